@@ -1,11 +1,34 @@
+import argparse
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
 import pygame
 import pygame.sndarray
 import math
 import random
+import time
 import heapq
 import numpy as np
+from types import MappingProxyType
 from typing import List, Tuple, Dict, Optional
 
+import event_log
+import map_loader
+from camera import Camera
+from distance_oracle import DistanceOracle
+from frame_profiler import FrameProfiler, TOTAL_STAGE
+from hpa_planner import HierarchicalPlanner
+from jps_planner import jump_point_search
+from item_index import ItemIndex, LandmarkIndex
+from mission_planner import MissionPlanner
+from path_cache import PathCache
+from sim_clock import SimClock
+from warehouse_grid import (WarehouseGrid, CHAR_TO_CODE, CELL_OBSTACLE, CELL_FREE, CELL_START,
+                            CELL_RECHARGE, CELL_WAREHOUSE)
+
 # Definições de cores
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -17,7 +40,7 @@ RED = (255, 0, 0)
 # Tamanho da célula
 CELL_SIZE = 100
 MARGIN = 5
-ANIMATION_SPEED = 5  # Velocidade de animação do robô
+ANIMATION_SPEED = 5  # Velocidade de animação do robô (pixels por passo da simulação)
 RECHARGE_SPEED = 60  # Segundos para recarregar de 0% a 100%
 STATION_WAIT_TIME = 3000  # Tempo em milissegundos para iniciar recarga (3 segundos)
 
@@ -55,34 +78,60 @@ matriz2 = [
     ['1', '0', '0', '1', '0', '1', '1', 'R'],
 ]
 
+# Grid compacto (códigos uint8 + camadas de flags) usado por toda a lógica
+world_grid = WarehouseGrid.from_matrix(matriz2)
+
 # Definir a posição inicial do robô (encontra o 'S')
-for row_idx, row in enumerate(matriz2):
-    for col_idx, cell in enumerate(row):
-        if cell == 'S':
-            robot_grid_pos = [col_idx, row_idx]  # (x, y)
-
-# Inicializar pygame
-pygame.init()
-pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
-pygame.mixer.set_num_channels(8)  # Permite 8 sons simultâneos
-
-# Configurar a tela
-GRID_WIDTH = len(matriz2[0]) * CELL_SIZE
-GRID_HEIGHT = len(matriz2) * CELL_SIZE
+robot_grid_pos = list(world_grid.positions(CELL_START)[0])  # (x, y)
+
+# Configurar a tela (a janela só é criada em init_display(), nunca no import)
+GRID_WIDTH = world_grid.cols * CELL_SIZE  # Tamanho do mundo em pixels (zoom 1)
+GRID_HEIGHT = world_grid.rows * CELL_SIZE
+VIEW_MAX_WIDTH = 1024  # Maior área do grid na janela; mapas maiores usam a câmera
+VIEW_MAX_HEIGHT = 768
+VIEW_WIDTH = min(GRID_WIDTH, VIEW_MAX_WIDTH)  # Área do grid na janela
+VIEW_HEIGHT = min(GRID_HEIGHT, VIEW_MAX_HEIGHT)
 PANEL_WIDTH = 350  # Largura do painel lateral
-WIDTH = GRID_WIDTH + PANEL_WIDTH  # Largura total da tela
-HEIGHT = GRID_HEIGHT
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Simulador de Robô com Bateria e Gradiente")
-
-# Fonte para exibição de texto
-font = pygame.font.Font(None, 32)       # Reduzido de 36
-font_small = pygame.font.Font(None, 24)  # Reduzido de 28
-font_tiny = pygame.font.Font(None, 18)   # Reduzido de 22
+PANEL_BG_COLOR = (30, 30, 40)  # Azul escuro
+PANEL_BORDER_COLOR = (100, 100, 120)
+WIDTH = VIEW_WIDTH + PANEL_WIDTH  # Largura total da tela
+HEIGHT = VIEW_HEIGHT
+screen = None  # Superfície da janela (criada por init_display)
+
+# Fonte para exibição de texto (criadas por init_display)
+font = None        # 32px
+font_small = None  # 24px
+font_tiny = None   # 18px
+font_title = None        # 72px (overlay de fim de jogo)
+font_message = None      # 48px (overlay de fim de jogo)
+font_instruction = None  # 36px (overlay de fim de jogo)
+
+# Cache de textos renderizados: (fonte, texto, cor) -> superfície
+TEXT_CACHE_SIZE = 512
+text_cache = {}
 
 # Sistema de scroll do painel lateral
 panel_scroll_offset = 0  # Offset de scroll do painel
 panel_max_scroll = 0     # Máximo de scroll possível
+panel_surface = None     # Superfície virtual persistente do painel
+panel_layout = None      # (widgets, scroll, altura) pintados em panel_surface
+overlay_surface = None   # Véu semitransparente do overlay de fim de jogo
+
+# Lista de controles exibida no painel (tecla, descrição)
+PANEL_CONTROLS = [
+    ("Setas", "Mover robô"),
+    ("1/2", "Coletar item"),
+    ("A", "Auto Total"),
+    ("S", "Semi-Auto"),
+    ("R", "Reiniciar"),
+    ("M", "Mute/Som"),
+    ("T", "Testar Sons"),
+    ("F1-F4", "Velocidade 1×/4×/16×/máx"),
+    ("P", "Perfil do quadro"),
+    ("+/-", "Zoom (ou roda no grid)"),
+    ("C", "Câmera segue o robô"),
+    ("F", "Mapa inteiro"),
+]
 
 # Sistema de sons
 SOUND_ENABLED = True  # Toggle para habilitar/desabilitar sons
@@ -91,6 +140,8 @@ sounds_failed = set()  # Nomes de sons que falharam ao criar (evita tentar de no
 
 # Posição real do robô (para animação)
 robot_real_pos = [robot_grid_pos[0] * CELL_SIZE, robot_grid_pos[1] * CELL_SIZE]
+robot_prev_pos = None  # robot_real_pos antes do último passo (para interpolar o desenho)
+robot_draw_pos = list(robot_real_pos)  # Posição desenhada no frame atual (interpolada)
 battery = 100  # Bateria inicial (100%)
 
 # Variáveis de recarga automática
@@ -104,6 +155,10 @@ last_position = robot_grid_pos.copy()  # Última posição para detectar movimen
 # items_on_grid: {(x, y): [{'type': 'TYPE_A'}, {'type': 'TYPE_B'}, ...]}
 items_on_grid = {}
 robot_inventory = []  # Lista de itens carregados pelo robô
+# Contadores dos itens (restantes, por tipo), atualizados por collect_item e pela entrega.
+# Quem substitui items_on_grid por outro dicionário não precisa avisar: get_item_index()
+# percebe a troca e recalcula; alterações na lista de uma célula devem passar por collect_item.
+item_index = ItemIndex()
 
 # Variáveis de entrega automática
 WAREHOUSE_WAIT_TIME = 3000  # Tempo em milissegundos para iniciar entrega (3 segundos)
@@ -132,14 +187,175 @@ action_completed = False  # Flag para indicar que ação foi completada e pode a
 # Configurações do modo automático total
 AUTO_ACTION_DELAY = 300  # Pausa de 300ms entre ações no modo automático total
 last_action_time = 0  # Tempo da última ação completada
-RECHARGE_THRESHOLD = 85  # Porcentagem de bateria suficiente para parar de recarregar
+RECHARGE_THRESHOLD = 85  # Recarga mínima (%) no modo automático total guloso, antes de parar de recarregar
+SAFETY_MARGIN = 8  # Margem de segurança no cálculo de bateria necessária (era 15%)
+DECISION_SAFETY_MARGIN = 6  # Margem de segurança nas decisões do modo automático (era 10%)
+MIN_BATTERY = 20  # Mínimo de bateria necessária calculada (era 30%)
+USE_MISSION_PLANNER = True  # Modo automático total segue o plano CVRP (False: decisão gulosa a cada ação)
+MISSION_PLAN_MAX_EVALUATIONS = 3000  # Avaliações de custo por plano de missão (limite determinístico)
+MISSION_PLAN_TIME_BUDGET_MS = 200  # Prazo do planejamento na interface interativa (distâncias + construção + busca local)
+
+# Plano de missão do modo automático total (mission_planner.MissionPlan)
+mission_plan = None
+# Prazo em tempo real do planejamento: só main() (a interface) liga; headless e
+# Monte Carlo usam apenas o limite de avaliações, e a mesma semente dá a mesma missão
+mission_plan_time_budget_ms = None
+mission_plan_step = 0  # Próxima ação do plano
+mission_plan_version = -1  # map_version em que o plano foi feito
+planned_recharge_target = None  # Bateria alvo da recarga planejada em andamento
 
 # Cache para recarga dinâmica
 cached_target_battery = None  # Cache do target calculado
 last_battery_calculation_time = 0  # Última vez que calculou
 
+# Versão do mapa: incrementada a cada alteração de células (invalida caches de navegação)
+map_version = 0
+
+# Grafo de navegação imutável (reconstruído apenas quando map_version muda)
+navigation_graph = None
+navigation_graph_version = -1
+
+# Oráculo de distâncias entre marcos (construído sob demanda, uma vez por mapa)
+distance_oracle = None
+distance_oracle_version = -1
+
+# Posições fixas do mapa: almoxarifados, estações e início (refeitas quando map_version muda)
+landmark_index = None
+landmark_index_version = -1
+
+# Planejador hierárquico (HPA*) para mapas grandes; acompanha set_cell sem ser reconstruído
+HPA_MIN_CELLS = 200 * 200  # A partir deste número de células find_path usa o HPA* em vez do a_star
+PATH_SEARCH = "a_star"  # Busca de find_path abaixo de HPA_MIN_CELLS: "a_star" ou "jps" (Jump Point Search)
+hierarchical_planner = None
+hierarchical_planner_version = -1
+
+# Caminhos e custos de rota já calculados, por (início, alvo, map_version), com descarte LRU
+PATH_CACHE_SIZE = 256  # Entradas de caminhos (e, à parte, de custos)
+path_cache = PathCache(PATH_CACHE_SIZE)
+
+# Renderização por retângulos sujos (render_frame)
+grid_surface = None  # Grid estático pré-desenhado
+grid_surface_version = -1  # map_version do grid pré-desenhado
+full_redraw_pending = True  # Próximo frame redesenha a tela inteira
+dirty_cells = set()  # Células com itens alterados desde o último frame
+last_robot_rect = None  # Área do robô no último frame
+last_robot_key = None  # (posição na tela, itens carregados, degrau de cor) no último frame
+robot_bounds_cache = {}  # (escala, deslocamento) -> retângulo do desenho do robô
+
+# Câmera sobre o grid (render_camera_frame): com zoom 1 e o mapa inteiro na janela
+# vale o caminho por retângulos sujos acima; senão só a vista é desenhada
+LOD_CELL_PX = 6  # Abaixo deste tamanho de célula na tela: um pixel de cor por célula
+camera = Camera(CELL_SIZE, VIEW_WIDTH, VIEW_HEIGHT, GRID_WIDTH, GRID_HEIGHT)
+camera.follow = not camera.fits()
+camera_frame_active = False  # O último frame foi desenhado pela câmera
+view_background = None  # Células visíveis pré-desenhadas
+view_background_key = None  # (mapa, zoom, células visíveis, versão dos itens no LOD)
+cell_tile_cache = {}  # (código, px por célula) -> superfície de uma célula
+
+# Laço principal: simulação em passo fixo, desenho na taxa que a máquina sustentar
+SIM_STEP_MS = 1000 / 30    # Tempo simulado por passo (a lógica foi calibrada para 30 passos/s)
+RENDER_FPS = 60            # Limite de frames desenhados por segundo
+MAX_FRAME_MS = 250         # Pausas maiores (janela arrastada, depurador) não viram rajadas de passos
+MAX_TICKS_PER_FRAME = 8    # Passos por frame (em 1×) antes de descartar o atraso
+
+# Velocidade da simulação (teclas F1 a F4): multiplica o tempo simulado por
+# segundo real; None = o mais rápido possível. Frames são pulados, nunca passos.
+SIM_SPEEDS = (1, 4, 16, None)
+MAX_SPEED_FRAME_BUDGET_MS = 12  # Tempo real por frame gasto em passos na velocidade máxima
+sim_speed = 1
+
+# Perfil do quadro por etapa (tecla P mostra os percentis no painel; --profile-csv grava cada quadro)
+PROFILER_STAGES = [
+    "check_game_state", "update_auto_recharge", "update_auto_delivery", "update_auto_mode",
+    "animate_robot", "draw_grid", "draw_items", "draw_robot", "draw_side_panel",
+    "draw_game_overlay", "display_flip", "events", TOTAL_STAGE,
+]
+PROFILER_WINDOW = 300        # Quadros na janela dos percentis
+PROFILER_REFRESH_MS = 500    # Intervalo (tempo real) entre atualizações dos números no painel
+frame_profiler = FrameProfiler(PROFILER_STAGES, window=PROFILER_WINDOW)
+profiler_visible = False
+profiler_snapshot = []       # FrameProfiler.summary() mostrado no painel
+profiler_snapshot_time = 0.0
+path_cache_snapshot = None  # path_cache.stats() mostrado junto com o perfil
+
+# Gravação de eventos para replay (start_event_recording / event_log.py)
+event_recorder = None  # event_log.EventLogWriter ativo (None = sem gravação)
+recorded_mode = None   # Último auto_mode gravado
+
 # Sistema de logs
 showLogs = True  # Controla se os logs são exibidos no terminal
+LOG_LEVEL = "INFO"  # Nível mínimo ("DEBUG" inclui o rastreamento do modo automático)
+LOG_JSON_PATH = None  # Arquivo JSON Lines com todos os registros (None = desligado)
+# Severidade de cada categoria de log; as demais (MOVE, AUTO, ITEM...) são INFO
+LOG_CATEGORY_LEVELS = {"DEBUG": logging.DEBUG, "ERROR": logging.ERROR}
+
+# Fonte de tempo da simulação (ms). Por padrão usa o relógio do pygame; o laço
+# interativo (main) e o motor headless usam um SimClock via set_time_source().
+_time_source = pygame.time.get_ticks
+
+
+def now_ms():
+    """Retorna o tempo atual da simulação em milissegundos."""
+    return _time_source()
+
+
+def set_time_source(source):
+    """Define a função usada como relógio da simulação (None restaura o pygame)."""
+    global _time_source
+    _time_source = source if source is not None else pygame.time.get_ticks
+
+
+def init_display():
+    """Inicializa pygame, mixer, janela e fontes (apenas no modo interativo)."""
+    global screen, font, font_small, font_tiny, font_title, font_message, font_instruction
+
+    pygame.init()
+    pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+    pygame.mixer.set_num_channels(8)  # Permite 8 sons simultâneos
+
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Simulador de Robô com Bateria e Gradiente")
+
+    font = pygame.font.Font(None, 32)       # Reduzido de 36
+    font_small = pygame.font.Font(None, 24)  # Reduzido de 28
+    font_tiny = pygame.font.Font(None, 18)   # Reduzido de 22
+    font_title = pygame.font.Font(None, 72)
+    font_message = pygame.font.Font(None, 48)
+    font_instruction = pygame.font.Font(None, 36)
+    text_cache.clear()  # Superfícies das fontes antigas
+
+
+def load_map(matriz):
+    """
+    Carrega uma nova matriz de ambiente e recalcula posição inicial e dimensões.
+    Aceita a matriz literal ou um WarehouseGrid (ex.: de map_loader.load_map_file);
+    com um grid, matriz2 fica None: mapas grandes não são convertidos para listas.
+    """
+    global matriz2, world_grid, robot_grid_pos, GRID_WIDTH, GRID_HEIGHT, VIEW_WIDTH, VIEW_HEIGHT, WIDTH, HEIGHT
+
+    if isinstance(matriz, WarehouseGrid):
+        matriz2 = None
+        world_grid = matriz
+    else:
+        matriz2 = matriz
+        world_grid = WarehouseGrid.from_matrix(matriz)
+    starts = world_grid.positions(CELL_START)
+    if starts:
+        robot_grid_pos = list(starts[0])
+
+    GRID_WIDTH = world_grid.cols * CELL_SIZE
+    GRID_HEIGHT = world_grid.rows * CELL_SIZE
+    VIEW_WIDTH = min(GRID_WIDTH, VIEW_MAX_WIDTH)
+    VIEW_HEIGHT = min(GRID_HEIGHT, VIEW_MAX_HEIGHT)
+    WIDTH = VIEW_WIDTH + PANEL_WIDTH
+    HEIGHT = VIEW_HEIGHT
+    camera.resize(VIEW_WIDTH, VIEW_HEIGHT, GRID_WIDTH, GRID_HEIGHT)
+    camera.follow = not camera.fits()
+
+    bump_map_version()
+    request_full_redraw()
+    if event_recorder is not None:
+        record_map()
 
 
 def generate_beep(frequency=440, duration=0.1, volume=0.5, wave_type='sine'):
@@ -175,7 +391,7 @@ def generate_beep(frequency=440, duration=0.1, volume=0.5, wave_type='sine'):
             sound.set_volume(1.0)
         return sound
     except Exception as e:
-        log(f"generate_beep falhou (freq={frequency}): {e}", "SOUND")
+        log("generate_beep falhou (freq={}): {}", "SOUND", frequency, e)
         return None
 
 
@@ -211,10 +427,10 @@ def ensure_sound(sound_name):
         snd = generate_beep(**SOUND_DEFINITIONS[sound_name])
         if snd is not None:
             sounds[sound_name] = snd
-            log(f"Som '{sound_name}' criado sob demanda.", "SOUND")
+            log("Som '{}' criado sob demanda.", "SOUND", sound_name)
             return True
     except Exception as e:
-        log(f"Erro ao criar som '{sound_name}': {e}", "ERROR")
+        log("Erro ao criar som '{}': {}", "ERROR", sound_name, e)
     
     sounds_failed.add(sound_name)
     return False
@@ -234,12 +450,12 @@ def init_sounds():
             else:
                 sounds_failed.add(name)
         except Exception as e:
-            log(f"Erro ao criar som '{name}': {e}", "ERROR")
+            log("Erro ao criar som '{}': {}", "ERROR", name, e)
             sounds_failed.add(name)
     
     loaded = len(sounds)
     total = len(SOUND_DEFINITIONS)
-    log(f"Sistema de sons: {loaded}/{total} carregados.", "SOUND")
+    log("Sistema de sons: {}/{} carregados.", "SOUND", loaded, total)
     
     if loaded == 0:
         log("Nenhum som pôde ser carregado. Verifique numpy e pygame.mixer.", "ERROR")
@@ -251,21 +467,23 @@ def init_sounds():
             sounds['test'].play()
             log("Som de teste tocado (440 Hz).", "SOUND")
         except Exception as e:
-            log(f"Erro ao tocar teste: {e}", "ERROR")
+            log("Erro ao tocar teste: {}", "ERROR", e)
 
 
 def play_sound(sound_name, debug=False):
     """Toca um som se o sistema de som estiver habilitado."""
     if not SOUND_ENABLED:
         if debug:
-            log(f"Som '{sound_name}' não tocado (SOUND_ENABLED = False)", "SOUND")
+            log("Som '{}' não tocado (SOUND_ENABLED = False)", "SOUND", sound_name)
         return
+    if not pygame.mixer.get_init():
+        return  # Mixer não inicializado (ex.: simulação headless)
     
     # Se o som não está carregado, tenta criar sob demanda (apenas uma vez por nome)
     if sound_name not in sounds or sounds[sound_name] is None:
         if not ensure_sound(sound_name):
             if debug:
-                log(f"Som '{sound_name}' indisponível.", "SOUND")
+                log("Som '{}' indisponível.", "SOUND", sound_name)
             return
     
     try:
@@ -274,10 +492,10 @@ def play_sound(sound_name, debug=False):
             return
         channel = snd.play()
         if debug and channel:
-            log(f"♪ Som '{sound_name}' tocando.", "SOUND")
+            log("♪ Som '{}' tocando.", "SOUND", sound_name)
     except Exception as e:
         global sounds_failed
-        log(f"Erro ao tocar som '{sound_name}': {e}", "ERROR")
+        log("Erro ao tocar som '{}': {}", "ERROR", sound_name, e)
         sounds_failed.add(sound_name)
 
 
@@ -286,42 +504,144 @@ def toggle_sound():
     global SOUND_ENABLED
     SOUND_ENABLED = not SOUND_ENABLED
     status = "LIGADO" if SOUND_ENABLED else "DESLIGADO"
-    log(f"========== Som {status} ==========", "SOUND")
+    log("========== Som {} ==========", "SOUND", status)
     if SOUND_ENABLED:
         log("Tocando som de confirmação...", "SOUND")
         play_sound('mode_change', debug=True)
 
 
-def log(message, level="INFO"):
-    """Exibe log no terminal se showLogs estiver ativo."""
-    if showLogs:
-        prefix = f"[{level}]"
-        print(f"{prefix:10} {message}")
+# Logger raiz da simulação; cada categoria é um filho ("simrobot.MOVE", ...)
+# e pode ser silenciada sozinha com logging.getLogger("simrobot.MOVE").setLevel(...)
+sim_logger = logging.getLogger("simrobot")
+sim_logger.setLevel(LOG_LEVEL)
+sim_logger.propagate = False
+category_loggers = {}
+log_listener = None  # logging.handlers.QueueListener ativo (None = não configurado)
 
 
-def draw_grid():
-    """Desenha a matriz representando o ambiente."""
-    for row_idx, row in enumerate(matriz2):
-        for col_idx, cell in enumerate(row):
-            x = col_idx * CELL_SIZE
-            y = row_idx * CELL_SIZE
+class LazyLogMessage:
+    """Mensagem no estilo str.format; só é formatada se o registro for emitido."""
+    __slots__ = ('fmt', 'args')
+
+    def __init__(self, fmt, args):
+        self.fmt = fmt
+        self.args = args
+
+    def __str__(self):
+        return self.fmt.format(*self.args) if self.args else self.fmt
+
+
+class SimTimeFilter(logging.Filter):
+    """Anota o registro com a categoria e o tempo simulado, no thread de quem loga."""
+
+    def filter(self, record):
+        record.category = record.name.rpartition('.')[2]
+        record.sim_ms = now_ms()
+        return True
+
+
+class ConsoleLogFormatter(logging.Formatter):
+    """Mesmo formato de sempre no terminal: "[CATEGORIA] mensagem"."""
+
+    def format(self, record):
+        prefix = f"[{record.category}]"
+        return f"{prefix:10} {record.getMessage()}"
+
+
+class JsonLinesLogFormatter(logging.Formatter):
+    """Um objeto JSON por linha, para filtrar e analisar logs de missões longas."""
+
+    def format(self, record):
+        return json.dumps({
+            'sim_ms': record.sim_ms,
+            'time': round(record.created, 6),
+            'level': record.levelname,
+            'category': record.category,
+            'message': record.getMessage(),
+        }, ensure_ascii=False)
+
+
+def configure_logging(level=None, json_path=None, console=True):
+    """
+    (Re)configura os logs: nível mínimo, terminal e arquivo JSON Lines.
+    log() só enfileira o registro; a escrita acontece no thread de um
+    QueueListener, então E/S de terminal ou disco não atrasa o quadro.
+    """
+    global log_listener
+    shutdown_logging()
+    level = level or LOG_LEVEL
+    json_path = json_path or LOG_JSON_PATH
+
+    handlers = []
+    if console:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(ConsoleLogFormatter())
+        handlers.append(console_handler)
+    if json_path:
+        json_handler = logging.FileHandler(json_path, mode='w', encoding='utf-8')
+        json_handler.setFormatter(JsonLinesLogFormatter())
+        handlers.append(json_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(SimTimeFilter())
+    sim_logger.handlers[:] = [queue_handler]
+    sim_logger.setLevel(level)
+    log_listener = logging.handlers.QueueListener(log_queue, *handlers)
+    log_listener.start()
+
+
+def shutdown_logging():
+    """Escreve os registros pendentes e encerra o thread de logs."""
+    global log_listener
+    if log_listener is None:
+        return
+    log_listener.stop()
+    for handler in log_listener.handlers:
+        handler.close()
+    sim_logger.handlers.clear()
+    log_listener = None
 
-            # Definir cor baseada no tipo de célula
-            if cell == 'S':
-                color = (255, 255, 0)  # Amarelo
-            elif cell == 'R':
-                color = BLUE
-            elif cell == 'A':
-                color = GREEN
-            elif cell == '1':
-                color = WHITE
-            elif cell == '0':
-                color = GRAY
-            else:
-                color = BLACK  # Caso não identificado
 
-            pygame.draw.rect(screen, color, (x, y, CELL_SIZE - MARGIN, CELL_SIZE - MARGIN))
-            pygame.draw.rect(screen, BLACK, (x, y, CELL_SIZE - MARGIN, CELL_SIZE - MARGIN), 2)  # Borda
+atexit.register(shutdown_logging)
+
+
+def log(message, level="INFO", *args):
+    """
+    Registra uma mensagem da categoria 'level' (MOVE, AUTO, DEBUG...) se showLogs
+    estiver ativo. Campos {} de 'message' são preenchidos com 'args' só quando o
+    registro passa pelo nível mínimo, então logs filtrados quase não custam nada.
+    """
+    if not showLogs:
+        return
+    logger = category_loggers.get(level)
+    if logger is None:
+        logger = category_loggers[level] = sim_logger.getChild(level)
+    severity = LOG_CATEGORY_LEVELS.get(level, logging.INFO)
+    if not logger.isEnabledFor(severity):
+        return
+    if log_listener is None:
+        configure_logging()
+    logger.log(severity, LazyLogMessage(message, args))
+
+
+# Cor de cada código de célula
+CELL_COLORS = {
+    CELL_START: (255, 255, 0),  # Amarelo
+    CELL_RECHARGE: BLUE,
+    CELL_WAREHOUSE: GREEN,
+    CELL_FREE: WHITE,
+    CELL_OBSTACLE: GRAY,
+}
+# Mesmas cores numa tabela código -> RGB, para o nível de detalhe da câmera (um pixel por célula)
+CELL_RGB = np.zeros((256, 3), dtype=np.uint8)
+for _code, _color in CELL_COLORS.items():
+    CELL_RGB[_code] = _color
+
+
+def draw_grid():
+    """Desenha a matriz representando o ambiente (a partir do grid pré-desenhado)."""
+    screen.blit(get_grid_surface(), (0, 0))
 
 
 def initialize_items_randomly():
@@ -333,24 +653,27 @@ def initialize_items_randomly():
     total_items_initial = 0
     
     # Percorre todas as células tipo '1' e adiciona itens aleatoriamente
-    for row_idx, row in enumerate(matriz2):
-        for col_idx, cell in enumerate(row):
-            if cell == '1':  # Apenas células livres
-                # 40% de chance de ter itens nesta célula
-                if random.random() < 0.4:
-                    num_items = random.randint(1, MAX_ITEMS_PER_CELL)
-                    cell_key = (col_idx, row_idx)
-                    items_on_grid[cell_key] = []
-                    
-                    for _ in range(num_items):
-                        item_type = random.choice(ITEM_TYPES)
-                        items_on_grid[cell_key].append({'type': item_type})
-                        total_items_initial += 1
-                    
-                    log(f"Item criado em ({col_idx}, {row_idx}): {num_items} itens tipo {item_type}", "INIT")
+    for col_idx, row_idx in world_grid.positions(CELL_FREE):  # Apenas células livres
+        # 40% de chance de ter itens nesta célula
+        if random.random() < 0.4:
+            num_items = random.randint(1, MAX_ITEMS_PER_CELL)
+            cell_key = (col_idx, row_idx)
+            items_on_grid[cell_key] = []
+            
+            for _ in range(num_items):
+                item_type = random.choice(ITEM_TYPES)
+                items_on_grid[cell_key].append({'type': item_type})
+                total_items_initial += 1
+            
+            log("Item criado em ({}, {}): {} itens tipo {}", "INIT", col_idx, row_idx, num_items, item_type)
     
-    log(f"Total de itens criados: {total_items_initial}", "INIT")
-    log(f"Células com itens: {len(items_on_grid)}", "INIT")
+    log("Total de itens criados: {}", "INIT", total_items_initial)
+    log("Células com itens: {}", "INIT", len(items_on_grid))
+    item_index.rebuild(items_on_grid)
+
+    # As células com itens são marcos do oráculo de distâncias
+    invalidate_distance_oracle()
+    request_full_redraw()
 
 
 def draw_items_on_grid():
@@ -370,67 +693,74 @@ def draw_items_on_grid():
                 pygame.draw.circle(screen, BLACK, (item_x, item_y), 8, 2)
 
 
-def draw_robot_item_count():
+def draw_robot_item_count(center=None):
     """Desenha a quantidade de itens carregados pelo robô (canto superior direito do robô)."""
     if len(robot_inventory) > 0:
-        # Posição no canto superior direito do robô
-        count_x = robot_real_pos[0] + CELL_SIZE - 30
-        count_y = robot_real_pos[1] + 10
+        # Posição no canto superior direito do robô ('center' na tela, para a câmera)
+        if center is None:
+            center = (robot_draw_pos[0] + CELL_SIZE - 30, robot_draw_pos[1] + 10)
+        count_x, count_y = center
         
         # Fundo do contador
         pygame.draw.circle(screen, (50, 50, 50), (count_x, count_y), 15)
         pygame.draw.circle(screen, BLACK, (count_x, count_y), 15, 2)
         
         # Texto com a quantidade
-        count_text = font.render(str(len(robot_inventory)), True, WHITE)
+        count_text = render_text(font, str(len(robot_inventory)), WHITE)
         text_rect = count_text.get_rect(center=(count_x, count_y))
         screen.blit(count_text, text_rect)
 
 
-def collect_item(item_index):
-    """Coleta um item específico da célula atual (item_index: 1 ou 2)."""
+def collect_item(item_number):
+    """Coleta um item específico da célula atual (item_number: 1 ou 2)."""
     global robot_inventory, items_on_grid
     
     x, y = robot_grid_pos
     cell_key = (x, y)
     
+    index = get_item_index()
+    
     # Verifica se há itens nesta célula e se o robô tem espaço
     if cell_key in items_on_grid and len(items_on_grid[cell_key]) > 0:
         if len(robot_inventory) < ROBOT_CAPACITY:
             # Ajusta o índice (usuário digita 1 ou 2, mas lista começa em 0)
-            item_pos = item_index - 1
+            item_pos = item_number - 1
             
             # Verifica se o índice é válido
             if 0 <= item_pos < len(items_on_grid[cell_key]):
                 # Remove o item da célula e adiciona ao inventário
                 item = items_on_grid[cell_key].pop(item_pos)
                 robot_inventory.append(item)
+                mark_cell_dirty(cell_key)
+                record_event(event_log.EV_COLLECT, x, y, item_pos, ITEM_TYPES.index(item['type']))
                 
-                log(f"Item coletado: tipo {item['type']} em ({x}, {y})", "COLLECT")
-                log(f"Inventário: {len(robot_inventory) - 1} -> {len(robot_inventory)}/{ROBOT_CAPACITY}", "INVENTORY")
+                log("Item coletado: tipo {} em ({}, {})", "COLLECT", item['type'], x, y)
+                log("Inventário: {} -> {}/{}", "INVENTORY", len(robot_inventory) - 1, len(robot_inventory), ROBOT_CAPACITY)
                 
                 # Toca som de coleta
                 play_sound('collect')
                 
                 # Remove a célula se não houver mais itens
-                if len(items_on_grid[cell_key]) == 0:
+                cell_emptied = len(items_on_grid[cell_key]) == 0
+                index.collected(cell_key, item, cell_emptied)
+                if cell_emptied:
                     del items_on_grid[cell_key]
-                    log(f"Célula ({x}, {y}) esvaziada", "COLLECT")
+                    log("Célula ({}, {}) esvaziada", "COLLECT", x, y)
                 
                 return True
             else:
-                log(f"Índice de item inválido: {item_index} (disponíveis: {len(items_on_grid[cell_key])})", "ERROR")
+                log("Índice de item inválido: {} (disponíveis: {})", "ERROR", item_number, len(items_on_grid[cell_key]))
         else:
-            log(f"Inventário cheio! Capacidade: {ROBOT_CAPACITY}, Atual: {len(robot_inventory)}", "ERROR")
+            log("Inventário cheio! Capacidade: {}, Atual: {}", "ERROR", ROBOT_CAPACITY, len(robot_inventory))
     else:
-        log(f"Nenhum item disponível em ({x}, {y})", "ERROR")
+        log("Nenhum item disponível em ({}, {})", "ERROR", x, y)
     return False
 
 
 def is_at_warehouse():
     """Verifica se o robô está em um almoxarifado."""
     x, y = robot_grid_pos
-    return matriz2[y][x] == 'A'
+    return world_grid.is_warehouse(x, y)
 
 
 def update_auto_delivery():
@@ -438,7 +768,7 @@ def update_auto_delivery():
     global robot_inventory, is_delivering, time_at_warehouse, last_delivery_time, items_delivered_count, last_position
     global waiting_for_action, current_action, current_path, auto_mode, last_action_time
     
-    current_time = pygame.time.get_ticks()
+    current_time = now_ms()
     
     # Verifica se está em um almoxarifado e tem itens
     if is_at_warehouse() and len(robot_inventory) > 0:
@@ -449,21 +779,23 @@ def update_auto_delivery():
                 # Ainda não está entregando, verifica se já passou o tempo de espera
                 if time_at_warehouse == 0:
                     time_at_warehouse = current_time
-                    log(f"Robô chegou no almoxarifado com {len(robot_inventory)} itens. Aguardando {WAREHOUSE_WAIT_TIME/1000:.1f}s...", "DELIVERY")
+                    log("Robô chegou no almoxarifado com {} itens. Aguardando {:.1f}s...", "DELIVERY", len(robot_inventory), WAREHOUSE_WAIT_TIME/1000)
                 elif current_time - time_at_warehouse >= WAREHOUSE_WAIT_TIME:
                     # Passou 3 segundos, inicia a entrega
                     is_delivering = True
                     last_delivery_time = current_time
-                    log(f"Entrega iniciada! {len(robot_inventory)} itens para entregar", "DELIVERY")
+                    log("Entrega iniciada! {} itens para entregar", "DELIVERY", len(robot_inventory))
             else:
                 # Já está entregando, verifica se passou 1 segundo desde a última entrega
                 if current_time - last_delivery_time >= DELIVERY_INTERVAL:
                     # Entrega um item
                     if len(robot_inventory) > 0:
-                        robot_inventory.pop(0)  # Remove o primeiro item
+                        delivered = robot_inventory.pop(0)  # Remove o primeiro item
                         items_delivered_count += 1
+                        get_item_index().delivered(delivered)
+                        record_event(event_log.EV_DELIVER, ITEM_TYPES.index(delivered['type']))
                         last_delivery_time = current_time
-                        log(f"Item entregue! Restantes: {len(robot_inventory)}, Total entregue: {items_delivered_count}", "DELIVERY")
+                        log("Item entregue! Restantes: {}, Total entregue: {}", "DELIVERY", len(robot_inventory), items_delivered_count)
                         
                         # Toca som de entrega
                         play_sound('deliver')
@@ -472,10 +804,10 @@ def update_auto_delivery():
                     if len(robot_inventory) == 0:
                         is_delivering = False
                         time_at_warehouse = 0
-                        log(f"Entrega completa! Total de itens entregues: {items_delivered_count}", "DELIVERY")
+                        log("Entrega completa! Total de itens entregues: {}", "DELIVERY", items_delivered_count)
                         
                         # Verifica se TODOS os itens do jogo foram entregues
-                        items_remaining = sum(len(items) for items in items_on_grid.values())
+                        items_remaining = remaining_item_count()
                         
                         # Se estava em ação automática de entrega, marca como completa
                         if waiting_for_action and current_action == 'deliver' and auto_mode == AUTO_MODE_FULL:
@@ -488,7 +820,7 @@ def update_auto_delivery():
                             if items_remaining == 0:
                                 log("=== AÇÃO AUTOMÁTICA COMPLETA: Todos os itens foram entregues! ===", "AUTO")
                             else:
-                                log(f"=== AÇÃO AUTOMÁTICA COMPLETA: Inventário entregue. Restam {items_remaining} itens no ambiente ===", "AUTO")
+                                log("=== AÇÃO AUTOMÁTICA COMPLETA: Inventário entregue. Restam {} itens no ambiente ===", "AUTO", items_remaining)
         else:
             # Robô se moveu ou chegou no almoxarifado, atualiza last_position e reseta entrega
             is_delivering = False
@@ -590,9 +922,13 @@ ROBOT_EYE_COLOR    = (70, 170, 255)
 BOX_COLOR          = (194, 149, 89)
 BOX_BORDER_COLOR   = (130, 95, 60)
 
-def draw_robot(scale=0.5, offset_y=20):
-    """Desenha um robô estilo armazém escalado por 'scale'."""
-    x, y = robot_real_pos   # ponto de referência
+# Sprites do robô: o desenho vetorial é feito uma vez por escala e degrau de cor
+ROBOT_BATTERY_TINT = False  # Corpo vai do verde (100%) ao vermelho (0%) conforme a bateria
+ROBOT_COLOR_STEPS = 64      # Degraus de cor da bateria (um sprite por degrau usado)
+robot_sprite_cache = {}     # (escala, deslocamento, degrau) -> (sprite, deslocamento do sprite)
+
+def paint_robot(target, x, y, scale=0.5, offset_y=20, body_color=ROBOT_BODY_COLOR):
+    """Desenha (vetorialmente) um robô estilo armazém em 'target', com referência em (x, y)."""
 
     y += offset_y
 
@@ -614,17 +950,17 @@ def draw_robot(scale=0.5, offset_y=20):
 
     # sombra
     shadow_rect = body_rect.move(s(4), s(6))
-    pygame.draw.ellipse(screen, (30, 30, 30), shadow_rect)
+    pygame.draw.ellipse(target, (30, 30, 30), shadow_rect)
 
     # corpo
-    pygame.draw.ellipse(screen, ROBOT_BODY_COLOR, body_rect)
-    pygame.draw.ellipse(screen, ROBOT_STROKE_COLOR, body_rect, s(3) or 1)
+    pygame.draw.ellipse(target, body_color, body_rect)
+    pygame.draw.ellipse(target, ROBOT_STROKE_COLOR, body_rect, s(3) or 1)
 
     # --- Faixa “cabeça” com olhos ---
     head_rect = body_rect.inflate(-s(10), -s(18))
     head_rect.height = head_rect.height // 2
     head_rect.centery = body_rect.centery - s(6)
-    pygame.draw.ellipse(screen, (15, 15, 20), head_rect)
+    pygame.draw.ellipse(target, (15, 15, 20), head_rect)
 
     # olhos
     eye_r = s(7)
@@ -634,21 +970,21 @@ def draw_robot(scale=0.5, offset_y=20):
     left_eye_center  = (head_rect.centerx - eye_dx, eye_y)
     right_eye_center = (head_rect.centerx + eye_dx, eye_y)
 
-    pygame.draw.circle(screen, ROBOT_EYE_COLOR, left_eye_center, eye_r)
-    pygame.draw.circle(screen, ROBOT_EYE_COLOR, right_eye_center, eye_r)
+    pygame.draw.circle(target, ROBOT_EYE_COLOR, left_eye_center, eye_r)
+    pygame.draw.circle(target, ROBOT_EYE_COLOR, right_eye_center, eye_r)
 
     # brilho
-    pygame.draw.circle(screen, (230, 250, 255),
+    pygame.draw.circle(target, (230, 250, 255),
                        (left_eye_center[0] - s(2), left_eye_center[1] - s(3)), s(2) or 1)
-    pygame.draw.circle(screen, (230, 250, 255),
+    pygame.draw.circle(target, (230, 250, 255),
                        (right_eye_center[0] - s(2), right_eye_center[1] - s(3)), s(2) or 1)
 
     # “boca” / painel
     mouth_rect = pygame.Rect(0, 0, s(26), s(10))
     mouth_rect.centerx = body_cx
     mouth_rect.centery = body_cy + s(8)
-    pygame.draw.rect(screen, (20, 20, 25), mouth_rect, border_radius=s(4))
-    pygame.draw.rect(screen, (60, 60, 70), mouth_rect, 1, border_radius=s(4))
+    pygame.draw.rect(target, (20, 20, 25), mouth_rect, border_radius=s(4))
+    pygame.draw.rect(target, (60, 60, 70), mouth_rect, 1, border_radius=s(4))
 
     # --- Pernas ---
     bottom_y = body_rect.bottom - s(5)
@@ -676,17 +1012,17 @@ def draw_robot(scale=0.5, offset_y=20):
             foot = (knee1[0] + s(6), knee1[1] + leg_length2)
 
         # segmentos
-        pygame.draw.line(screen, ROBOT_STROKE_COLOR, (px, py), knee1, max(1, s(4)))
-        pygame.draw.line(screen, ROBOT_STROKE_COLOR, knee1, foot, max(1, s(4)))
+        pygame.draw.line(target, ROBOT_STROKE_COLOR, (px, py), knee1, max(1, s(4)))
+        pygame.draw.line(target, ROBOT_STROKE_COLOR, knee1, foot, max(1, s(4)))
 
         # juntas
-        pygame.draw.circle(screen, ROBOT_JOINT_COLOR, (px, py), s(4) or 1)
-        pygame.draw.circle(screen, ROBOT_JOINT_COLOR, knee1, s(4) or 1)
+        pygame.draw.circle(target, ROBOT_JOINT_COLOR, (px, py), s(4) or 1)
+        pygame.draw.circle(target, ROBOT_JOINT_COLOR, knee1, s(4) or 1)
 
         # pé oval
         foot_rect = pygame.Rect(0, 0, s(12), s(6))
         foot_rect.center = foot
-        pygame.draw.ellipse(screen, ROBOT_STROKE_COLOR, foot_rect)
+        pygame.draw.ellipse(target, ROBOT_STROKE_COLOR, foot_rect)
 
     # --- Braços levantados ---
     arm_left_base  = (body_rect.left + s(6),  body_rect.top + s(5))
@@ -699,37 +1035,84 @@ def draw_robot(scale=0.5, offset_y=20):
     arm_right_joint2 = (arm_right_joint1[0] - s(5), arm_right_joint1[1] - s(25))
 
     def draw_arm(base, j1, j2, end_x):
-        pygame.draw.line(screen, ROBOT_STROKE_COLOR, base, j1, max(1, s(4)))
-        pygame.draw.line(screen, ROBOT_STROKE_COLOR, j1, j2, max(1, s(4)))
+        pygame.draw.line(target, ROBOT_STROKE_COLOR, base, j1, max(1, s(4)))
+        pygame.draw.line(target, ROBOT_STROKE_COLOR, j1, j2, max(1, s(4)))
         end_point = (end_x, j2[1] - s(8))
-        pygame.draw.line(screen, ROBOT_STROKE_COLOR, j2, end_point, max(1, s(4)))
+        pygame.draw.line(target, ROBOT_STROKE_COLOR, j2, end_point, max(1, s(4)))
 
         for p in (base, j1, j2):
-            pygame.draw.circle(screen, ROBOT_JOINT_COLOR, p, s(4) or 1)
+            pygame.draw.circle(target, ROBOT_JOINT_COLOR, p, s(4) or 1)
 
         return end_point
 
     left_end  = draw_arm(arm_left_base,  arm_left_joint1,  arm_left_joint2,  body_cx - s(26))
     right_end = draw_arm(arm_right_base, arm_right_joint1, arm_right_joint2, body_cx + s(26))
 
-    pygame.draw.circle(screen, ROBOT_STROKE_COLOR, left_end,  s(4) or 1)
-    pygame.draw.circle(screen, ROBOT_STROKE_COLOR, right_end, s(4) or 1)
+    pygame.draw.circle(target, ROBOT_STROKE_COLOR, left_end,  s(4) or 1)
+    pygame.draw.circle(target, ROBOT_STROKE_COLOR, right_end, s(4) or 1)
 
     # --- Caixa ---
     box_w, box_h = s(52), s(38)
     box_rect = pygame.Rect(0, 0, box_w, box_h)
     box_rect.midbottom = ((left_end[0] + right_end[0]) // 2, left_end[1] - s(2))
 
-    pygame.draw.rect(screen, BOX_COLOR, box_rect)
-    pygame.draw.rect(screen, BOX_BORDER_COLOR, box_rect, max(1, s(2)))
+    pygame.draw.rect(target, BOX_COLOR, box_rect)
+    pygame.draw.rect(target, BOX_BORDER_COLOR, box_rect, max(1, s(2)))
 
-    pygame.draw.line(screen, BOX_BORDER_COLOR,
+    pygame.draw.line(target, BOX_BORDER_COLOR,
                      (box_rect.left + s(8), box_rect.top + s(10)),
                      (box_rect.right - s(6), box_rect.bottom - s(8)), max(1, s(2)))
-    pygame.draw.line(screen, BOX_BORDER_COLOR,
+    pygame.draw.line(target, BOX_BORDER_COLOR,
                      (box_rect.left + s(6), box_rect.bottom - s(10)),
                      (box_rect.right - s(8), box_rect.top + s(8)), max(1, s(2)))
 
+
+def robot_color_step(level):
+    """Degrau de cor (0 a ROBOT_COLOR_STEPS - 1) para um nível de bateria."""
+    level = min(100, max(0, level))
+    return int(round(level / 100 * (ROBOT_COLOR_STEPS - 1)))
+
+
+def robot_step_color(step):
+    """Cor do corpo no degrau 'step': do vermelho (0) ao verde (último degrau)."""
+    green = pygame.Color(0, 255, 0)  # Verde (máxima bateria)
+    red = pygame.Color(255, 0, 0)  # Vermelho (sem bateria)
+    return tuple(green.lerp(red, 1 - step / (ROBOT_COLOR_STEPS - 1)))[:3]
+
+
+def get_robot_sprite(scale=0.5, offset_y=20, color_step=None):
+    """
+    Robô pré-desenhado numa superfície transparente, em cache por (escala,
+    deslocamento, degrau de cor). Retorna (sprite, deslocamento do sprite em
+    relação à posição do robô). color_step None usa ROBOT_BODY_COLOR.
+    """
+    key = (scale, offset_y, color_step)
+    cached = robot_sprite_cache.get(key)
+    if cached is None:
+        body_color = ROBOT_BODY_COLOR if color_step is None else robot_step_color(color_step)
+        pad = CELL_SIZE  # Braços e caixa passam do canto superior da célula
+        scratch = pygame.Surface((3 * CELL_SIZE, 3 * CELL_SIZE), pygame.SRCALPHA)
+        paint_robot(scratch, pad, pad, scale=scale, offset_y=offset_y, body_color=body_color)
+        bounds = scratch.get_bounding_rect()
+        sprite = scratch.subsurface(bounds).copy()
+        if pygame.display.get_surface() is not None:
+            sprite = sprite.convert_alpha()  # Mesmo formato da janela: blit mais rápido
+        cached = (sprite, (bounds.x - pad, bounds.y - pad))
+        robot_sprite_cache[key] = cached
+    return cached
+
+
+def draw_robot_at(x, y, scale=0.5, offset_y=20, level=None):
+    """Desenha um robô em (x, y) a partir do sprite em cache (uso: um robô da frota por chamada)."""
+    color_step = robot_color_step(level) if ROBOT_BATTERY_TINT and level is not None else None
+    sprite, (dx, dy) = get_robot_sprite(scale, offset_y, color_step)
+    screen.blit(sprite, (int(x) + dx, int(y) + dy))
+
+
+def draw_robot(scale=0.5, offset_y=20):
+    """Desenha o robô estilo armazém escalado por 'scale' na posição de desenho (robot_draw_pos)."""
+    draw_robot_at(robot_draw_pos[0], robot_draw_pos[1], scale=scale, offset_y=offset_y, level=battery)
+
 def draw_robot2():
     """Desenha o robô na posição real com um design de rover."""
     x, y = robot_real_pos
@@ -757,13 +1140,13 @@ def move_robot(command):
     x, y = robot_grid_pos
     old_pos = robot_grid_pos.copy()
 
-    if command == 'mr' and x + 1 < len(matriz2[0]) and matriz2[y][x + 1] != '0':
+    if command == 'mr' and world_grid.is_walkable(x + 1, y):
         robot_grid_pos = [x + 1, y]
-    elif command == 'ml' and x - 1 >= 0 and matriz2[y][x - 1] != '0':
+    elif command == 'ml' and world_grid.is_walkable(x - 1, y):
         robot_grid_pos = [x - 1, y]
-    elif command == 'mu' and y - 1 >= 0 and matriz2[y - 1][x] != '0':
+    elif command == 'mu' and world_grid.is_walkable(x, y - 1):
         robot_grid_pos = [x, y - 1]
-    elif command == 'md' and y + 1 < len(matriz2) and matriz2[y + 1][x] != '0':
+    elif command == 'md' and world_grid.is_walkable(x, y + 1):
         robot_grid_pos = [x, y + 1]
     else:
         return  # Se o movimento for inválido, não gasta bateria
@@ -771,14 +1154,15 @@ def move_robot(command):
     # Se o robô se moveu, interrompe a recarga e entrega, e reseta os tempos
     if robot_grid_pos != old_pos:
         direction_map = {'mr': 'DIREITA', 'ml': 'ESQUERDA', 'mu': 'CIMA', 'md': 'BAIXO'}
-        log(f"Robô moveu {direction_map.get(command, command)}: ({old_pos[0]}, {old_pos[1]}) -> ({robot_grid_pos[0]}, {robot_grid_pos[1]})", "MOVE")
-        log(f"Bateria: {battery + 2}% -> {battery - 2}%", "BATTERY")
+        log("Robô moveu {}: ({}, {}) -> ({}, {})", "MOVE", direction_map.get(command, command), old_pos[0], old_pos[1], robot_grid_pos[0], robot_grid_pos[1])
+        log("Bateria: {}% -> {}%", "BATTERY", battery + 2, battery - 2)
         
         # Toca som de movimento
         play_sound('move')
         
         if is_recharging:
             log("Recarga interrompida por movimento", "RECHARGE")
+            record_event(event_log.EV_RECHARGE_STOP)
         if is_delivering:
             log("Entrega interrompida por movimento", "DELIVERY")
         
@@ -788,17 +1172,18 @@ def move_robot(command):
         time_at_warehouse = 0
         last_position = robot_grid_pos.copy()
         battery -= 2  # Reduz a bateria em 2% a cada movimento
+        record_event(event_log.EV_MOVE, robot_grid_pos[0], robot_grid_pos[1])
         
         # Log do tipo de célula atual
-        cell_type = matriz2[robot_grid_pos[1]][robot_grid_pos[0]]
+        cell_type = world_grid.cell_char(robot_grid_pos[0], robot_grid_pos[1])
         cell_types = {'S': 'INÍCIO', 'R': 'RECARGA', 'A': 'ALMOXARIFADO', '1': 'CAMINHO LIVRE', '0': 'OBSTÁCULO'}
-        log(f"Robô está em célula tipo: {cell_types.get(cell_type, cell_type)}", "POSITION")
+        log("Robô está em célula tipo: {}", "POSITION", cell_types.get(cell_type, cell_type))
 
 
 def is_at_recharge_station():
     """Verifica se o robô está em uma estação de recarga."""
     x, y = robot_grid_pos
-    return matriz2[y][x] == 'R'
+    return world_grid.is_station(x, y)
 
 
 def update_auto_recharge():
@@ -806,7 +1191,7 @@ def update_auto_recharge():
     global battery, is_recharging, time_at_station, recharge_start_time, battery_at_recharge_start, last_position
     global waiting_for_action, current_action, current_path, current_path_index, auto_mode, last_action_time
     
-    current_time = pygame.time.get_ticks()
+    current_time = now_ms()
     
     # Verifica se está em uma estação de recarga
     if is_at_recharge_station():
@@ -814,15 +1199,13 @@ def update_auto_recharge():
         if robot_grid_pos == last_position:
             # Se não se moveu, incrementa o tempo na estação
             # Para modo automático total, calcula dinamicamente. Para manual/semi, carrega até 100%
-            if auto_mode == AUTO_MODE_FULL:
-                target_battery = calculate_needed_battery()
-            else:
-                target_battery = 100
+            target_battery = recharge_target_battery()
             
             if battery >= target_battery:
                 # Se atingiu o threshold/100%, mantém a bateria e não faz nada
                 if is_recharging:
-                    log(f"Recarga COMPLETA! Bateria: {battery:.1f}% (alvo: {target_battery}%)", "RECHARGE")
+                    log("Recarga COMPLETA! Bateria: {:.1f}% (alvo: {}%)", "RECHARGE", battery, target_battery)
+                    record_event(event_log.EV_RECHARGE_STOP)
                     
                     # Toca som de recarga completa
                     play_sound('recharge_complete')
@@ -846,13 +1229,14 @@ def update_auto_recharge():
                 # Ainda não está recarregando, verifica se já passou o tempo de espera
                 if time_at_station == 0:
                     time_at_station = current_time
-                    log(f"Robô chegou na estação de recarga. Aguardando {STATION_WAIT_TIME/1000:.1f}s...", "RECHARGE")
+                    log("Robô chegou na estação de recarga. Aguardando {:.1f}s...", "RECHARGE", STATION_WAIT_TIME/1000)
                 elif current_time - time_at_station >= STATION_WAIT_TIME:
                     # Passou 3 segundos, inicia a recarga
                     is_recharging = True
                     recharge_start_time = current_time
                     battery_at_recharge_start = battery
-                    log(f"Recarga iniciada! Bateria: {battery:.1f}% -> {target_battery}% (estimado: {((target_battery-battery)/100.0)*RECHARGE_SPEED:.1f}s)", "RECHARGE")
+                    record_event(event_log.EV_RECHARGE_START)
+                    log("Recarga iniciada! Bateria: {:.1f}% -> {}% (estimado: {:.1f}s)", "RECHARGE", battery, target_battery, ((target_battery-battery)/100.0)*RECHARGE_SPEED)
                     
                     # Toca som de início de recarga
                     play_sound('recharge_start')
@@ -876,7 +1260,8 @@ def update_auto_recharge():
                 else:
                     # Bateria chegou ao threshold/100%, para de recarregar mas mantém na estação
                     if is_recharging:
-                        log(f"Recarga completa! Bateria: {battery:.1f}% (alvo: {target_battery}%)", "RECHARGE")
+                        log("Recarga completa! Bateria: {:.1f}% (alvo: {}%)", "RECHARGE", battery, target_battery)
+                        record_event(event_log.EV_RECHARGE_STOP)
                         
                         # Se estava em ação automática de recarga, marca como completa
                         if waiting_for_action and current_action == 'recharge' and auto_mode == AUTO_MODE_FULL:
@@ -891,12 +1276,16 @@ def update_auto_recharge():
                     battery = min(battery, 100)  # Garante que não ultrapasse 100%
         else:
             # Robô se moveu ou chegou na estação, atualiza last_position e reseta recarga
+            if is_recharging:
+                record_event(event_log.EV_RECHARGE_STOP)
             is_recharging = False
             time_at_station = 0
             last_position = robot_grid_pos.copy()
     else:
         # Não está em estação de recarga, reseta tudo
         if is_recharging or time_at_station > 0:
+            if is_recharging:
+                record_event(event_log.EV_RECHARGE_STOP)
             is_recharging = False
             time_at_station = 0
         last_position = robot_grid_pos.copy()
@@ -905,27 +1294,79 @@ def update_auto_recharge():
 # ==================== SISTEMA DE AUTOMAÇÃO ====================
 
 def build_graph_from_matrix(matriz):
-    """Constrói grafo a partir da matriz do ambiente."""
-    graph = {}
-    rows = len(matriz)
-    cols = len(matriz[0])
-    
-    for y in range(rows):
-        for x in range(cols):
-            if matriz[y][x] != '0':  # Não é obstáculo
-                node = (x, y)
-                neighbors = []
-                
-                # Verifica 4 direções
-                for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
-                    nx, ny = x + dx, y + dy
-                    if 0 <= nx < cols and 0 <= ny < rows:
-                        if matriz[ny][nx] != '0':
-                            neighbors.append(((nx, ny), 1.0))  # Custo 1 por movimento
-                
-                graph[node] = neighbors
-    
-    return graph
+    """Constrói grafo a partir da matriz do ambiente (formato literal de caracteres)."""
+    return WarehouseGrid.from_matrix(matriz).build_graph()
+
+
+def bump_map_version():
+    """Registra uma alteração no mapa: grafo e oráculo de distâncias serão reconstruídos."""
+    global map_version
+    map_version += 1
+    path_cache.invalidate()
+
+
+def set_cell(x, y, cell):
+    """Altera o tipo de uma célula do mapa e invalida os caches de navegação."""
+    old_cell = world_grid.cell_char(x, y)
+    if old_cell == cell:
+        return
+    global hierarchical_planner_version
+    log("Célula ({}, {}) alterada: '{}' -> '{}'", "MAP", x, y, old_cell, cell)
+    planner_current = hierarchical_planner is not None and hierarchical_planner_version == map_version
+    world_grid.set_code(x, y, CHAR_TO_CODE[cell])
+    if matriz2 is not None:
+        matriz2[y][x] = cell
+    bump_map_version()
+    if planner_current:
+        # Só o bloco da célula e as fronteiras dele são refeitos
+        hierarchical_planner.update_cell(x, y)
+        hierarchical_planner_version = map_version
+    record_event(event_log.EV_CELL, x, y, CHAR_TO_CODE[cell])
+
+
+def get_navigation_graph():
+    """
+    Retorna o grafo de navegação do mapa atual.
+    O grafo é construído uma única vez por versão do mapa e é imutável
+    (MappingProxyType com tuplas de vizinhos), podendo ser compartilhado.
+    """
+    global navigation_graph, navigation_graph_version
+    if navigation_graph is None or navigation_graph_version != map_version:
+        graph = world_grid.build_graph()
+        navigation_graph = MappingProxyType({node: tuple(neighbors) for node, neighbors in graph.items()})
+        navigation_graph_version = map_version
+    return navigation_graph
+
+
+def get_hierarchical_planner():
+    """
+    Planejador HPA* do mapa atual. É construído uma vez por mapa carregado;
+    alterações de células (set_cell) atualizam só os blocos afetados.
+    """
+    global hierarchical_planner, hierarchical_planner_version
+    if hierarchical_planner is None or hierarchical_planner_version != map_version:
+        hierarchical_planner = HierarchicalPlanner(world_grid)
+        hierarchical_planner_version = map_version
+        log("Planejador hierárquico construído: {} nós de transição", "PATH", len(hierarchical_planner.inter))
+    return hierarchical_planner
+
+
+def find_path(start, goal):
+    """
+    Caminho célula a célula de start a goal ([] se não há caminho).
+    Mapas pequenos usam a busca de PATH_SEARCH (a_star ou JPS) no grafo de
+    navegação; a partir de HPA_MIN_CELLS células, o HPA*, que não monta o
+    grafo do mapa inteiro. Caminhos repetidos vêm do path_cache.
+    """
+    cached = path_cache.get_path(start, goal, map_version)
+    if cached is not None:
+        return list(cached)
+    if world_grid.rows * world_grid.cols >= HPA_MIN_CELLS:
+        path = get_hierarchical_planner().find_path(start, goal)
+    else:
+        path = grid_search(get_navigation_graph(), start, goal)
+    path_cache.put_path(start, goal, map_version, path)
+    return path
 
 
 def heuristic_manhattan(pos1, pos2):
@@ -940,22 +1381,23 @@ def validate_path(path):
     obstacle_found = False
     for pos in path:
         x, y = pos
-        if not (0 <= x < len(matriz2[0]) and 0 <= y < len(matriz2)):
-            log(f"🚫 ERRO: Posição fora dos limites: ({x}, {y})", "ERROR")
+        if not world_grid.in_bounds(x, y):
+            log("🚫 ERRO: Posição fora dos limites: ({}, {})", "ERROR", x, y)
             return False
-        if matriz2[y][x] == '0':
-            log(f"🚫 ERRO: Caminho contém OBSTÁCULO em ({x}, {y})", "ERROR")
+        if not world_grid.is_walkable(x, y):
+            log("🚫 ERRO: Caminho contém OBSTÁCULO em ({}, {})", "ERROR", x, y)
             obstacle_found = True
             return False
     if not obstacle_found:
-        log(f"✓ Validação de caminho: {len(path)} passos, SEM obstáculos", "AUTO")
+        log("✓ Validação de caminho: {} passos, SEM obstáculos", "AUTO", len(path))
     return True
 
 
-def a_star(graph, start, goal):
+def a_star(graph, start, goal, stats=None):
     """
     A* para encontrar caminho entre start e goal.
     Retorna lista de posições do caminho.
+    Com 'stats' (dict), soma os nós retirados da fila em stats['expanded'].
     """
     if start == goal:
         return [start]
@@ -964,11 +1406,15 @@ def a_star(graph, start, goal):
     came_from = {}
     g_score = {start: 0}
     f_score = {start: heuristic_manhattan(start, goal)}
+    expanded = 0
     
     while open_set:
         current = heapq.heappop(open_set)[1]
+        expanded += 1
         
         if current == goal:
+            if stats is not None:
+                stats['expanded'] = stats.get('expanded', 0) + expanded
             # Reconstrói caminho
             path = []
             while current in came_from:
@@ -986,42 +1432,102 @@ def a_star(graph, start, goal):
                 f_score[neighbor] = tentative_g + heuristic_manhattan(neighbor, goal)
                 heapq.heappush(open_set, (f_score[neighbor], neighbor))
     
+    if stats is not None:
+        stats['expanded'] = stats.get('expanded', 0) + expanded
     return []  # Sem caminho
 
 
+# Buscas célula a célula com a assinatura do a_star, escolhidas por PATH_SEARCH
+PATH_SEARCH_FUNCTIONS = {
+    "a_star": a_star,
+    "jps": jump_point_search,
+}
+
+
+def grid_search(graph, start, goal, stats=None):
+    """Busca célula a célula configurada em PATH_SEARCH ("a_star" ou "jps"), com a assinatura do a_star."""
+    return PATH_SEARCH_FUNCTIONS[PATH_SEARCH](graph, start, goal, stats)
+
+
+def get_item_index():
+    """
+    Índice de itens de items_on_grid. Se o dicionário foi substituído (headless,
+    replay, benchmark), o índice é recalculado uma vez; depois segue incremental.
+    """
+    if not item_index.is_current(items_on_grid):
+        item_index.rebuild(items_on_grid)
+    return item_index
+
+
+def remaining_item_count():
+    """Quantidade de itens ainda no ambiente (O(1))."""
+    return get_item_index().remaining
+
+
+def item_type_counts():
+    """Itens restantes no ambiente por tipo: {'TYPE_A': n, ...} (não alterar)."""
+    return get_item_index().type_counts
+
+
+def get_landmark_index():
+    """Posições fixas do mapa atual (almoxarifados, estações, início), refeitas só quando o mapa muda."""
+    global landmark_index, landmark_index_version
+    if landmark_index is None or landmark_index_version != map_version:
+        landmark_index = LandmarkIndex(world_grid)
+        landmark_index_version = map_version
+    return landmark_index
+
+
 def find_all_positions():
-    """Encontra todas as posições importantes no ambiente."""
-    items = list(items_on_grid.keys())
-    warehouses = []
-    recharge_stations = []
-    
-    for y in range(len(matriz2)):
-        for x in range(len(matriz2[0])):
-            if matriz2[y][x] == 'A':
-                warehouses.append((x, y))
-            elif matriz2[y][x] == 'R':
-                recharge_stations.append((x, y))
-    
-    return items, warehouses, recharge_stations
+    """
+    Encontra todas as posições importantes no ambiente.
+    As listas de almoxarifados e estações são compartilhadas pelo índice de marcos (não alterar).
+    """
+    landmarks = get_landmark_index()
+    return list(items_on_grid), landmarks.warehouses, landmarks.recharge_stations
+
+
+def invalidate_distance_oracle():
+    """Descarta o oráculo de distâncias (mapa ou conjunto de marcos mudou)."""
+    global distance_oracle
+    distance_oracle = None
+
+
+def get_distance_oracle():
+    """Retorna o oráculo de distâncias do mapa atual, construindo-o se necessário."""
+    global distance_oracle, distance_oracle_version
+    if distance_oracle is None or distance_oracle_version != map_version:
+        items, warehouses, recharge_stations = find_all_positions()
+        start = get_landmark_index().starts
+        distance_oracle = DistanceOracle(world_grid, warehouses + recharge_stations + items + start)
+        distance_oracle_version = map_version
+        log("Oráculo de distâncias construído: {} marcos", "PATH", len(distance_oracle.landmarks))
+    return distance_oracle
 
 
 def find_nearest(target_pos, positions):
-    """Encontra a posição mais próxima de target_pos."""
-    if not positions:
+    """
+    Encontra a posição mais próxima de target_pos.
+    Usa a tabela do oráculo quando todos são marcos; senão faz uma única BFS multi-alvo.
+    """
+    if not positions or target_pos is None:
         return None
-    
-    graph = build_graph_from_matrix(matriz2)
-    min_dist = float('inf')
-    nearest = None
-    
-    for pos in positions:
-        path = a_star(graph, tuple(target_pos), pos)
-        if path:
-            dist = len(path) - 1
-            if dist < min_dist:
-                min_dist = dist
-                nearest = pos
-    
+    return get_distance_oracle().nearest(target_pos, positions)
+
+
+def find_nearest_warehouse(pos):
+    """Almoxarifado mais próximo de pos (BFS reversa a partir de todos os 'A', consulta O(1))."""
+    if pos is None:
+        return None
+    nearest, _ = get_distance_oracle().nearest_warehouse(pos)
+    return nearest
+
+
+def find_nearest_recharge_station(pos):
+    """Estação de recarga mais próxima de pos (BFS reversa a partir de todos os 'R', consulta O(1))."""
+    if pos is None:
+        return None
+    nearest, _ = get_distance_oracle().nearest_recharge_station(pos)
     return nearest
 
 
@@ -1031,12 +1537,22 @@ def estimate_battery_cost(path):
 
 
 def calculate_route_cost(from_pos, to_pos):
-    """Calcula custo de bateria para ir de uma posição a outra."""
-    graph = build_graph_from_matrix(matriz2)
-    path = a_star(graph, from_pos, to_pos)
-    if path:
-        return estimate_battery_cost(path)
-    return float('inf')  # Sem caminho
+    """Calcula custo de bateria para ir de uma posição a outra (em cache por versão do mapa)."""
+    cost = path_cache.get_cost(from_pos, to_pos, map_version)
+    if cost is not None:
+        return cost
+    if world_grid.rows * world_grid.cols >= HPA_MIN_CELLS:
+        # O robô anda o caminho do HPA*, que pode ser um pouco mais longo que o
+        # mínimo: o custo é o desse caminho, não a distância exata do oráculo
+        path = find_path(tuple(from_pos), tuple(to_pos))
+        dist = len(path) - 1 if path else None
+    else:
+        dist = get_distance_oracle().distance(from_pos, to_pos)
+    if dist is not None:
+        cost = dist * 2  # 2% por movimento
+    else:
+        cost = float('inf')  # Sem caminho
+    return path_cache.put_cost(from_pos, to_pos, map_version, cost)
 
 
 def invalidate_battery_cache():
@@ -1055,7 +1571,11 @@ def calculate_needed_battery():
     """
     global cached_target_battery, last_battery_calculation_time
     
-    current_time = pygame.time.get_ticks()
+    current_time = now_ms()
+    
+    # Recarga do plano de missão: carrega só o que o plano gasta até a próxima recarga
+    if auto_mode == AUTO_MODE_FULL and planned_recharge_target is not None:
+        return planned_recharge_target
     
     # Se calculou recentemente (< 1 segundo), usa cache (sem log para evitar poluição)
     if cached_target_battery is not None and (current_time - last_battery_calculation_time) < 1000:
@@ -1064,9 +1584,6 @@ def calculate_needed_battery():
     robot_pos = tuple(robot_grid_pos)
     items, warehouses, recharge_stations = find_all_positions()
     
-    SAFETY_MARGIN = 8  # Margem de segurança reduzida (era 15%)
-    MIN_BATTERY = 20  # Mínimo de bateria reduzido (era 30%)
-    
     log("=== CALCULANDO BATERIA NECESSÁRIA ===", "RECHARGE")
     
     # Se não há estações de recarga, retorna 100%
@@ -1074,7 +1591,7 @@ def calculate_needed_battery():
         log("Sem estações de recarga, recarregando até 100%", "RECHARGE")
         return 100
     
-    nearest_recharge = find_nearest(robot_pos, recharge_stations)
+    nearest_recharge = find_nearest_recharge_station(robot_pos)
     total_cost = 0
     simulated_pos = robot_pos
     actions_simulated = 0
@@ -1087,12 +1604,12 @@ def calculate_needed_battery():
         # Se tem itens no inventário ou capacidade cheia, vai entregar
         if len(robot_inventory) >= ROBOT_CAPACITY or (len(robot_inventory) > 0 and not items):
             if warehouses:
-                nearest_warehouse = find_nearest(simulated_pos, warehouses)
+                nearest_warehouse = find_nearest_warehouse(simulated_pos)
                 cost = calculate_route_cost(simulated_pos, nearest_warehouse)
                 if cost != float('inf'):
                     total_cost += cost
                     simulated_pos = nearest_warehouse
-                    log(f"  Ação {actions_simulated + 1}: Entregar em {nearest_warehouse} (custo: {cost:.1f}%)", "RECHARGE")
+                    log("  Ação {}: Entregar em {} (custo: {:.1f}%)", "RECHARGE", actions_simulated + 1, nearest_warehouse, cost)
                     actions_simulated += 1
                     # Após entregar, inventário fica vazio (simulação)
                     if actions_simulated < max_actions_to_simulate and items:
@@ -1108,7 +1625,7 @@ def calculate_needed_battery():
             if cost != float('inf'):
                 total_cost += cost
                 simulated_pos = nearest_item
-                log(f"  Ação {actions_simulated + 1}: Coletar em {nearest_item} (custo: {cost:.1f}%)", "RECHARGE")
+                log("  Ação {}: Coletar em {} (custo: {:.1f}%)", "RECHARGE", actions_simulated + 1, nearest_item, cost)
                 actions_simulated += 1
             else:
                 break
@@ -1120,7 +1637,7 @@ def calculate_needed_battery():
     cost_back_to_recharge = calculate_route_cost(simulated_pos, nearest_recharge)
     if cost_back_to_recharge != float('inf'):
         total_cost += cost_back_to_recharge
-        log(f"  Retorno à estação de {simulated_pos} -> {nearest_recharge} (custo: {cost_back_to_recharge:.1f}%)", "RECHARGE")
+        log("  Retorno à estação de {} -> {} (custo: {:.1f}%)", "RECHARGE", simulated_pos, nearest_recharge, cost_back_to_recharge)
     
     # Bateria necessária = custo total + margem de segurança
     needed_battery = total_cost + SAFETY_MARGIN
@@ -1129,9 +1646,9 @@ def calculate_needed_battery():
     needed_battery = max(needed_battery, MIN_BATTERY)
     needed_battery = min(needed_battery, 100)
     
-    log(f"  Total de {actions_simulated} ações simuladas", "RECHARGE")
-    log(f"  Custo total estimado: {total_cost:.1f}%", "RECHARGE")
-    log(f"  Bateria necessária (com margem): {needed_battery:.1f}%", "RECHARGE")
+    log("  Total de {} ações simuladas", "RECHARGE", actions_simulated)
+    log("  Custo total estimado: {:.1f}%", "RECHARGE", total_cost)
+    log("  Bateria necessária (com margem): {:.1f}%", "RECHARGE", needed_battery)
     
     # Atualiza cache
     cached_target_battery = needed_battery
@@ -1140,6 +1657,20 @@ def calculate_needed_battery():
     return needed_battery
 
 
+def recharge_target_battery():
+    """
+    Bateria em que a recarga na estação para.
+    Manual/semi: 100%. Automático total com plano de missão: o alvo do plano.
+    Automático total guloso: a bateria necessária, mas nunca menos que RECHARGE_THRESHOLD.
+    """
+    if auto_mode != AUTO_MODE_FULL:
+        return 100
+    needed_battery = calculate_needed_battery()
+    if planned_recharge_target is not None:
+        return needed_battery
+    return min(100, max(needed_battery, RECHARGE_THRESHOLD))
+
+
 def decide_next_action_intelligent():
     """
     Decide a próxima ação de forma inteligente para modo semi-automático.
@@ -1148,27 +1679,23 @@ def decide_next_action_intelligent():
     """
     robot_pos = tuple(robot_grid_pos)
     items, warehouses, recharge_stations = find_all_positions()
-    graph = build_graph_from_matrix(matriz2)
     
-    SAFETY_MARGIN = 6  # Margem de segurança reduzida (era 10%)
+    SAFETY_MARGIN = DECISION_SAFETY_MARGIN
     
     log("=== ANÁLISE INTELIGENTE (MODO SEMI-AUTOMÁTICO) ===", "DECISION")
-    log(f"Estado atual: Posição: ({robot_pos[0]}, {robot_pos[1]}), Bateria: {battery:.1f}%, Inventário: {len(robot_inventory)}/{ROBOT_CAPACITY}, Itens restantes: {len(items)}", "DECISION")
+    log("Estado atual: Posição: ({}, {}), Bateria: {:.1f}%, Inventário: {}/{}, Itens restantes: {}", "DECISION", robot_pos[0], robot_pos[1], battery, len(robot_inventory), ROBOT_CAPACITY, len(items))
     
     # Caso 1: Está no almoxarifado com itens -> ENTREGA
     if is_at_warehouse() and len(robot_inventory) > 0:
-        log(f"Decisão: ENTREGAR (já está no almoxarifado com {len(robot_inventory)} itens)", "DECISION")
+        log("Decisão: ENTREGAR (já está no almoxarifado com {} itens)", "DECISION", len(robot_inventory))
         return ('deliver', robot_pos, 'Entregar itens no almoxarifado')
     
     # Caso 2: Está na estação de recarga com bateria baixa -> RECARGA
     # No modo automático total, calcula dinamicamente. No manual/semi, até 100%
-    if auto_mode == AUTO_MODE_FULL:
-        target_battery = calculate_needed_battery()
-    else:
-        target_battery = 100
+    target_battery = recharge_target_battery()
     
     if is_at_recharge_station() and battery < target_battery:
-        log(f"Decisão: RECARREGAR (já está na estação, bateria: {battery:.1f}%, alvo: {target_battery}%)", "DECISION")
+        log("Decisão: RECARREGAR (já está na estação, bateria: {:.1f}%, alvo: {}%)", "DECISION", battery, target_battery)
         return ('recharge', robot_pos, 'Recarregar bateria na estação')
     
     # Caso 3: Bateria crítica (< 20%) -> PRIORIDADE MÁXIMA: IR RECARREGAR
@@ -1176,45 +1703,45 @@ def decide_next_action_intelligent():
         if not recharge_stations:
             log("ERRO: Bateria crítica mas não há estações de recarga!", "ERROR")
             return None
-        nearest_recharge = find_nearest(robot_pos, recharge_stations)
+        nearest_recharge = find_nearest_recharge_station(robot_pos)
         if nearest_recharge:
             cost_to_recharge = calculate_route_cost(robot_pos, nearest_recharge)
             if battery >= cost_to_recharge + SAFETY_MARGIN:
-                log(f"Decisão: RECARREGAR (bateria crítica: {battery:.1f}%, custo: {cost_to_recharge:.1f}%)", "DECISION")
+                log("Decisão: RECARREGAR (bateria crítica: {:.1f}%, custo: {:.1f}%)", "DECISION", battery, cost_to_recharge)
                 return ('recharge', nearest_recharge, f'Bateria crítica ({battery:.1f}%), indo recarregar')
             else:
                 # EMERGÊNCIA: Bateria insuficiente para chegar à estação
                 # Tenta mover-se o máximo possível em direção à estação
-                log(f"🚨 EMERGÊNCIA: Bateria insuficiente para chegar à estação! Bateria: {battery:.1f}%, Custo: {cost_to_recharge:.1f}%", "ERROR")
-                log(f"🚨 Tentando movimento de emergência: mover-se na direção da estação o máximo possível", "DECISION")
+                log("🚨 EMERGÊNCIA: Bateria insuficiente para chegar à estação! Bateria: {:.1f}%, Custo: {:.1f}%", "ERROR", battery, cost_to_recharge)
+                log("🚨 Tentando movimento de emergência: mover-se na direção da estação o máximo possível", "DECISION")
                 # Calcula caminho e retorna mesmo sem bateria suficiente
                 return ('recharge', nearest_recharge, f'EMERGÊNCIA: Tentando chegar à estação (bateria: {battery:.1f}%)')
     
     # Caso 4: Tem itens no inventário -> ANALISAR SE DEVE ENTREGAR OU COLETAR MAIS
     if len(robot_inventory) > 0:
-        log(f"Análise: Robô com {len(robot_inventory)} itens no inventário", "DECISION")
+        log("Análise: Robô com {} itens no inventário", "DECISION", len(robot_inventory))
         
         if not warehouses:
             log("ERRO: Tem itens mas não há almoxarifados!", "ERROR")
             return None
         
-        nearest_warehouse = find_nearest(robot_pos, warehouses)
+        nearest_warehouse = find_nearest_warehouse(robot_pos)
         cost_to_warehouse = calculate_route_cost(robot_pos, nearest_warehouse)
         
         # Calcular custo para ir ao almoxarifado e depois à estação de recarga
-        nearest_recharge = find_nearest(nearest_warehouse, recharge_stations) if recharge_stations else None
+        nearest_recharge = find_nearest_recharge_station(nearest_warehouse) if recharge_stations else None
         cost_warehouse_to_recharge = calculate_route_cost(nearest_warehouse, nearest_recharge) if nearest_recharge else 0
         
         total_cost_deliver = cost_to_warehouse + cost_warehouse_to_recharge
         
-        log(f"  - Custo para ir ao almoxarifado: {cost_to_warehouse:.1f}%", "DECISION")
-        log(f"  - Custo almoxarifado -> estação: {cost_warehouse_to_recharge:.1f}%", "DECISION")
-        log(f"  - Custo total (entregar + poder recarregar): {total_cost_deliver:.1f}%", "DECISION")
+        log("  - Custo para ir ao almoxarifado: {:.1f}%", "DECISION", cost_to_warehouse)
+        log("  - Custo almoxarifado -> estação: {:.1f}%", "DECISION", cost_warehouse_to_recharge)
+        log("  - Custo total (entregar + poder recarregar): {:.1f}%", "DECISION", total_cost_deliver)
         
         # Se bateria não é suficiente para entregar E depois recarregar, PRECISA RECARREGAR ANTES
         if battery < total_cost_deliver + SAFETY_MARGIN:
-            log(f"  - Bateria insuficiente ({battery:.1f}% < {total_cost_deliver + SAFETY_MARGIN:.1f}%) para entregar e depois recarregar!", "DECISION")
-            log(f"  - Decisão: RECARREGAR ANTES de entregar", "DECISION")
+            log("  - Bateria insuficiente ({:.1f}% < {:.1f}%) para entregar e depois recarregar!", "DECISION", battery, total_cost_deliver + SAFETY_MARGIN)
+            log("  - Decisão: RECARREGAR ANTES de entregar", "DECISION")
             
             if nearest_recharge:
                 cost_to_recharge = calculate_route_cost(robot_pos, nearest_recharge)
@@ -1224,15 +1751,15 @@ def decide_next_action_intelligent():
                     # Situação crítica: tem itens mas não tem bateria nem para recarregar
                     # Verifica se pelo menos pode entregar os itens primeiro
                     if battery >= cost_to_warehouse + SAFETY_MARGIN:
-                        log(f"⚠️ DECISÃO DE EMERGÊNCIA: Entregar itens primeiro (bateria: {battery:.1f}%)", "DECISION")
+                        log("⚠️ DECISÃO DE EMERGÊNCIA: Entregar itens primeiro (bateria: {:.1f}%)", "DECISION", battery)
                         return ('deliver', nearest_warehouse, f'EMERGÊNCIA: Entregar antes de ficar sem bateria')
                     else:
-                        log(f"🚨 EMERGÊNCIA CRÍTICA: Bateria muito baixa! Tentando mover-se em direção à estação", "ERROR")
+                        log("🚨 EMERGÊNCIA CRÍTICA: Bateria muito baixa! Tentando mover-se em direção à estação", "ERROR")
                         return ('recharge', nearest_recharge, f'EMERGÊNCIA: Tentando chegar à estação (bateria: {battery:.1f}%)')
         
         # Se inventário está cheio, DEVE ENTREGAR
         if len(robot_inventory) >= ROBOT_CAPACITY:
-            log(f"  - Inventário cheio ({len(robot_inventory)}/{ROBOT_CAPACITY}), decisão: ENTREGAR", "DECISION")
+            log("  - Inventário cheio ({}/{}), decisão: ENTREGAR", "DECISION", len(robot_inventory), ROBOT_CAPACITY)
             return ('deliver', nearest_warehouse, 'Inventário cheio, entregar itens')
         
         # Se inventário não está cheio, AVALIAR SE DEVE COLETAR MAIS OU ENTREGAR
@@ -1242,32 +1769,32 @@ def decide_next_action_intelligent():
             
             # OTIMIZAÇÃO: Se já está na célula com item, custo é 0!
             if robot_pos == nearest_item:
-                log(f"  - ✅ OTIMIZAÇÃO: Robô já está na célula com item! Custo de coleta: 0%", "DECISION")
-                log(f"  - Decisão: COLETAR item adicional (mesma célula, sem custo)", "DECISION")
+                log("  - ✅ OTIMIZAÇÃO: Robô já está na célula com item! Custo de coleta: 0%", "DECISION")
+                log("  - Decisão: COLETAR item adicional (mesma célula, sem custo)", "DECISION")
                 return ('collect', nearest_item, f'Coletar item na mesma célula (0% bateria)')
             
             # Calcular custo total: coletar item -> ir ao almoxarifado -> ir à estação
             cost_item_to_warehouse = calculate_route_cost(nearest_item, nearest_warehouse)
             total_cost_collect = cost_to_item + cost_item_to_warehouse + cost_warehouse_to_recharge
             
-            log(f"  - Custo para coletar mais item: {cost_to_item:.1f}%", "DECISION")
-            log(f"  - Custo total (coletar + entregar + recarregar): {total_cost_collect:.1f}%", "DECISION")
+            log("  - Custo para coletar mais item: {:.1f}%", "DECISION", cost_to_item)
+            log("  - Custo total (coletar + entregar + recarregar): {:.1f}%", "DECISION", total_cost_collect)
             
             # Se tem bateria para coletar mais, COLETA (margem reduzida)
             if battery >= total_cost_collect + SAFETY_MARGIN:
-                log(f"  - Decisão: COLETAR mais item (bateria suficiente: {battery:.1f}%)", "DECISION")
+                log("  - Decisão: COLETAR mais item (bateria suficiente: {:.1f}%)", "DECISION", battery)
                 return ('collect', nearest_item, f'Coletar mais item (inventário: {len(robot_inventory)}/{ROBOT_CAPACITY})')
             # OTIMIZAÇÃO: Se o custo é baixo e tem mais de 20%, arrisca coletar
             elif cost_to_item <= 6 and battery >= 20:
-                log(f"  - ✅ OTIMIZAÇÃO: Item próximo ({cost_to_item:.1f}%) e bateria razoável ({battery:.1f}%), decisão: COLETAR", "DECISION")
+                log("  - ✅ OTIMIZAÇÃO: Item próximo ({:.1f}%) e bateria razoável ({:.1f}%), decisão: COLETAR", "DECISION", cost_to_item, battery)
                 return ('collect', nearest_item, f'Coletar item próximo')
             else:
                 # Não tem bateria para coletar mais, ENTREGA O QUE TEM
-                log(f"  - Decisão: ENTREGAR itens atuais (bateria insuficiente para coletar mais)", "DECISION")
+                log("  - Decisão: ENTREGAR itens atuais (bateria insuficiente para coletar mais)", "DECISION")
                 return ('deliver', nearest_warehouse, f'Entregar {len(robot_inventory)} itens')
         else:
             # Não há mais itens para coletar, ENTREGA O QUE TEM
-            log(f"  - Não há mais itens, decisão: ENTREGAR", "DECISION")
+            log("  - Não há mais itens, decisão: ENTREGAR", "DECISION")
             return ('deliver', nearest_warehouse, f'Entregar últimos {len(robot_inventory)} itens')
     
     # Caso 5: Inventário vazio -> COLETAR ITENS
@@ -1281,22 +1808,22 @@ def decide_next_action_intelligent():
             log("ERRO: Não há almoxarifados para entregar depois!", "ERROR")
             return None
         
-        nearest_warehouse = find_nearest(nearest_item, warehouses)
+        nearest_warehouse = find_nearest_warehouse(nearest_item)
         cost_item_to_warehouse = calculate_route_cost(nearest_item, nearest_warehouse)
         
-        nearest_recharge = find_nearest(nearest_warehouse, recharge_stations) if recharge_stations else None
+        nearest_recharge = find_nearest_recharge_station(nearest_warehouse) if recharge_stations else None
         cost_warehouse_to_recharge = calculate_route_cost(nearest_warehouse, nearest_recharge) if nearest_recharge else 0
         
         total_cost = cost_to_item + cost_item_to_warehouse + cost_warehouse_to_recharge
         
-        log(f"  - Custo para coletar item: {cost_to_item:.1f}%", "DECISION")
-        log(f"  - Custo item -> almoxarifado: {cost_item_to_warehouse:.1f}%", "DECISION")
-        log(f"  - Custo almoxarifado -> estação: {cost_warehouse_to_recharge:.1f}%", "DECISION")
-        log(f"  - Custo total: {total_cost:.1f}%", "DECISION")
+        log("  - Custo para coletar item: {:.1f}%", "DECISION", cost_to_item)
+        log("  - Custo item -> almoxarifado: {:.1f}%", "DECISION", cost_item_to_warehouse)
+        log("  - Custo almoxarifado -> estação: {:.1f}%", "DECISION", cost_warehouse_to_recharge)
+        log("  - Custo total: {:.1f}%", "DECISION", total_cost)
         
         # Se tem bateria para coletar, entregar e recarregar, COLETA
         if battery >= total_cost + SAFETY_MARGIN:
-            log(f"  - Decisão: COLETAR item (bateria suficiente: {battery:.1f}%)", "DECISION")
+            log("  - Decisão: COLETAR item (bateria suficiente: {:.1f}%)", "DECISION", battery)
             return ('collect', nearest_item, 'Coletar item')
         else:
             # Bateria insuficiente, verifica se precisa recarregar
@@ -1306,23 +1833,23 @@ def decide_next_action_intelligent():
                 
                 # OTIMIZAÇÃO: Se tem mais de 25%, tenta coletar (ser menos conservador)
                 if battery >= 25 and battery >= needed_battery * 0.85:
-                    log(f"  - ✅ Na estação com bateria razoável ({battery:.1f}% >= 25%), decisão: COLETAR", "DECISION")
+                    log("  - ✅ Na estação com bateria razoável ({:.1f}% >= 25%), decisão: COLETAR", "DECISION", battery)
                     return ('collect', nearest_item, 'Coletar item (bateria razoável)')
                 elif battery >= needed_battery:
-                    log(f"  - Já está na estação com bateria suficiente ({battery:.1f}% >= {needed_battery:.1f}%), decisão: COLETAR", "DECISION")
+                    log("  - Já está na estação com bateria suficiente ({:.1f}% >= {:.1f}%), decisão: COLETAR", "DECISION", battery, needed_battery)
                     return ('collect', nearest_item, 'Coletar item')
                 else:
-                    log(f"  - Está na estação mas precisa recarregar mais ({battery:.1f}% < {needed_battery:.1f}%), decisão: RECARREGAR", "DECISION")
+                    log("  - Está na estação mas precisa recarregar mais ({:.1f}% < {:.1f}%), decisão: RECARREGAR", "DECISION", battery, needed_battery)
                     return ('recharge', robot_pos, 'Recarregar antes de coletar')
             
             # Não está na estação, precisa ir até lá
-            log(f"  - Bateria insuficiente ({battery:.1f}% < {total_cost + SAFETY_MARGIN:.1f}%), decisão: RECARREGAR ANTES", "DECISION")
+            log("  - Bateria insuficiente ({:.1f}% < {:.1f}%), decisão: RECARREGAR ANTES", "DECISION", battery, total_cost + SAFETY_MARGIN)
             if nearest_recharge:
                 cost_to_recharge = calculate_route_cost(robot_pos, nearest_recharge)
                 if battery >= cost_to_recharge + SAFETY_MARGIN:
                     return ('recharge', nearest_recharge, 'Recarregar antes de coletar')
                 else:
-                    log(f"ERRO: Bateria insuficiente até para recarregar! Bateria: {battery:.1f}%, Custo: {cost_to_recharge:.1f}%", "ERROR")
+                    log("ERRO: Bateria insuficiente até para recarregar! Bateria: {:.1f}%, Custo: {:.1f}%", "ERROR", battery, cost_to_recharge)
                     return None
     
     # Caso 6: Todos os itens coletados e entregues -> MISSÃO COMPLETA
@@ -1341,18 +1868,18 @@ def decide_next_action():
     """
     robot_pos = tuple(robot_grid_pos)
     items, warehouses, recharge_stations = find_all_positions()
-    current_time = pygame.time.get_ticks()
+    current_time = now_ms()
     
     # Prioridade 0: Se está no almoxarifado com itens, sempre decidir entregar
     # Não precisa calcular rota, já está no local
     if is_at_warehouse() and len(robot_inventory) > 0:
-        log(f"Prioridade: Entregar itens (já está no almoxarifado com {len(robot_inventory)} itens)", "DECISION")
+        log("Prioridade: Entregar itens (já está no almoxarifado com {} itens)", "DECISION", len(robot_inventory))
         return ('deliver', robot_pos)  # Já está na posição, entrega será automática após 3s
     
     # Prioridade 0.5: Se está na estação de recarga com bateria baixa, sempre decidir recarregar
     # Não precisa calcular rota, já está no local
     if is_at_recharge_station() and battery < 100:
-        log(f"Prioridade: Recarregar (já está na estação de recarga, bateria: {battery:.1f}%)", "DECISION")
+        log("Prioridade: Recarregar (já está na estação de recarga, bateria: {:.1f}%)", "DECISION", battery)
         return ('recharge', robot_pos)  # Já está na posição, recarga será automática após 3s
     
     # Prioridade 1: Recarregar se bateria muito baixa (< 20%)
@@ -1361,7 +1888,7 @@ def decide_next_action():
         if is_at_recharge_station():
             log("Prioridade: Recarregar (bateria < 20%, já está na estação)", "DECISION")
             return ('recharge', robot_pos)
-        nearest_recharge = find_nearest(robot_pos, recharge_stations)
+        nearest_recharge = find_nearest_recharge_station(robot_pos)
         if nearest_recharge:
             log("Prioridade: Recarregar (bateria < 20%)", "DECISION")
             return ('recharge', nearest_recharge)
@@ -1372,7 +1899,7 @@ def decide_next_action():
         if is_at_warehouse():
             log("Prioridade: Entregar (inventário cheio, já está no almoxarifado)", "DECISION")
             return ('deliver', robot_pos)
-        nearest_warehouse = find_nearest(robot_pos, warehouses)
+        nearest_warehouse = find_nearest_warehouse(robot_pos)
         if nearest_warehouse:
             log("Prioridade: Entregar (inventário cheio)", "DECISION")
             return ('deliver', nearest_warehouse)
@@ -1383,12 +1910,11 @@ def decide_next_action():
         if is_at_warehouse():
             log("Prioridade: Entregar (tem itens, já está no almoxarifado)", "DECISION")
             return ('deliver', robot_pos)
-        nearest_warehouse = find_nearest(robot_pos, warehouses)
+        nearest_warehouse = find_nearest_warehouse(robot_pos)
         if nearest_warehouse:
-            graph = build_graph_from_matrix(matriz2)
-            path = a_star(graph, robot_pos, nearest_warehouse)
+            path = find_path(robot_pos, nearest_warehouse)
             if path and len(path) <= 2:  # Muito próximo (1-2 movimentos)
-                log(f"Prioridade: Entregar (muito próximo do almoxarifado, {len(path)-1} passos)", "DECISION")
+                log("Prioridade: Entregar (muito próximo do almoxarifado, {} passos)", "DECISION", len(path)-1)
                 return ('deliver', nearest_warehouse)
     
     # Prioridade 4: Coletar itens se houver espaço
@@ -1411,12 +1937,11 @@ def decide_next_action():
                         return ('collect', nearest_item)
                 else:
                     # Verifica se tem bateria suficiente para ir até o item
-                    graph = build_graph_from_matrix(matriz2)
-                    path = a_star(graph, robot_pos, nearest_item)
+                    path = find_path(robot_pos, nearest_item)
                     if path:
                         battery_cost = estimate_battery_cost(path)
                         if battery >= battery_cost + 10:  # Deixa margem de segurança
-                            log(f"Prioridade: Coletar item em ({nearest_item[0]}, {nearest_item[1]})", "DECISION")
+                            log("Prioridade: Coletar item em ({}, {})", "DECISION", nearest_item[0], nearest_item[1])
                             return ('collect', nearest_item)
     
     # Prioridade 5: Recarregar se bateria baixa (< 30%) e não há itens para coletar
@@ -1425,7 +1950,7 @@ def decide_next_action():
         if is_at_recharge_station():
             log("Prioridade: Recarregar (bateria < 30%, já está na estação)", "DECISION")
             return ('recharge', robot_pos)
-        nearest_recharge = find_nearest(robot_pos, recharge_stations)
+        nearest_recharge = find_nearest_recharge_station(robot_pos)
         if nearest_recharge:
             log("Prioridade: Recarregar (bateria < 30%, sem itens)", "DECISION")
             return ('recharge', nearest_recharge)
@@ -1436,7 +1961,7 @@ def decide_next_action():
         if is_at_warehouse():
             log("Prioridade: Entregar (tem itens, já está no almoxarifado)", "DECISION")
             return ('deliver', robot_pos)
-        nearest_warehouse = find_nearest(robot_pos, warehouses)
+        nearest_warehouse = find_nearest_warehouse(robot_pos)
         if nearest_warehouse:
             log("Prioridade: Entregar (tem itens)", "DECISION")
             return ('deliver', nearest_warehouse)
@@ -1445,11 +1970,11 @@ def decide_next_action():
     if battery < 100 and recharge_stations:
         # Se já está em uma estação de recarga, não precisa calcular rota
         if is_at_recharge_station():
-            log(f"Prioridade: Recarregar (bateria: {battery:.1f}%, já está na estação)", "DECISION")
+            log("Prioridade: Recarregar (bateria: {:.1f}%, já está na estação)", "DECISION", battery)
             return ('recharge', robot_pos)
-        nearest_recharge = find_nearest(robot_pos, recharge_stations)
+        nearest_recharge = find_nearest_recharge_station(robot_pos)
         if nearest_recharge:
-            log(f"Prioridade: Recarregar (bateria: {battery:.1f}%)", "DECISION")
+            log("Prioridade: Recarregar (bateria: {:.1f}%)", "DECISION", battery)
             return ('recharge', nearest_recharge)
     
     # Se chegou aqui, realmente não há trabalho a fazer
@@ -1457,84 +1982,128 @@ def decide_next_action():
     if not items and len(robot_inventory) == 0:
         log("Nenhuma ação disponível: Todos os itens foram coletados e entregues!", "DECISION")
     else:
-        log(f"Nenhuma ação disponível: Itens restantes: {len(items)}, Inventário: {len(robot_inventory)}, Bateria: {battery:.1f}%", "DECISION")
+        log("Nenhuma ação disponível: Itens restantes: {}, Inventário: {}, Bateria: {:.1f}%", "DECISION", len(items), len(robot_inventory), battery)
     return None
 
 
 def plan_full_mission():
     """
-    Planeja missão completa para modo automático total.
-    Retorna lista de ações: [('action_type', target_pos), ...]
+    Planeja missão completa para modo automático total: roteamento com
+    capacidade e paradas de recarga (mission_planner.MissionPlanner).
+    Guarda o plano em mission_plan e retorna a lista de ações:
+    [('action_type', target_pos), ...]
     """
+    global mission_plan, mission_plan_step, mission_plan_version, planned_recharge_target
+
     log("Iniciando planejamento de missão completa...", "PLAN")
-    mission_plan = []
-    current_pos = tuple(robot_grid_pos)
-    current_battery = battery
-    remaining_items = list(items_on_grid.keys())
-    graph = build_graph_from_matrix(matriz2)
-    items, warehouses, recharge_stations = find_all_positions()
-    
-    log(f"Itens restantes para coletar: {len(remaining_items)}", "PLAN")
-    log(f"Bateria atual: {current_battery}%", "PLAN")
-    
-    trip_number = 1
-    while remaining_items:
-        # Verifica se precisa recarregar antes de continuar
-        if current_battery < 30 and recharge_stations:
-            nearest_recharge = find_nearest(current_pos, recharge_stations)
-            if nearest_recharge:
-                path = a_star(graph, current_pos, nearest_recharge)
-                if path:
-                    log(f"Viagem {trip_number}: Recarga planejada em ({nearest_recharge[0]}, {nearest_recharge[1]}) - Bateria: {current_battery}%", "PLAN")
-                    mission_plan.append(('recharge', nearest_recharge))
-                    current_pos = nearest_recharge
-                    current_battery = 100
-        
-        # Coleta itens até encher ou acabar
-        items_to_collect = []
-        items_collected = 0
-        
-        while items_collected < ROBOT_CAPACITY and remaining_items:
-            nearest_item = find_nearest(current_pos, remaining_items)
-            if not nearest_item:
-                break
-            
-            path = a_star(graph, current_pos, nearest_item)
-            if not path:
-                break
-            
-            battery_cost = estimate_battery_cost(path)
-            if current_battery < battery_cost + 20:  # Precisa recarregar
+    planner = MissionPlanner(get_distance_oracle(), tuple(robot_grid_pos), battery, items_on_grid,
+                             ROBOT_CAPACITY, inventory=len(robot_inventory), safety_margin=SAFETY_MARGIN)
+    plan = planner.plan(time_budget_ms=mission_plan_time_budget_ms, max_evaluations=MISSION_PLAN_MAX_EVALUATIONS)
+
+    log("Plano ({} + {} melhorias em {:.1f} ms): {} viagens, {} movimentos, {} recargas", "PLAN", plan.construction, plan.improvements, plan.planning_ms, len(plan.trips), plan.moves, plan.recharge_stops)
+    for trip_number, trip in enumerate(plan.trips, 1):
+        log("  Viagem {}: coletar em {}", "PLAN", trip_number, ', '.join(f'({x}, {y})' for x, y in trip) or '-')
+    if plan.unserved:
+        log("Planejamento: {} células com itens fora do alcance da bateria", "PLAN", len(plan.unserved))
+    if plan.construction is None:
+        log("Planejamento: sem tempo para as distâncias em {:.1f} ms; seguindo com decisão gulosa", "PLAN", plan.planning_ms)
+    elif plan.deferred:
+        log("Planejamento: {} células com itens ficam para o próximo plano", "PLAN", len(plan.deferred))
+
+    mission_plan = plan
+    mission_plan_step = 0
+    mission_plan_version = map_version
+    planned_recharge_target = None
+    log("Planejamento completo! Total de ações: {}", "PLAN", len(plan.actions))
+    return plan.actions
+
+
+def clear_mission_plan():
+    """Descarta o plano de missão (o modo automático volta à decisão gulosa)."""
+    global mission_plan, mission_plan_step, planned_recharge_target
+    mission_plan = None
+    mission_plan_step = 0
+    planned_recharge_target = None
+
+
+def planned_step_is_safe(target_pos, final=False):
+    """
+    A bateria leva o robô até o alvo e dali até a estação mais próxima (só até
+    o alvo no último trecho da missão, sem itens restantes no grid) sem usar os SAFETY_MARGIN % que o
+    planejador de missão reserva: um trecho planejado nunca chega com a bateria zerada.
+    """
+    robot_pos = tuple(robot_grid_pos)
+    cost = calculate_route_cost(robot_pos, target_pos)
+    nearest_recharge = None if final else find_nearest_recharge_station(target_pos)
+    if nearest_recharge is not None:
+        cost += calculate_route_cost(target_pos, nearest_recharge)
+    return cost + SAFETY_MARGIN <= battery
+
+
+def next_planned_action(replanned=False):
+    """
+    Próxima ação do plano de missão, validada contra o estado atual.
+    Pula coletas de células já vazias e entregas sem inventário; replaneja
+    se o mapa mudou ou se a bateria não cobre o próximo trecho.
+    Retorna ('action_type', target_pos, description) ou None (sem plano).
+    """
+    global mission_plan_step, planned_recharge_target
+
+    if mission_plan is None:
+        return None
+    if mission_plan_version != map_version and not replanned:
+        log("Mapa alterado: replanejando missão", "PLAN")
+        plan_full_mission()
+        return next_planned_action(replanned=True)
+
+    actions = mission_plan.actions
+    while mission_plan_step < len(actions):
+        index = mission_plan_step
+        action_type, target_pos = actions[index]
+        mission_plan_step += 1
+        step = f"plano {index + 1}/{len(actions)}"
+
+        if action_type == 'collect':
+            if not items_on_grid.get(target_pos) or len(robot_inventory) >= ROBOT_CAPACITY:
+                log("Plano: coleta em ({}, {}) não se aplica mais, pulando", "PLAN", target_pos[0], target_pos[1])
+                continue
+            description = f"Coletar item em ({target_pos[0]}, {target_pos[1]}) ({step})"
+        elif action_type == 'deliver':
+            if not robot_inventory:
+                continue
+            description = f"Entregar {len(robot_inventory)} itens ({step})"
+        else:
+            target_battery = mission_plan.charge_targets.get(index, 100)
+            if battery >= target_battery:
+                continue
+            description = f"Recarregar até {target_battery:.0f}% ({step})"
+
+        # Último trecho só se nada sobra no grid depois dele: itens fora do plano
+        # ficam para a decisão gulosa, que parte daqui e precisa chegar a uma estação
+        final = (all(kind == 'recharge' for kind, _ in actions[index + 1:])
+                 and remaining_item_count() == 0)
+        if action_type != 'recharge' and not planned_step_is_safe(target_pos, final):
+            if replanned:
                 break
-            
-            items_to_collect.append(nearest_item)
-            remaining_items.remove(nearest_item)
-            items_collected += 1
-            current_pos = nearest_item
-            current_battery -= battery_cost
-        
-        # Adiciona ações de coleta
-        if items_to_collect:
-            log(f"Viagem {trip_number}: Planejando coleta de {len(items_to_collect)} itens", "PLAN")
-            for item_pos in items_to_collect:
-                mission_plan.append(('collect', item_pos))
-                log(f"  - Coletar item em ({item_pos[0]}, {item_pos[1]})", "PLAN")
-        
-        # Vai entregar no almoxarifado mais próximo
-        if items_to_collect and warehouses:
-            nearest_warehouse = find_nearest(current_pos, warehouses)
-            if nearest_warehouse:
-                path = a_star(graph, current_pos, nearest_warehouse)
-                if path:
-                    battery_cost = estimate_battery_cost(path)
-                    current_battery -= battery_cost
-                    log(f"Viagem {trip_number}: Entrega planejada em ({nearest_warehouse[0]}, {nearest_warehouse[1]})", "PLAN")
-                    mission_plan.append(('deliver', nearest_warehouse))
-                    current_pos = nearest_warehouse
-                    trip_number += 1
-    
-    log(f"Planejamento completo! Total de ações: {len(mission_plan)}", "PLAN")
-    return mission_plan
+            log("Bateria ({:.1f}%) não cobre o próximo trecho do plano: replanejando", "PLAN", battery)
+            plan_full_mission()
+            return next_planned_action(replanned=True)
+
+        planned_recharge_target = target_battery if action_type == 'recharge' else None
+        invalidate_battery_cache()
+        return (action_type, target_pos, description)
+
+    # Plano esgotado: se ele deixou itens para depois, planeja o próximo trecho da missão
+    if mission_plan.deferred and mission_plan.trips and not replanned:
+        log("Plano de missão concluído; planejando as células restantes", "PLAN")
+        plan_full_mission()
+        return next_planned_action(replanned=True)
+
+    # Plano esgotado (ou inviável): itens que sobraram ficam para a decisão gulosa
+    if remaining_item_count() > 0 or robot_inventory:
+        log("Plano de missão encerrado com itens restantes; seguindo com decisão gulosa", "PLAN")
+    clear_mission_plan()
+    return None
 
 
 def execute_auto_action():
@@ -1553,11 +2122,10 @@ def execute_auto_action():
         next_pos = current_path[current_path_index]
         
         # VALIDAÇÃO CRÍTICA: Verifica se o próximo passo não é um obstáculo
-        if (0 <= next_pos[0] < len(matriz2[0]) and 0 <= next_pos[1] < len(matriz2)):
-            cell_type = matriz2[next_pos[1]][next_pos[0]]
-            if cell_type == '0':
+        if world_grid.in_bounds(next_pos[0], next_pos[1]):
+            if not world_grid.is_walkable(next_pos[0], next_pos[1]):
                 # Próximo passo é um obstáculo! Aborta o caminho
-                log(f"🚫 ERRO CRÍTICO: Próximo passo é OBSTÁCULO em ({next_pos[0]}, {next_pos[1]})! Abortando.", "ERROR")
+                log("🚫 ERRO CRÍTICO: Próximo passo é OBSTÁCULO em ({}, {})! Abortando.", "ERROR", next_pos[0], next_pos[1])
                 current_action = None
                 current_path = []
                 current_path_index = 0
@@ -1566,7 +2134,7 @@ def execute_auto_action():
                     action_completed = True
                 return
             else:
-                log(f"✓ Validação: próximo passo ({next_pos[0]}, {next_pos[1]}) é válido (tipo: {cell_type})", "AUTO")
+                log("✓ Validação: próximo passo ({}, {}) é válido (tipo: {})", "AUTO", next_pos[0], next_pos[1], world_grid.cell_char(next_pos[0], next_pos[1]))
         
         # Move o robô na direção do próximo passo
         current_x, current_y = robot_grid_pos
@@ -1576,7 +2144,7 @@ def execute_auto_action():
         dx = abs(target_x - current_x)
         dy = abs(target_y - current_y)
         if dx + dy != 1:
-            log(f"ERRO: Movimento inválido de ({current_x}, {current_y}) para ({target_x}, {target_y}) - distância incorreta!", "ERROR")
+            log("ERRO: Movimento inválido de ({}, {}) para ({}, {}) - distância incorreta!", "ERROR", current_x, current_y, target_x, target_y)
             current_action = None
             current_path = []
             current_path_index = 0
@@ -1599,7 +2167,7 @@ def execute_auto_action():
         # Verifica se o movimento foi bem-sucedido
         if robot_grid_pos == old_pos:
             # Movimento falhou (provavelmente obstáculo ou bateria)
-            log(f"Movimento falhou de ({old_pos[0]}, {old_pos[1]}) para ({target_x}, {target_y})", "ERROR")
+            log("Movimento falhou de ({}, {}) para ({}, {})", "ERROR", old_pos[0], old_pos[1], target_x, target_y)
             current_action = None
             current_path = []
             current_path_index = 0
@@ -1613,7 +2181,7 @@ def execute_auto_action():
             current_path_index += 1
         else:
             # Robô não chegou na posição esperada - algo deu errado
-            log(f"ERRO: Robô não chegou na posição esperada. Esperado: ({target_x}, {target_y}), Atual: ({robot_grid_pos[0]}, {robot_grid_pos[1]})", "ERROR")
+            log("ERRO: Robô não chegou na posição esperada. Esperado: ({}, {}), Atual: ({}, {})", "ERROR", target_x, target_y, robot_grid_pos[0], robot_grid_pos[1])
             current_action = None
             current_path = []
             current_path_index = 0
@@ -1633,9 +2201,9 @@ def execute_auto_action():
                 tuple(robot_grid_pos) in items_on_grid and 
                 len(items_on_grid[tuple(robot_grid_pos)]) > 0 and
                 len(robot_inventory) < ROBOT_CAPACITY):
-                log(f"✓ Validação de coleta: Robô NA célula ({robot_grid_pos[0]}, {robot_grid_pos[1]}) = Item alvo ({target_pos[0]}, {target_pos[1]})", "AUTO")
+                log("✓ Validação de coleta: Robô NA célula ({}, {}) = Item alvo ({}, {})", "AUTO", robot_grid_pos[0], robot_grid_pos[1], target_pos[0], target_pos[1])
                 collect_item(1)
-                log(f"Ação automática COMPLETA: Coleta em ({robot_grid_pos[0]}, {robot_grid_pos[1]})", "AUTO")
+                log("Ação automática COMPLETA: Coleta em ({}, {})", "AUTO", robot_grid_pos[0], robot_grid_pos[1])
                 just_collected = True  # Marca que acabou de coletar
                 
                 # Modo semi-automático: desativa após coletar
@@ -1654,19 +2222,19 @@ def execute_auto_action():
                     current_path = []
                     current_path_index = 0
                     waiting_for_action = False
-                    last_action_time = pygame.time.get_ticks()  # Marca tempo para delay de 300ms
+                    last_action_time = now_ms()  # Marca tempo para delay de 300ms
                     invalidate_battery_cache()  # Invalida cache para recalcular bateria necessária
                     log("=== AÇÃO AUTOMÁTICA COMPLETA: Coleta finalizada ===", "AUTO")
                     return
             else:
-                log(f"Ação automática FALHOU: Não é possível coletar em ({target_pos[0]}, {target_pos[1]}) - Posição atual: ({robot_grid_pos[0]}, {robot_grid_pos[1]}), Itens: {tuple(robot_grid_pos) in items_on_grid}, Inventário: {len(robot_inventory)}/{ROBOT_CAPACITY}", "ERROR")
+                log("Ação automática FALHOU: Não é possível coletar em ({}, {}) - Posição atual: ({}, {}), Itens: {}, Inventário: {}/{}", "ERROR", target_pos[0], target_pos[1], robot_grid_pos[0], robot_grid_pos[1], tuple(robot_grid_pos) in items_on_grid, len(robot_inventory), ROBOT_CAPACITY)
                 # Se falhou, limpa e marca tempo
                 if auto_mode == AUTO_MODE_FULL:
                     current_action = None
                     current_path = []
                     current_path_index = 0
                     waiting_for_action = False
-                    last_action_time = pygame.time.get_ticks()
+                    last_action_time = now_ms()
                 elif auto_mode == AUTO_MODE_SEMI:
                     auto_mode = AUTO_MODE_OFF
                     current_action = None
@@ -1684,10 +2252,10 @@ def execute_auto_action():
                 waiting_for_action = True
                 current_path = []
                 current_path_index = 0
-                log(f"Robô chegou ao almoxarifado, aguardando entrega automática...", "AUTO")
+                log("Robô chegou ao almoxarifado, aguardando entrega automática...", "AUTO")
             # Aguarda entrega completar
             elif len(robot_inventory) == 0:
-                log(f"Ação automática COMPLETA: Entrega em ({robot_grid_pos[0]}, {robot_grid_pos[1]})", "AUTO")
+                log("Ação automática COMPLETA: Entrega em ({}, {})", "AUTO", robot_grid_pos[0], robot_grid_pos[1])
                 if auto_mode == AUTO_MODE_FULL:
                     action_completed = True
                 current_action = None
@@ -1702,7 +2270,7 @@ def execute_auto_action():
                 waiting_for_action = True
                 current_path = []
                 current_path_index = 0
-                log(f"Robô chegou à estação de recarga, aguardando recarga automática...", "AUTO")
+                log("Robô chegou à estação de recarga, aguardando recarga automática...", "AUTO")
             # A limpeza do estado é feita em update_auto_recharge() quando atingir target
             # Não precisa verificar aqui para evitar condição de corrida
 
@@ -1721,7 +2289,7 @@ def update_auto_mode():
     
     # Debug: log quando entra em update_auto_mode no modo semi-automático
     if auto_mode == AUTO_MODE_SEMI and not current_path and not waiting_for_action:
-        log(f"[DEBUG] update_auto_mode: Modo SEMI, sem caminho ativo, decidindo próxima ação...", "AUTO")
+        log("update_auto_mode: Modo SEMI, sem caminho ativo, decidindo próxima ação...", "DEBUG")
     
     # Se acabou de coletar, aguarda uma iteração antes de processar próxima ação
     if just_collected:
@@ -1760,7 +2328,7 @@ def update_auto_mode():
     if not current_path:
         if auto_mode == AUTO_MODE_FULL:
             # Modo automático total: funciona como sequência de ações semi-automáticas com delay
-            current_time = pygame.time.get_ticks()
+            current_time = now_ms()
             
             # Verifica se passou tempo suficiente desde a última ação (delay de 300ms)
             if last_action_time > 0 and (current_time - last_action_time) < AUTO_ACTION_DELAY:
@@ -1769,25 +2337,26 @@ def update_auto_mode():
             log("=== DECIDINDO PRÓXIMA AÇÃO (MODO AUTOMÁTICO TOTAL) ===", "AUTO")
             
             # Verifica se missão está completa
-            items_remaining = sum(len(items) for items in items_on_grid.values())
+            items_remaining = remaining_item_count()
             if items_remaining == 0 and len(robot_inventory) == 0:
                 log("=== MISSÃO COMPLETA! Todos os itens foram entregues. ===", "AUTO")
                 auto_mode = AUTO_MODE_OFF
                 return
             
-            # Usa lógica inteligente de decisão (igual ao modo semi-automático)
-            decision = decide_next_action_intelligent()
+            # Segue o plano de missão; sem plano, usa a lógica inteligente (igual ao modo semi-automático)
+            decision = next_planned_action() if USE_MISSION_PLANNER else None
+            if decision is None:
+                decision = decide_next_action_intelligent()
             
             if decision:
                 action_type, target_pos, description = decision
-                log(f"Decisão automática: {description}", "AUTO")
+                log("Decisão automática: {}", "AUTO", description)
                 
-                graph = build_graph_from_matrix(matriz2)
-                path = a_star(graph, tuple(robot_grid_pos), target_pos)
+                path = find_path(tuple(robot_grid_pos), target_pos)
                 
                 # Valida o caminho antes de usar
                 if path and not validate_path(path):
-                    log(f"🚫 ERRO: Caminho inválido calculado para {action_type}! Abortando ação.", "ERROR")
+                    log("🚫 ERRO: Caminho inválido calculado para {}! Abortando ação.", "ERROR", action_type)
                     last_action_time = current_time  # Marca tempo para tentar novamente após delay
                     return
                 
@@ -1800,7 +2369,7 @@ def update_auto_mode():
                             current_path_index = 0
                             current_action = action_type
                             waiting_for_action = True
-                            log(f"Iniciando {action_type} imediatamente (já está no local)", "AUTO")
+                            log("Iniciando {} imediatamente (já está no local)", "AUTO", action_type)
                         else:
                             # Para coleta, também executa diretamente (já está na posição)
                             current_path = []
@@ -1811,27 +2380,27 @@ def update_auto_mode():
                             if (tuple(robot_grid_pos) in items_on_grid and 
                                 len(items_on_grid[tuple(robot_grid_pos)]) > 0 and
                                 len(robot_inventory) < ROBOT_CAPACITY):
-                                log(f"✓ Robô já está na célula do item ({robot_grid_pos[0]}, {robot_grid_pos[1]}), coletando diretamente", "AUTO")
+                                log("✓ Robô já está na célula do item ({}, {}), coletando diretamente", "AUTO", robot_grid_pos[0], robot_grid_pos[1])
                                 collect_item(1)
                                 last_action_time = current_time
                                 log("=== AÇÃO AUTOMÁTICA COMPLETA: Coleta finalizada ===", "AUTO")
                             else:
-                                log(f"⚠️ AVISO: Robô na posição mas sem item para coletar", "AUTO")
+                                log("⚠️ AVISO: Robô na posição mas sem item para coletar", "AUTO")
                                 last_action_time = current_time
                     else:
                         # Remove posição atual e valida o caminho restante
                         remaining_path = path[1:]
                         if not validate_path(remaining_path):
-                            log(f"🚫 ERRO: Caminho restante inválido! Abortando ação.", "ERROR")
+                            log("🚫 ERRO: Caminho restante inválido! Abortando ação.", "ERROR")
                             last_action_time = current_time
                             return
                         
                         current_path = remaining_path
                         current_path_index = 0
                         current_action = action_type
-                        log(f"Executando ação: {action_type} -> ({target_pos[0]}, {target_pos[1]}) | {len(path)} passos", "AUTO")
+                        log("Executando ação: {} -> ({}, {}) | {} passos", "AUTO", action_type, target_pos[0], target_pos[1], len(path))
                 else:
-                    log(f"🚫 ERRO: Não foi possível encontrar caminho para {action_type}", "ERROR")
+                    log("🚫 ERRO: Não foi possível encontrar caminho para {}", "ERROR", action_type)
                     last_action_time = current_time
             else:
                 log("⚠️ AVISO: Nenhuma ação decidida. Robô aguardando...", "AUTO")
@@ -1842,7 +2411,7 @@ def update_auto_mode():
             action = decide_next_action_intelligent()
             if action:
                 action_type, target_pos, description = action
-                log(f"=== AÇÃO SEMI-AUTOMÁTICA INICIADA: {description} ===", "AUTO")
+                log("=== AÇÃO SEMI-AUTOMÁTICA INICIADA: {} ===", "AUTO", description)
                 
                 # Se já está na posição alvo para entregar ou recarregar, não precisa calcular rota
                 if action_type in ['deliver', 'recharge'] and tuple(robot_grid_pos) == target_pos:
@@ -1851,15 +2420,14 @@ def update_auto_mode():
                     current_path_index = 0
                     current_action = action_type
                     waiting_for_action = True
-                    log(f"Ação (Semi-Auto): {action_type} - já está no local, aguardando ação automática", "AUTO")
+                    log("Ação (Semi-Auto): {} - já está no local, aguardando ação automática", "AUTO", action_type)
                 else:
                     # Precisa se mover até o alvo
-                    graph = build_graph_from_matrix(matriz2)
-                    path = a_star(graph, tuple(robot_grid_pos), target_pos)
+                    path = find_path(tuple(robot_grid_pos), target_pos)
                     
                     # Valida o caminho antes de usar
                     if path and not validate_path(path):
-                        log(f"ERRO: Caminho inválido calculado para {action_type} -> ({target_pos[0]}, {target_pos[1]})! Abortando ação.", "ERROR")
+                        log("ERRO: Caminho inválido calculado para {} -> ({}, {})! Abortando ação.", "ERROR", action_type, target_pos[0], target_pos[1])
                         auto_mode = AUTO_MODE_OFF
                         log("Modo semi-automático DESATIVADO devido a erro.", "AUTO")
                         return
@@ -1874,8 +2442,7 @@ def update_auto_mode():
                                 adjacent_found = False
                                 for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
                                     nx, ny = x + dx, y + dy
-                                    if (0 <= nx < len(matriz2[0]) and 0 <= ny < len(matriz2) and
-                                        matriz2[ny][nx] != '0'):
+                                    if world_grid.is_walkable(nx, ny):
                                         # Cria caminho: posição atual -> adjacente -> posição alvo
                                         min_path = [(nx, ny), target_pos]
                                         # Valida o caminho mínimo antes de usar
@@ -1883,15 +2450,15 @@ def update_auto_mode():
                                             current_path = min_path
                                             current_path_index = 0
                                             current_action = action_type
-                                            log(f"Criando caminho mínimo (Semi-Auto) para passar pela célula: ({x}, {y}) -> ({nx}, {ny}) -> ({x}, {y})", "AUTO")
+                                            log("Criando caminho mínimo (Semi-Auto) para passar pela célula: ({}, {}) -> ({}, {}) -> ({}, {})", "AUTO", x, y, nx, ny, x, y)
                                             adjacent_found = True
                                             break
                                         else:
-                                            log(f"ERRO: Caminho mínimo inválido criado (Semi-Auto)! Tentando próxima direção...", "ERROR")
+                                            log("ERRO: Caminho mínimo inválido criado (Semi-Auto)! Tentando próxima direção...", "ERROR")
                                 
                                 if not adjacent_found:
                                     # Não há célula adjacente livre - não pode coletar sem passar pela célula
-                                    log(f"Ação automática PULADA (Semi-Auto): Não há célula adjacente livre em ({target_pos[0]}, {target_pos[1]})", "AUTO")
+                                    log("Ação automática PULADA (Semi-Auto): Não há célula adjacente livre em ({}, {})", "AUTO", target_pos[0], target_pos[1])
                                     auto_mode = AUTO_MODE_OFF
                                     log("Modo semi-automático DESATIVADO.", "AUTO")
                                     current_action = None
@@ -1899,19 +2466,19 @@ def update_auto_mode():
                             # Remove posição atual e valida o caminho restante
                             remaining_path = path[1:]
                             if not validate_path(remaining_path):
-                                log(f"ERRO: Caminho restante inválido após remover posição atual (Semi-Auto)! Abortando ação.", "ERROR")
+                                log("ERRO: Caminho restante inválido após remover posição atual (Semi-Auto)! Abortando ação.", "ERROR")
                                 auto_mode = AUTO_MODE_OFF
                                 log("Modo semi-automático DESATIVADO devido a erro.", "AUTO")
                                 return
                             current_path = remaining_path
                             current_path_index = 0
                             current_action = action_type
-                            log(f"Decisão (Semi-Auto): {action_type} -> ({target_pos[0]}, {target_pos[1]})", "AUTO")
-                            log(f"Caminho calculado: {len(path)} passos", "AUTO")
+                            log("Decisão (Semi-Auto): {} -> ({}, {})", "AUTO", action_type, target_pos[0], target_pos[1])
+                            log("Caminho calculado: {} passos", "AUTO", len(path))
                             # NÃO define waiting_for_action aqui - só define quando chegar ao destino
                             # waiting_for_action será definido em execute_auto_action() quando completar o caminho
                     else:
-                        log(f"ERRO: Não foi possível encontrar caminho para {action_type} -> ({target_pos[0]}, {target_pos[1]})", "ERROR")
+                        log("ERRO: Não foi possível encontrar caminho para {} -> ({}, {})", "ERROR", action_type, target_pos[0], target_pos[1])
                         auto_mode = AUTO_MODE_OFF
                         log("Modo semi-automático DESATIVADO devido a erro.", "AUTO")
             else:
@@ -1922,10 +2489,54 @@ def update_auto_mode():
     
     # Executa ação atual
     if current_path:
-        log(f"[DEBUG] Executando ação: current_path={current_path}, current_path_index={current_path_index}, current_action={current_action}", "AUTO")
+        log("Executando ação: current_path={}, current_path_index={}, current_action={}", "DEBUG", current_path, current_path_index, current_action)
         execute_auto_action()
     elif auto_mode == AUTO_MODE_SEMI:
-        log(f"[DEBUG] Modo semi-automático ativo mas sem caminho! waiting_for_action={waiting_for_action}, current_action={current_action}", "AUTO")
+        log("Modo semi-automático ativo mas sem caminho! waiting_for_action={}, current_action={}", "DEBUG", waiting_for_action, current_action)
+
+
+def next_timer_deadline():
+    """
+    Retorna o próximo instante (ms) em que um temporizador da simulação expira:
+    espera/fim de recarga, espera/próxima entrega ou delay entre ações do modo
+    automático. Retorna None se não há nenhuma espera pendente.
+    Permite ao motor headless saltar o relógio direto para o próximo evento.
+    """
+    deadlines = []
+    at_rest = robot_grid_pos == last_position
+
+    if is_at_recharge_station() and at_rest:
+        target_battery = recharge_target_battery()
+        if battery < target_battery:
+            if is_recharging:
+                battery_needed = target_battery - battery_at_recharge_start
+                time_needed = (battery_needed / 100.0) * RECHARGE_SPEED * 1000
+                deadlines.append(math.ceil(recharge_start_time + time_needed))
+            elif time_at_station > 0:
+                deadlines.append(time_at_station + STATION_WAIT_TIME)
+
+    if is_at_warehouse() and at_rest and len(robot_inventory) > 0:
+        if is_delivering:
+            deadlines.append(last_delivery_time + DELIVERY_INTERVAL)
+        elif time_at_warehouse > 0:
+            deadlines.append(time_at_warehouse + WAREHOUSE_WAIT_TIME)
+
+    if (auto_mode == AUTO_MODE_FULL and not current_path and not waiting_for_action
+            and last_action_time > 0):
+        deadlines.append(last_action_time + AUTO_ACTION_DELAY)
+
+    return min(deadlines) if deadlines else None
+
+
+def automation_pending():
+    """Indica se update_auto_mode() tem trabalho imediato no próximo passo (sem esperar temporizador)."""
+    if auto_mode == AUTO_MODE_OFF or waiting_for_action:
+        return False
+    if current_path or just_collected:
+        return True
+    if auto_mode == AUTO_MODE_FULL:
+        return last_action_time == 0 or (now_ms() - last_action_time) >= AUTO_ACTION_DELAY
+    return True  # Semi-automático decide a próxima ação imediatamente
 
 
 def is_animation_complete():
@@ -1956,31 +2567,35 @@ def animate_robot():
         robot_real_pos[1] -= ANIMATION_SPEED
 
 
-def draw_side_panel():
-    """Desenha o painel lateral direito com todas as informações do jogo."""
-    global panel_max_scroll
-    
-    panel_x = GRID_WIDTH
-    panel_y = 0
-    panel_bg_color = (30, 30, 40)  # Azul escuro
-    panel_border_color = (100, 100, 120)
-    
-    # Desenha fundo do painel
-    pygame.draw.rect(screen, panel_bg_color, (panel_x, panel_y, PANEL_WIDTH, HEIGHT))
-    pygame.draw.line(screen, panel_border_color, (panel_x, 0), (panel_x, HEIGHT), 3)
-    
-    # Criar superfície virtual para scroll (altura estimada)
-    virtual_height = HEIGHT + 400  # Altura extra para conteúdo
-    virtual_surface = pygame.Surface((PANEL_WIDTH, virtual_height), pygame.SRCALPHA)
-    virtual_surface.fill((0, 0, 0, 0))  # Transparente
+# ==================== PAINEL LATERAL (CAMADA DE WIDGETS) ====================
+
+def render_text(text_font, text, color):
+    """Texto renderizado em cache por (fonte, texto, cor): só textos novos passam por font.render."""
+    key = (text_font, text, color)
+    surface = text_cache.get(key)
+    if surface is None:
+        if len(text_cache) >= TEXT_CACHE_SIZE:
+            text_cache.pop(next(iter(text_cache)))  # Descarta o mais antigo (contadores, cronômetros)
+        surface = text_font.render(text, True, color)
+        text_cache[key] = surface
+    return surface
+
+
+def build_panel_layout():
+    """
+    Descreve o conteúdo do painel lateral como uma lista de widgets:
+    ('text', fonte, texto, cor, posição), ('text_center', fonte, texto, cor, centro),
+    ('line', y) e ('bar', retângulo, largura preenchida, cor).
+    Retorna (widgets, altura total do conteúdo).
+    """
+    layout = []
     
     # Posição inicial para textos (na superfície virtual)
     y_offset = 15
     x_margin = 15
     
     # ========== TÍTULO ==========
-    title_text = font_small.render("STATUS", True, (255, 255, 255))
-    virtual_surface.blit(title_text, (x_margin, y_offset))
+    layout.append(('text', font_small, "STATUS", (255, 255, 255), (x_margin, y_offset)))
     y_offset += 35
     
     # ========== MODO ==========
@@ -1994,33 +2609,59 @@ def draw_side_panel():
         mode_text = "MANUAL"
         mode_color = WHITE
     
-    mode_label = font_tiny.render("Modo:", True, (200, 200, 200))
-    virtual_surface.blit(mode_label, (x_margin, y_offset))
+    layout.append(('text', font_tiny, "Modo:", (200, 200, 200), (x_margin, y_offset)))
     y_offset += 22
-    mode_surface = font_tiny.render(mode_text, True, mode_color)
-    virtual_surface.blit(mode_surface, (x_margin + 8, y_offset))
+    layout.append(('text', font_tiny, mode_text, mode_color, (x_margin + 8, y_offset)))
+    y_offset += 22
+    speed_color = (200, 200, 200) if sim_speed == 1 else (255, 200, 0)
+    layout.append(('text', font_tiny, f"Velocidade: {sim_speed_label()}", speed_color, (x_margin + 8, y_offset)))
     y_offset += 28
+    if not camera.is_identity():
+        follow_text = ", seguindo" if camera.follow else ""
+        layout.append(('text', font_tiny, f"Zoom: {camera.cell_px:g} px/célula{follow_text}",
+                       (200, 200, 200), (x_margin + 8, y_offset - 6)))
+        y_offset += 22
     
     # ========== AÇÃO ATUAL ==========
     if auto_mode != AUTO_MODE_OFF and current_action:
-        action_label = font_tiny.render("Ação:", True, (200, 200, 200))
-        virtual_surface.blit(action_label, (x_margin, y_offset))
+        layout.append(('text', font_tiny, "Ação:", (200, 200, 200), (x_margin, y_offset)))
         y_offset += 22
         
         action_text = current_action.upper()
         if current_path:
             action_text += f" ({len(current_path) - current_path_index} passos)"
-        action_surface = font_tiny.render(action_text, True, mode_color)
-        virtual_surface.blit(action_surface, (x_margin + 8, y_offset))
+        layout.append(('text', font_tiny, action_text, mode_color, (x_margin + 8, y_offset)))
         y_offset += 25
     
+    # ========== PERFIL DO QUADRO (tecla P) ==========
+    if profiler_visible:
+        layout.append(('line', y_offset))
+        y_offset += 15
+        layout.append(('text', font_tiny, "Quadro (ms):", (200, 200, 200), (x_margin, y_offset)))
+        for i, p in enumerate(frame_profiler.percentiles):
+            layout.append(('text', font_tiny, f"p{p}", (200, 200, 200), (x_margin + 175 + i * 55, y_offset)))
+        y_offset += 22
+        if not profiler_snapshot:
+            layout.append(('text', font_tiny, "medindo...", (180, 180, 180), (x_margin + 8, y_offset)))
+            y_offset += 20
+        for stage, values in profiler_snapshot:
+            layout.append(('text', font_tiny, stage, (180, 180, 180), (x_margin + 8, y_offset)))
+            for i, ms in enumerate(values):
+                layout.append(('text', font_tiny, f"{ms:.2f}", (200, 200, 255), (x_margin + 175 + i * 55, y_offset)))
+            y_offset += 20
+        if path_cache_snapshot is not None:
+            rates = (f"Cache de rotas: {path_cache_snapshot['paths']['hit_rate']:.0%} caminhos, "
+                     f"{path_cache_snapshot['costs']['hit_rate']:.0%} custos")
+            layout.append(('text', font_tiny, rates, (180, 180, 180), (x_margin + 8, y_offset)))
+            y_offset += 20
+        y_offset += 5
+    
     # Linha separadora
-    pygame.draw.line(virtual_surface, panel_border_color, (x_margin, y_offset), (PANEL_WIDTH - 15, y_offset), 1)
+    layout.append(('line', y_offset))
     y_offset += 15
     
     # ========== BATERIA ==========
-    battery_label = font_tiny.render("Bateria:", True, (200, 200, 200))
-    virtual_surface.blit(battery_label, (x_margin, y_offset))
+    layout.append(('text', font_tiny, "Bateria:", (200, 200, 200), (x_margin, y_offset)))
     y_offset += 22
     
     # Barra de bateria
@@ -2037,94 +2678,80 @@ def draw_side_panel():
     else:
         battery_color = RED
     
-    # Borda da barra
-    pygame.draw.rect(virtual_surface, (100, 100, 100), (bar_x, bar_y, bar_width, bar_height), 2)
-    # Preenchimento da barra
     fill_width = int((bar_width - 4) * (battery / 100.0))
-    pygame.draw.rect(virtual_surface, battery_color, (bar_x + 2, bar_y + 2, fill_width, bar_height - 4))
+    layout.append(('bar', (bar_x, bar_y, bar_width, bar_height), fill_width, battery_color))
     
     # Texto da bateria
-    battery_text = f"{int(battery)}%"
-    battery_surface = font_tiny.render(battery_text, True, WHITE)
-    battery_rect = battery_surface.get_rect(center=(bar_x + bar_width // 2, bar_y + bar_height // 2))
-    virtual_surface.blit(battery_surface, battery_rect)
+    layout.append(('text_center', font_tiny, f"{int(battery)}%", WHITE,
+                   (bar_x + bar_width // 2, bar_y + bar_height // 2)))
     y_offset += 28
     
     # Status de recarga
     if is_recharging:
         battery_needed = 100 - battery_at_recharge_start
         time_needed = (battery_needed / 100.0) * RECHARGE_SPEED
-        elapsed_time = (pygame.time.get_ticks() - recharge_start_time) / 1000.0
+        elapsed_time = (now_ms() - recharge_start_time) / 1000.0
         time_remaining = max(0, time_needed - elapsed_time)
         
         status_text = f"⚡ Recarregando... ({time_remaining:.1f}s)"
-        status_surface = font_tiny.render(status_text, True, GREEN)
-        virtual_surface.blit(status_surface, (x_margin + 8, y_offset))
+        layout.append(('text', font_tiny, status_text, GREEN, (x_margin + 8, y_offset)))
         y_offset += 22
     elif is_at_recharge_station() and not is_recharging and battery < 100:
-        wait_time = (pygame.time.get_ticks() - time_at_station) / 1000.0 if time_at_station > 0 else 0
+        wait_time = (now_ms() - time_at_station) / 1000.0 if time_at_station > 0 else 0
         wait_remaining = max(0, (STATION_WAIT_TIME / 1000.0) - wait_time)
         
         status_text = f"⏳ Aguardando... ({wait_remaining:.1f}s)"
-        status_surface = font_tiny.render(status_text, True, (255, 255, 0))
-        virtual_surface.blit(status_surface, (x_margin + 8, y_offset))
+        layout.append(('text', font_tiny, status_text, (255, 255, 0), (x_margin + 8, y_offset)))
         y_offset += 22
     
     # Linha separadora
-    pygame.draw.line(virtual_surface, panel_border_color, (x_margin, y_offset), (PANEL_WIDTH - 15, y_offset), 1)
+    layout.append(('line', y_offset))
     y_offset += 15
     
     # ========== INVENTÁRIO ==========
-    inventory_label = font_tiny.render("Inventário:", True, (200, 200, 200))
-    virtual_surface.blit(inventory_label, (x_margin, y_offset))
+    layout.append(('text', font_tiny, "Inventário:", (200, 200, 200), (x_margin, y_offset)))
     y_offset += 22
     
     inventory_text = f"{len(robot_inventory)}/{ROBOT_CAPACITY} itens"
     inventory_color = (255, 200, 0) if len(robot_inventory) > 0 else WHITE
-    inventory_surface = font_tiny.render(inventory_text, True, inventory_color)
-    virtual_surface.blit(inventory_surface, (x_margin + 8, y_offset))
+    layout.append(('text', font_tiny, inventory_text, inventory_color, (x_margin + 8, y_offset)))
     y_offset += 25
     
     # Status de entrega
     if is_delivering:
         items_remaining = len(robot_inventory)
         status_text = f"📦 Entregando... ({items_remaining} itens)"
-        status_surface = font_tiny.render(status_text, True, GREEN)
-        virtual_surface.blit(status_surface, (x_margin + 8, y_offset))
+        layout.append(('text', font_tiny, status_text, GREEN, (x_margin + 8, y_offset)))
         y_offset += 22
     elif is_at_warehouse() and len(robot_inventory) > 0 and not is_delivering:
-        wait_time = (pygame.time.get_ticks() - time_at_warehouse) / 1000.0 if time_at_warehouse > 0 else 0
+        wait_time = (now_ms() - time_at_warehouse) / 1000.0 if time_at_warehouse > 0 else 0
         wait_remaining = max(0, (WAREHOUSE_WAIT_TIME / 1000.0) - wait_time)
         
         status_text = f"⏳ Aguardando... ({wait_remaining:.1f}s)"
-        status_surface = font_tiny.render(status_text, True, (255, 200, 0))
-        virtual_surface.blit(status_surface, (x_margin + 8, y_offset))
+        layout.append(('text', font_tiny, status_text, (255, 200, 0), (x_margin + 8, y_offset)))
         y_offset += 22
     
     # Linha separadora
-    pygame.draw.line(virtual_surface, panel_border_color, (x_margin, y_offset), (PANEL_WIDTH - 15, y_offset), 1)
+    layout.append(('line', y_offset))
     y_offset += 15
     
     # ========== ESTATÍSTICAS ==========
-    stats_label = font_tiny.render("Estatísticas:", True, (200, 200, 200))
-    virtual_surface.blit(stats_label, (x_margin, y_offset))
+    layout.append(('text', font_tiny, "Estatísticas:", (200, 200, 200), (x_margin, y_offset)))
     y_offset += 22
     
     # Itens entregues
     delivered_text = f"✓ Entregues: {items_delivered_count}"
-    delivered_surface = font_tiny.render(delivered_text, True, (150, 255, 150))
-    virtual_surface.blit(delivered_surface, (x_margin + 8, y_offset))
+    layout.append(('text', font_tiny, delivered_text, (150, 255, 150), (x_margin + 8, y_offset)))
     y_offset += 22
     
     # Itens restantes
-    items_remaining = sum(len(items) for items in items_on_grid.values())
+    items_remaining = remaining_item_count()
     remaining_text = f"○ No ambiente: {items_remaining}"
-    remaining_surface = font_tiny.render(remaining_text, True, (255, 255, 150))
-    virtual_surface.blit(remaining_surface, (x_margin + 8, y_offset))
+    layout.append(('text', font_tiny, remaining_text, (255, 255, 150), (x_margin + 8, y_offset)))
     y_offset += 25
     
     # Linha separadora
-    pygame.draw.line(virtual_surface, panel_border_color, (x_margin, y_offset), (PANEL_WIDTH - 15, y_offset), 1)
+    layout.append(('line', y_offset))
     y_offset += 15
     
     # ========== SOM ==========
@@ -2132,63 +2759,104 @@ def draw_side_panel():
     sound_status = "Ligado" if SOUND_ENABLED else "Desligado"
     sound_color = (150, 255, 150) if SOUND_ENABLED else (255, 150, 150)
     sound_text = f"{sound_icon} Som: {sound_status}"
-    sound_surface = font_tiny.render(sound_text, True, sound_color)
-    virtual_surface.blit(sound_surface, (x_margin + 8, y_offset))
+    layout.append(('text', font_tiny, sound_text, sound_color, (x_margin + 8, y_offset)))
     y_offset += 28
     
     # Linha separadora
-    pygame.draw.line(virtual_surface, panel_border_color, (x_margin, y_offset), (PANEL_WIDTH - 15, y_offset), 1)
+    layout.append(('line', y_offset))
     y_offset += 15
     
     # ========== CONTROLES ==========
-    controls_label = font_tiny.render("Controles:", True, (200, 200, 200))
-    virtual_surface.blit(controls_label, (x_margin, y_offset))
+    layout.append(('text', font_tiny, "Controles:", (200, 200, 200), (x_margin, y_offset)))
     y_offset += 22
     
-    controls = [
-        ("Setas", "Mover robô"),
-        ("1/2", "Coletar item"),
-        ("A", "Auto Total"),
-        ("S", "Semi-Auto"),
-        ("R", "Reiniciar"),
-        ("M", "Mute/Som"),
-        ("T", "Testar Sons"),
-    ]
-    
-    for key, desc in controls:
-        key_surface = font_tiny.render(f"{key}:", True, (200, 200, 255))
-        virtual_surface.blit(key_surface, (x_margin + 8, y_offset))
-        
-        desc_surface = font_tiny.render(desc, True, (180, 180, 180))
-        virtual_surface.blit(desc_surface, (x_margin + 65, y_offset))
+    for key, desc in PANEL_CONTROLS:
+        layout.append(('text', font_tiny, f"{key}:", (200, 200, 255), (x_margin + 8, y_offset)))
+        layout.append(('text', font_tiny, desc, (180, 180, 180), (x_margin + 65, y_offset)))
         y_offset += 20
     
     # Total de conteúdo
-    total_content_height = y_offset + 20
+    return layout, y_offset + 20
+
+
+def paint_panel_surface(layout, total_content_height):
+    """Redesenha a superfície virtual persistente do painel a partir dos widgets."""
+    global panel_surface
+    x_margin = 15
+    
+    # Altura extra para conteúdo; a superfície só é recriada quando a janela muda
+    virtual_height = max(HEIGHT + 400, total_content_height)
+    if panel_surface is None or panel_surface.get_size() != (PANEL_WIDTH, virtual_height):
+        panel_surface = pygame.Surface((PANEL_WIDTH, virtual_height), pygame.SRCALPHA)
+    panel_surface.fill((0, 0, 0, 0))  # Transparente
+    
+    for widget in layout:
+        kind = widget[0]
+        if kind == 'text':
+            _, text_font, text, color, pos = widget
+            panel_surface.blit(render_text(text_font, text, color), pos)
+        elif kind == 'text_center':
+            _, text_font, text, color, center = widget
+            surface = render_text(text_font, text, color)
+            panel_surface.blit(surface, surface.get_rect(center=center))
+        elif kind == 'line':
+            y = widget[1]
+            pygame.draw.line(panel_surface, PANEL_BORDER_COLOR, (x_margin, y), (PANEL_WIDTH - 15, y), 1)
+        elif kind == 'bar':
+            _, (bar_x, bar_y, bar_width, bar_height), fill_width, color = widget
+            # Borda e preenchimento da barra
+            pygame.draw.rect(panel_surface, (100, 100, 100), (bar_x, bar_y, bar_width, bar_height), 2)
+            pygame.draw.rect(panel_surface, color, (bar_x + 2, bar_y + 2, fill_width, bar_height - 4))
+
+
+def draw_side_panel(force=True):
+    """
+    Desenha o painel lateral direito com todas as informações do jogo.
+
+    O conteúdo é descrito por build_panel_layout() e pintado numa superfície
+    persistente; textos vêm do cache de render_text. Com force=False o painel
+    só é desenhado na tela se algum widget ou o scroll mudou desde o último
+    frame. Retorna True se desenhou.
+    """
+    global panel_max_scroll, panel_layout
+    
+    panel_x = VIEW_WIDTH
+    panel_y = 0
+    
+    layout, total_content_height = build_panel_layout()
+    state = (layout, panel_scroll_offset, HEIGHT)
+    if state != panel_layout or panel_surface is None:
+        paint_panel_surface(layout, total_content_height)
+    elif not force:
+        return False  # Nada mudou: a tela já mostra este painel
+    panel_layout = state
+    
+    # Desenha fundo do painel
+    pygame.draw.rect(screen, PANEL_BG_COLOR, (panel_x, panel_y, PANEL_WIDTH, HEIGHT))
+    pygame.draw.line(screen, PANEL_BORDER_COLOR, (panel_x, 0), (panel_x, HEIGHT), 3)
     
     # Calcula o máximo de scroll
     panel_max_scroll = max(0, total_content_height - HEIGHT)
     
     # Desenha a parte visível da superfície virtual no painel
     visible_area = pygame.Rect(0, panel_scroll_offset, PANEL_WIDTH, HEIGHT)
-    screen.blit(virtual_surface, (panel_x, panel_y), visible_area)
+    screen.blit(panel_surface, (panel_x, panel_y), visible_area)
     
     # Desenha indicadores de scroll se necessário
     if panel_max_scroll > 0:
         # Seta para cima (se não está no topo)
         if panel_scroll_offset > 0:
-            arrow_up = font_tiny.render("▲", True, (200, 200, 255))
-            screen.blit(arrow_up, (panel_x + PANEL_WIDTH - 25, 5))
+            screen.blit(render_text(font_tiny, "▲", (200, 200, 255)), (panel_x + PANEL_WIDTH - 25, 5))
         
         # Seta para baixo (se não está no final)
         if panel_scroll_offset < panel_max_scroll:
-            arrow_down = font_tiny.render("▼", True, (200, 200, 255))
-            screen.blit(arrow_down, (panel_x + PANEL_WIDTH - 25, HEIGHT - 25))
+            screen.blit(render_text(font_tiny, "▼", (200, 200, 255)), (panel_x + PANEL_WIDTH - 25, HEIGHT - 25))
         
         # Barra de scroll lateral
         scroll_bar_height = max(30, int(HEIGHT * (HEIGHT / total_content_height)))
         scroll_bar_y = int((HEIGHT - scroll_bar_height) * (panel_scroll_offset / panel_max_scroll))
         pygame.draw.rect(screen, (150, 150, 170), (panel_x + PANEL_WIDTH - 8, scroll_bar_y, 6, scroll_bar_height), border_radius=3)
+    return True
 
 
 def draw_battery():
@@ -2211,82 +2879,457 @@ def check_game_state():
     global game_state
     
     # Verifica se todos os itens foram entregues
-    items_remaining = sum(len(items) for items in items_on_grid.values())
+    items_remaining = remaining_item_count()
     total_items_delivered = items_delivered_count + len(robot_inventory)
     
     if items_remaining == 0 and len(robot_inventory) == 0 and total_items_initial > 0:
         # Todos os itens foram coletados e entregues
         if game_state == "playing":
             game_state = "victory"
+            record_event(event_log.EV_GAME_STATE, event_log.GAME_STATES.index(game_state))
             play_sound('victory')
     elif battery <= 0 and (items_remaining > 0 or len(robot_inventory) > 0):
         # Bateria acabou e ainda há itens para entregar
         if game_state == "playing":
             game_state = "game_over"
+            record_event(event_log.EV_GAME_STATE, event_log.GAME_STATES.index(game_state))
             play_sound('gameover')
 
 
 def draw_game_overlay():
-    """Desenha mensagens de vitória ou game over."""
+    """Desenha mensagens de vitória ou game over (fontes e textos em cache)."""
+    global overlay_surface
+    
+    if game_state not in ("victory", "game_over"):
+        return
+    
     # Centro da área do grid (sem incluir o painel lateral)
-    grid_center_x = GRID_WIDTH // 2
+    grid_center_x = VIEW_WIDTH // 2
     grid_center_y = HEIGHT // 2
     
+    # Véu escuro sobre a tela inteira (recriado só se a janela mudar de tamanho)
+    if overlay_surface is None or overlay_surface.get_size() != (WIDTH, HEIGHT):
+        overlay_surface = pygame.Surface((WIDTH, HEIGHT))
+        overlay_surface.set_alpha(200)
+        overlay_surface.fill(BLACK)
+    screen.blit(overlay_surface, (0, 0))
+    
     if game_state == "victory":
-        # Mensagem de vitória
-        overlay = pygame.Surface((WIDTH, HEIGHT))
-        overlay.set_alpha(200)
-        overlay.fill(BLACK)
-        screen.blit(overlay, (0, 0))
-        
-        # Título
-        title_font = pygame.font.Font(None, 72)
-        title_text = title_font.render("PARABÉNS!", True, GREEN)
-        title_rect = title_text.get_rect(center=(grid_center_x, grid_center_y - 60))
-        screen.blit(title_text, title_rect)
-        
-        # Mensagem
-        message_font = pygame.font.Font(None, 48)
-        message_text = message_font.render("Todos os itens foram entregues!", True, WHITE)
-        message_rect = message_text.get_rect(center=(grid_center_x, grid_center_y))
-        screen.blit(message_text, message_rect)
-        
-        # Instrução
-        instruction_font = pygame.font.Font(None, 36)
-        instruction_text = instruction_font.render("Pressione ESPAÇO para jogar novamente", True, (200, 200, 200))
-        instruction_rect = instruction_text.get_rect(center=(grid_center_x, grid_center_y + 60))
-        screen.blit(instruction_text, instruction_rect)
-        
-    elif game_state == "game_over":
-        # Mensagem de game over
-        overlay = pygame.Surface((WIDTH, HEIGHT))
-        overlay.set_alpha(200)
-        overlay.fill(BLACK)
-        screen.blit(overlay, (0, 0))
-        
-        # Título
-        title_font = pygame.font.Font(None, 72)
-        title_text = title_font.render("GAME OVER", True, RED)
-        title_rect = title_text.get_rect(center=(grid_center_x, grid_center_y - 60))
-        screen.blit(title_text, title_rect)
-        
-        # Mensagem
-        message_font = pygame.font.Font(None, 48)
-        message_text = message_font.render("Bateria acabou!", True, WHITE)
-        message_rect = message_text.get_rect(center=(grid_center_x, grid_center_y))
-        screen.blit(message_text, message_rect)
-        
-        # Mensagem adicional
-        items_remaining = sum(len(items) for items in items_on_grid.values()) + len(robot_inventory)
-        additional_text = message_font.render(f"Ainda há {items_remaining} itens para entregar", True, (255, 200, 200))
-        additional_rect = additional_text.get_rect(center=(grid_center_x, grid_center_y + 40))
-        screen.blit(additional_text, additional_rect)
-        
-        # Instrução
-        instruction_font = pygame.font.Font(None, 36)
-        instruction_text = instruction_font.render("Pressione ESPAÇO para tentar novamente", True, (200, 200, 200))
-        instruction_rect = instruction_text.get_rect(center=(grid_center_x, grid_center_y + 100))
-        screen.blit(instruction_text, instruction_rect)
+        lines = [
+            (font_title, "PARABÉNS!", GREEN, -60),  # Título
+            (font_message, "Todos os itens foram entregues!", WHITE, 0),  # Mensagem
+            (font_instruction, "Pressione ESPAÇO para jogar novamente", (200, 200, 200), 60),  # Instrução
+        ]
+    else:
+        items_remaining = remaining_item_count() + len(robot_inventory)
+        lines = [
+            (font_title, "GAME OVER", RED, -60),  # Título
+            (font_message, "Bateria acabou!", WHITE, 0),  # Mensagem
+            (font_message, f"Ainda há {items_remaining} itens para entregar", (255, 200, 200), 40),  # Mensagem adicional
+            (font_instruction, "Pressione ESPAÇO para tentar novamente", (200, 200, 200), 100),  # Instrução
+        ]
+    
+    for text_font, text, color, dy in lines:
+        text_surface = render_text(text_font, text, color)
+        screen.blit(text_surface, text_surface.get_rect(center=(grid_center_x, grid_center_y + dy)))
+
+
+# ==================== RENDERIZAÇÃO POR RETÂNGULOS SUJOS ====================
+
+def build_grid_surface():
+    """Pré-desenha o grid estático (células e bordas) numa superfície do tamanho do grid."""
+    surface = pygame.Surface((GRID_WIDTH, GRID_HEIGHT))
+    if pygame.display.get_surface() is not None:
+        surface = surface.convert()  # Mesmo formato da janela: blit sem conversão
+    surface.fill(BLACK)
+    for row_idx, row in enumerate(world_grid.codes.tolist()):
+        for col_idx, code in enumerate(row):
+            x = col_idx * CELL_SIZE
+            y = row_idx * CELL_SIZE
+
+            # Definir cor baseada no tipo de célula
+            color = CELL_COLORS.get(code, BLACK)  # Preto: caso não identificado
+
+            pygame.draw.rect(surface, color, (x, y, CELL_SIZE - MARGIN, CELL_SIZE - MARGIN))
+            pygame.draw.rect(surface, BLACK, (x, y, CELL_SIZE - MARGIN, CELL_SIZE - MARGIN), 2)  # Borda
+    return surface
+
+
+def get_grid_surface():
+    """Superfície do grid estático, refeita apenas quando map_version muda."""
+    global grid_surface, grid_surface_version
+    if grid_surface is None or grid_surface_version != map_version:
+        grid_surface = build_grid_surface()
+        grid_surface_version = map_version
+        request_full_redraw()
+    return grid_surface
+
+
+def request_full_redraw():
+    """O próximo frame redesenha a tela inteira (mapa novo, itens reiniciados, overlay)."""
+    global full_redraw_pending
+    full_redraw_pending = True
+
+
+def mark_cell_dirty(pos):
+    """Os itens da célula mudaram: a célula é redesenhada no próximo frame."""
+    dirty_cells.add(tuple(pos))
+
+
+def robot_bounds(scale, offset_y=20):
+    """
+    Retângulo ocupado pelo desenho do robô, relativo à sua posição:
+    o sprite em cache mais o contador de itens.
+    """
+    key = (scale, offset_y)
+    bounds = robot_bounds_cache.get(key)
+    if bounds is None:
+        sprite, offset = get_robot_sprite(scale, offset_y)
+        bounds = sprite.get_rect(topleft=offset)
+        # Contador de itens no canto superior direito (círculo de raio 15)
+        bounds = bounds.union(pygame.Rect(CELL_SIZE - 45, -5, 31, 31))
+        robot_bounds_cache[key] = bounds
+    return bounds
+
+
+def robot_screen_rect(scale):
+    """Retângulo do robô na tela, na posição de desenho do frame atual."""
+    return robot_bounds(scale).move(int(robot_draw_pos[0]), int(robot_draw_pos[1]))
+
+
+def draw_items_in_rect(rect):
+    """Desenha apenas os itens das células que tocam 'rect'."""
+    first_col = max(0, rect.left // CELL_SIZE)
+    last_col = min(world_grid.cols - 1, (rect.right - 1) // CELL_SIZE)
+    first_row = max(0, rect.top // CELL_SIZE)
+    last_row = min(world_grid.rows - 1, (rect.bottom - 1) // CELL_SIZE)
+    for y in range(first_row, last_row + 1):
+        for x in range(first_col, last_col + 1):
+            items = items_on_grid.get((x, y))
+            if items:
+                cell_x = x * CELL_SIZE
+                cell_y = y * CELL_SIZE
+                for i, item in enumerate(items):
+                    item_color = ITEM_COLORS[item['type']]
+                    item_x = cell_x + 20 + (i * 25)
+                    item_y = cell_y + 20
+                    pygame.draw.circle(screen, item_color, (item_x, item_y), 8)
+                    pygame.draw.circle(screen, BLACK, (item_x, item_y), 8, 2)
+
+
+def redraw_region(rect, robot_rect, robot_scale):
+    """Restaura o fundo de 'rect' a partir do grid pré-desenhado e redesenha o que o cobre."""
+    screen.set_clip(rect)
+    with frame_profiler.section("draw_grid"):
+        screen.blit(get_grid_surface(), rect, rect)
+    with frame_profiler.section("draw_items"):
+        draw_items_in_rect(rect)
+    if rect.colliderect(robot_rect):
+        with frame_profiler.section("draw_robot"):
+            draw_robot(scale=robot_scale)
+            draw_robot_item_count()
+    if rect.right >= VIEW_WIDTH:
+        # A borda do painel (3px) invade a última coluna do grid
+        pygame.draw.line(screen, PANEL_BORDER_COLOR, (VIEW_WIDTH, 0), (VIEW_WIDTH, HEIGHT), 3)
+    screen.set_clip(None)
+
+
+def render_frame(robot_scale=0.45, alpha=1.0):
+    """
+    Desenha um frame e envia para a janela só o que mudou.
+
+    O grid estático vem de uma superfície pré-desenhada. Num frame comum só
+    as células com itens alterados e as áreas antiga e nova do robô são
+    redesenhadas, e pygame.display.update() recebe apenas esses retângulos
+    e o painel lateral. Mapa novo, itens reiniciados e o overlay de fim de
+    jogo (semitransparente) pedem o redesenho completo com flip().
+
+    'alpha' (0 a 1) é a fração do próximo passo da simulação já decorrida:
+    o robô é desenhado entre a posição do passo anterior e a atual.
+    """
+    global full_redraw_pending, last_robot_rect, last_robot_key, robot_draw_pos, camera_frame_active
+
+    robot_draw_pos = interpolated_robot_pos(alpha)
+    if not camera.is_identity():
+        render_camera_frame(robot_scale)
+        return
+    if camera_frame_active:
+        camera_frame_active = False
+        full_redraw_pending = True  # Voltou ao zoom 1: a tela ainda mostra a vista da câmera
+    grid = get_grid_surface()
+    grid_rect = grid.get_rect()
+    robot_rect = robot_screen_rect(robot_scale)
+    # Chave pela posição sem recorte: na borda o retângulo recortado não muda quando o robô se move
+    robot_key = (robot_rect.topleft, len(robot_inventory),
+                 robot_color_step(battery) if ROBOT_BATTERY_TINT else None)
+    robot_rect = robot_rect.clip(grid_rect)
+
+    if full_redraw_pending or game_state != "playing":
+        with frame_profiler.section("draw_grid"):
+            screen.fill(BLACK)
+            screen.blit(grid, (0, 0))
+        with frame_profiler.section("draw_items"):
+            draw_items_on_grid()
+        with frame_profiler.section("draw_robot"):
+            draw_robot(scale=robot_scale)
+            draw_robot_item_count()
+        with frame_profiler.section("draw_side_panel"):
+            draw_side_panel()
+        with frame_profiler.section("draw_game_overlay"):
+            draw_game_overlay()
+        with frame_profiler.section("display_flip"):
+            pygame.display.flip()
+        # Enquanto o overlay aparece, cada frame é completo (ele escurece o que estiver embaixo)
+        full_redraw_pending = game_state != "playing"
+        dirty_cells.clear()
+        last_robot_rect, last_robot_key = robot_rect, robot_key
+        return
+
+    dirty = [pygame.Rect(x * CELL_SIZE, y * CELL_SIZE, CELL_SIZE, CELL_SIZE).clip(grid_rect)
+             for x, y in dirty_cells]
+    dirty_cells.clear()
+    if robot_key != last_robot_key:
+        dirty.append(last_robot_rect)
+        dirty.append(robot_rect)
+    last_robot_rect, last_robot_key = robot_rect, robot_key
+
+    for rect in dirty:
+        redraw_region(rect, robot_rect, robot_scale)
+
+    with frame_profiler.section("draw_side_panel"):
+        panel_drawn = draw_side_panel(force=False)
+    if panel_drawn:
+        dirty.append(pygame.Rect(VIEW_WIDTH, 0, PANEL_WIDTH, HEIGHT))
+    if dirty:
+        with frame_profiler.section("display_flip"):
+            pygame.display.update(dirty)
+
+
+# ==================== CÂMERA (MAPAS MAIORES QUE A JANELA) ====================
+
+def get_cell_tile(code, cell_px):
+    """Uma célula do grid desenhada com 'cell_px' pixels de lado (margem e borda em escala)."""
+    key = (code, cell_px)
+    tile = cell_tile_cache.get(key)
+    if tile is None:
+        zoom = cell_px / CELL_SIZE
+        size = cell_px - round(MARGIN * zoom)
+        tile = pygame.Surface((cell_px, cell_px))
+        if pygame.display.get_surface() is not None:
+            tile = tile.convert()
+        tile.fill(BLACK)
+        pygame.draw.rect(tile, CELL_COLORS.get(code, BLACK), (0, 0, size, size))
+        pygame.draw.rect(tile, BLACK, (0, 0, size, size), max(1, round(2 * zoom)))  # Borda
+        cell_tile_cache[key] = tile
+    return tile
+
+
+def build_view_background(c0, r0, c1, r1, cell_px):
+    """Células [c0, c1) x [r0, r1) lado a lado, uma cópia de tile por célula."""
+    surface = pygame.Surface(((c1 - c0) * cell_px, (r1 - r0) * cell_px))
+    if pygame.display.get_surface() is not None:
+        surface = surface.convert()
+    surface.fill(BLACK)
+    tiles = {}
+    blits = []
+    for row_offset, row in enumerate(world_grid.codes[r0:r1, c0:c1].tolist()):
+        y = row_offset * cell_px
+        for col_offset, code in enumerate(row):
+            tile = tiles.get(code)
+            if tile is None:
+                tile = tiles[code] = get_cell_tile(code, cell_px)
+            blits.append((tile, (col_offset * cell_px, y)))
+    surface.blits(blits, doreturn=False)
+    return surface
+
+
+def build_lod_background(c0, r0, c1, r1, cell_px, step):
+    """
+    Nível de detalhe para zoom afastado: um pixel de cor por célula (tomando uma
+    célula a cada 'step' quando várias caem no mesmo pixel), com as células com
+    itens na cor do primeiro item, ampliado para cell_px * step pixels por amostra.
+    """
+    rgb = CELL_RGB[world_grid.codes[r0:r1:step, c0:c1:step]]
+    for x, y in get_item_index().cells_in_rect(c0, r0, c1, r1):
+        rgb[(y - r0) // step, (x - c0) // step] = ITEM_COLORS[items_on_grid[(x, y)][0]['type']]
+    surface = pygame.surfarray.make_surface(rgb.transpose(1, 0, 2))
+    sample_px = int(cell_px * step)
+    if sample_px > 1:
+        surface = pygame.transform.scale(surface, (surface.get_width() * sample_px,
+                                                   surface.get_height() * sample_px))
+    return surface
+
+
+def get_view_background():
+    """
+    Fundo da vista com só as células visíveis. Fica em cache até a vista cruzar
+    uma célula, o zoom ou o mapa mudar (e, no LOD, os itens). Retorna
+    (superfície, posição na tela).
+    """
+    global view_background, view_background_key
+    c0, r0, c1, r1 = camera.visible_cells()
+    cell_px = camera.cell_px
+    lod = cell_px < LOD_CELL_PX
+    step = max(1, round(1 / cell_px)) if lod else 1
+    c0 -= c0 % step  # Amostras alinhadas: a imagem não tremula ao rolar
+    r0 -= r0 % step
+    key = (map_version, cell_px, c0, r0, c1, r1, get_item_index().version if lod else None)
+    if key != view_background_key:
+        if lod:
+            view_background = build_lod_background(c0, r0, c1, r1, cell_px, step)
+        else:
+            view_background = build_view_background(c0, r0, c1, r1, cell_px)
+        view_background_key = key
+    ox, oy = camera.origin_px()
+    return view_background, (int(c0 * cell_px) - ox, int(r0 * cell_px) - oy)
+
+
+def draw_visible_items():
+    """Desenha os itens das células visíveis (consulta espacial do índice de itens) na escala da câmera."""
+    c0, r0, c1, r1 = camera.visible_cells()
+    cell_px = camera.cell_px
+    zoom = camera.zoom
+    ox, oy = camera.origin_px()
+    radius = max(2, round(8 * zoom))
+    border = max(1, round(2 * zoom))
+    for x, y in get_item_index().cells_in_rect(c0, r0, c1, r1):
+        cell_x = x * cell_px - ox
+        cell_y = y * cell_px - oy
+        for i, item in enumerate(items_on_grid[(x, y)]):
+            center = (cell_x + round((20 + i * 25) * zoom), cell_y + round(20 * zoom))
+            pygame.draw.circle(screen, ITEM_COLORS[item['type']], center, radius)
+            pygame.draw.circle(screen, BLACK, center, radius, border)
+
+
+def draw_camera_robot(robot_scale):
+    """Robô na escala da câmera; no LOD, um marcador do tamanho de pelo menos alguns pixels."""
+    sx, sy = camera.world_to_screen(robot_draw_pos[0], robot_draw_pos[1])
+    cell_px = camera.cell_px
+    if cell_px < LOD_CELL_PX:
+        center = (int(sx + cell_px / 2), int(sy + cell_px / 2))
+        pygame.draw.circle(screen, ROBOT_BODY_COLOR, center, 4)
+        pygame.draw.circle(screen, BLACK, center, 4, 1)
+        return
+    zoom = camera.zoom
+    draw_robot_at(sx, sy, scale=robot_scale * zoom, offset_y=round(20 * zoom), level=battery)
+    if cell_px >= 40:  # Em zoom menor o contador cobriria a célula inteira
+        draw_robot_item_count(center=(int(sx + (CELL_SIZE - 30) * zoom), int(sy + 10 * zoom)))
+
+
+def render_camera_frame(robot_scale=0.45):
+    """
+    Desenha a vista da câmera: fundo com as células visíveis (em cache), itens
+    visíveis pela consulta espacial e o robô, tudo na escala do zoom. O custo
+    depende do tamanho da vista, não do tamanho do almoxarifado.
+    """
+    global full_redraw_pending, camera_frame_active
+
+    if camera.follow:
+        camera.center_on(robot_draw_pos[0] + CELL_SIZE / 2, robot_draw_pos[1] + CELL_SIZE / 2)
+    full = full_redraw_pending or game_state != "playing" or not camera_frame_active
+    camera_frame_active = True
+    view = pygame.Rect(0, 0, VIEW_WIDTH, VIEW_HEIGHT)
+
+    screen.set_clip(view)
+    with frame_profiler.section("draw_grid"):
+        background, position = get_view_background()
+        screen.fill(BLACK)
+        screen.blit(background, position)
+    if camera.cell_px >= LOD_CELL_PX:  # No LOD os itens já estão no fundo
+        with frame_profiler.section("draw_items"):
+            draw_visible_items()
+    with frame_profiler.section("draw_robot"):
+        draw_camera_robot(robot_scale)
+    screen.set_clip(None)
+    # A borda do painel (3px) invade a última coluna da vista
+    pygame.draw.line(screen, PANEL_BORDER_COLOR, (VIEW_WIDTH, 0), (VIEW_WIDTH, HEIGHT), 3)
+    dirty_cells.clear()
+
+    with frame_profiler.section("draw_side_panel"):
+        panel_drawn = draw_side_panel(force=full)
+    if full:
+        with frame_profiler.section("draw_game_overlay"):
+            draw_game_overlay()
+        with frame_profiler.section("display_flip"):
+            pygame.display.flip()
+        full_redraw_pending = game_state != "playing"
+        return
+    rects = [view]
+    if panel_drawn:
+        rects.append(pygame.Rect(VIEW_WIDTH, 0, PANEL_WIDTH, HEIGHT))
+    with frame_profiler.section("display_flip"):
+        pygame.display.update(rects)
+
+
+def zoom_camera(steps, anchor=None):
+    """Aproxima (steps > 0) ou afasta a câmera; 'anchor' é o ponto da tela que fica parado."""
+    if camera.zoom_by(steps, anchor):
+        log("Zoom: {} px por célula", "CAMERA", camera.cell_px)
+
+
+def toggle_camera_follow():
+    """Liga/desliga a câmera seguindo o robô."""
+    camera.follow = not camera.follow
+    log("Câmera {}", "CAMERA", "seguindo o robô" if camera.follow else "livre")
+
+
+def fit_camera():
+    """Afasta a câmera até o mapa inteiro caber na vista."""
+    camera.follow = False
+    camera.fit_world()
+    log("Zoom: mapa inteiro ({} px por célula)", "CAMERA", camera.cell_px)
+
+
+# ==================== GRAVAÇÃO DE EVENTOS ====================
+
+def start_event_recording(path, seed=None):
+    """
+    Começa a gravar em 'path' os eventos da simulação (log binário do
+    event_log, replay com 'python event_log.py path'). O log começa com o
+    mapa e o estado atual do mundo; 'seed' é a semente usada nos itens.
+    """
+    global event_recorder, recorded_mode
+    stop_event_recording()
+    event_recorder = event_log.EventLogWriter(path, seed=seed, item_types=ITEM_TYPES)
+    recorded_mode = None
+    record_map()
+    record_reset()
+    record_mode_change()
+    log("Gravando eventos em {} (semente: {})", "INIT", path, seed)
+
+
+def stop_event_recording():
+    """Encerra a gravação de eventos (grava o que estiver no buffer)."""
+    global event_recorder
+    if event_recorder is not None:
+        event_recorder.close()
+        log("Log de eventos fechado: {} eventos em {}", "INIT", event_recorder.events, event_recorder.path)
+        event_recorder = None
+
+
+def record_event(kind, *fields):
+    """Grava um evento (tipo do event_log e seus campos) no instante e bateria atuais."""
+    if event_recorder is not None:
+        event_recorder.record(kind, now_ms(), battery, *fields)
+
+
+def record_map():
+    """Grava o mapa inteiro (início da gravação ou load_map)."""
+    event_recorder.record_map(now_ms(), battery, world_grid.rows, world_grid.cols, world_grid.codes.tobytes())
+
+
+def record_reset():
+    """Grava o mundo reiniciado: posição do robô, bateria e itens no ambiente."""
+    if event_recorder is not None:
+        event_recorder.record_reset(now_ms(), battery, robot_grid_pos, items_on_grid)
+
+
+def record_mode_change():
+    """Grava auto_mode se mudou desde o último registro (consultado a cada passo da simulação)."""
+    global recorded_mode
+    if event_recorder is not None and auto_mode != recorded_mode:
+        recorded_mode = auto_mode
+        event_recorder.record(event_log.EV_MODE, now_ms(), battery, auto_mode)
 
 
 def reset_game():
@@ -2298,12 +3341,11 @@ def reset_game():
     global game_state, total_items_initial
     
     # Resetar posição do robô
-    for row_idx, row in enumerate(matriz2):
-        for col_idx, cell in enumerate(row):
-            if cell == 'S':
-                robot_grid_pos = [col_idx, row_idx]
-                robot_real_pos = [col_idx * CELL_SIZE, row_idx * CELL_SIZE]
-                break
+    starts = get_landmark_index().starts
+    if starts:
+        col_idx, row_idx = starts[0]
+        robot_grid_pos = [col_idx, row_idx]
+        robot_real_pos = [col_idx * CELL_SIZE, row_idx * CELL_SIZE]
     
     # Resetar bateria
     battery = 100
@@ -2327,198 +3369,413 @@ def reset_game():
     
     # Resetar estado do jogo
     game_state = "playing"
+    record_reset()
+
+
+def reset_automation_state():
+    """Limpa o estado do modo automático (caminho, ação atual e caches)."""
+    global auto_mode, current_path, current_path_index, current_action
+    global waiting_for_action, just_collected, action_completed, last_action_time
+
+    auto_mode = AUTO_MODE_OFF
+    current_path = []
+    current_path_index = 0
+    current_action = None
+    waiting_for_action = False
+    just_collected = False
+    action_completed = False
+    last_action_time = 0
+    clear_mission_plan()
+    invalidate_battery_cache()
+
+
+def start_full_auto_mode():
+    """Ativa o modo automático total a partir de um estado limpo."""
+    global auto_mode, current_path, current_path_index, current_action, waiting_for_action, last_action_time
+
+    auto_mode = AUTO_MODE_FULL
+    # Limpa estados anteriores
+    current_path = []
+    current_path_index = 0
+    current_action = None
+    waiting_for_action = False
+    last_action_time = 0  # Inicia imediatamente sem delay
+    log("=== MODO AUTOMÁTICO TOTAL ATIVADO (Sequência de ações com delay de 300ms) ===", "MODE")
+    if USE_MISSION_PLANNER:
+        plan_full_mission()
+    play_sound('mode_change')
+
+
+# ==================== LAÇO DE SIMULAÇÃO (PASSO FIXO) ====================
+
+def interpolated_robot_pos(alpha):
+    """Posição de desenho do robô entre o passo anterior e o atual (alpha de 0 a 1)."""
+    x, y = robot_real_pos
+    if robot_prev_pos is None:
+        return [x, y]
+    px, py = robot_prev_pos
+    if abs(x - px) > ANIMATION_SPEED or abs(y - py) > ANIMATION_SPEED:
+        return [x, y]  # Salto (reinício, mapa novo): nada a interpolar
+    return [round(px + (x - px) * alpha), round(py + (y - py) * alpha)]
 
 
-# Inicializar itens aleatoriamente
-initialize_items_randomly()
+def simulation_tick(clock):
+    """
+    Um passo fixo da simulação: lógica do jogo, um passo da animação do robô
+    e SIM_STEP_MS de tempo simulado em 'clock' (o SimClock usado por now_ms()).
+    """
+    global robot_prev_pos
+
+    record_mode_change()  # Teclas A/S e setas mudam o modo entre os passos
 
-# Diagnóstico do mixer de áudio
-log("=" * 60, "SOUND")
-log("DIAGNÓSTICO DO SISTEMA DE ÁUDIO", "SOUND")
-try:
-    mixer_info = pygame.mixer.get_init()
-    if mixer_info:
-        log(f"Mixer inicializado: freq={mixer_info[0]}Hz, size={mixer_info[1]}, channels={mixer_info[2]}", "SOUND")
-        log(f"Canais disponíveis: {pygame.mixer.get_num_channels()}", "SOUND")
-    else:
-        log("AVISO: Mixer não foi inicializado!", "ERROR")
-except Exception as e:
-    log(f"Erro ao verificar mixer: {e}", "ERROR")
-
-# Inicializar sistema de sons
-init_sounds()
-
-# Log do estado inicial
-log("=" * 60, "INIT")
-log("=== SIMULADOR DE ROBÔ - INICIADO ===", "INIT")
-log(f"Posição inicial do robô: ({robot_grid_pos[0]}, {robot_grid_pos[1]})", "INIT")
-log(f"Bateria inicial: {battery}%", "INIT")
-log(f"Capacidade do robô: {ROBOT_CAPACITY} itens", "INIT")
-log(f"Total de itens no ambiente: {total_items_initial}", "INIT")
-# Conta almoxarifados e estações de recarga
-warehouses_count = sum(1 for row in matriz2 for cell in row if cell == 'A')
-recharge_count = sum(1 for row in matriz2 for cell in row if cell == 'R')
-log(f"Almoxarifados disponíveis: {warehouses_count}", "INIT")
-log(f"Estações de recarga disponíveis: {recharge_count}", "INIT")
-log("=" * 60, "INIT")
-
-# Loop principal
-running = True
-clock = pygame.time.Clock()
-
-while running:
-    screen.fill(BLACK)
-
-    # Verifica o estado do jogo
     if game_state == "playing":
-        check_game_state()
-        
+        # Verifica o estado do jogo
+        with frame_profiler.section("check_game_state"):
+            check_game_state()
+
         # Atualiza a recarga automática
-        update_auto_recharge()
-        
+        with frame_profiler.section("update_auto_recharge"):
+            update_auto_recharge()
+
         # Atualiza a entrega automática
-        update_auto_delivery()
-        
+        with frame_profiler.section("update_auto_delivery"):
+            update_auto_delivery()
+
         # Atualiza modo automático
-        update_auto_mode()
-        
-        draw_grid()
-        draw_items_on_grid()  # Desenha itens no grid
-        animate_robot()  # Atualiza a posição do robô suavemente
-        draw_robot(scale=0.45)
-        draw_robot_item_count()  # Mostra quantidade de itens carregados
-        draw_side_panel()  # Desenha painel lateral com todas as informações
-    else:
-        # Desenha o jogo pausado
-        draw_grid()
-        draw_items_on_grid()
-        animate_robot()  # Mantém animação mesmo pausado
-        draw_robot(scale=0.45)
-        draw_robot_item_count()
-        draw_side_panel()  # Desenha painel lateral com todas as informações
-    
-    # Desenha overlay de vitória ou game over
-    draw_game_overlay()
-
-    pygame.display.flip()
-    clock.tick(30)  # Atualiza 30 vezes por segundo
-
-    # Captura de eventos
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
+        with frame_profiler.section("update_auto_mode"):
+            update_auto_mode()
+        record_mode_change()
+
+    # Atualiza a posição do robô suavemente
+    robot_prev_pos = list(robot_real_pos)
+    with frame_profiler.section("animate_robot"):
+        animate_robot()
+    clock.advance(SIM_STEP_MS)
+
+
+def advance_simulation(clock, accumulator_ms, max_ticks=MAX_TICKS_PER_FRAME):
+    """
+    Executa os passos fixos que cabem em 'accumulator_ms' (tempo simulado ainda
+    não executado). Retorna o tempo que sobrou, menor que SIM_STEP_MS.
+    """
+    ticks = 0
+    while accumulator_ms >= SIM_STEP_MS:
+        if ticks >= max_ticks:
+            return 0.0  # Atrasado demais: descarta o resto em vez de acumular atraso
+        simulation_tick(clock)
+        accumulator_ms -= SIM_STEP_MS
+        ticks += 1
+    return accumulator_ms
+
+
+def run_simulation_burst(clock, budget_ms=MAX_SPEED_FRAME_BUDGET_MS):
+    """Velocidade máxima: executa passos até gastar 'budget_ms' de tempo real. Retorna os passos."""
+    deadline = time.perf_counter() + budget_ms / 1000
+    ticks = 0
+    while game_state == "playing" and time.perf_counter() < deadline:
+        for _ in range(16):  # Consulta o relógio a cada poucos passos
+            simulation_tick(clock)
+        ticks += 16
+    return ticks
+
+
+def set_sim_speed(speed):
+    """Muda a velocidade da simulação (um valor de SIM_SPEEDS)."""
+    global sim_speed
+    if speed not in SIM_SPEEDS:
+        raise ValueError(f"velocidade inválida: {speed!r} (use {SIM_SPEEDS})")
+    if speed != sim_speed:
+        sim_speed = speed
+        log("Velocidade da simulação: {}", "MODE", sim_speed_label())
+
+
+def sim_speed_label(speed=None):
+    """Texto da velocidade para o painel: '1×', '16×' ou 'MÁX'."""
+    speed = sim_speed if speed is None else speed
+    return "MÁX" if speed is None else f"{speed}×"
+
+
+def toggle_profiler_overlay():
+    """Mostra/esconde os percentis por etapa no painel (a medição só roda se visível ou gravando CSV)."""
+    global profiler_visible, profiler_snapshot, profiler_snapshot_time
+    profiler_visible = not profiler_visible
+    frame_profiler.enable(profiler_visible or frame_profiler.csv_path is not None)
+    profiler_snapshot = []
+    profiler_snapshot_time = time.perf_counter()
+    log("Perfil do quadro {}", "MODE", "visível" if profiler_visible else "oculto")
+
+
+def refresh_profiler_snapshot():
+    """Atualiza os números do painel a cada PROFILER_REFRESH_MS (o painel só repinta quando mudam)."""
+    global profiler_snapshot, profiler_snapshot_time, path_cache_snapshot
+    if not profiler_visible:
+        return
+    now = time.perf_counter()
+    if (now - profiler_snapshot_time) * 1000 >= PROFILER_REFRESH_MS:
+        profiler_snapshot = frame_profiler.summary()
+        path_cache_snapshot = path_cache.stats()
+        profiler_snapshot_time = now
+
+
+def start_profiler_csv(path):
+    """Grava o tempo de cada etapa, quadro a quadro, em 'path' (CSV)."""
+    frame_profiler.open_csv(path)
+    frame_profiler.enable()
+    log("Perfil do quadro gravado em {}", "INIT", path)
+
+
+def stop_profiler_csv():
+    """Fecha o CSV do perfil; a medição continua só se o painel estiver mostrando."""
+    frame_profiler.close_csv()
+    frame_profiler.enable(profiler_visible)
+
+
+def main(seed=None, event_log_path=None, profile_csv_path=None):
+    """
+    Executa o simulador interativo (janela, sons e loop principal).
+    'seed' fixa a distribuição de itens (sorteada se None); com 'event_log_path'
+    os eventos da execução são gravados para replay (event_log.py) e com
+    'profile_csv_path' o tempo de cada etapa de cada quadro vai para um CSV.
+    """
+    global panel_scroll_offset, auto_mode, current_path, current_path_index, current_action, waiting_for_action
+    global mission_plan_time_budget_ms
+
+    init_display()
+    mission_plan_time_budget_ms = MISSION_PLAN_TIME_BUDGET_MS  # A janela não pode travar no planejamento
+
+    # Inicializar itens aleatoriamente (semente registrada para reproduzir a execução)
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    random.seed(seed)
+    log("Semente dos itens: {}", "INIT", seed)
+    initialize_items_randomly()
+
+    # Diagnóstico do mixer de áudio
+    log("=" * 60, "SOUND")
+    log("DIAGNÓSTICO DO SISTEMA DE ÁUDIO", "SOUND")
+    try:
+        mixer_info = pygame.mixer.get_init()
+        if mixer_info:
+            log("Mixer inicializado: freq={}Hz, size={}, channels={}", "SOUND", mixer_info[0], mixer_info[1], mixer_info[2])
+            log("Canais disponíveis: {}", "SOUND", pygame.mixer.get_num_channels())
+        else:
+            log("AVISO: Mixer não foi inicializado!", "ERROR")
+    except Exception as e:
+        log("Erro ao verificar mixer: {}", "ERROR", e)
+
+    # Inicializar sistema de sons
+    init_sounds()
+
+    # Log do estado inicial
+    log("=" * 60, "INIT")
+    log("=== SIMULADOR DE ROBÔ - INICIADO ===", "INIT")
+    log("Posição inicial do robô: ({}, {})", "INIT", robot_grid_pos[0], robot_grid_pos[1])
+    log("Bateria inicial: {}%", "INIT", battery)
+    log("Capacidade do robô: {} itens", "INIT", ROBOT_CAPACITY)
+    log("Total de itens no ambiente: {}", "INIT", total_items_initial)
+    # Conta almoxarifados e estações de recarga
+    warehouses_count = world_grid.count(CELL_WAREHOUSE)
+    recharge_count = world_grid.count(CELL_RECHARGE)
+    log("Almoxarifados disponíveis: {}", "INIT", warehouses_count)
+    log("Estações de recarga disponíveis: {}", "INIT", recharge_count)
+    log("=" * 60, "INIT")
+
+    # Teclas de velocidade: F1 = 1×, F2 = 4×, F3 = 16×, F4 = máxima
+    SPEED_KEYS = dict(zip((pygame.K_F1, pygame.K_F2, pygame.K_F3, pygame.K_F4), SIM_SPEEDS))
+
+    # Loop principal: a simulação anda em passos fixos de SIM_STEP_MS de tempo simulado
+    # (relógio próprio, independente do FPS) e o desenho interpola entre os passos
+    running = True
+    clock = pygame.time.Clock()
+    sim_clock = SimClock()
+    set_time_source(sim_clock)
+    accumulator_ms = 0.0
+    if event_log_path:
+        start_event_recording(event_log_path, seed=seed)
+    if profile_csv_path:
+        start_profiler_csv(profile_csv_path)
+
+    while running:
+        frame_ms = clock.tick(RENDER_FPS)  # Tempo real desde o último frame
+        frame_profiler.begin_frame()
+        if sim_speed is None:
+            # Velocidade máxima: passos até esgotar o orçamento do frame, depois um único desenho
+            run_simulation_burst(sim_clock)
+            accumulator_ms = 0.0
+        else:
+            # N×: N vezes mais tempo simulado por frame; os frames intermediários não são desenhados
+            accumulator_ms = advance_simulation(sim_clock, accumulator_ms + min(frame_ms, MAX_FRAME_MS) * sim_speed,
+                                                max_ticks=MAX_TICKS_PER_FRAME * sim_speed)
+
+        # Grid, itens, robô, painel e overlay de vitória/game over (só as regiões que mudaram)
+        render_frame(robot_scale=0.45, alpha=accumulator_ms / SIM_STEP_MS)
+
+        # Captura de eventos
+        with frame_profiler.section("events"):
+            events = pygame.event.get()
+        for event in events:
+            if event.type == pygame.QUIT:
+                running = False
         
-        elif event.type == pygame.MOUSEWHEEL:
-            # Scroll do painel lateral
-            scroll_amount = -event.y * 25  # Inverte e multiplica para suavizar
-            panel_scroll_offset = max(0, min(panel_max_scroll, panel_scroll_offset + scroll_amount))
-
-        elif event.type == pygame.KEYDOWN:
-            if game_state == "playing":
-                # Controles de modo automático
-                if event.key == pygame.K_a:
-                    # Alterna modo automático total
-                    if auto_mode == AUTO_MODE_OFF:
-                        auto_mode = AUTO_MODE_FULL
-                        # Limpa estados anteriores
-                        current_path = []
-                        current_path_index = 0
-                        current_action = None
-                        waiting_for_action = False
-                        last_action_time = 0  # Inicia imediatamente sem delay
-                        log("=== MODO AUTOMÁTICO TOTAL ATIVADO (Sequência de ações com delay de 300ms) ===", "MODE")
-                        play_sound('mode_change')
-                    else:
-                        auto_mode = AUTO_MODE_OFF
-                        current_path = []
-                        current_action = None
-                        log("Modo automático DESATIVADO (voltou para MANUAL)", "MODE")
-                        play_sound('mode_change')
+            elif event.type == pygame.MOUSEWHEEL:
+                mouse_pos = pygame.mouse.get_pos()
+                if mouse_pos[0] < VIEW_WIDTH:
+                    # Roda sobre o grid: zoom da câmera em torno do cursor
+                    zoom_camera(event.y, anchor=mouse_pos)
+                else:
+                    # Scroll do painel lateral
+                    scroll_amount = -event.y * 25  # Inverte e multiplica para suavizar
+                    panel_scroll_offset = max(0, min(panel_max_scroll, panel_scroll_offset + scroll_amount))
+
+            elif event.type == pygame.MOUSEMOTION:
+                # Arrastar com o botão esquerdo sobre o grid move a câmera (e para de seguir o robô)
+                if event.buttons[0] and event.pos[0] < VIEW_WIDTH:
+                    camera.follow = False
+                    camera.pan(-event.rel[0], -event.rel[1])
+
+            elif event.type == pygame.KEYDOWN:
+                if game_state == "playing":
+                    # Controles de modo automático
+                    if event.key == pygame.K_a:
+                        # Alterna modo automático total
+                        if auto_mode == AUTO_MODE_OFF:
+                            start_full_auto_mode()
+                        else:
+                            auto_mode = AUTO_MODE_OFF
+                            current_path = []
+                            current_action = None
+                            log("Modo automático DESATIVADO (voltou para MANUAL)", "MODE")
+                            play_sound('mode_change')
                 
-                elif event.key == pygame.K_s:
-                    # Ativa modo semi-automático (sempre ativa, nunca desativa)
-                    # O modo se desativa automaticamente após completar uma ação
-                    if auto_mode == AUTO_MODE_OFF:
-                        auto_mode = AUTO_MODE_SEMI
-                        # Limpa resíduos de execuções anteriores
-                        current_path = []
-                        current_path_index = 0
-                        current_action = None
-                        waiting_for_action = False
-                        log("=== MODO SEMI-AUTOMÁTICO ATIVADO ===", "MODE")
-                        play_sound('mode_change')
-                    elif auto_mode == AUTO_MODE_SEMI:
-                        # Se já está em modo semi-automático, ignora
-                        log("Modo semi-automático já está ativo. Aguarde a conclusão da ação atual.", "MODE")
-                    else:
-                        # Se está em modo automático total, avisa que não pode ativar semi-automático
-                        log("Não é possível ativar modo semi-automático enquanto modo automático total está ativo.", "MODE")
+                    elif event.key == pygame.K_s:
+                        # Ativa modo semi-automático (sempre ativa, nunca desativa)
+                        # O modo se desativa automaticamente após completar uma ação
+                        if auto_mode == AUTO_MODE_OFF:
+                            auto_mode = AUTO_MODE_SEMI
+                            # Limpa resíduos de execuções anteriores
+                            current_path = []
+                            current_path_index = 0
+                            current_action = None
+                            waiting_for_action = False
+                            log("=== MODO SEMI-AUTOMÁTICO ATIVADO ===", "MODE")
+                            play_sound('mode_change')
+                        elif auto_mode == AUTO_MODE_SEMI:
+                            # Se já está em modo semi-automático, ignora
+                            log("Modo semi-automático já está ativo. Aguarde a conclusão da ação atual.", "MODE")
+                        else:
+                            # Se está em modo automático total, avisa que não pode ativar semi-automático
+                            log("Não é possível ativar modo semi-automático enquanto modo automático total está ativo.", "MODE")
                 
-                # Controles normais (interrompem modo automático se usado)
-                elif event.key == pygame.K_RIGHT:
-                    if auto_mode != AUTO_MODE_OFF:
-                        log("Modo automático interrompido por movimento manual", "MODE")
-                        auto_mode = AUTO_MODE_OFF
-                        current_path = []
-                        current_action = None
-                    move_robot('mr')
-                elif event.key == pygame.K_LEFT:
-                    if auto_mode != AUTO_MODE_OFF:
-                        log("Modo automático interrompido por movimento manual", "MODE")
-                        auto_mode = AUTO_MODE_OFF
-                        current_path = []
-                        current_action = None
-                    move_robot('ml')
-                elif event.key == pygame.K_UP:
-                    if auto_mode != AUTO_MODE_OFF:
-                        log("Modo automático interrompido por movimento manual", "MODE")
-                        auto_mode = AUTO_MODE_OFF
-                        current_path = []
-                        current_action = None
-                    move_robot('mu')
-                elif event.key == pygame.K_DOWN:
-                    if auto_mode != AUTO_MODE_OFF:
-                        log("Modo automático interrompido por movimento manual", "MODE")
-                        auto_mode = AUTO_MODE_OFF
-                        current_path = []
-                        current_action = None
-                    move_robot('md')
-                elif event.key == pygame.K_1:
-                    if auto_mode != AUTO_MODE_OFF:
-                        log("Modo automático interrompido por coleta manual", "MODE")
-                        auto_mode = AUTO_MODE_OFF
-                        current_path = []
-                        current_action = None
-                    # Coleta o primeiro item (índice 1)
-                    collect_item(1)
-                elif event.key == pygame.K_2:
-                    if auto_mode != AUTO_MODE_OFF:
-                        log("Modo automático interrompido por coleta manual", "MODE")
-                        auto_mode = AUTO_MODE_OFF
-                        current_path = []
-                        current_action = None
-                    # Coleta o segundo item (índice 2)
-                    collect_item(2)
+                    # Controles normais (interrompem modo automático se usado)
+                    elif event.key == pygame.K_RIGHT:
+                        if auto_mode != AUTO_MODE_OFF:
+                            log("Modo automático interrompido por movimento manual", "MODE")
+                            auto_mode = AUTO_MODE_OFF
+                            current_path = []
+                            current_action = None
+                        move_robot('mr')
+                    elif event.key == pygame.K_LEFT:
+                        if auto_mode != AUTO_MODE_OFF:
+                            log("Modo automático interrompido por movimento manual", "MODE")
+                            auto_mode = AUTO_MODE_OFF
+                            current_path = []
+                            current_action = None
+                        move_robot('ml')
+                    elif event.key == pygame.K_UP:
+                        if auto_mode != AUTO_MODE_OFF:
+                            log("Modo automático interrompido por movimento manual", "MODE")
+                            auto_mode = AUTO_MODE_OFF
+                            current_path = []
+                            current_action = None
+                        move_robot('mu')
+                    elif event.key == pygame.K_DOWN:
+                        if auto_mode != AUTO_MODE_OFF:
+                            log("Modo automático interrompido por movimento manual", "MODE")
+                            auto_mode = AUTO_MODE_OFF
+                            current_path = []
+                            current_action = None
+                        move_robot('md')
+                    elif event.key == pygame.K_1:
+                        if auto_mode != AUTO_MODE_OFF:
+                            log("Modo automático interrompido por coleta manual", "MODE")
+                            auto_mode = AUTO_MODE_OFF
+                            current_path = []
+                            current_action = None
+                        # Coleta o primeiro item (índice 1)
+                        collect_item(1)
+                    elif event.key == pygame.K_2:
+                        if auto_mode != AUTO_MODE_OFF:
+                            log("Modo automático interrompido por coleta manual", "MODE")
+                            auto_mode = AUTO_MODE_OFF
+                            current_path = []
+                            current_action = None
+                        # Coleta o segundo item (índice 2)
+                        collect_item(2)
                 
-                elif event.key == pygame.K_m:
-                    # Toggle de som
-                    toggle_sound()
+                    elif event.key == pygame.K_m:
+                        # Toggle de som
+                        toggle_sound()
                 
-                elif event.key == pygame.K_t:
-                    # Testa todos os sons (apenas se som estiver habilitado)
-                    if SOUND_ENABLED:
-                        log("========== TESTANDO TODOS OS SONS ==========", "SOUND")
-                        test_sounds = ['move', 'collect', 'deliver', 'recharge_start', 
-                                      'recharge_complete', 'mode_change', 'victory', 'gameover']
-                        for i, sound_name in enumerate(test_sounds):
-                            log(f"Teste {i+1}/{len(test_sounds)}: {sound_name}", "SOUND")
-                            play_sound(sound_name, debug=True)
-                            pygame.time.wait(400)  # Espera 400ms entre sons
-                        log("========== TESTE COMPLETO ==========", "SOUND")
-                    else:
-                        log("Som está desabilitado. Pressione M para habilitar.", "SOUND")
-            elif event.key == pygame.K_SPACE:
-                # Reinicia o jogo quando em vitória ou game over
-                reset_game()
-
-pygame.quit()
\ No newline at end of file
+                    elif event.key == pygame.K_t:
+                        # Testa todos os sons (apenas se som estiver habilitado)
+                        if SOUND_ENABLED:
+                            log("========== TESTANDO TODOS OS SONS ==========", "SOUND")
+                            test_sounds = ['move', 'collect', 'deliver', 'recharge_start', 
+                                          'recharge_complete', 'mode_change', 'victory', 'gameover']
+                            for i, sound_name in enumerate(test_sounds):
+                                log("Teste {}/{}: {}", "SOUND", i+1, len(test_sounds), sound_name)
+                                play_sound(sound_name, debug=True)
+                                pygame.time.wait(400)  # Espera 400ms entre sons
+                            log("========== TESTE COMPLETO ==========", "SOUND")
+                        else:
+                            log("Som está desabilitado. Pressione M para habilitar.", "SOUND")
+                elif event.key == pygame.K_SPACE:
+                    # Reinicia o jogo quando em vitória ou game over
+                    reset_game()
+
+                # Velocidade da simulação (em qualquer estado do jogo)
+                if event.key in SPEED_KEYS:
+                    set_sim_speed(SPEED_KEYS[event.key])
+                elif event.key == pygame.K_p:
+                    toggle_profiler_overlay()
+
+                # Câmera: zoom, seguir o robô, mapa inteiro
+                elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                    zoom_camera(1)
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    zoom_camera(-1)
+                elif event.key == pygame.K_c:
+                    toggle_camera_follow()
+                elif event.key == pygame.K_f:
+                    fit_camera()
+
+        frame_profiler.end_frame()
+        refresh_profiler_snapshot()
+
+    stop_event_recording()
+    stop_profiler_csv()
+    shutdown_logging()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulador de robô de almoxarifado")
+    parser.add_argument('--seed', type=int, default=None, help="semente da distribuição de itens")
+    parser.add_argument('--map', metavar='ARQUIVO', default=None,
+                        help="mapa em texto, CSV ou binário .srmap (padrão: matriz2)")
+    parser.add_argument('--record', metavar='ARQUIVO', default=None,
+                        help="grava o log de eventos da execução (replay: python event_log.py ARQUIVO)")
+    parser.add_argument('--log-level', default=LOG_LEVEL, choices=["DEBUG", "INFO", "ERROR"],
+                        help="nível mínimo dos logs no terminal")
+    parser.add_argument('--log-json', metavar='ARQUIVO', default=LOG_JSON_PATH,
+                        help="também grava os logs em JSON Lines (um registro por linha)")
+    parser.add_argument('--profile-csv', metavar='ARQUIVO', default=None,
+                        help="grava o tempo de cada etapa de cada quadro em CSV")
+    parser.add_argument('--path-search', default=PATH_SEARCH, choices=sorted(PATH_SEARCH_FUNCTIONS),
+                        help="busca de caminho nos mapas pequenos (a_star ou jps)")
+    args = parser.parse_args()
+    configure_logging(level=args.log_level, json_path=args.log_json)
+    PATH_SEARCH = args.path_search
+    if args.map:
+        load_map(map_loader.load_map_file(args.map))
+    main(seed=args.seed, event_log_path=args.record, profile_csv_path=args.profile_csv)
@@ -0,0 +1,409 @@
+"""
+Benchmark de escalabilidade do planejador do SimRobot.
+
+Gera ambientes de almoxarifado com semente fixa, de 10x10 até 2000x2000,
+com densidade de obstáculos, densidade de itens e quantidade de
+almoxarifados/estações configuráveis, e mede o tempo de:
+
+- a_star (do início até o item mais distante);
+- hpa_star: o mesmo caminho pelo planejador hierárquico (hpa_planner.py);
+- jps: o mesmo caminho por Jump Point Search (jps_planner.py), com os nós
+  expandidos por ela e pelo a_star (use --obstacle-density 0 para piso aberto);
+- find_nearest (item mais próximo a partir do início);
+- calculate_needed_battery (sem o cache de 1 segundo);
+- decide_next_action_intelligent (no modo automático total, que é o laço de decisão),
+  sem e com o cache de rotas (path_cache);
+- plan_full_mission.
+
+Por padrão os itens seguem a densidade do jogo (40% das células livres,
+como em initialize_items_randomly), com no máximo 50 células com itens:
+sem o teto, os mapas grandes geram milhões de marcos e paradas e a
+medição não chega aos tamanhos maiores (--max-items 0 tira o teto).
+
+Também mede a preparação de cada mapa (conversão do grid, grafo de navegação,
+oráculo de distâncias e fronteiras do HPA*), que só acontece quando o mapa
+muda. O resultado é um JSON que diz, para cada tamanho, se o laço de decisão
+cabe num frame de 33 ms, e pode ser comparado com um resultado anterior para
+acusar regressões.
+
+Uso:
+
+    python benchmark.py                                  # tamanhos padrão, JSON na saída padrão
+    python benchmark.py --sizes 10 100 500 --output atual.json
+    python benchmark.py --baseline anterior.json         # código de saída 1 se houver regressão
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+
+import Simrobot as sim
+from distance_oracle import bfs_distances
+from jps_planner import jump_point_search
+from sim_clock import SimClock
+from warehouse_grid import (WarehouseGrid, CELL_OBSTACLE, CELL_FREE, CELL_START,
+                            CELL_RECHARGE, CELL_WAREHOUSE)
+
+# Orçamento de um frame a 30 FPS
+FRAME_BUDGET_MS = 1000 / 30
+
+DEFAULT_SIZES = [10, 25, 50, 100, 250, 500, 1000, 2000]
+DEFAULT_OBSTACLE_DENSITY = 0.2
+# Fração das células livres com itens: a mesma chance de initialize_items_randomly
+DEFAULT_ITEM_DENSITY = 0.4
+# Teto de células com itens: cada uma é um marco do oráculo e uma parada do
+# planejador de missão, e sem teto os mapas grandes não terminam
+DEFAULT_MAX_ITEMS = 50
+DEFAULT_WAREHOUSES = 2
+DEFAULT_STATIONS = 2
+
+DEFAULT_REPEAT = 5
+MAX_TOTAL_MS_PER_OPERATION = 2000  # Para de repetir uma medição depois disso
+DEFAULT_STOP_MS = 30000            # Uma chamada acima disso encerra os tamanhos maiores
+
+# Abaixo disso a diferença entre execuções é ruído, não regressão
+REGRESSION_NOISE_FLOOR_MS = 1.0
+DEFAULT_TOLERANCE = 1.5
+
+# Tentativas de sortear uma posição inicial dentro de uma região grande
+START_ATTEMPTS = 10
+
+
+# ==================== GERAÇÃO DE AMBIENTES ====================
+
+def generate_layout(rows, cols, seed=0, obstacle_density=DEFAULT_OBSTACLE_DENSITY,
+                    item_density=DEFAULT_ITEM_DENSITY, max_items=DEFAULT_MAX_ITEMS,
+                    warehouses=DEFAULT_WAREHOUSES, stations=DEFAULT_STATIONS):
+    """
+    Gera um ambiente aleatório reprodutível.
+    Células livres fora da região alcançável a partir do 'S' viram obstáculo,
+    para que todo item, almoxarifado e estação tenha caminho (o planejador não
+    trata alvos inalcançáveis). Retorna (grid, items_on_grid).
+    """
+    rng = np.random.default_rng(seed)
+    codes = np.where(rng.random((rows, cols)) < obstacle_density, CELL_OBSTACLE, CELL_FREE).astype(np.uint8)
+
+    free = np.flatnonzero(codes.ravel() == CELL_FREE)
+    if len(free) == 0:
+        free = np.array([0])
+        codes.flat[0] = CELL_FREE
+
+    # Escolhe o início dentro de uma região que cubra ao menos metade das células livres
+    walkable = (codes == CELL_FREE).astype(np.uint8).tobytes()
+    best_start, best_field, best_size = None, None, -1
+    for _ in range(START_ATTEMPTS):
+        start = int(free[rng.integers(len(free))])
+        field = bfs_distances(walkable, rows, cols, start)
+        size = int(np.count_nonzero(field >= 0))
+        if size > best_size:
+            best_start, best_field, best_size = start, field, size
+        if size * 2 >= len(free):
+            break
+
+    codes.flat[best_field < 0] = CELL_OBSTACLE
+    codes.flat[best_start] = CELL_START
+
+    candidates = np.flatnonzero(codes.ravel() == CELL_FREE)
+    n_items = max(1, round(item_density * len(candidates)))
+    if max_items is not None:
+        n_items = min(max_items, n_items)
+    wanted = min(len(candidates), warehouses + stations + n_items)
+    chosen = rng.choice(candidates, size=wanted, replace=False)
+
+    warehouse_cells = chosen[:warehouses]
+    station_cells = chosen[warehouses:warehouses + stations]
+    item_cells = chosen[warehouses + stations:]
+    codes.flat[warehouse_cells] = CELL_WAREHOUSE
+    codes.flat[station_cells] = CELL_RECHARGE
+
+    items_on_grid = {}
+    for cell in item_cells.tolist():
+        count = int(rng.integers(1, sim.MAX_ITEMS_PER_CELL + 1))
+        items_on_grid[(cell % cols, cell // cols)] = [
+            {'type': sim.ITEM_TYPES[int(rng.integers(len(sim.ITEM_TYPES)))]} for _ in range(count)
+        ]
+
+    return WarehouseGrid(codes), items_on_grid
+
+
+def prepare_world(grid, items_on_grid):
+    """Carrega o ambiente no Simrobot com o robô no início, bateria cheia e modo automático total."""
+    sim.showLogs = False
+    sim.SOUND_ENABLED = False
+    sim.set_time_source(SimClock())
+
+    sim.load_map(grid)  # O grid direto: sem converter milhões de células em strings
+
+    start = sim.world_grid.positions(CELL_START)[0]
+    sim.robot_grid_pos = list(start)
+    sim.robot_real_pos = [start[0] * sim.CELL_SIZE, start[1] * sim.CELL_SIZE]
+    sim.last_position = list(start)
+    sim.battery = 100
+    sim.robot_inventory = []
+    sim.items_on_grid = {pos: list(items) for pos, items in items_on_grid.items()}
+    sim.total_items_initial = sum(len(items) for items in items_on_grid.values())
+    sim.items_delivered_count = 0
+    sim.game_state = "playing"
+    sim.invalidate_distance_oracle()
+    sim.reset_automation_state()
+    sim.auto_mode = sim.AUTO_MODE_FULL
+    # plan_full_mission medido como na interface, com o prazo em tempo real
+    sim.mission_plan_time_budget_ms = sim.MISSION_PLAN_TIME_BUDGET_MS
+
+
+# ==================== MEDIÇÃO ====================
+
+def time_call(fn, repeat=DEFAULT_REPEAT, max_total_ms=MAX_TOTAL_MS_PER_OPERATION):
+    """
+    Executa fn até 'repeat' vezes (ao menos uma; para antes se passar de max_total_ms).
+    Retorna (estatísticas em ms, resultado da última chamada).
+    """
+    samples = []
+    result = None
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+        if sum(samples) >= max_total_ms:
+            break
+    stats = {
+        'runs': len(samples),
+        'min_ms': round(min(samples), 4),
+        'median_ms': round(statistics.median(samples), 4),
+        'max_ms': round(max(samples), 4),
+    }
+    return stats, result
+
+
+def _uncached_needed_battery():
+    sim.invalidate_battery_cache()
+    sim.path_cache.invalidate()
+    return sim.calculate_needed_battery()
+
+
+def _uncached_decision():
+    sim.invalidate_battery_cache()
+    sim.path_cache.invalidate()
+    return sim.decide_next_action_intelligent()
+
+
+def _cached_decision():
+    # Custos e caminhos repetidos vêm do path_cache, como no laço do modo automático
+    sim.invalidate_battery_cache()
+    return sim.decide_next_action_intelligent()
+
+
+def benchmark_size(rows, cols, seed=0, repeat=DEFAULT_REPEAT, **layout_options):
+    """Gera um ambiente rows x cols e mede preparação e operações do planejador."""
+    t0 = time.perf_counter()
+    grid, items_on_grid = generate_layout(rows, cols, seed=seed, **layout_options)
+    generation_ms = (time.perf_counter() - t0) * 1000
+
+    # Preparação: roda uma vez por mapa (o grafo e o oráculo ficam em cache por versão)
+    setup = {}
+    setup['load_map'], _ = time_call(lambda: prepare_world(grid, items_on_grid), repeat=1)
+    setup['navigation_graph'], graph = time_call(sim.get_navigation_graph, repeat=1)
+    setup['distance_oracle'], _ = time_call(sim.get_distance_oracle, repeat=1)
+    setup['hierarchical_planner'], planner = time_call(sim.get_hierarchical_planner, repeat=1)
+    # O oráculo calcula os campos de distância na primeira consulta: a primeira
+    # decisão do mapa paga essas BFS
+    setup['first_decision'], _ = time_call(_uncached_decision, repeat=1)
+
+    start = tuple(sim.robot_grid_pos)
+    items = list(sim.items_on_grid.keys())
+    # Alvo do A*: o item mais distante do início (pior caso entre os marcos)
+    far_goal = max(items, key=lambda pos: sim.heuristic_manhattan(start, pos))
+
+    operations = {}
+    operations['a_star'], path = time_call(lambda: sim.a_star(graph, start, far_goal), repeat)
+    operations['hpa_star'], hpa_path = time_call(lambda: planner.find_path(start, far_goal), repeat)
+    operations['jps'], jps_path = time_call(lambda: jump_point_search(graph, start, far_goal), repeat)
+    a_star_stats = {}
+    jps_stats = {}
+    sim.a_star(graph, start, far_goal, stats=a_star_stats)
+    jump_point_search(graph, start, far_goal, stats=jps_stats)
+    operations['find_nearest'], _ = time_call(lambda: sim.find_nearest(start, items), repeat)
+    operations['calculate_needed_battery'], _ = time_call(_uncached_needed_battery, repeat)
+    operations['decide_next_action_intelligent'], decision = time_call(_uncached_decision, repeat)
+    operations['decide_next_action_cached'], _ = time_call(_cached_decision, repeat)
+    operations['plan_full_mission'], plan = time_call(sim.plan_full_mission, repeat)
+
+    decision_ms = operations['decide_next_action_intelligent']['median_ms']
+    # Primeira decisão após uma mudança de mapa paga também a reconstrução do oráculo
+    cold_decision_ms = setup['distance_oracle']['median_ms'] + setup['first_decision']['median_ms']
+    return {
+        'size': f"{rows}x{cols}",
+        'rows': rows,
+        'cols': cols,
+        'seed': seed,
+        'cells': rows * cols,
+        'walkable_cells': int(np.count_nonzero(grid.walkable)),
+        'item_cells': len(items),
+        'warehouses': grid.count(CELL_WAREHOUSE),
+        'stations': grid.count(CELL_RECHARGE),
+        'landmarks': len(sim.get_distance_oracle().landmarks),
+        'generation_ms': round(generation_ms, 2),
+        'setup': setup,
+        'operations': operations,
+        'a_star_path_length': len(path),
+        'hpa_star_path_length': len(hpa_path),
+        'jps_path_length': len(jps_path),
+        'search_expansions': {
+            'a_star': a_star_stats['expanded'],
+            'jps': jps_stats['expanded'],
+            'jps_scanned_cells': jps_stats['scanned'],
+        },
+        'decision': decision[0] if decision else None,
+        'plan_actions': len(plan),
+        'decision_loop_ms': decision_ms,
+        'fits_frame': decision_ms <= FRAME_BUDGET_MS,
+        'cold_decision_ms': round(cold_decision_ms, 4),
+        'cold_fits_frame': cold_decision_ms <= FRAME_BUDGET_MS,
+    }
+
+
+def slowest_call_ms(result):
+    """Maior tempo de uma única chamada entre todas as medições de um tamanho."""
+    timings = list(result['setup'].values()) + list(result['operations'].values())
+    return max(t['max_ms'] for t in timings)
+
+
+def run_benchmark(sizes=DEFAULT_SIZES, seed=0, repeat=DEFAULT_REPEAT, stop_ms=DEFAULT_STOP_MS,
+                  progress=None, **layout_options):
+    """
+    Mede todos os tamanhos em ordem crescente. Quando uma única chamada passa
+    de stop_ms, os tamanhos maiores são pulados (e registrados como pulados).
+    """
+    results = []
+    skipped = []
+    stop_reason = None
+    for size in sorted(sizes):
+        if stop_reason:
+            skipped.append({'size': f"{size}x{size}", 'reason': stop_reason})
+            continue
+
+        result = benchmark_size(size, size, seed=seed, repeat=repeat, **layout_options)
+        results.append(result)
+        if progress:
+            progress(result)
+
+        slowest = slowest_call_ms(result)
+        if slowest > stop_ms:
+            stop_reason = f"{result['size']} teve uma chamada de {slowest:.0f} ms (limite {stop_ms} ms)"
+
+    within = [r['size'] for r in results if r['fits_frame']]
+    over = [r['size'] for r in results if not r['fits_frame']]
+    cold_within = [r['size'] for r in results if r['cold_fits_frame']]
+    return {
+        'benchmark': 'simrobot-planner',
+        'frame_budget_ms': round(FRAME_BUDGET_MS, 3),
+        'config': dict(layout_options, sizes=sorted(sizes), seed=seed, repeat=repeat, stop_ms=stop_ms),
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+        },
+        'results': results,
+        'skipped': skipped,
+        'summary': {
+            'largest_size_within_frame': within[-1] if within else None,
+            'first_size_over_frame': over[0] if over else None,
+            'largest_size_within_frame_cold': cold_within[-1] if cold_within else None,
+        },
+    }
+
+
+def find_regressions(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Compara medianas com um relatório anterior; retorna lista de regressões encontradas."""
+    previous = {r['size']: r for r in baseline.get('results', [])}
+    regressions = []
+    for result in report['results']:
+        old = previous.get(result['size'])
+        if old is None:
+            continue
+        for group in ('setup', 'operations'):
+            for name, timing in result[group].items():
+                old_timing = old.get(group, {}).get(name)
+                if old_timing is None:
+                    continue
+                new_ms = timing['median_ms']
+                old_ms = old_timing['median_ms']
+                if new_ms > REGRESSION_NOISE_FLOOR_MS and new_ms > old_ms * tolerance:
+                    regressions.append({
+                        'size': result['size'],
+                        'operation': name,
+                        'baseline_ms': old_ms,
+                        'current_ms': new_ms,
+                        'ratio': round(new_ms / old_ms, 2) if old_ms else None,
+                    })
+    return regressions
+
+
+# ==================== LINHA DE COMANDO ====================
+
+def _print_progress(result):
+    ops = result['operations']
+    print(f"{result['size']:>11}  oráculo {result['setup']['distance_oracle']['median_ms']:9.1f} ms  "
+          f"a_star {ops['a_star']['median_ms']:9.2f} ms  "
+          f"hpa* {ops['hpa_star']['median_ms']:7.2f} ms  "
+          f"jps {ops['jps']['median_ms']:8.2f} ms "
+          f"({result['search_expansions']['jps']}/{result['search_expansions']['a_star']} expansões)  "
+          f"decisão {ops['decide_next_action_intelligent']['median_ms']:7.2f} ms  "
+          f"plano {ops['plan_full_mission']['median_ms']:8.2f} ms  "
+          f"{'cabe' if result['fits_frame'] else 'NÃO cabe'} no frame",
+          file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de escalabilidade do planejador do SimRobot")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="lados dos mapas quadrados (padrão: %(default)s)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--obstacle-density', type=float, default=DEFAULT_OBSTACLE_DENSITY)
+    parser.add_argument('--item-density', type=float, default=DEFAULT_ITEM_DENSITY)
+    parser.add_argument('--max-items', type=int, default=DEFAULT_MAX_ITEMS,
+                        help="limite de células com itens (padrão: %(default)s; 0 = sem limite)")
+    parser.add_argument('--warehouses', type=int, default=DEFAULT_WAREHOUSES)
+    parser.add_argument('--stations', type=int, default=DEFAULT_STATIONS)
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--stop-ms', type=float, default=DEFAULT_STOP_MS,
+                        help="pula os tamanhos maiores quando uma chamada passa deste tempo")
+    parser.add_argument('--output', help="arquivo JSON de saída (padrão: saída padrão)")
+    parser.add_argument('--baseline', help="JSON de uma execução anterior para detectar regressões")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="razão máxima aceita entre mediana atual e da linha de base")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(
+        sizes=args.sizes, seed=args.seed, repeat=args.repeat, stop_ms=args.stop_ms,
+        progress=_print_progress,
+        obstacle_density=args.obstacle_density, item_density=args.item_density,
+        max_items=args.max_items or None, warehouses=args.warehouses, stations=args.stations,
+    )
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        report['regressions'] = find_regressions(report, baseline, args.tolerance)
+        for reg in report['regressions']:
+            print(f"REGRESSÃO {reg['size']} {reg['operation']}: {reg['baseline_ms']} ms -> {reg['current_ms']} ms",
+                  file=sys.stderr)
+        if report['regressions']:
+            exit_code = 1
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
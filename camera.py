@@ -0,0 +1,142 @@
+"""
+Câmera sobre a área do grid: rolagem, zoom e seguir o robô.
+
+A janela tem tamanho fixo (a vista, no máximo VIEW_MAX_WIDTH x VIEW_MAX_HEIGHT
+no Simrobot) e a câmera escolhe qual parte do mundo aparece nela. O zoom anda
+por níveis discretos de tamanho de célula na tela (ZOOM_CELL_SIZES), o que
+mantém finitos os caches de sprites e de fundo. As coordenadas do mundo são
+as do Simrobot: pixels com CELL_SIZE por célula.
+
+Uso:
+
+    camera = Camera(CELL_SIZE, view_w=1024, view_h=768, world_w=..., world_h=...)
+    camera.zoom_by(-1, anchor=(512, 384))     # um nível para fora, mantendo o ponto sob o cursor
+    camera.center_on(robot_x, robot_y)
+    c0, r0, c1, r1 = camera.visible_cells()    # só estas células são desenhadas
+"""
+import math
+
+# Tamanho de uma célula na tela (px) em cada nível de zoom, do mais perto ao mais longe.
+# Abaixo de 1 px, várias células caem no mesmo pixel da vista.
+ZOOM_CELL_SIZES = (100, 64, 40, 25, 16, 10, 6, 4, 2, 1, 0.5, 0.25, 0.125)
+
+
+class Camera:
+    """Janela (view_w x view_h px) sobre um mundo de world_w x world_h px."""
+
+    def __init__(self, cell_size, view_w, view_h, world_w, world_h, zoom_sizes=ZOOM_CELL_SIZES):
+        self.cell_size = cell_size
+        self.zoom_sizes = tuple(zoom_sizes)
+        self.zoom_level = 0
+        self.x = 0.0  # Canto superior esquerdo da vista, em pixels do mundo
+        self.y = 0.0
+        self.follow = False  # Centraliza no robô a cada quadro
+        self.resize(view_w, view_h, world_w, world_h)
+
+    def resize(self, view_w, view_h, world_w, world_h):
+        """Novo tamanho da vista ou do mundo (mapa carregado); mantém zoom e posição válidos."""
+        self.view_w = view_w
+        self.view_h = view_h
+        self.world_w = world_w
+        self.world_h = world_h
+        self.clamp()
+
+    @property
+    def cell_px(self):
+        """Tamanho de uma célula na tela no zoom atual."""
+        return self.zoom_sizes[self.zoom_level]
+
+    @property
+    def zoom(self):
+        """Fator de escala mundo -> tela."""
+        return self.cell_px / self.cell_size
+
+    def fits(self):
+        """O mundo inteiro cabe na vista no zoom atual."""
+        return self.world_w * self.zoom <= self.view_w and self.world_h * self.zoom <= self.view_h
+
+    def is_identity(self):
+        """Sem zoom e com o mundo inteiro visível: tela e mundo usam as mesmas coordenadas."""
+        return self.cell_px == self.cell_size and self.x == 0 and self.y == 0 and self.fits()
+
+    def clamp(self):
+        """Mantém a vista dentro do mundo (encostada no canto se o mundo é menor que ela)."""
+        zoom = self.zoom
+        max_x = max(0.0, self.world_w - self.view_w / zoom)
+        max_y = max(0.0, self.world_h - self.view_h / zoom)
+        self.x = min(max(self.x, 0.0), max_x)
+        self.y = min(max(self.y, 0.0), max_y)
+
+    # ------------------------------------------------------------------
+    # Movimento
+    # ------------------------------------------------------------------
+
+    def pan(self, dx, dy):
+        """Desloca a vista em pixels da tela (arrastar com o mouse)."""
+        zoom = self.zoom
+        self.x += dx / zoom
+        self.y += dy / zoom
+        self.clamp()
+
+    def center_on(self, wx, wy):
+        """Centraliza a vista no ponto (wx, wy) do mundo."""
+        zoom = self.zoom
+        self.x = wx - self.view_w / zoom / 2
+        self.y = wy - self.view_h / zoom / 2
+        self.clamp()
+
+    def set_zoom_level(self, level, anchor=None):
+        """Muda o nível de zoom mantendo fixo o ponto do mundo sob 'anchor' (px da tela; padrão: centro)."""
+        level = min(max(level, 0), len(self.zoom_sizes) - 1)
+        if level == self.zoom_level:
+            return False
+        ax, ay = anchor if anchor is not None else (self.view_w / 2, self.view_h / 2)
+        wx, wy = self.screen_to_world(ax, ay)
+        self.zoom_level = level
+        zoom = self.zoom
+        self.x = wx - ax / zoom
+        self.y = wy - ay / zoom
+        self.clamp()
+        return True
+
+    def zoom_by(self, steps, anchor=None):
+        """Aproxima (steps > 0) ou afasta (steps < 0) alguns níveis."""
+        return self.set_zoom_level(self.zoom_level - steps, anchor)
+
+    def fit_world(self):
+        """Menor afastamento em que o mundo inteiro aparece na vista."""
+        for level in range(len(self.zoom_sizes)):
+            self.zoom_level = level
+            if self.fits():
+                break
+        self.x = self.y = 0.0
+        self.clamp()
+
+    # ------------------------------------------------------------------
+    # Conversões e visibilidade
+    # ------------------------------------------------------------------
+
+    def world_to_screen(self, wx, wy):
+        zoom = self.zoom
+        return (wx - self.x) * zoom, (wy - self.y) * zoom
+
+    def screen_to_world(self, sx, sy):
+        zoom = self.zoom
+        return self.x + sx / zoom, self.y + sy / zoom
+
+    def origin_px(self):
+        """Canto superior esquerdo da vista em pixels da tela no zoom atual (inteiros)."""
+        zoom = self.zoom
+        return int(self.x * zoom), int(self.y * zoom)
+
+    def visible_cells(self):
+        """Intervalo de células visíveis (c0, r0, c1, r1), c1/r1 exclusivos, recortado ao mundo."""
+        cell_px = self.cell_px
+        ox, oy = self.origin_px()
+        cols = int(math.ceil(self.world_w / self.cell_size))
+        rows = int(math.ceil(self.world_h / self.cell_size))
+        c0 = int(ox // cell_px)
+        r0 = int(oy // cell_px)
+        c1 = min(cols, int(math.ceil((ox + self.view_w) / cell_px)))
+        r1 = min(rows, int(math.ceil((oy + self.view_h) / cell_px)))
+        return c0, r0, c1, r1
@@ -0,0 +1,318 @@
+"""
+Planejamento cooperativo de caminhos para vários robôs (A* espaço-tempo).
+
+O a_star do Simrobot planeja só no espaço e ignora os outros agentes; com
+mais de um robô os caminhos colidem. Aqui cada robô planeja no espaço-tempo
+(célula, instante) contra uma tabela de reservas compartilhada:
+
+- conflito de vértice: dois robôs na mesma célula no mesmo instante;
+- conflito de aresta: dois robôs trocando de célula entre t e t + 1;
+- robô estacionado: ao fim do caminho o robô fica parado na última célula
+  (entregando, recarregando, sem trabalho) até planejar de novo.
+
+Os robôs planejam em ordem de chegada (prioridade implícita): quem planeja
+depois desvia ou espera. A heurística é a distância real até o alvo (BFS
+reversa em cache por alvo), então a busca só expande estados fora do
+caminho ótimo quando há espera ou desvio. Se nenhum caminho é encontrado
+dentro do horizonte, o robô espera no lugar e tenta de novo, em vez de
+travar; a espera dobra a cada falha seguida (até MAX_WAIT_STEPS), para que
+um robô sem saída não refaça uma busca cara a cada tick.
+
+Cada instante corresponde a um tick do FleetWorld (um movimento). Uso:
+
+    from fleet import FleetWorld
+    from cooperative_planner import CooperativePlanner
+
+    planner = CooperativePlanner()
+    world = FleetWorld(n_robots=50, seed=1, planner=planner)
+    result = world.run()
+    print(result['planning'])
+"""
+import heapq
+import time
+from collections import deque
+
+# Folga de passos além da distância real permitida para esperas e desvios
+DEFAULT_HORIZON_SLACK = 64
+
+# Quantos campos de heurística (um por alvo) manter em cache
+HEURISTIC_CACHE_SIZE = 256
+
+# Maior espera (em passos) depois de falhas seguidas de planejamento
+MAX_WAIT_STEPS = 8
+
+
+class ReservationTable:
+    """Reservas de células e arestas no espaço-tempo, por robô."""
+
+    def __init__(self):
+        self.vertices = {}   # (célula, t) -> robô
+        self.edges = {}      # (origem, destino, t) -> robô (move de origem em t para destino em t + 1)
+        self.parked = {}     # célula -> (robô, a partir de t)
+        self.cell_last = {}  # célula -> {robô: último t reservado}
+        self._owned = {}     # robô -> (chaves de vértice, chaves de aresta, célula estacionada)
+        self.horizon = 0     # Nenhuma reserva muda depois deste instante
+
+    def is_free(self, cell, t, robot_id):
+        owner = self.vertices.get((cell, t))
+        if owner is not None and owner != robot_id:
+            return False
+        park = self.parked.get(cell)
+        return park is None or park[0] == robot_id or park[1] > t
+
+    def edge_free(self, a, b, t, robot_id):
+        """Mover de a (em t) para b (em t + 1) não cruza outro robô vindo de b para a."""
+        owner = self.edges.get((b, a, t))
+        return owner is None or owner == robot_id
+
+    def last_reserved(self, cell, robot_id):
+        """Último instante em que outro robô passa por 'cell' (-1 se nenhum)."""
+        usage = self.cell_last.get(cell)
+        if not usage:
+            return -1
+        return max((t for rid, t in usage.items() if rid != robot_id), default=-1)
+
+    def can_park(self, cell, t, robot_id):
+        """O robô pode ficar em 'cell' de t em diante."""
+        park = self.parked.get(cell)
+        if park is not None and park[0] != robot_id:
+            return False
+        return self.last_reserved(cell, robot_id) < t
+
+    def release(self, robot_id):
+        """Remove todas as reservas do robô."""
+        owned = self._owned.pop(robot_id, None)
+        if owned is None:
+            return
+        vertex_keys, edge_keys, parked_cell = owned
+        for key in vertex_keys:
+            if self.vertices.get(key) == robot_id:
+                del self.vertices[key]
+            usage = self.cell_last.get(key[0])
+            if usage is not None:
+                usage.pop(robot_id, None)
+        for key in edge_keys:
+            if self.edges.get(key) == robot_id:
+                del self.edges[key]
+        if parked_cell is not None and self.parked.get(parked_cell, (None,))[0] == robot_id:
+            del self.parked[parked_cell]
+
+    def reserve(self, robot_id, path, start_t):
+        """Reserva o caminho (uma célula por instante a partir de start_t) e estaciona no fim."""
+        self.release(robot_id)
+        vertex_keys = []
+        edge_keys = []
+        for k, cell in enumerate(path):
+            t = start_t + k
+            self.vertices[(cell, t)] = robot_id
+            vertex_keys.append((cell, t))
+            self.cell_last.setdefault(cell, {})[robot_id] = t
+            if k + 1 < len(path) and path[k + 1] != cell:
+                key = (cell, path[k + 1], t)
+                self.edges[key] = robot_id
+                edge_keys.append(key)
+        end = path[-1]
+        self.parked[end] = (robot_id, start_t + len(path) - 1)
+        self.horizon = max(self.horizon, start_t + len(path) - 1)
+        self._owned[robot_id] = (vertex_keys, edge_keys, end)
+
+    def park(self, robot_id, cell, t):
+        """Robô fica parado em 'cell' a partir de t (sem caminho)."""
+        self.reserve(robot_id, [cell], t)
+
+
+def _distance_field(graph, goal):
+    """Distância real de cada célula até goal (BFS reversa; grafo não direcionado)."""
+    dist = {goal: 0}
+    queue = deque([goal])
+    while queue:
+        node = queue.popleft()
+        d = dist[node] + 1
+        for neighbor, _ in graph.get(node, ()):
+            if neighbor not in dist:
+                dist[neighbor] = d
+                queue.append(neighbor)
+    return dist
+
+
+def space_time_a_star(graph, start, goal, reservations, start_t=0, robot_id=None,
+                      heuristic=None, horizon_slack=DEFAULT_HORIZON_SLACK):
+    """
+    A* no espaço-tempo de start (no instante start_t) até goal, respeitando
+    'reservations'. Ações: mover para um vizinho ou esperar. O caminho só
+    termina em goal se o robô puder ficar estacionado lá.
+
+    Retorna (caminho, expansões); o caminho tem uma célula por instante
+    (esperas repetem a célula) e é [] se não houver solução no horizonte.
+
+    Depois de reservations.horizon nenhuma reserva muda, então os estados
+    (célula, t) com t além dele são todos equivalentes: o instante é limitado
+    a horizon + 1 e a busca vira um A* espacial comum, o que mantém finita
+    uma busca sem solução.
+    """
+    if heuristic is None:
+        heuristic = _distance_field(graph, goal)
+    h0 = heuristic.get(start)
+    if h0 is None:
+        return [], 0
+    park = reservations.parked.get(goal)
+    if park is not None and park[0] != robot_id:
+        return [], 0  # Outro robô está estacionado no alvo: não adianta buscar agora
+
+    max_steps = h0 + horizon_slack
+    static_t = max(reservations.horizon, start_t) + 1
+    open_set = [(h0, 0, 0, start, min(start_t, static_t))]
+    came_from = {}
+    closed = set()
+    expansions = 0
+    counter = 0
+
+    while open_set:
+        _, _, steps, cell, t = heapq.heappop(open_set)
+        state = (cell, t)
+        if state in closed:
+            continue
+        closed.add(state)
+        expansions += 1
+
+        if cell == goal and reservations.can_park(cell, t, robot_id):
+            path = [cell]
+            while state in came_from:
+                state = came_from[state]
+                path.append(state[0])
+            return path[::-1], expansions
+
+        if steps >= max_steps:
+            continue
+
+        nt = min(t + 1, static_t)
+        moves = [neighbor for neighbor, _ in graph.get(cell, ())]
+        moves.append(cell)  # Esperar
+        for nxt in moves:
+            h = heuristic.get(nxt)
+            if h is None or (nxt, nt) in closed or (nxt == cell and nt == t):
+                continue  # Esperar depois do horizonte não muda nada
+            if not reservations.is_free(nxt, nt, robot_id):
+                continue
+            if nxt != cell and not reservations.edge_free(cell, nxt, t, robot_id):
+                continue
+            came_from.setdefault((nxt, nt), state)
+            counter += 1
+            heapq.heappush(open_set, (steps + 1 + h, counter, steps + 1, nxt, nt))
+
+    return [], expansions
+
+
+class CooperativePlanner:
+    """
+    Planejador para FleetWorld.planner: A* espaço-tempo com uma tabela de
+    reservas compartilhada por toda a frota. Mede o tempo de planejamento
+    de cada robô.
+    """
+
+    def __init__(self, horizon_slack=DEFAULT_HORIZON_SLACK):
+        self.horizon_slack = horizon_slack
+        self.reservations = ReservationTable()
+        self.world = None
+        self._heuristics = {}
+        self._failures = {}  # robô -> falhas seguidas de planejamento
+        # Estatísticas por robô: [planos, tempo total (ms), pior tempo (ms), expansões, falhas]
+        self.stats = {}
+
+    def attach(self, world):
+        """Começa a planejar para 'world': cada robô no grid fica estacionado onde está."""
+        self.world = world
+        self.reservations = ReservationTable()
+        self._heuristics = {}
+        self._failures = {}
+        self.stats = {}
+        for robot in world.robots:
+            if robot.state != 'queued':
+                self.reservations.park(robot.id, robot.pos, world.ticks)
+
+    def _heuristic(self, goal):
+        field = self._heuristics.get(goal)
+        if field is None:
+            if len(self._heuristics) >= HEURISTIC_CACHE_SIZE:
+                self._heuristics.pop(next(iter(self._heuristics)))
+            field = _distance_field(self.world.graph, goal)
+            self._heuristics[goal] = field
+        return field
+
+    def __call__(self, world, robot, goal):
+        if world is not self.world:
+            self.attach(world)
+
+        t0 = time.perf_counter()
+        start = robot.pos
+        path, expansions = space_time_a_star(
+            world.graph, start, goal, self.reservations, start_t=world.ticks,
+            robot_id=robot.id, heuristic=self._heuristic(goal), horizon_slack=self.horizon_slack,
+        )
+        failed = not path
+        if failed:
+            path = self._wait_path(robot, start, world.ticks)
+        else:
+            self._failures.pop(robot.id, None)
+        self.reservations.reserve(robot.id, path, world.ticks)
+        elapsed = (time.perf_counter() - t0) * 1000
+
+        entry = self.stats.setdefault(robot.id, [0, 0.0, 0.0, 0, 0])
+        entry[0] += 1
+        entry[1] += elapsed
+        entry[2] = max(entry[2], elapsed)
+        entry[3] += expansions
+        entry[4] += failed
+        return path
+
+    def _wait_path(self, robot, start, t):
+        """Sem caminho livre agora: espera no lugar (1, 2, 4... passos) e tenta de novo."""
+        failures = self._failures.get(robot.id, 0) + 1
+        self._failures[robot.id] = failures
+        path = [start]
+        for k in range(1, min(2 ** (failures - 1), MAX_WAIT_STEPS) + 1):
+            if not self.reservations.is_free(start, t + k, robot.id):
+                break
+            path.append(start)
+        return path
+
+    def enter(self, world, robot, cell):
+        """Robô da fila entra no grid em 'cell' se nenhum outro robô a reservou daqui em diante."""
+        if world is not self.world:
+            self.attach(world)
+        if not self.reservations.can_park(cell, world.ticks, robot.id):
+            return False
+        self.reservations.park(robot.id, cell, world.ticks)
+        return True
+
+    def leave(self, world, robot):
+        """Robô saiu do grid: libera todas as reservas dele."""
+        self.reservations.release(robot.id)
+
+    def stop(self, world, robot):
+        """Robô parou fora do plano (ex.: sem bateria): libera o caminho e estaciona."""
+        self.reservations.park(robot.id, robot.pos, world.ticks)
+
+    def summary(self):
+        """Tempo de planejamento por robô e agregado da frota."""
+        per_robot = {
+            robot_id: {
+                'plans': plans,
+                'total_ms': round(total, 3),
+                'mean_ms': round(total / plans, 4) if plans else 0.0,
+                'max_ms': round(worst, 4),
+                'expansions': expansions,
+                'failed': failed,
+            }
+            for robot_id, (plans, total, worst, expansions, failed) in sorted(self.stats.items())
+        }
+        plans = sum(s['plans'] for s in per_robot.values())
+        total = sum(s['total_ms'] for s in per_robot.values())
+        return {
+            'plans': plans,
+            'total_ms': round(total, 3),
+            'mean_ms_per_plan': round(total / plans, 4) if plans else 0.0,
+            'max_ms': max((s['max_ms'] for s in per_robot.values()), default=0.0),
+            'failed_plans': sum(s['failed'] for s in per_robot.values()),
+            'per_robot': per_robot,
+        }
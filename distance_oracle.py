@@ -0,0 +1,327 @@
+"""
+Oráculo de distâncias do ambiente.
+
+Responde custo de rota e "mais próximo" com campos de BFS (a distância de
+uma origem a todas as células, em arrays NumPy), sem reconstruir grafo nem
+rodar A*. O campo de uma origem é calculado na primeira consulta que parte
+dela e fica num cache LRU limitado por FIELD_MEMORY_LIMIT; as consultas
+seguintes são O(1). Criar o oráculo não roda nenhuma BFS: com um marco por
+célula com item, a BFS adiantada de todos os marcos custava segundos em
+mapas de 100x100, quase toda em campos nunca consultados.
+
+Também oferece as buscas de "mais próximo" sem um A* por candidato:
+- nearest_target_search: BFS única a partir da origem que para na primeira
+  camada que contém um alvo;
+- multi_source_bfs: BFS reversa a partir de todas as fontes de uma vez
+  (todos os almoxarifados, todas as estações), que responde em O(1) qual
+  fonte é a mais próxima de qualquer célula.
+
+Como o grid é 4-conectado com custo uniforme, a BFS dá exatamente a mesma
+distância que o A* com heurística de Manhattan. Empates são resolvidos pela
+ordem da lista de candidatos, como no find_nearest original.
+"""
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from warehouse_grid import CELL_RECHARGE, CELL_WAREHOUSE
+
+UNREACHABLE = -1
+
+# Limite de memória dos campos de distância em cache (bytes). Cada campo
+# ocupa 4 bytes por célula; acima do limite sai o usado há mais tempo.
+FIELD_MEMORY_LIMIT = 64 * 1024 * 1024
+
+# Mínimo de campos em cache, mesmo em mapas grandes demais para o limite
+SOURCE_CACHE_SIZE = 32
+
+# Até quantos candidatos o "mais próximo" usa um laço em vez de argmin vetorizado
+SMALL_QUERY_SIZE = 32
+
+
+def bfs_distances(walkable, rows, cols, source):
+    """
+    BFS 4-conectada a partir de 'source' (índice linear y * cols + x).
+    Retorna array int32 com a distância em passos para cada célula (-1 se inalcançável).
+    """
+    dist = [UNREACHABLE] * (rows * cols)
+    if not walkable[source]:
+        return np.array(dist, dtype=np.int32)
+
+    dist[source] = 0
+    queue = deque([source])
+    last_col = cols - 1
+    while queue:
+        idx = queue.popleft()
+        next_dist = dist[idx] + 1
+        x = idx % cols
+
+        if x < last_col:
+            n = idx + 1
+            if walkable[n] and dist[n] < 0:
+                dist[n] = next_dist
+                queue.append(n)
+        if x > 0:
+            n = idx - 1
+            if walkable[n] and dist[n] < 0:
+                dist[n] = next_dist
+                queue.append(n)
+        n = idx + cols
+        if n < len(dist) and walkable[n] and dist[n] < 0:
+            dist[n] = next_dist
+            queue.append(n)
+        n = idx - cols
+        if n >= 0 and walkable[n] and dist[n] < 0:
+            dist[n] = next_dist
+            queue.append(n)
+
+    return np.array(dist, dtype=np.int32)
+
+
+def _grid_neighbors(idx, cols, n_cells):
+    """Índices lineares dos vizinhos 4-conectados de idx (sem checar obstáculos)."""
+    x = idx % cols
+    if x < cols - 1:
+        yield idx + 1
+    if x > 0:
+        yield idx - 1
+    if idx + cols < n_cells:
+        yield idx + cols
+    if idx - cols >= 0:
+        yield idx - cols
+
+
+def nearest_target_search(walkable, rows, cols, source, targets):
+    """
+    BFS única a partir de 'source' até o alvo mais próximo entre 'targets'
+    (índices lineares). Para ao terminar a primeira camada que contém um alvo;
+    entre alvos à mesma distância vence o que aparece primeiro em 'targets'.
+    Retorna (posição em targets, distância) ou (None, None).
+    """
+    order = {}
+    for k, t in enumerate(targets):
+        order.setdefault(t, k)
+    if not order or not walkable[source]:
+        return None, None
+
+    n_cells = rows * cols
+    visited = bytearray(n_cells)
+    visited[source] = 1
+    frontier = [source]
+    depth = 0
+    while frontier:
+        found = [order[idx] for idx in frontier if idx in order]
+        if found:
+            return min(found), depth
+
+        next_frontier = []
+        for idx in frontier:
+            for n in _grid_neighbors(idx, cols, n_cells):
+                if walkable[n] and not visited[n]:
+                    visited[n] = 1
+                    next_frontier.append(n)
+        frontier = next_frontier
+        depth += 1
+
+    return None, None
+
+
+def multi_source_bfs(walkable, rows, cols, sources):
+    """
+    BFS reversa a partir de todas as 'sources' (índices lineares) ao mesmo tempo.
+    Retorna (dist, owner): distância até a fonte mais próxima e o índice dessa
+    fonte em 'sources' (-1 se inalcançável). Empates ficam com a menor posição.
+    """
+    n_cells = rows * cols
+    dist = [UNREACHABLE] * n_cells
+    owner = [UNREACHABLE] * n_cells
+
+    frontier = []
+    for k, s in enumerate(sources):
+        if walkable[s] and dist[s] < 0:
+            dist[s] = 0
+            owner[s] = k
+            frontier.append(s)
+
+    depth = 0
+    while frontier:
+        next_depth = depth + 1
+        next_frontier = []
+        for idx in frontier:
+            o = owner[idx]
+            for n in _grid_neighbors(idx, cols, n_cells):
+                if not walkable[n]:
+                    continue
+                if dist[n] < 0:
+                    dist[n] = next_depth
+                    owner[n] = o
+                    next_frontier.append(n)
+                elif dist[n] == next_depth and o < owner[n]:
+                    owner[n] = o
+        frontier = next_frontier
+        depth = next_depth
+
+    return np.array(dist, dtype=np.int32), np.array(owner, dtype=np.int32)
+
+
+class NearestSourceField:
+    """Campo de "fonte mais próxima" para um conjunto fixo de fontes (ex.: todos os 'A')."""
+
+    def __init__(self, oracle, sources):
+        self.oracle = oracle
+        self.sources = [tuple(pos) for pos in sources]
+        flat_sources = [oracle._flat(pos) for pos in self.sources]
+        self.dist, self.owner = multi_source_bfs(oracle.walkable, oracle.rows, oracle.cols, flat_sources)
+
+    def nearest(self, pos):
+        """Retorna (fonte mais próxima, distância) ou (None, None) se nenhuma é alcançável."""
+        pos = tuple(pos)
+        if not self.oracle._is_walkable(pos):
+            return None, None
+        flat = self.oracle._flat(pos)
+        k = self.owner[flat]
+        if k < 0:
+            return None, None
+        return self.sources[k], int(self.dist[flat])
+
+
+class DistanceOracle:
+    """Distâncias a partir dos marcos do mapa, com campos de BFS calculados sob demanda."""
+
+    def __init__(self, grid, landmarks):
+        self.rows = grid.rows
+        self.cols = grid.cols
+        self.walkable = grid.walkable_flat
+
+        # Marcos fixos do mapa, em ordem de varredura (linha a linha)
+        self.warehouses = grid.positions(CELL_WAREHOUSE)
+        self.recharge_stations = grid.positions(CELL_RECHARGE)
+        self._fixed = set(self.warehouses) | set(self.recharge_stations)
+
+        # Apenas marcos em células livres, sem repetição, na ordem recebida
+        self.landmarks = []
+        self.index = {}
+        for pos in landmarks:
+            pos = tuple(pos)
+            if pos not in self.index and self._is_walkable(pos):
+                self.index[pos] = len(self.landmarks)
+                self.landmarks.append(pos)
+
+        # Campos de distância por origem (marco ou não), em LRU limitado por memória
+        field_bytes = max(self.rows * self.cols * 4, 1)
+        self.field_capacity = max(SOURCE_CACHE_SIZE, FIELD_MEMORY_LIMIT // field_bytes)
+        self._fields = OrderedDict()
+        self.bfs_runs = 0
+
+        self._nearest_fields = {}
+
+    def _flat(self, pos):
+        return pos[1] * self.cols + pos[0]
+
+    def _is_walkable(self, pos):
+        x, y = pos
+        return 0 <= x < self.cols and 0 <= y < self.rows and self.walkable[y * self.cols + x]
+
+    def _field_from(self, pos):
+        """Campo de distâncias a partir de uma célula (BFS na primeira consulta, depois LRU)."""
+        field = self._fields.get(pos)
+        if field is None:
+            field = bfs_distances(self.walkable, self.rows, self.cols, self._flat(pos))
+            self.bfs_runs += 1
+            self._fields[pos] = field
+            if len(self._fields) > self.field_capacity:
+                self._fields.popitem(last=False)
+        else:
+            self._fields.move_to_end(pos)
+        return field
+
+    def distance(self, a, b):
+        """Distância em passos entre duas células, ou None se não há caminho."""
+        a = tuple(a)
+        b = tuple(b)
+        if a == b:
+            return 0
+        if not (self._is_walkable(a) and self._is_walkable(b)):
+            return None
+
+        if a not in self._fields and (b in self._fields or (b in self._fixed and a not in self._fixed)):
+            # Grafo não direcionado: d(a, b) = d(b, a). Prefere o campo já pronto ou o de
+            # um almoxarifado/estação, que servem a muitas consultas
+            d = self._field_from(b)[self._flat(a)]
+        else:
+            d = self._field_from(a)[self._flat(b)]
+
+        return int(d) if d >= 0 else None
+
+    def distances_from(self, source, positions):
+        """Distâncias de 'source' a cada posição (UNREACHABLE sem caminho), uma BFS no máximo."""
+        source = tuple(source)
+        positions = [tuple(pos) for pos in positions]
+        if not self._is_walkable(source):
+            return [0 if pos == source else UNREACHABLE for pos in positions]
+        field = self._field_from(source)
+        return [int(field[self._flat(pos)]) if self._is_walkable(pos) else UNREACHABLE
+                for pos in positions]
+
+    def distance_matrix(self, positions):
+        """Distâncias entre todas as posições (UNREACHABLE sem caminho), uma BFS por linha."""
+        positions = [tuple(pos) for pos in positions]
+        walkable = [self._is_walkable(pos) for pos in positions]
+        columns = np.array([self._flat(pos) if ok else 0 for pos, ok in zip(positions, walkable)], dtype=np.int64)
+        matrix = np.full((len(positions), len(positions)), UNREACHABLE, dtype=np.int32)
+        for i, pos in enumerate(positions):
+            if walkable[i]:
+                matrix[i] = self._field_from(pos)[columns]
+        matrix[:, [j for j, ok in enumerate(walkable) if not ok]] = UNREACHABLE
+        np.fill_diagonal(matrix, 0)  # distance(a, a) = 0 mesmo fora do grid andável
+        return matrix
+
+    def nearest(self, source, positions):
+        """
+        Posição de 'positions' mais próxima de 'source' (None se nenhuma alcançável).
+        Se a origem e todos os candidatos são marcos, é um argmin no campo da
+        origem (em cache depois da primeira consulta); senão roda uma única BFS
+        multi-alvo em vez de uma busca por candidato.
+        """
+        source = tuple(source)
+        if not positions or not self._is_walkable(source):
+            return None
+
+        if source in self.index and all(tuple(pos) in self.index for pos in positions):
+            field = self._field_from(source)
+            if len(positions) <= SMALL_QUERY_SIZE:
+                # Poucos candidatos: laço simples sai mais barato que montar arrays
+                best, best_dist = None, None
+                for k, pos in enumerate(positions):
+                    d = field[self._flat(pos)]
+                    if d >= 0 and (best_dist is None or d < best_dist):
+                        best, best_dist = k, d
+                return positions[best] if best is not None else None
+            row = field[[self._flat(tuple(pos)) for pos in positions]].astype(np.int64)
+            reachable = row >= 0
+            row[~reachable] = np.iinfo(np.int64).max
+            k = int(np.argmin(row))  # argmin devolve o primeiro empate, como o find_nearest original
+            return positions[k] if reachable[k] else None
+
+        flat_targets = [self._flat(pos) if self._is_walkable(pos) else -1 for pos in positions]
+        k, _ = nearest_target_search(self.walkable, self.rows, self.cols, self._flat(source), flat_targets)
+        return positions[k] if k is not None else None
+
+    def nearest_field(self, key, sources):
+        """
+        Campo de fonte mais próxima (BFS reversa multi-fonte), em cache por 'key'.
+        As fontes de uma chave devem ser fixas durante a vida do oráculo.
+        """
+        field = self._nearest_fields.get(key)
+        if field is None:
+            field = NearestSourceField(self, sources)
+            self._nearest_fields[key] = field
+        return field
+
+    def nearest_warehouse(self, pos):
+        """(almoxarifado mais próximo, distância) a partir de qualquer célula."""
+        return self.nearest_field('A', self.warehouses).nearest(pos)
+
+    def nearest_recharge_station(self, pos):
+        """(estação de recarga mais próxima, distância) a partir de qualquer célula."""
+        return self.nearest_field('R', self.recharge_stations).nearest(pos)
@@ -0,0 +1,411 @@
+"""
+Log binário de eventos da simulação: gravação em fluxo e replay determinístico.
+
+Uma execução é reproduzível a partir da semente e do mapa, mas para investigar
+uma falha não é preciso rodar a lógica de novo: o log guarda cada evento que
+muda o estado do mundo (movimento, coleta, entrega, início/fim de recarga,
+troca de modo, fim de jogo), com o instante simulado e a bateria naquele
+momento. ReplayState reconstrói o estado em qualquer evento só aplicando
+esses registros, sem pygame e sem planejamento, milhares de vezes mais rápido
+que o tempo real; dá para bisseccionar um turno de 3 horas em segundos.
+
+Formato (little-endian):
+
+    cabeçalho: b"SRLG", versão u16, semente i64 (-1 = sem semente),
+               nº de tipos de item u8, nomes (tamanho u8 + UTF-8)
+    evento:    tipo u8, tempo simulado u32 (ms), bateria f32, dados do tipo
+
+Gravação (Simrobot):
+
+    import Simrobot as sim
+    sim.start_event_recording("turno.srlog", seed=42)
+    ...
+    sim.stop_event_recording()
+
+Replay:
+
+    python event_log.py turno.srlog --until-ms 5400000
+
+ou em código:
+
+    from event_log import replay
+    state = replay("turno.srlog", until_event=12000)
+    print(state.summary())
+"""
+import argparse
+import json
+import struct
+import sys
+import time
+
+from warehouse_grid import CODE_TO_CHAR
+
+MAGIC = b"SRLG"
+FORMAT_VERSION = 1
+
+# Tipos de evento
+EV_RESET = 1           # Mundo reiniciado: robô, bateria e itens (ver record_reset)
+EV_MAP = 2             # Mapa inteiro: linhas u16, colunas u16, códigos u8
+EV_CELL = 3            # Célula alterada: x u16, y u16, código u8
+EV_MOVE = 4            # Robô moveu: nova posição x u16, y u16
+EV_COLLECT = 5         # Item coletado: x u16, y u16, posição na célula u8, tipo u8
+EV_DELIVER = 6         # Primeiro item do inventário entregue: tipo u8
+EV_RECHARGE_START = 7  # Recarga iniciada
+EV_RECHARGE_STOP = 8   # Recarga encerrada (completa ou interrompida)
+EV_MODE = 9            # Modo de automação: modo u8
+EV_GAME_STATE = 10     # Estado do jogo: GAME_STATES u8
+
+EVENT_NAMES = {
+    EV_RESET: "reset",
+    EV_MAP: "map",
+    EV_CELL: "cell",
+    EV_MOVE: "move",
+    EV_COLLECT: "collect",
+    EV_DELIVER: "deliver",
+    EV_RECHARGE_START: "recharge_start",
+    EV_RECHARGE_STOP: "recharge_stop",
+    EV_MODE: "mode",
+    EV_GAME_STATE: "game_state",
+}
+
+GAME_STATES = ("playing", "victory", "game_over")
+
+_HEADER = struct.Struct("<4sHqB")
+_EVENT = struct.Struct("<BIf")  # tipo, tempo (ms), bateria
+_U8 = struct.Struct("<B")
+_CELL_ITEMS = struct.Struct("<HHB")
+
+# Dados de tamanho fixo de cada tipo (EV_RESET e EV_MAP têm tamanho variável)
+_PAYLOADS = {
+    EV_CELL: struct.Struct("<HHB"),
+    EV_MOVE: struct.Struct("<HH"),
+    EV_COLLECT: struct.Struct("<HHBB"),
+    EV_DELIVER: struct.Struct("<B"),
+    EV_RECHARGE_START: struct.Struct("<"),
+    EV_RECHARGE_STOP: struct.Struct("<"),
+    EV_MODE: struct.Struct("<B"),
+    EV_GAME_STATE: struct.Struct("<B"),
+}
+
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+
+class EventLogError(ValueError):
+    """Arquivo que não é um log de eventos válido (ou de versão desconhecida)."""
+
+
+# ==================== GRAVAÇÃO ====================
+
+class EventLogWriter:
+    """Grava eventos em fluxo num arquivo binário (com buffer; flush() força a escrita)."""
+
+    def __init__(self, path, seed=None, item_types=(), buffer_size=DEFAULT_BUFFER_SIZE):
+        self.path = path
+        self.item_types = list(item_types)
+        self._type_index = {name: i for i, name in enumerate(self.item_types)}
+        self.events = 0
+        self._file = open(path, "wb", buffering=buffer_size)
+        names = b"".join(_U8.pack(len(encoded)) + encoded
+                         for encoded in (name.encode("utf-8") for name in self.item_types))
+        self._file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, -1 if seed is None else seed,
+                                      len(self.item_types)) + names)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def type_index(self, item_type):
+        """Índice do tipo de item no cabeçalho."""
+        return self._type_index[item_type]
+
+    def record(self, kind, t_ms, battery, *fields):
+        """Grava um evento de tamanho fixo (EV_MOVE, EV_COLLECT, ...)."""
+        self._file.write(_EVENT.pack(kind, int(t_ms), battery) + _PAYLOADS[kind].pack(*fields))
+        self.events += 1
+
+    def record_map(self, t_ms, battery, rows, cols, codes):
+        """Grava o mapa inteiro: 'codes' são os códigos uint8 linha a linha (rows * cols bytes)."""
+        self._file.write(_EVENT.pack(EV_MAP, int(t_ms), battery) + struct.pack("<HH", rows, cols) + bytes(codes))
+        self.events += 1
+
+    def record_reset(self, t_ms, battery, pos, items_on_grid):
+        """Grava o mundo reiniciado: posição do robô e itens de cada célula (inventário vazio)."""
+        cells = [(cell, items) for cell, items in items_on_grid.items() if items]
+        parts = [_EVENT.pack(EV_RESET, int(t_ms), battery), struct.pack("<HHH", pos[0], pos[1], len(cells))]
+        for (x, y), items in cells:
+            parts.append(_CELL_ITEMS.pack(x, y, len(items)))
+            parts.append(bytes(self._type_index[item['type']] for item in items))
+        self._file.write(b"".join(parts))
+        self.events += 1
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+# ==================== LEITURA ====================
+
+def read_log(path):
+    """
+    Lê um log inteiro. Retorna (cabeçalho, eventos), onde cada evento é
+    (tipo, tempo ms, bateria, dados) e 'dados' é a tupla de campos do tipo
+    (EV_RESET: (x, y, {célula: [tipos]}); EV_MAP: (linhas, colunas, códigos)).
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < _HEADER.size:
+        raise EventLogError(f"{path}: arquivo curto demais para um log de eventos")
+    magic, version, seed, n_types = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise EventLogError(f"{path}: não é um log de eventos do SimRobot")
+    if version != FORMAT_VERSION:
+        raise EventLogError(f"{path}: versão {version} não suportada (esperada {FORMAT_VERSION})")
+    offset = _HEADER.size
+    item_types = []
+    for _ in range(n_types):
+        (size,) = _U8.unpack_from(data, offset)
+        item_types.append(data[offset + 1:offset + 1 + size].decode("utf-8"))
+        offset += 1 + size
+    header = {'version': version, 'seed': None if seed == -1 else seed, 'item_types': item_types}
+
+    events = []
+    end = len(data)
+    event_size = _EVENT.size
+    payloads = _PAYLOADS
+    while offset + event_size <= end:
+        kind, t_ms, battery = _EVENT.unpack_from(data, offset)
+        offset += event_size
+        payload = payloads.get(kind)
+        if payload is not None:
+            if offset + payload.size > end:
+                break  # Último evento incompleto (gravação interrompida)
+            fields = payload.unpack_from(data, offset)
+            offset += payload.size
+        elif kind == EV_RESET:
+            x, y, n_cells = struct.unpack_from("<HHH", data, offset)
+            offset += 6
+            items = {}
+            for _ in range(n_cells):
+                cx, cy, n = _CELL_ITEMS.unpack_from(data, offset)
+                offset += _CELL_ITEMS.size
+                items[(cx, cy)] = [item_types[i] for i in data[offset:offset + n]]
+                offset += n
+            fields = (x, y, items)
+        elif kind == EV_MAP:
+            rows, cols = struct.unpack_from("<HH", data, offset)
+            offset += 4
+            codes = data[offset:offset + rows * cols]
+            offset += rows * cols
+            fields = (rows, cols, codes)
+        else:
+            raise EventLogError(f"{path}: tipo de evento desconhecido {kind} no byte {offset - event_size}")
+        events.append((kind, t_ms, battery, fields))
+    return header, events
+
+
+# ==================== REPLAY ====================
+
+class ReplayState:
+    """Estado do mundo reconstruído aplicando eventos do log, sem executar a simulação."""
+
+    def __init__(self, item_types=()):
+        self.item_types = list(item_types)
+        self.rows = 0
+        self.cols = 0
+        self.codes = b""
+        self.robot_pos = (0, 0)
+        self.battery = 100.0
+        self.items_on_grid = {}
+        self.robot_inventory = []
+        self.items_delivered = 0
+        self.items_initial = 0
+        self.moves = 0
+        self.recharging = False
+        self.auto_mode = 0
+        self.game_state = "playing"
+        self.time_ms = 0
+        self.start_ms = 0            # Instante do último EV_RESET (início da missão)
+        self.recharge_time_ms = 0    # Tempo entre EV_RECHARGE_START e EV_RECHARGE_STOP
+        self._recharge_start_ms = None
+        self.events_applied = 0
+
+    def apply(self, event):
+        """Aplica um evento (tipo, tempo ms, bateria, dados) ao estado."""
+        kind, t_ms, battery, fields = event
+        self.time_ms = t_ms
+        self.battery = battery
+        self.events_applied += 1
+
+        if kind == EV_MOVE:
+            self.robot_pos = fields
+            self.recharging = False
+            self.moves += 1
+        elif kind == EV_COLLECT:
+            x, y, slot, type_index = fields
+            items = self.items_on_grid[(x, y)]
+            items.pop(slot)
+            if not items:
+                del self.items_on_grid[(x, y)]
+            self.robot_inventory.append(self.item_types[type_index])
+        elif kind == EV_DELIVER:
+            self.robot_inventory.pop(0)
+            self.items_delivered += 1
+        elif kind == EV_RECHARGE_START:
+            self.recharging = True
+            self._recharge_start_ms = t_ms
+        elif kind == EV_RECHARGE_STOP:
+            self.recharging = False
+            if self._recharge_start_ms is not None:
+                self.recharge_time_ms += t_ms - self._recharge_start_ms
+                self._recharge_start_ms = None
+        elif kind == EV_MODE:
+            self.auto_mode = fields[0]
+        elif kind == EV_GAME_STATE:
+            self.game_state = GAME_STATES[fields[0]]
+        elif kind == EV_RESET:
+            x, y, items = fields
+            self.robot_pos = (x, y)
+            self.items_on_grid = {cell: list(types) for cell, types in items.items()}
+            self.items_initial = sum(len(types) for types in items.values())
+            self.robot_inventory = []
+            self.items_delivered = 0
+            self.moves = 0
+            self.recharging = False
+            self.game_state = "playing"
+            self.start_ms = t_ms
+            self.recharge_time_ms = 0
+            self._recharge_start_ms = None
+        elif kind == EV_MAP:
+            self.rows, self.cols, self.codes = fields
+        elif kind == EV_CELL:
+            x, y, code = fields
+            codes = bytearray(self.codes)
+            codes[y * self.cols + x] = code
+            self.codes = bytes(codes)
+
+    def summary(self):
+        """Resumo do estado (serializável em JSON)."""
+        return {
+            'time_ms': self.time_ms,
+            'elapsed_ms': self.time_ms - self.start_ms,
+            'recharge_time_ms': self.recharge_time_ms,
+            'events_applied': self.events_applied,
+            'robot_pos': list(self.robot_pos),
+            'battery': round(self.battery, 3),
+            'inventory': list(self.robot_inventory),
+            'items_delivered': self.items_delivered,
+            'items_remaining': sum(len(items) for items in self.items_on_grid.values()),
+            'items_initial': self.items_initial,
+            'moves': self.moves,
+            'recharging': self.recharging,
+            'auto_mode': self.auto_mode,
+            'game_state': self.game_state,
+        }
+
+    def load_into_simrobot(self, sim):
+        """
+        Coloca este estado no módulo Simrobot (mapa, robô, itens, bateria), em
+        modo manual, para inspecionar ou continuar a partir do evento.
+        """
+        sim.load_map([[CODE_TO_CHAR[self.codes[y * self.cols + x]] for x in range(self.cols)]
+                      for y in range(self.rows)])
+        sim.reset_automation_state()
+        sim.robot_grid_pos = list(self.robot_pos)
+        sim.robot_real_pos = [self.robot_pos[0] * sim.CELL_SIZE, self.robot_pos[1] * sim.CELL_SIZE]
+        sim.last_position = list(self.robot_pos)
+        sim.battery = self.battery
+        sim.items_on_grid = {cell: [{'type': t} for t in types] for cell, types in self.items_on_grid.items()}
+        sim.robot_inventory = [{'type': t} for t in self.robot_inventory]
+        sim.items_delivered_count = self.items_delivered
+        sim.total_items_initial = self.items_initial
+        sim.game_state = self.game_state
+        sim.is_recharging = False
+        sim.time_at_station = 0
+        sim.is_delivering = False
+        sim.time_at_warehouse = 0
+        sim.invalidate_distance_oracle()
+        sim.request_full_redraw()
+
+
+def replay(path, until_event=None, until_ms=None):
+    """
+    Reconstrói o estado depois de 'until_event' eventos ou no instante
+    'until_ms' (o que vier primeiro; sem limites, o estado final).
+    """
+    header, events = read_log(path)
+    state = ReplayState(header['item_types'])
+    for index, event in enumerate(events):
+        if until_event is not None and index >= until_event:
+            break
+        if until_ms is not None and event[1] > until_ms:
+            break
+        state.apply(event)
+    return state
+
+
+def bisect_events(path, predicate):
+    """
+    Menor número de eventos n tal que predicate(estado depois de n eventos)
+    é verdadeiro; a condição deve continuar verdadeira depois que passa a
+    valer (ex.: bateria abaixo de 10%, item perdido). Retorna (n, estado) ou
+    (None, estado final). Cada sondagem refaz o replay desde o início.
+    """
+    header, events = read_log(path)
+
+    def state_at(n):
+        state = ReplayState(header['item_types'])
+        for event in events[:n]:
+            state.apply(event)
+        return state
+
+    final = state_at(len(events))
+    if not predicate(final):
+        return None, final
+    lo, hi = 0, len(events)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if predicate(state_at(mid)):
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo, state_at(lo)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay de um log de eventos do SimRobot (sem janela)")
+    parser.add_argument('log', help="arquivo gravado por Simrobot.start_event_recording")
+    parser.add_argument('--until-event', type=int, default=None, help="para depois de N eventos")
+    parser.add_argument('--until-ms', type=float, default=None, help="para no instante simulado T (ms)")
+    parser.add_argument('--list', action='store_true', help="lista os eventos aplicados")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    header, events = read_log(args.log)
+    state = ReplayState(header['item_types'])
+    for index, event in enumerate(events):
+        if args.until_event is not None and index >= args.until_event:
+            break
+        if args.until_ms is not None and event[1] > args.until_ms:
+            break
+        state.apply(event)
+        if args.list:
+            kind, t_ms, battery, fields = event
+            shown = fields if kind not in (EV_RESET, EV_MAP) else ()
+            print(f"{index:8d} {t_ms / 1000:10.3f}s {EVENT_NAMES[kind]:15} bateria {battery:6.2f} {shown}")
+    elapsed = time.perf_counter() - t0
+
+    result = {'seed': header['seed'], 'events_in_log': len(events), 'state': state.summary()}
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    speedup = state.time_ms / (elapsed * 1000) if elapsed > 0 else float('inf')
+    print(f"{state.events_applied} eventos em {elapsed * 1000:.1f} ms "
+          f"({speedup:,.0f}x o tempo real)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,812 @@
+"""
+Modo frota: vários robôs no mesmo grid, com estado do mundo compartilhado.
+
+O simulador interativo tem exatamente um robô em variáveis globais
+(robot_grid_pos, battery, robot_inventory, current_path, auto_mode). Aqui
+cada robô é um objeto Robot com bateria, inventário e plano próprios, e
+itens, estações e almoxarifados são recursos compartilhados do FleetWorld.
+
+Posição, bateria, estado, temporizadores e caminhos de todos os robôs ficam
+em arrays NumPy indexados pelo id do robô. Um tick avança a frota inteira de
+uma vez: movimento, espera, recarga e entregas são operações vetorizadas
+sobre máscaras de estado; só os robôs que chegaram ao destino ou precisam de
+uma nova decisão passam por código Python individual, e essas decisões são
+consultas ao oráculo de distâncias. Simular 200 robôs custa perto de um
+passo vetorizado, não 200 cópias da lógica global.
+
+Cada tick dura o tempo de um movimento (MOVE_TIME_MS). As regras seguem as
+do robô único: 2% de bateria por movimento, STATION_WAIT_TIME antes de
+recarregar, RECHARGE_SPEED segundos de 0% a 100%, WAREHOUSE_WAIT_TIME antes
+de entregar e DELIVERY_INTERVAL entre itens.
+
+O planejador padrão é o A* espacial de cada robô, que deixa robôs ocuparem
+a mesma célula; com planner=CooperativePlanner() (cooperative_planner.py)
+os caminhos são reservados no espaço-tempo e não há colisões. Como dois
+robôs não podem dividir uma célula, com esse planejador a frota começa fora
+do grid e cada robô entra pelo 'S' quando a célula está livre e ainda há
+item sem dono; uma frota maior que o trabalho não lota os corredores.
+
+Uso típico:
+
+    from fleet import FleetWorld
+
+    world = FleetWorld(n_robots=20, seed=42)
+    result = world.run()
+    print(result['outcome'], result['items_delivered'])
+"""
+import random
+from types import MappingProxyType
+
+import numpy as np
+
+import Simrobot as sim
+from distance_oracle import DistanceOracle, bfs_distances, multi_source_bfs, nearest_target_search
+from warehouse_grid import WarehouseGrid, CELL_FREE, CELL_START, CELL_RECHARGE, CELL_WAREHOUSE
+
+# Estados de um robô (array world.state)
+STATE_IDLE = 0        # Precisa de uma nova decisão
+STATE_MOVING = 1      # Seguindo o caminho do plano
+STATE_WAITING = 2     # Parado na estação/almoxarifado antes de recarregar/entregar
+STATE_CHARGING = 3
+STATE_DELIVERING = 4
+STATE_DONE = 5        # Nada mais a fazer
+STATE_DEAD = 6        # Sem bateria fora de uma estação
+STATE_QUEUED = 7      # Fora do grid, esperando a vez de entrar pelo 'S'
+
+STATE_NAMES = {
+    STATE_IDLE: 'idle',
+    STATE_MOVING: 'moving',
+    STATE_WAITING: 'waiting',
+    STATE_CHARGING: 'charging',
+    STATE_DELIVERING: 'delivering',
+    STATE_DONE: 'done',
+    STATE_DEAD: 'dead',
+    STATE_QUEUED: 'queued',
+}
+
+# Posição dos robôs que ainda não entraram no grid
+OFF_GRID = (-1, -1)
+
+# Duração de um movimento: a animação anda ANIMATION_SPEED px por frame a 30 FPS
+MOVE_TIME_MS = (sim.CELL_SIZE / sim.ANIMATION_SPEED) * 1000 / 30
+
+BATTERY_PER_MOVE = 2  # 2% por movimento, como no robô único
+
+# Chance de uma célula livre receber itens (a mesma de initialize_items_randomly)
+ITEM_CELL_CHANCE = 0.4
+
+# Replanejamentos seguidos sem sair do lugar antes de o robô abrir caminho
+MAX_BLOCKED_REPLANS = 6
+
+# Entre quantas vagas próximas um robô que abre caminho sorteia a sua
+YIELD_SPOT_CHOICES = 3
+
+# Limite padrão de tempo simulado por execução (1 hora)
+DEFAULT_MAX_SIM_TIME_MS = 60 * 60 * 1000
+
+
+def spatial_planner(world, robot, goal):
+    """Planejador padrão: A* no espaço, ignorando os outros robôs."""
+    return sim.a_star(world.graph, robot.pos, goal)
+
+
+class Robot:
+    """
+    Um robô da frota. Posição, bateria e estado vivem nos arrays do mundo
+    (índice self.id); inventário e ação atual ficam no próprio objeto.
+    """
+
+    def __init__(self, world, robot_id):
+        self.world = world
+        self.id = robot_id
+        self.inventory = []
+        self.action = None  # ('collect' | 'deliver' | 'recharge' | 'park' | 'yield' | 'leave', alvo)
+
+    @property
+    def pos(self):
+        x, y = self.world.pos[self.id]
+        return (int(x), int(y))
+
+    @property
+    def battery(self):
+        return float(self.world.battery[self.id])
+
+    @property
+    def state(self):
+        return STATE_NAMES[int(self.world.state[self.id])]
+
+    @property
+    def path(self):
+        """Caminho restante (posição atual inclusa)."""
+        i = self.id
+        cells = self.world.paths[i, self.world.path_idx[i]:self.world.path_len[i]]
+        return [tuple(c) for c in cells.tolist()]
+
+    def __repr__(self):
+        return f"Robot({self.id}, pos={self.pos}, battery={self.battery:.0f}%, state={self.state}, inventory={len(self.inventory)})"
+
+
+class FleetWorld:
+    """Mundo compartilhado por uma frota de robôs, avançado em ticks vetorizados."""
+
+    def __init__(self, matriz=None, n_robots=20, seed=None, grid=None, items_on_grid=None,
+                 tick_ms=MOVE_TIME_MS, planner=spatial_planner):
+        if grid is None and matriz is None and sim.matriz2 is None:
+            grid = WarehouseGrid(sim.world_grid.codes.copy())  # Mapa do Simrobot carregado de arquivo
+        if grid is None:
+            grid = WarehouseGrid.from_matrix(matriz if matriz is not None else sim.matriz2)
+        self.grid = grid
+        self.graph = MappingProxyType({node: tuple(neighbors) for node, neighbors in grid.build_graph().items()})
+        self.tick_ms = tick_ms
+        self.planner = planner
+        self.rng = random.Random(seed)
+        self._enter = getattr(planner, 'enter', None)  # Planejador com células exclusivas
+
+        self.warehouses = grid.positions(CELL_WAREHOUSE)
+        self.recharge_stations = grid.positions(CELL_RECHARGE)
+        starts = grid.positions(CELL_START)
+        self.entrance = starts[0] if starts else self.warehouses[0]
+
+        # Itens: recurso compartilhado; cada célula é reservada por no máximo um robô
+        self.items_on_grid = items_on_grid if items_on_grid is not None else self._random_items()
+        self.items_initial = sum(len(items) for items in self.items_on_grid.values())
+        self.items_left = self.items_initial  # Contador: is_finished roda a cada tick
+        self._item_trips = {}  # célula com item -> (custo item -> almoxarifado -> estação, estação mais próxima, distância)
+        self.claims = {}  # célula com item -> id do robô que vai coletá-la
+        self._item_field = None  # (células, distância, dono) da BFS multi-fonte a partir de todos os itens
+
+        self.oracle = DistanceOracle(grid, self.warehouses + self.recharge_stations + list(self.items_on_grid))
+
+        # Estado vetorizado da frota
+        n = n_robots
+        self.now = 0.0
+        self.ticks = 0
+        if self._enter is None:
+            self.pos = np.array(self._start_positions(n), dtype=np.int32).reshape(n, 2)
+            self.state = np.full(n, STATE_IDLE, dtype=np.int8)
+        else:
+            self.pos = np.tile(np.array(OFF_GRID, dtype=np.int32), (n, 1))
+            self.state = np.full(n, STATE_QUEUED, dtype=np.int8)
+        self.battery = np.full(n, 100.0)
+        self.timer = np.zeros(n)                  # Fim da espera / próxima entrega (ms)
+        self.target_battery = np.full(n, 100.0)
+        self.inventory_count = np.zeros(n, dtype=np.int32)
+        self.blocked = np.zeros(n, dtype=np.int32)  # Replanejamentos seguidos sem avançar
+        self.paths = np.zeros((n, 1, 2), dtype=np.int32)
+        self.path_len = np.ones(n, dtype=np.int32)
+        self.path_idx = np.zeros(n, dtype=np.int32)
+        self.paths[:, 0] = self.pos
+
+        # Estatísticas por robô
+        self.moves = np.zeros(n, dtype=np.int64)
+        self.delivered = np.zeros(n, dtype=np.int64)
+        self.recharge_time_ms = np.zeros(n)
+
+        self.robots = [Robot(self, i) for i in range(n)]
+
+    # ------------------------------------------------------------------
+    # Montagem do mundo
+    # ------------------------------------------------------------------
+
+    def _random_items(self):
+        """Itens aleatórios nas células livres, com a mesma regra de initialize_items_randomly."""
+        items_on_grid = {}
+        for pos in self.grid.positions(CELL_FREE):
+            if self.rng.random() < ITEM_CELL_CHANCE:
+                count = self.rng.randint(1, sim.MAX_ITEMS_PER_CELL)
+                items_on_grid[pos] = [{'type': self.rng.choice(sim.ITEM_TYPES)} for _ in range(count)]
+        return items_on_grid
+
+    def _start_positions(self, n):
+        """Robôs começam no 'S' e nas células andáveis mais próximas dele (uma por robô enquanto houver)."""
+        origin = self.entrance
+        field = bfs_distances(self.grid.walkable_flat, self.grid.rows, self.grid.cols,
+                              origin[1] * self.grid.cols + origin[0])
+        reachable = np.flatnonzero(field >= 0)
+        order = reachable[np.argsort(field[reachable], kind='stable')]
+        cells = [(int(c % self.grid.cols), int(c // self.grid.cols)) for c in order]
+        return [cells[i % len(cells)] for i in range(n)]
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def items_remaining(self):
+        return self.items_left
+
+    def items_in_inventories(self):
+        return int(self.inventory_count.sum())
+
+    def _nearest_free_item(self, pos):
+        """
+        (célula com item não reservada mais próxima de pos, distância) ou (None, None).
+        O campo multi-fonte cobre todas as células com item e só é refeito quando
+        uma célula se esvazia; se o item mais próximo já está reservado, uma BFS
+        multi-alvo sobre os livres resolve o caso.
+        """
+        o = self.oracle
+        if self._item_field is None:
+            cells = list(self.items_on_grid)
+            dist, owner = multi_source_bfs(o.walkable, o.rows, o.cols, [o._flat(c) for c in cells])
+            self._item_field = (cells, dist, owner)
+        cells, dist, owner = self._item_field
+
+        flat = o._flat(pos)
+        k = owner[flat]
+        if k >= 0 and cells[k] not in self.claims:
+            return cells[k], int(dist[flat])
+
+        free = [c for c in self.items_on_grid if c not in self.claims]
+        k, depth = nearest_target_search(o.walkable, o.rows, o.cols, flat, [o._flat(c) for c in free])
+        return (free[k], depth) if k is not None else (None, None)
+
+    def _recharge_station(self, robot):
+        """
+        Estação para o robô recarregar: entre as alcançáveis com a bateria atual,
+        a com menos robôs indo para ela (ou já recarregando), e a mais próxima no
+        empate. Sem isso a frota inteira faz fila na mesma estação.
+        """
+        queued = {}
+        for other in self.robots:
+            if other.id != robot.id and other.action is not None and other.action[0] == 'recharge':
+                queued[other.action[1]] = queued.get(other.action[1], 0) + 1
+        best, best_key = None, None
+        for station in self.recharge_stations:
+            d = self.oracle.distance(robot.pos, station)
+            if d is None or d * BATTERY_PER_MOVE > self.battery[robot.id]:
+                continue
+            key = (queued.get(station, 0), d)
+            if best_key is None or key < best_key:
+                best, best_key = station, key
+        if best is None:
+            best, _ = self.oracle.nearest_recharge_station(robot.pos)
+        return best
+
+    # ------------------------------------------------------------------
+    # Decisão e ações (só para robôs com evento neste tick)
+    # ------------------------------------------------------------------
+
+    def _needs_robots(self):
+        """Há item sem dono e todo robô no grid está ocupado (quem está 'done' não tem item viável)."""
+        return len(self.claims) < len(self.items_on_grid) and not np.any(self.state == STATE_DONE)
+
+    def _admit(self):
+        """
+        Com um planejador de células exclusivas, o próximo robô da fila entra
+        pelo 'S' se a célula está livre agora e nas reservas dos outros robôs.
+        Entra no máximo um robô por tick.
+        """
+        queued = np.flatnonzero(self.state == STATE_QUEUED)
+        if not len(queued) or not self._needs_robots():
+            return
+        if self.entrance in set(map(tuple, self.pos.tolist())):
+            return
+        robot = self.robots[queued[0]]
+        if self._enter(self, robot, self.entrance):
+            i = robot.id
+            self.pos[i] = self.entrance
+            self._set_path(i, [self.entrance])
+            self.state[i] = STATE_IDLE
+
+    def _finish(self, robot):
+        """
+        Robô sem trabalho: sai de almoxarifado/estação para não bloquear a célula.
+        Com células exclusivas e nenhum item sem dono, volta para a fila pelo 'S'
+        (recarregando antes, se a bateria não cobre a ida e, depois de reentrar,
+        a estação mais próxima do 'S'): robôs parados lotariam os corredores de
+        quem ainda trabalha.
+        """
+        i = robot.id
+        pos = robot.pos
+        if self._enter is not None and len(self.claims) >= len(self.items_on_grid):
+            d = self.oracle.distance(pos, self.entrance)
+            back = self.oracle.nearest_recharge_station(self.entrance)[1] or 0
+            if d is not None and (d + back) * BATTERY_PER_MOVE <= self.battery[i]:
+                self._start_action(robot, 'leave', self.entrance)
+                return
+            station = self._recharge_station(robot)
+            if station is not None and self.battery[i] < 100:
+                self._start_action(robot, 'recharge', station)
+                return
+        if self.grid.is_warehouse(*pos) or self.grid.is_station(*pos):
+            spot = self._free_parking_spot(pos, i)
+            if spot is not None and self.battery[i] >= BATTERY_PER_MOVE:
+                self._start_action(robot, 'park', spot)
+                return
+        self.state[i] = STATE_DONE
+
+    def _occupied_cells(self, robot_id=None):
+        """Células ocupadas por outros robôs: onde estão agora e onde o caminho atual deles termina."""
+        others = np.arange(len(self.robots))
+        if robot_id is not None:
+            others = others[others != robot_id]
+        ends = self.paths[others, self.path_len[others] - 1]
+        return set(map(tuple, self.pos[others].tolist())) | set(map(tuple, ends.tolist()))
+
+    def _free_parking_spot(self, origin, robot_id=None, avoid=(), choices=1):
+        """
+        Célula comum (sem almoxarifado/estação) desocupada mais próxima de origin,
+        fora de 'avoid'. Prefere vagas alcançáveis sem passar por outros robôs:
+        num corredor cheio, a vaga do outro lado de um robô parado não resolve nada.
+        Com choices > 1, sorteia entre as 'choices' vagas mais próximas.
+        """
+        occupied = self._occupied_cells(robot_id)
+        occupied.update(avoid)
+        others = np.arange(len(self.robots)) != robot_id if robot_id is not None else slice(None)
+        standing = set(map(tuple, self.pos[others].tolist()))
+        for blocked in (standing, ()):
+            spots = []
+            seen = {origin}
+            queue = [origin]
+            for cell in queue:
+                code = self.grid.code_at(*cell)
+                if code in (CELL_FREE, CELL_START) and cell not in occupied:
+                    spots.append(cell)
+                    if len(spots) >= choices:
+                        break
+                for neighbor, _ in self.graph.get(cell, ()):
+                    if neighbor not in seen and neighbor not in blocked:
+                        seen.add(neighbor)
+                        queue.append(neighbor)
+            if spots:
+                return self.rng.choice(spots)
+        return None
+
+    def _yield_spot(self, robot, avoid=()):
+        """
+        Vaga para um robô que abre caminho: fora de 'avoid' e das rotas espaciais
+        dos outros robôs bloqueados, para não estacionar no corredor que eles
+        precisam. A vaga é sorteada entre as mais próximas: robôs que abrem
+        caminho uns para os outros não repetem o mesmo ciclo para sempre.
+        """
+        routes = set(avoid)
+        for j in np.flatnonzero(self.blocked > 0):
+            other = self.robots[j]
+            if j != robot.id and other.action is not None:
+                routes.update(sim.a_star(self.graph, other.pos, other.action[1]))
+        # Num mapa lotado as rotas cobrem todas as vagas: qualquer vaga livre serve
+        for excluded in (routes, avoid, ()):
+            spot = self._free_parking_spot(robot.pos, robot.id, excluded, choices=YIELD_SPOT_CHOICES)
+            if spot is not None:
+                return spot
+        return None
+
+    def _decide(self, robot):
+        """Escolhe a próxima ação de um robô ocioso, com as regras de bateria do robô único."""
+        i = robot.id
+        pos = robot.pos
+        battery = self.battery[i]
+        margin = sim.DECISION_SAFETY_MARGIN
+
+        station, _ = self.oracle.nearest_recharge_station(pos)
+
+        if robot.inventory:
+            warehouse, d_warehouse = self.oracle.nearest_warehouse(pos)
+            if warehouse is None:
+                self.state[i] = STATE_DONE
+                return
+            back = self.oracle.nearest_recharge_station(warehouse)[1] or 0
+            item, d_item = (None, None) if len(robot.inventory) >= sim.ROBOT_CAPACITY else self._nearest_free_item(pos)
+            if item is not None:
+                item_warehouse, d_item_warehouse = self.oracle.nearest_warehouse(item)
+                item_back = self.oracle.nearest_recharge_station(item_warehouse)[1] or 0
+                cost = (d_item + d_item_warehouse + item_back) * BATTERY_PER_MOVE
+                if battery >= cost + margin:
+                    self._start_action(robot, 'collect', item)
+                    return
+            if battery >= (d_warehouse + back) * BATTERY_PER_MOVE + margin or station is None:
+                self._start_action(robot, 'deliver', warehouse)
+            else:
+                self._start_action(robot, 'recharge', self._recharge_station(robot))
+            return
+
+        item, d_item = self._nearest_free_item(pos)
+        if item is None:
+            self._finish(robot)
+            return
+        trip = self._item_trip(item)
+        if trip is None:
+            self.state[i] = STATE_DONE
+            return
+        if battery >= (d_item + trip[0]) * BATTERY_PER_MOVE + margin or station is None:
+            self._start_action(robot, 'collect', item)
+            return
+
+        # O item mais próximo não é seguro: tenta os outros, do mais próximo ao mais
+        # distante; depois, itens que dá para coletar e levar até uma estação, onde o
+        # robô recarrega antes de entregar
+        item = self._safe_free_item(pos, battery) or self._safe_free_item(pos, battery, via_station=True)
+        if item is not None:
+            self._start_action(robot, 'collect', item)
+            return
+        # Nenhum é seguro com a bateria atual: recarrega perto de um item que seja
+        # seguro saindo de uma estação com a bateria cheia; se nenhum for, termina
+        station = self._station_for_free_items(pos, battery)
+        if station is None and self._station_for_free_items(pos, 100) is not None:
+            station = self._recharge_station(robot)  # Recarrega no caminho até lá
+        if station is None or (station == pos and battery >= 100):
+            self._finish(robot)
+        else:
+            self._start_action(robot, 'recharge', station)
+
+    def _item_trip(self, item):
+        """
+        Custos a partir de uma célula com item: (passos item -> almoxarifado mais
+        próximo -> estação, estação mais próxima do item, passos até ela, passos
+        dessa estação -> almoxarifado -> estação ou None se não cabem numa carga).
+        None se nenhum almoxarifado é alcançável.
+        """
+        trip = self._item_trips.get(item)
+        if trip is None:
+            warehouse, d_warehouse = self.oracle.nearest_warehouse(item)
+            if warehouse is None:
+                return None
+            back = self.oracle.nearest_recharge_station(warehouse)[1] or 0
+            station, d_station = self.oracle.nearest_recharge_station(item)
+            delivery = None
+            if station is not None:
+                station_warehouse, d_delivery = self.oracle.nearest_warehouse(station)
+                d_delivery += self.oracle.nearest_recharge_station(station_warehouse)[1] or 0
+                if d_delivery * BATTERY_PER_MOVE + sim.DECISION_SAFETY_MARGIN <= 100:
+                    delivery = d_delivery
+            trip = self._item_trips[item] = (d_warehouse + back, station, d_station, delivery)
+        return trip
+
+    @staticmethod
+    def _after_item(trip, via_station):
+        """Passos depois de pegar o item: até o almoxarifado e uma estação, ou (via_station) só até a estação."""
+        if not via_station:
+            return trip[0]
+        return trip[2] if trip[1] is not None and trip[3] is not None else None
+
+    def _safe_free_item(self, pos, battery, via_station=False):
+        """Item livre mais próximo cuja rota (ver _after_item) cabe na bateria atual."""
+        margin = sim.DECISION_SAFETY_MARGIN
+        best, best_dist = None, None
+        for cell in self.items_on_grid:
+            if cell in self.claims:
+                continue
+            trip = self._item_trip(cell)
+            after = self._after_item(trip, via_station) if trip is not None else None
+            if after is None:
+                continue
+            d = self.oracle.distance(pos, cell)
+            if d is None or (best_dist is not None and d >= best_dist):
+                continue
+            if (d + after) * BATTERY_PER_MOVE + margin <= battery:
+                best, best_dist = cell, d
+        return best
+
+    def _station_for_free_items(self, pos, battery):
+        """
+        Estação mais próxima de pos, alcançável com 'battery', entre as que deixam
+        algum item livre seguro (saindo dela com a bateria cheia), ou None.
+        """
+        margin = sim.DECISION_SAFETY_MARGIN
+        stations = set()
+        for cell in self.items_on_grid:
+            if cell in self.claims:
+                continue
+            trip = self._item_trip(cell)
+            if trip is None or trip[1] is None:
+                continue
+            after = min(a for a in (trip[0], self._after_item(trip, True)) if a is not None)
+            if (trip[2] + after) * BATTERY_PER_MOVE + margin <= 100:
+                stations.add(trip[1])
+        best, best_dist = None, None
+        for station in stations:
+            d = self.oracle.distance(pos, station)
+            if d is not None and d * BATTERY_PER_MOVE <= battery and (best_dist is None or d < best_dist):
+                best, best_dist = station, d
+        return best
+
+    def _start_action(self, robot, kind, target):
+        i = robot.id
+        if kind in ('park', 'yield') and target != robot.pos and target in self._occupied_cells(i):
+            # A vaga escolhida foi tomada desde a última tentativa: procura outra
+            spot = self._yield_spot(robot)
+            target = spot if spot is not None else robot.pos
+        robot.action = (kind, target)
+        if kind == 'collect':
+            self.claims[target] = i
+        path = self.planner(self, robot, target) if target != robot.pos else [target]
+        if not path:
+            self._release_claim(robot)
+            robot.action = None
+            self.state[i] = STATE_DONE
+            return
+        if not self._path_fits(robot, kind, target, path):
+            # O caminho planejado desvia mais do que a bateria cobre: libera a
+            # reserva e troca coleta/entrega pela estação; quem ia estacionar ou
+            # abrir caminho fica onde está; se nem a estação cabe, espera um tick
+            # no lugar (esperar não gasta bateria) e tenta de novo
+            stop = getattr(self.planner, 'stop', None)
+            if stop is not None:
+                stop(self, robot)
+            if kind in ('park', 'yield', 'leave'):
+                robot.action = None
+                self._set_path(i, [robot.pos])
+                self.state[i] = STATE_IDLE if kind == 'yield' else STATE_DONE
+                return
+            station = self._recharge_station(robot) if kind in ('collect', 'deliver') else None
+            if station is not None:
+                self._release_claim(robot)
+                self._start_action(robot, 'recharge', station)
+                return
+            path = [robot.pos, robot.pos]
+        self._set_path(i, path)
+        if len(path) == 1:
+            self._arrive(robot)
+        else:
+            self.state[i] = STATE_MOVING
+
+    def _path_fits(self, robot, kind, target, path):
+        """
+        A bateria cobre os movimentos do caminho planejado e, fora da recarga,
+        a ida do alvo até a estação mais próxima (com a margem de segurança
+        para coletar ou entregar). _decide usa a distância do oráculo; o caminho
+        do planejador cooperativo pode ser mais longo, com desvios em volta das
+        reservas.
+        """
+        moves = sum(a != b for a, b in zip(path, path[1:]))
+        need = moves * BATTERY_PER_MOVE
+        if kind != 'recharge':
+            station, back = self.oracle.nearest_recharge_station(target)
+            if station is None:
+                return True  # Sem estação alcançável não há alternativa
+            need += back * BATTERY_PER_MOVE
+            if kind in ('collect', 'deliver'):
+                need += sim.DECISION_SAFETY_MARGIN
+        return need <= self.battery[robot.id]
+
+    def _set_path(self, i, path):
+        if len(path) > self.paths.shape[1]:
+            grown = np.zeros((len(self.robots), max(len(path), 2 * self.paths.shape[1]), 2), dtype=np.int32)
+            grown[:, :self.paths.shape[1]] = self.paths
+            self.paths = grown
+        self.paths[i, :len(path)] = path
+        self.path_len[i] = len(path)
+        self.path_idx[i] = 0
+
+    def _release_claim(self, robot):
+        if robot.action and robot.action[0] == 'collect' and self.claims.get(robot.action[1]) == robot.id:
+            cell = robot.action[1]
+            del self.claims[cell]
+            if self.items_on_grid.get(cell):
+                # A célula ainda tem itens e voltou a ficar livre: robôs sem trabalho reavaliam
+                self.state[self.state == STATE_DONE] = STATE_IDLE
+
+    def _arrive(self, robot):
+        """Robô chegou ao fim do caminho da ação atual."""
+        i = robot.id
+        kind, target = robot.action
+        if robot.pos != target:
+            # O planejador devolveu só uma espera (caminho bloqueado): replaneja no próximo tick
+            self.blocked[i] += 1
+            self.state[i] = STATE_IDLE
+            if self.blocked[i] >= MAX_BLOCKED_REPLANS:
+                # Bloqueado há vários ticks (ex.: cada robô parado no alvo do outro,
+                # ou um robô sem trabalho estacionado no único corredor até o alvo):
+                # os robôs parados no caminho saem da frente; se nenhum pode sair,
+                # este robô desiste da ação e abre caminho, e decide de novo depois
+                if self._vacate(sim.a_star(self.graph, robot.pos, target), i):
+                    self.blocked[i] = 0
+                    return
+                spot = self._yield_spot(robot)
+                if spot is not None:
+                    self.blocked[i] = 0
+                    self._release_claim(robot)
+                    self._start_action(robot, 'yield', spot)
+            return
+        self.blocked[i] = 0
+        if kind == 'park':
+            robot.action = None
+            self.state[i] = STATE_DONE
+        elif kind == 'leave':
+            robot.action = None
+            self.planner.leave(self, robot)
+            self.pos[i] = OFF_GRID
+            self._set_path(i, [OFF_GRID])
+            self.state[i] = STATE_QUEUED
+        elif kind == 'yield':
+            robot.action = None
+            self.state[i] = STATE_IDLE
+        elif kind == 'collect':
+            items = self.items_on_grid.get(target, [])
+            space = sim.ROBOT_CAPACITY - len(robot.inventory)
+            robot.inventory.extend(items[:space])
+            self.items_left -= len(items[:space])
+            del items[:space]
+            if not items:
+                self.items_on_grid.pop(target, None)
+                self._item_field = None
+            self._release_claim(robot)
+            self.inventory_count[i] = len(robot.inventory)
+            robot.action = None
+            self.state[i] = STATE_IDLE
+        elif kind == 'deliver':
+            self.state[i] = STATE_WAITING
+            self.timer[i] = self.now + sim.WAREHOUSE_WAIT_TIME
+        else:
+            self.state[i] = STATE_WAITING
+            self.timer[i] = self.now + sim.STATION_WAIT_TIME
+            self.target_battery[i] = 100.0
+
+    def _vacate(self, cells, robot_id):
+        """
+        Robôs parados em 'cells' (o caminho de robot_id) sem nada a fazer ali (sem
+        trabalho, ou já carregados numa estação) vão para uma vaga fora dele. Quem
+        tem uma ação pendente também está tentando sair e não é empurrado.
+        Retorna quantos robôs saíram.
+        """
+        cells = set(cells)
+        moved = 0
+        for j in np.flatnonzero((self.state == STATE_IDLE) | (self.state == STATE_DONE)):
+            other = self.robots[j]
+            if j == robot_id or other.action is not None or other.pos not in cells:
+                continue
+            spot = self._yield_spot(other, avoid=cells)
+            if spot is not None and self.battery[j] >= BATTERY_PER_MOVE:
+                self._start_action(other, 'yield', spot)
+                if self.state[j] == STATE_MOVING:  # Sem bateria para sair e ainda recarregar, fica
+                    moved += 1
+        return moved
+
+    def _invalidate_paths_through(self, cell, robot_id):
+        """Robôs em movimento cujo caminho restante passa por 'cell' replanejam a ação atual."""
+        moving = np.flatnonzero(self.state == STATE_MOVING)
+        moving = moving[moving != robot_id]
+        if not len(moving):
+            return
+        steps = np.arange(self.paths.shape[1])
+        ahead = (steps >= self.path_idx[moving, None]) & (steps < self.path_len[moving, None])
+        hits = (self.paths[moving] == cell).all(axis=2) & ahead
+        self.state[moving[hits.any(axis=1)]] = STATE_IDLE
+
+    # ------------------------------------------------------------------
+    # Tick vetorizado
+    # ------------------------------------------------------------------
+
+    def tick(self):
+        """Avança a frota inteira em um intervalo de tick_ms."""
+        dt = self.tick_ms
+        self.now += dt
+        self.ticks += 1
+        state = self.state
+
+        # 1. Movimento: todos os robôs em movimento avançam um passo do caminho
+        # (um passo que repete a célula é uma espera e não gasta bateria)
+        movers = np.flatnonzero((state == STATE_MOVING) & (self.battery > 0))
+        if len(movers):
+            self.path_idx[movers] += 1
+            new_pos = self.paths[movers, self.path_idx[movers]]
+            stepped = movers[(new_pos != self.pos[movers]).any(axis=1)]
+            self.pos[movers] = new_pos
+            self.battery[stepped] = np.maximum(self.battery[stepped] - BATTERY_PER_MOVE, 0)
+            self.moves[stepped] += 1
+        arrived = movers[self.path_idx[movers] >= self.path_len[movers] - 1]
+        stranded = np.setdiff1d(np.flatnonzero((state == STATE_MOVING) & (self.battery <= 0)), arrived)
+
+        # 2. Fim da espera na estação/almoxarifado
+        ready = np.flatnonzero((state == STATE_WAITING) & (self.now >= self.timer))
+        for i in ready:
+            if self.robots[i].action[0] == 'recharge':
+                state[i] = STATE_CHARGING
+            else:
+                state[i] = STATE_DELIVERING
+                self.timer[i] = self.now + sim.DELIVERY_INTERVAL
+
+        # 3. Recarga: RECHARGE_SPEED segundos de 0% a 100%
+        charging = state == STATE_CHARGING
+        if charging.any():
+            rate = 100.0 / (sim.RECHARGE_SPEED * 1000)
+            self.battery[charging] = np.minimum(self.battery[charging] + rate * dt, self.target_battery[charging])
+            self.recharge_time_ms[charging] += dt
+            full = np.flatnonzero(charging & (self.battery >= self.target_battery))
+            state[full] = STATE_IDLE
+            for i in full:
+                self.robots[i].action = None
+
+        # 4. Entregas: um item a cada DELIVERY_INTERVAL
+        due = np.flatnonzero((state == STATE_DELIVERING) & (self.now >= self.timer))
+        for i in due:
+            robot = self.robots[i]
+            robot.inventory.pop(0)
+            self.delivered[i] += 1
+            self.inventory_count[i] = len(robot.inventory)
+            if robot.inventory:
+                self.timer[i] += sim.DELIVERY_INTERVAL
+            else:
+                robot.action = None
+                state[i] = STATE_IDLE
+
+        # 5. Eventos individuais: chegadas, robôs sem bateria e decisões
+        for i in arrived:
+            self._arrive(self.robots[i])
+        stop = getattr(self.planner, 'stop', None)
+        for i in stranded:
+            robot = self.robots[i]
+            if stop is not None:
+                stop(self, robot)  # Libera o resto do caminho reservado
+                self._invalidate_paths_through(robot.pos, i)
+            self._release_claim(robot)
+            if self.grid.is_station(*robot.pos):
+                # Parou em cima de uma estação: recarrega ali mesmo
+                robot.action = ('recharge', robot.pos)
+                self._arrive(robot)
+            else:
+                state[i] = STATE_DEAD
+        if self._enter is not None:
+            self._admit()
+        for i in np.flatnonzero(state == STATE_IDLE):
+            robot = self.robots[i]
+            if robot.action is not None:
+                self._start_action(robot, *robot.action)  # Ação pendente: só replaneja
+            else:
+                self._decide(robot)
+
+    # ------------------------------------------------------------------
+    # Execução
+    # ------------------------------------------------------------------
+
+    def is_finished(self):
+        """Retorna o resultado ('victory', 'game_over', 'stalled') ou None se ainda há trabalho."""
+        if self.items_remaining() == 0 and self.items_in_inventories() == 0:
+            return 'victory'
+        if np.all(self.state == STATE_DEAD):
+            return 'game_over'
+        waiting = np.isin(self.state, (STATE_DONE, STATE_DEAD, STATE_QUEUED))
+        if np.all(waiting) and not (np.any(self.state == STATE_QUEUED) and self._needs_robots()):
+            return 'stalled'
+        return None
+
+    def run(self, max_sim_time_ms=DEFAULT_MAX_SIM_TIME_MS, max_ticks=None):
+        """Executa ticks até vitória, derrota, travamento ou limite de tempo."""
+        outcome = 'timeout'
+        while self.now < max_sim_time_ms:
+            if max_ticks is not None and self.ticks >= max_ticks:
+                break
+            self.tick()
+            finished = self.is_finished()
+            if finished:
+                outcome = finished
+                break
+        return self.result(outcome)
+
+    def result(self, outcome):
+        """Resumo da execução da frota."""
+        minutes = self.now / 60000
+        delivered = int(self.delivered.sum())
+        result = {
+            'outcome': outcome,
+            'robots': len(self.robots),
+            'sim_time_ms': self.now,
+            'ticks': self.ticks,
+            'items_initial': self.items_initial,
+            'items_delivered': delivered,
+            'items_remaining': self.items_remaining(),
+            'items_per_sim_minute': delivered / minutes if minutes > 0 else 0.0,
+            'moves': int(self.moves.sum()),
+            'recharge_time_ms': float(self.recharge_time_ms.sum()),
+            'robots_dead': int(np.count_nonzero(self.state == STATE_DEAD)),
+            'robots_queued': int(np.count_nonzero(self.state == STATE_QUEUED)),
+        }
+        summary = getattr(self.planner, 'summary', None)
+        if summary is not None:
+            result['planning'] = summary()
+        return result
+
+
+if __name__ == "__main__":
+    import time
+
+    from benchmark import generate_layout
+
+    grid, items = generate_layout(40, 40, seed=0, item_density=0.2, max_items=250, warehouses=6, stations=8)
+    for n in (20, 200):
+        world = FleetWorld(grid=grid, items_on_grid={pos: list(v) for pos, v in items.items()}, n_robots=n)
+        t0 = time.perf_counter()
+        result = world.run()
+        elapsed = time.perf_counter() - t0
+        print(result)
+        print(f"{n} robôs: {elapsed * 1000:.0f} ms reais, {elapsed / result['ticks'] * 1000:.2f} ms por tick")
@@ -0,0 +1,152 @@
+"""
+Perfil do tempo de cada quadro do laço interativo, por etapa.
+
+O Simrobot marca cada etapa do quadro (check_game_state, update_auto_*,
+cada chamada de desenho, display.flip...) com profiler.section(nome). O tempo
+de uma etapa em um quadro é a soma das suas execuções nele (a 16× um quadro
+tem vários passos da simulação). Os últimos 'window' quadros de cada etapa
+ficam numa janela deslizante, de onde saem os percentis mostrados no painel
+lateral, e cada quadro pode ser gravado numa linha de um CSV para análise.
+
+Desligado, section() devolve um contexto vazio compartilhado e o custo é
+o de um 'with'. Uso:
+
+    profiler = FrameProfiler(["update_auto_mode", "display_flip", TOTAL_STAGE])
+    profiler.enable()
+    profiler.begin_frame()
+    with profiler.section("update_auto_mode"):
+        ...
+    profiler.end_frame()
+    print(profiler.summary())
+"""
+import contextlib
+import csv
+import time
+from collections import deque
+
+# Quadros na janela deslizante dos percentis (10 s a 30 FPS)
+DEFAULT_WINDOW = 300
+
+# Percentis calculados por etapa
+DEFAULT_PERCENTILES = (50, 95, 99)
+
+# Etapa opcional com o tempo total do quadro, de begin_frame() a end_frame()
+TOTAL_STAGE = "frame"
+
+_NULL_SECTION = contextlib.nullcontext()
+
+
+class _Section:
+    """Contexto que soma o tempo gasto dentro dele à etapa do quadro atual."""
+    __slots__ = ('frame', 'stage', 't0')
+
+    def __init__(self, frame, stage):
+        self.frame = frame
+        self.stage = stage
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.frame[self.stage] = self.frame.get(self.stage, 0.0) + (time.perf_counter() - self.t0) * 1000
+        return False
+
+
+class FrameProfiler:
+    """Tempo por etapa de cada quadro, com percentis numa janela deslizante."""
+
+    def __init__(self, stages, window=DEFAULT_WINDOW, percentiles=DEFAULT_PERCENTILES):
+        self.stages = list(stages)
+        self.window = window
+        self.percentiles = tuple(percentiles)
+        self.enabled = False
+        self.frames = 0
+        self.history = {stage: deque(maxlen=window) for stage in self.stages}
+        self.frame = {}  # etapa -> ms somados no quadro atual
+        self._sections = {}
+        self.csv_path = None  # CSV em gravação (open_csv)
+        self._csv_file = None
+        self._csv_writer = None
+        self._frame_t0 = None
+
+    def enable(self, enabled=True):
+        """Liga ou desliga a medição (ligar começa uma janela nova)."""
+        if enabled and not self.enabled:
+            self.reset()
+        self.enabled = enabled
+
+    def reset(self):
+        """Descarta a janela e o quadro em andamento."""
+        self.frames = 0
+        self.frame = {}
+        self._sections = {}
+        self._frame_t0 = None
+        for samples in self.history.values():
+            samples.clear()
+
+    def section(self, stage):
+        """Contexto que mede 'stage' no quadro atual (vazio se desligado)."""
+        if not self.enabled:
+            return _NULL_SECTION
+        section = self._sections.get(stage)
+        if section is None:
+            if stage not in self.history:
+                raise ValueError(f"etapa desconhecida: {stage!r} (declare em FrameProfiler(stages))")
+            section = self._sections[stage] = _Section(self.frame, stage)
+        return section
+
+    def begin_frame(self):
+        """Início do trabalho do quadro (depois da espera do FPS), para a etapa TOTAL_STAGE."""
+        if self.enabled:
+            self._frame_t0 = time.perf_counter()
+
+    def end_frame(self):
+        """Fecha o quadro: guarda o tempo de cada etapa (0 se não rodou) e grava a linha do CSV."""
+        if not self.enabled:
+            return
+        frame = self.frame
+        if self._frame_t0 is not None and TOTAL_STAGE in self.history:
+            frame[TOTAL_STAGE] = (time.perf_counter() - self._frame_t0) * 1000
+            self._frame_t0 = None
+        row = [frame.get(stage, 0.0) for stage in self.stages]
+        for stage, ms in zip(self.stages, row):
+            self.history[stage].append(ms)
+        self.frames += 1
+        if self._csv_writer is not None:
+            self._csv_writer.writerow([self.frames, f"{time.perf_counter() * 1000:.3f}"]
+                                      + [f"{ms:.4f}" for ms in row])
+        frame.clear()
+
+    def stage_percentiles(self, stage):
+        """Percentis (ms) de 'stage' na janela, na ordem de self.percentiles; None sem amostras."""
+        samples = self.history.get(stage)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        last = len(ordered) - 1
+        return tuple(ordered[min(last, int(len(ordered) * p / 100))] for p in self.percentiles)
+
+    def summary(self):
+        """Lista de (etapa, percentis) para as etapas com amostras, na ordem de self.stages."""
+        result = []
+        for stage in self.stages:
+            values = self.stage_percentiles(stage)
+            if values is not None:
+                result.append((stage, values))
+        return result
+
+    def open_csv(self, path):
+        """Grava cada quadro medido em 'path': quadro, tempo real (ms) e ms de cada etapa."""
+        self.close_csv()
+        self._csv_file = open(path, 'w', newline='', encoding='utf-8')
+        self.csv_path = path
+        self._csv_writer = csv.writer(self._csv_file)
+        self._csv_writer.writerow(["frame", "wall_ms"] + [f"{stage}_ms" for stage in self.stages])
+
+    def close_csv(self):
+        if self._csv_file is not None:
+            self._csv_file.close()
+            self._csv_file = None
+            self.csv_path = None
+            self._csv_writer = None
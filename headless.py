@@ -0,0 +1,257 @@
+"""
+Motor de simulação headless do SimRobot.
+
+Executa a mesma lógica do simulador interativo (update_auto_recharge,
+update_auto_delivery, update_auto_mode) sem janela, sem mixer e sem limite
+de FPS. O tempo vem de um SimClock injetável: por padrão o motor avança por
+eventos discretos, saltando o relógio direto para a próxima expiração de
+temporizador (fim da espera, recarga completa, próximo item entregue), em
+vez de consultar a lógica a cada frame. Uma recarga de 60 segundos custa
+poucos passos de CPU.
+
+Uso típico:
+
+    from headless import HeadlessEngine
+
+    engine = HeadlessEngine(seed=42)
+    result = engine.run_mission()
+    print(result['outcome'], result['items_delivered'])
+"""
+import random
+
+import Simrobot as sim
+from sim_clock import SimClock
+
+# Intervalo de tempo simulado por passo (o mesmo passo fixo do laço interativo)
+DEFAULT_STEP_MS = sim.SIM_STEP_MS
+
+# Limite padrão de tempo simulado por missão (1 hora)
+DEFAULT_MAX_SIM_TIME_MS = 60 * 60 * 1000
+
+# Tempo simulado sem nenhum progresso para considerar a missão travada (2 minutos).
+# Uma recarga completa leva RECHARGE_SPEED + STATION_WAIT_TIME, bem menos que isso.
+DEFAULT_STALL_TIMEOUT_MS = 2 * 60 * 1000
+
+
+class HeadlessEngine:
+    """Dono do estado do mundo da simulação, avançado passo a passo sem display."""
+
+    def __init__(self, matriz=None, seed=None, clock=None, step_ms=DEFAULT_STEP_MS,
+                 event_driven=True, show_logs=False, record_path=None):
+        if matriz is None:
+            # Mapa atual do Simrobot (um WarehouseGrid se foi carregado de arquivo)
+            matriz = sim.matriz2 if sim.matriz2 is not None else sim.world_grid
+        self.matriz = matriz  # Matriz literal ou WarehouseGrid (ver Simrobot.load_map)
+        self.seed = seed
+        self.record_path = record_path  # Log de eventos (event_log) regravado a cada reset
+        self.clock = clock if clock is not None else SimClock()
+        self.step_ms = step_ms
+        self.event_driven = event_driven
+        self.show_logs = show_logs
+        # Duração de um movimento: a animação anda ANIMATION_SPEED px por frame
+        # (em ms inteiros, como o relógio e o log de eventos)
+        self.move_duration_ms = round((sim.CELL_SIZE / sim.ANIMATION_SPEED) * step_ms)
+        self.animation_end_ms = None  # Fim da animação do movimento em curso
+        self.steps = 0
+        self.step_time_ms = None  # Instante em que a lógica do último passo rodou
+        self.moves = 0
+        self.recharge_time_ms = 0
+        self.reset(seed)
+
+    # ------------------------------------------------------------------
+    # Estado do mundo
+    # ------------------------------------------------------------------
+
+    @property
+    def items_on_grid(self):
+        return sim.items_on_grid
+
+    @property
+    def robot_inventory(self):
+        return sim.robot_inventory
+
+    @property
+    def battery(self):
+        return sim.battery
+
+    @property
+    def robot_pos(self):
+        return tuple(sim.robot_grid_pos)
+
+    @property
+    def game_state(self):
+        return sim.game_state
+
+    def items_remaining(self):
+        """Quantidade de itens ainda no ambiente."""
+        return sim.remaining_item_count()
+
+    # ------------------------------------------------------------------
+    # Controle da simulação
+    # ------------------------------------------------------------------
+
+    def reset(self, seed=None):
+        """Reinicia o mundo com a matriz do motor e uma nova distribuição de itens."""
+        if seed is not None:
+            self.seed = seed
+        if self.seed is not None:
+            random.seed(self.seed)
+
+        sim.showLogs = self.show_logs
+        sim.SOUND_ENABLED = False
+        sim.mission_plan_time_budget_ms = None  # Planejamento sem relógio: a semente decide a missão
+        sim.set_time_source(self.clock)
+
+        self.clock.reset()
+        self.animation_end_ms = None
+        self.steps = 0
+        self.moves = 0
+        self.recharge_time_ms = 0
+
+        if self.record_path is not None:
+            sim.stop_event_recording()
+        sim.load_map(self.matriz)
+        sim.path_cache.reset_stats()  # Contadores do cache por missão
+        sim.reset_game()
+        sim.reset_automation_state()
+        self._snap_animation()
+        if self.record_path is not None:
+            sim.start_event_recording(self.record_path, seed=self.seed)
+
+    def now_ms(self):
+        """Tempo simulado atual em milissegundos."""
+        return self.clock.now()
+
+    def start_auto_mode(self):
+        """Ativa o modo automático total (equivalente a pressionar 'A')."""
+        sim.start_full_auto_mode()
+        sim.record_mode_change()
+
+    def close(self):
+        """Encerra a gravação de eventos, se houver."""
+        sim.stop_event_recording()
+
+    def step(self):
+        """Executa um passo da lógica e avança o relógio até o próximo instante relevante."""
+        old_pos = list(sim.robot_grid_pos)
+        if sim.game_state == "playing":
+            sim.check_game_state()
+            sim.update_auto_recharge()
+            sim.update_auto_delivery()
+            sim.update_auto_mode()
+            sim.record_mode_change()
+        self.steps += 1
+        recharging = sim.is_recharging
+        before = self.step_time_ms = self.clock.now()
+
+        if sim.robot_grid_pos != old_pos:
+            # Movimento iniciado: a posição visual fica na célula anterior até o fim da animação
+            self.moves += 1
+            self.animation_end_ms = self.clock.now() + self.move_duration_ms
+            sim.robot_real_pos = [old_pos[0] * sim.CELL_SIZE, old_pos[1] * sim.CELL_SIZE]
+            self.clock.advance(self.step_ms)
+        elif self.event_driven:
+            self._advance_to_next_event()
+        else:
+            self.clock.advance(self.step_ms)
+
+        if recharging:
+            self.recharge_time_ms += self.clock.now() - before
+
+        if self.animation_end_ms is not None and self.clock.now() >= self.animation_end_ms:
+            self._snap_animation()
+
+    def _advance_to_next_event(self):
+        """Salta o relógio para o próximo evento agendado (ou um frame se há trabalho imediato)."""
+        now = self.clock.now()
+        animating = self.animation_end_ms is not None
+        if not animating and sim.automation_pending():
+            self.clock.advance(self.step_ms)
+            return
+
+        candidates = [sim.next_timer_deadline()]
+        if animating:
+            candidates.append(self.animation_end_ms)
+        future = [t for t in candidates if t is not None and t > now]
+        if future:
+            self.clock.advance_to(min(future))
+        else:
+            self.clock.advance(self.step_ms)
+
+    def run_mission(self, max_sim_time_ms=DEFAULT_MAX_SIM_TIME_MS, max_steps=None, stall_timeout_ms=None):
+        """
+        Executa uma missão completa no modo automático total.
+        Retorna dicionário com o resultado ('victory', 'game_over', 'stopped', 'stalled' ou 'timeout').
+        Com stall_timeout_ms, a missão termina como 'stalled' se nada muda (posição,
+        inventário, entregas, bateria) durante esse tempo simulado.
+        """
+        self.start_auto_mode()
+        start_time = self.clock.now()
+        progress = self._progress_signature()
+        last_progress_time = start_time
+
+        outcome = "timeout"
+        end_time = None  # Vitória/derrota: o instante do passo que encerrou a missão
+        while self.clock.now() - start_time < max_sim_time_ms:
+            if max_steps is not None and self.steps >= max_steps:
+                break
+            self.step()
+            if stall_timeout_ms is not None:
+                signature = self._progress_signature()
+                if signature != progress:
+                    progress = signature
+                    last_progress_time = self.clock.now()
+                elif self.clock.now() - last_progress_time >= stall_timeout_ms:
+                    outcome = "stalled"
+                    break
+            if sim.game_state != "playing":
+                outcome = sim.game_state
+                end_time = self.step_time_ms
+                break
+            if sim.auto_mode == sim.AUTO_MODE_OFF:
+                # Modo automático encerrou sozinho: confere vitória/derrota
+                sim.check_game_state()
+                outcome = sim.game_state if sim.game_state != "playing" else "stopped"
+                end_time = self.step_time_ms
+                break
+
+        if sim.event_recorder is not None:
+            sim.event_recorder.flush()
+        return self.result(outcome, (end_time if end_time is not None else self.clock.now()) - start_time)
+
+    def result(self, outcome, sim_time_ms):
+        """Resumo do estado atual da missão."""
+        return {
+            'outcome': outcome,
+            'seed': self.seed,
+            'sim_time_ms': sim_time_ms,
+            'steps': self.steps,
+            'items_initial': sim.total_items_initial,
+            'items_delivered': sim.items_delivered_count,
+            'items_remaining': self.items_remaining(),
+            'inventory': len(sim.robot_inventory),
+            'battery': sim.battery,
+            'moves': self.moves,
+            'recharge_time_ms': self.recharge_time_ms,
+            'path_cache': sim.path_cache.stats(),
+        }
+
+    def _progress_signature(self):
+        """Resumo do estado que muda sempre que a missão avança."""
+        return (tuple(sim.robot_grid_pos), len(sim.robot_inventory), sim.items_delivered_count, sim.battery)
+
+    def _snap_animation(self):
+        """Conclui a animação: a posição visual passa a coincidir com a lógica."""
+        self.animation_end_ms = None
+        sim.robot_real_pos = [sim.robot_grid_pos[0] * sim.CELL_SIZE, sim.robot_grid_pos[1] * sim.CELL_SIZE]
+
+
+if __name__ == "__main__":
+    import time
+
+    engine = HeadlessEngine(seed=0)
+    t0 = time.perf_counter()
+    result = engine.run_mission()
+    elapsed = time.perf_counter() - t0
+    print(result)
+    print(f"Tempo real: {elapsed * 1000:.1f} ms para {result['sim_time_ms'] / 1000:.1f} s simulados")
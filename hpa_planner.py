@@ -0,0 +1,323 @@
+"""
+Planejamento hierárquico de caminhos (HPA*) para almoxarifados grandes.
+
+O a_star do Simrobot expande célula por célula; num mapa de 1000x1000 uma
+rota longa expande centenas de milhares de células. Aqui o grid é dividido
+em blocos de CLUSTER_SIZE x CLUSTER_SIZE células e a busca é feita em dois
+níveis:
+
+- entradas: em cada fronteira entre dois blocos vizinhos, cada trecho
+  contínuo de pares de células andáveis (uma de cada lado) vira uma
+  transição no meio do trecho, ou duas nas pontas se o trecho tem
+  ENTRANCE_SPLIT células ou mais. As células das transições são os nós do
+  grafo abstrato, ligadas ao par do outro lado com custo 1;
+- arestas internas: dentro de cada bloco, uma BFS limitada ao bloco dá a
+  distância entre cada par de nós do bloco. São calculadas na primeira vez
+  que a busca passa pelo bloco e guardadas até o bloco mudar;
+- consulta: início e alvo entram temporariamente no grafo (BFS no próprio
+  bloco), um A* roda sobre os nós abstratos e só os trechos do caminho
+  escolhido são refinados em células, por BFS dentro de cada bloco.
+
+Como toda fronteira tem pelo menos uma transição por trecho, existe caminho
+abstrato sempre que existe caminho no grid. O caminho pode ser alguns passos
+mais longo que o ótimo (ele passa pelas transições). Quando uma célula muda
+(update_cell), só as fronteiras do bloco dela são refeitas e as arestas
+internas do bloco e dos vizinhos são descartadas.
+
+Uso:
+
+    planner = HierarchicalPlanner(grid)          # WarehouseGrid
+    path = planner.find_path((0, 0), (990, 870)) # lista de células, como o a_star
+    steps = planner.distance((0, 0), (990, 870)) # só o custo, sem refinar
+    grid.set_code(10, 20, CELL_OBSTACLE)
+    planner.update_cell(10, 20)
+"""
+import heapq
+from collections import deque
+
+# Lado (em células) de cada bloco
+CLUSTER_SIZE = 16
+
+# Trechos de fronteira com esta largura ou mais ganham duas transições (nas pontas)
+ENTRANCE_SPLIT = 6
+
+
+def _manhattan(a, b):
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+class HierarchicalPlanner:
+    """Grafo abstrato de transições entre blocos de um WarehouseGrid, com refinamento sob demanda."""
+
+    def __init__(self, grid, cluster_size=CLUSTER_SIZE):
+        self.grid = grid
+        self.size = cluster_size
+        self.cluster_cols = -(-grid.cols // cluster_size)
+        self.cluster_rows = -(-grid.rows // cluster_size)
+        self.borders = {}   # ('E' | 'S', cx, cy) -> [(célula deste bloco, célula do vizinho), ...]
+        self.inter = {}     # nó -> {nó do outro lado: 1}
+        self.intra = {}     # bloco -> {nó: {outro nó do bloco: distância}} (preenchido sob demanda)
+        self.stats = {'queries': 0, 'expanded': 0, 'clusters_built': 0, 'cluster_updates': 0}
+        for cy in range(self.cluster_rows):
+            for cx in range(self.cluster_cols):
+                self._build_border('E', cx, cy)
+                self._build_border('S', cx, cy)
+
+    # ------------------------------------------------------------------
+    # Blocos e fronteiras
+    # ------------------------------------------------------------------
+
+    def cluster_of(self, pos):
+        return pos[0] // self.size, pos[1] // self.size
+
+    def _cluster_bounds(self, cluster):
+        """(x0, y0, x1, y1) do bloco, x1/y1 exclusivos."""
+        cx, cy = cluster
+        x0, y0 = cx * self.size, cy * self.size
+        return x0, y0, min(x0 + self.size, self.grid.cols), min(y0 + self.size, self.grid.rows)
+
+    def _walkable(self, x, y):
+        return self.grid.walkable_flat[y * self.grid.cols + x] != 0
+
+    def _border_cells(self, side, cx, cy):
+        """Pares (célula deste bloco, célula do vizinho) ao longo da fronteira leste ou sul."""
+        x0, y0, x1, y1 = self._cluster_bounds((cx, cy))
+        if side == 'E':
+            if x1 >= self.grid.cols:
+                return []
+            return [((x1 - 1, y), (x1, y)) for y in range(y0, y1)]
+        if y1 >= self.grid.rows:
+            return []
+        return [((x, y1 - 1), (x, y1)) for x in range(x0, x1)]
+
+    def _build_border(self, side, cx, cy):
+        """Calcula as transições de uma fronteira e liga os pares no grafo abstrato."""
+        transitions = []
+        run = []
+        for a, b in self._border_cells(side, cx, cy) + [(None, None)]:
+            if a is not None and self._walkable(*a) and self._walkable(*b):
+                run.append((a, b))
+                continue
+            if run:
+                if len(run) >= ENTRANCE_SPLIT:
+                    transitions.append(run[0])
+                    transitions.append(run[-1])
+                else:
+                    transitions.append(run[len(run) // 2])
+                run = []
+        self.borders[(side, cx, cy)] = transitions
+        for a, b in transitions:
+            self.inter.setdefault(a, {})[b] = 1
+            self.inter.setdefault(b, {})[a] = 1
+
+    def _clear_border(self, side, cx, cy):
+        for a, b in self.borders.pop((side, cx, cy), ()):
+            for u, v in ((a, b), (b, a)):
+                links = self.inter.get(u)
+                if links is not None:
+                    links.pop(v, None)
+                    if not links:
+                        del self.inter[u]
+
+    def _cluster_border_keys(self, cluster):
+        """As quatro fronteiras do bloco (as do oeste e do norte pertencem aos vizinhos)."""
+        cx, cy = cluster
+        keys = [('E', cx, cy), ('S', cx, cy)]
+        if cx > 0:
+            keys.append(('E', cx - 1, cy))
+        if cy > 0:
+            keys.append(('S', cx, cy - 1))
+        return keys
+
+    def cluster_nodes(self, cluster):
+        """Nós abstratos (células de transição) que ficam dentro do bloco."""
+        nodes = set()
+        for key in self._cluster_border_keys(cluster):
+            for a, b in self.borders.get(key, ()):
+                nodes.add(a if self.cluster_of(a) == cluster else b)
+        return nodes
+
+    def update_cell(self, x, y):
+        """A célula (x, y) mudou no grid: refaz as fronteiras do bloco e descarta as arestas internas afetadas."""
+        cluster = self.cluster_of((x, y))
+        for key in self._cluster_border_keys(cluster):
+            self._clear_border(*key)
+            self._build_border(*key)
+        cx, cy = cluster
+        for neighbor in ((cx, cy), (cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)):
+            self.intra.pop(neighbor, None)
+        self.stats['cluster_updates'] += 1
+
+    # ------------------------------------------------------------------
+    # Buscas dentro de um bloco
+    # ------------------------------------------------------------------
+
+    def _cluster_bfs(self, cluster, source, stop_at=None):
+        """
+        BFS a partir de 'source' sem sair do bloco. Retorna (dist, parent) por
+        índice local; com 'stop_at', para ao alcançar essa célula.
+        """
+        x0, y0, x1, y1 = self._cluster_bounds(cluster)
+        w = x1 - x0
+        n = w * (y1 - y0)
+        cols = self.grid.cols
+        walkable = self.grid.walkable_flat
+        dist = [-1] * n
+        parent = [-1] * n
+        start = (source[1] - y0) * w + (source[0] - x0)
+        stop = (stop_at[1] - y0) * w + (stop_at[0] - x0) if stop_at is not None else -1
+        dist[start] = 0
+        queue = deque([start])
+        while queue:
+            idx = queue.popleft()
+            if idx == stop:
+                break
+            ly, lx = divmod(idx, w)
+            gx, gy = x0 + lx, y0 + ly
+            d = dist[idx] + 1
+            if lx + 1 < w and dist[idx + 1] < 0 and walkable[gy * cols + gx + 1]:
+                dist[idx + 1] = d
+                parent[idx + 1] = idx
+                queue.append(idx + 1)
+            if lx > 0 and dist[idx - 1] < 0 and walkable[gy * cols + gx - 1]:
+                dist[idx - 1] = d
+                parent[idx - 1] = idx
+                queue.append(idx - 1)
+            if idx + w < n and dist[idx + w] < 0 and walkable[(gy + 1) * cols + gx]:
+                dist[idx + w] = d
+                parent[idx + w] = idx
+                queue.append(idx + w)
+            if idx >= w and dist[idx - w] < 0 and walkable[(gy - 1) * cols + gx]:
+                dist[idx - w] = d
+                parent[idx - w] = idx
+                queue.append(idx - w)
+        return dist, parent
+
+    def _distances_in_cluster(self, cluster, source, targets):
+        """{alvo: distância} para os alvos do bloco alcançáveis a partir de 'source' sem sair dele."""
+        x0, y0, x1, _ = self._cluster_bounds(cluster)
+        w = x1 - x0
+        dist, _ = self._cluster_bfs(cluster, source)
+        found = {}
+        for target in targets:
+            d = dist[(target[1] - y0) * w + (target[0] - x0)]
+            if d >= 0 and target != source:
+                found[target] = d
+        return found
+
+    def _cluster_edges(self, cluster):
+        """
+        Vizinhos de cada nó do bloco no grafo abstrato (arestas internas e de
+        transição), calculados na primeira consulta que passa pelo bloco.
+        """
+        edges = self.intra.get(cluster)
+        if edges is None:
+            nodes = self.cluster_nodes(cluster)
+            edges = {}
+            for node in nodes:
+                links = self._distances_in_cluster(cluster, node, nodes)
+                links.update(self.inter.get(node, {}))
+                edges[node] = tuple(links.items())
+            self.intra[cluster] = edges
+            self.stats['clusters_built'] += 1
+        return edges
+
+    def _refine_segment(self, a, b):
+        """Células de a até b (sem a) dentro do bloco de ambos."""
+        cluster = self.cluster_of(a)
+        x0, y0, x1, _ = self._cluster_bounds(cluster)
+        w = x1 - x0
+        _, parent = self._cluster_bfs(cluster, a, stop_at=b)
+        segment = []
+        idx = (b[1] - y0) * w + (b[0] - x0)
+        start = (a[1] - y0) * w + (a[0] - x0)
+        while idx != start:
+            ly, lx = divmod(idx, w)
+            segment.append((x0 + lx, y0 + ly))
+            idx = parent[idx]
+        segment.reverse()
+        return segment
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
+    def _abstract_search(self, start, goal):
+        """A* sobre os nós abstratos. Retorna (lista de nós de start a goal, custo) ou (None, None)."""
+        grid = self.grid
+        if not (grid.is_walkable(*start) and grid.is_walkable(*goal)):
+            return None, None
+        self.stats['queries'] += 1
+        if start == goal:
+            return [start], 0
+
+        size = self.size
+        start_cluster = self.cluster_of(start)
+        goal_cluster = self.cluster_of(goal)
+        start_targets = self.cluster_nodes(start_cluster)
+        if start_cluster == goal_cluster:
+            start_targets.add(goal)  # Caminho direto dentro do bloco
+        start_edges = self._distances_in_cluster(start_cluster, start, start_targets)
+        start_edges.update(self.inter.get(start, {}))
+        # Distâncias de cada nó do bloco do alvo até o alvo (o grid não é direcionado)
+        goal_edges = self._distances_in_cluster(goal_cluster, goal, self.cluster_nodes(goal_cluster))
+        gx, gy = goal
+
+        g_score = {start: 0}
+        came_from = {}
+        open_set = [(_manhattan(start, goal), 0, start)]  # (f, -g, nó): empates em f vão para o mais fundo
+        expanded = 0
+        while open_set:
+            _, neg_g, node = heapq.heappop(open_set)
+            g = -neg_g
+            if node == goal:
+                self.stats['expanded'] += expanded
+                nodes = [goal]
+                while node in came_from:
+                    node = came_from[node]
+                    nodes.append(node)
+                return nodes[::-1], g
+            if g > g_score[node]:
+                continue
+            expanded += 1
+
+            if node == start:
+                neighbors = start_edges.items()
+            else:
+                cluster = (node[0] // size, node[1] // size)
+                edges = self.intra.get(cluster)
+                if edges is None:
+                    edges = self._cluster_edges(cluster)
+                neighbors = edges[node]
+                if node in goal_edges:
+                    neighbors = neighbors + ((goal, goal_edges[node]),)
+
+            for neighbor, cost in neighbors:
+                tentative = g + cost
+                if tentative < g_score.get(neighbor, tentative + 1):
+                    g_score[neighbor] = tentative
+                    came_from[neighbor] = node
+                    f = tentative + abs(neighbor[0] - gx) + abs(neighbor[1] - gy)
+                    heapq.heappush(open_set, (f, -tentative, neighbor))
+        self.stats['expanded'] += expanded
+        return None, None
+
+    def distance(self, start, goal):
+        """Passos do caminho hierárquico de start a goal (sem refinar), ou None se não há caminho."""
+        _, cost = self._abstract_search(tuple(start), tuple(goal))
+        return cost
+
+    def find_path(self, start, goal):
+        """Caminho célula a célula de start a goal (lista de posições, como o a_star); [] se não há."""
+        start = tuple(start)
+        goal = tuple(goal)
+        nodes, _ = self._abstract_search(start, goal)
+        if nodes is None:
+            return []
+        path = [start]
+        for a, b in zip(nodes, nodes[1:]):
+            if self.cluster_of(a) != self.cluster_of(b):
+                path.append(b)  # Transição entre blocos: células vizinhas
+            else:
+                path.extend(self._refine_segment(a, b))
+        return path
@@ -0,0 +1,89 @@
+"""
+Índices incrementais de itens e marcos do ambiente.
+
+Contar os itens restantes com sum(len(items) for items in items_on_grid.values())
+custa O(células com itens) e era feito a cada frame (check_game_state, painel)
+e a cada decisão. ItemIndex mantém os contadores (total, por tipo, células com
+itens e entregues por tipo) e é atualizado a cada coleta e entrega, então as
+consultas são O(1) com qualquer quantidade de itens. As células com itens
+também ficam em baldes de ITEM_CHUNK x ITEM_CHUNK células, para achar os itens
+de uma região (a vista da câmera) sem percorrer o ambiente inteiro.
+
+LandmarkIndex guarda as posições fixas do mapa (almoxarifados, estações e
+início), que antes eram procuradas no grid inteiro a cada decisão; é refeito
+só quando o mapa muda.
+"""
+from warehouse_grid import CELL_RECHARGE, CELL_START, CELL_WAREHOUSE
+
+# Lado (em células) dos baldes da consulta espacial de itens
+ITEM_CHUNK = 32
+
+
+class ItemIndex:
+    """Contadores dos itens de um dicionário items_on_grid {(x, y): [itens]}."""
+
+    def __init__(self, items_on_grid=None):
+        self.version = 0  # Muda a cada alteração (caches de desenho)
+        self.rebuild({} if items_on_grid is None else items_on_grid)
+
+    def rebuild(self, items_on_grid):
+        """Recalcula tudo a partir de 'items_on_grid' (O(itens)); passa a indexar este dicionário."""
+        self.items_on_grid = items_on_grid
+        self.remaining = 0
+        self.cells = 0
+        self.type_counts = {}
+        self.delivered_type_counts = {}
+        self.chunks = {}  # (x // ITEM_CHUNK, y // ITEM_CHUNK) -> células com itens
+        self.version += 1
+        for cell, items in items_on_grid.items():
+            if items:
+                self.cells += 1
+                self.remaining += len(items)
+                for item in items:
+                    self.type_counts[item['type']] = self.type_counts.get(item['type'], 0) + 1
+                key = (cell[0] // ITEM_CHUNK, cell[1] // ITEM_CHUNK)
+                bucket = self.chunks.get(key)
+                if bucket is None:
+                    bucket = self.chunks[key] = set()
+                bucket.add(tuple(cell))
+
+    def is_current(self, items_on_grid):
+        """True se o índice corresponde a este dicionário (e não a um substituído depois)."""
+        return self.items_on_grid is items_on_grid
+
+    def collected(self, cell, item, cell_emptied):
+        """Um item saiu da célula 'cell' (já removido da lista da célula)."""
+        self.remaining -= 1
+        self.type_counts[item['type']] -= 1
+        self.version += 1
+        if cell_emptied:
+            self.cells -= 1
+            key = (cell[0] // ITEM_CHUNK, cell[1] // ITEM_CHUNK)
+            bucket = self.chunks.get(key)
+            if bucket is not None:
+                bucket.discard(tuple(cell))
+                if not bucket:
+                    del self.chunks[key]
+
+    def cells_in_rect(self, c0, r0, c1, r1):
+        """Células com itens dentro de colunas [c0, c1) e linhas [r0, r1)."""
+        found = []
+        for cy in range(r0 // ITEM_CHUNK, (r1 - 1) // ITEM_CHUNK + 1):
+            for cx in range(c0 // ITEM_CHUNK, (c1 - 1) // ITEM_CHUNK + 1):
+                bucket = self.chunks.get((cx, cy))
+                if bucket:
+                    found.extend(cell for cell in bucket if c0 <= cell[0] < c1 and r0 <= cell[1] < r1)
+        return found
+
+    def delivered(self, item):
+        """Um item do inventário foi entregue no almoxarifado."""
+        self.delivered_type_counts[item['type']] = self.delivered_type_counts.get(item['type'], 0) + 1
+
+
+class LandmarkIndex:
+    """Posições fixas de um WarehouseGrid, em ordem de varredura (como grid.positions)."""
+
+    def __init__(self, grid):
+        self.warehouses = grid.positions(CELL_WAREHOUSE)
+        self.recharge_stations = grid.positions(CELL_RECHARGE)
+        self.starts = grid.positions(CELL_START)
@@ -0,0 +1,189 @@
+"""
+Carregamento de mapas de arquivo: texto, CSV e formato binário compacto.
+
+Todos os formatos usam os mesmos caracteres da matriz do Simrobot
+('S' início, 'R' recarga, 'A' almoxarifado, '1' livre, '0' obstáculo) e
+resultam num WarehouseGrid.
+
+- Texto (.txt, .map): uma linha por linha do grid, com as células juntas
+  ("A11R") ou separadas por espaços; linhas vazias e começadas por '#' são
+  ignoradas.
+- CSV (.csv): células separadas por ',' ou ';' (aspas são ignoradas).
+- Binário (.srmap): cabeçalho b"SRMP", versão u16, linhas u32, colunas u32
+  (little-endian), seguido dos códigos uint8 linha a linha. É aberto com
+  numpy.memmap, sem copiar os códigos para a memória: a abertura só faz uma
+  passada vetorizada para rejeitar códigos desconhecidos, e as camadas
+  derivadas do WarehouseGrid (flags, walkable_flat) são calculadas no
+  primeiro uso. O mapeamento é cópia-na-escrita: set_cell altera o grid em
+  memória, nunca o arquivo.
+
+Texto e CSV são convertidos com uma tabela de 256 bytes em NumPy, sem criar
+uma string por célula. Uso:
+
+    import Simrobot as sim
+    from map_loader import load_map_file
+    sim.load_map(load_map_file("armazem.srmap"))
+
+Conversão de um mapa em texto para o formato binário:
+
+    python map_loader.py armazem.txt armazem.srmap
+"""
+import argparse
+import os
+import struct
+import sys
+
+import numpy as np
+
+from warehouse_grid import WarehouseGrid, CHAR_TO_CODE, CODE_TO_CHAR
+
+MAGIC = b"SRMP"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sHII")
+
+BINARY_EXTENSIONS = (".srmap",)
+CSV_EXTENSIONS = (".csv",)
+
+# Caractere (byte) -> código da célula; 255 marca um caractere inválido
+_INVALID = 255
+_CHAR_CODES = np.full(256, _INVALID, dtype=np.uint8)
+for _char, _code in CHAR_TO_CODE.items():
+    _CHAR_CODES[ord(_char)] = _code
+
+# Maior código de célula válido (os códigos vão de 0 a _MAX_CODE)
+_MAX_CODE = max(CODE_TO_CHAR)
+
+# Separadores removidos de cada linha antes da conversão
+_STRIP_TEXT = str.maketrans("", "", " \t")
+_STRIP_CSV = str.maketrans("", "", " \t,;\"'")
+
+
+# ==================== TEXTO E CSV ====================
+
+def parse_text_map(text, csv=False):
+    """Converte o conteúdo de um mapa em texto (ou CSV) para um WarehouseGrid."""
+    strip = _STRIP_CSV if csv else _STRIP_TEXT
+    rows = []
+    line_numbers = []
+    for number, line in enumerate(text.splitlines(), start=1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        rows.append(line.translate(strip))
+        line_numbers.append(number)
+    if not rows:
+        raise ValueError("mapa vazio")
+
+    cols = len(rows[0])
+    for row, number in zip(rows, line_numbers):
+        if len(row) != cols:
+            raise ValueError(f"linha {number}: {len(row)} células, esperado {cols}")
+
+    try:
+        data = "".join(rows).encode("ascii")
+    except UnicodeEncodeError as e:
+        raise ValueError(f"caractere inválido no mapa: {e.object[e.start]!r}") from None
+    codes = _CHAR_CODES[np.frombuffer(data, dtype=np.uint8)].reshape(len(rows), cols)
+
+    invalid = np.flatnonzero(codes == _INVALID)
+    if invalid.size:
+        row, col = divmod(int(invalid[0]), cols)
+        raise ValueError(f"linha {line_numbers[row]}, coluna {col + 1}: "
+                         f"caractere inválido {rows[row][col]!r} (use S, R, A, 1 ou 0)")
+    return WarehouseGrid(codes)
+
+
+def load_text_map(path, csv=None):
+    """Lê um mapa em texto ou CSV (CSV se csv=True ou se a extensão for .csv)."""
+    if csv is None:
+        csv = path.lower().endswith(CSV_EXTENSIONS)
+    with open(path, encoding="utf-8") as f:
+        return parse_text_map(f.read(), csv=csv)
+
+
+def save_text_map(path, grid, csv=False):
+    """Grava o grid em texto (células juntas) ou CSV (células separadas por vírgula)."""
+    table = np.array([ord(CODE_TO_CHAR.get(code, '0')) for code in range(256)], dtype=np.uint8)
+    chars = table[grid.codes]
+    with open(path, "w", encoding="ascii", newline="\n") as f:
+        for row in chars:
+            line = row.tobytes().decode("ascii")
+            f.write((",".join(line) if csv else line) + "\n")
+
+
+# ==================== BINÁRIO ====================
+
+def save_binary_map(path, grid):
+    """Grava o grid no formato binário (.srmap)."""
+    codes = np.ascontiguousarray(grid.codes, dtype=np.uint8)
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, grid.rows, grid.cols))
+        codes.tofile(f)
+
+
+def read_binary_header(path):
+    """Lê e valida o cabeçalho de um .srmap. Retorna (linhas, colunas)."""
+    with open(path, "rb") as f:
+        header = f.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise ValueError(f"{path}: arquivo curto demais para um mapa binário")
+    magic, version, rows, cols = _HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: não é um mapa binário do SimRobot")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"{path}: versão {version} do formato não suportada")
+    expected = _HEADER.size + rows * cols
+    if os.path.getsize(path) != expected:
+        raise ValueError(f"{path}: tamanho {os.path.getsize(path)} bytes, esperado {expected}")
+    return rows, cols
+
+
+def load_binary_map(path, memory_map=True):
+    """
+    Abre um .srmap. Com memory_map=True os códigos ficam num numpy.memmap
+    (cópia-na-escrita); senão são lidos inteiros para a memória.
+    """
+    rows, cols = read_binary_header(path)
+    if memory_map:
+        codes = np.memmap(path, dtype=np.uint8, mode="c", offset=_HEADER.size, shape=(rows, cols))
+    else:
+        codes = np.fromfile(path, dtype=np.uint8, offset=_HEADER.size).reshape(rows, cols)
+    if codes.size and codes.max() > _MAX_CODE:
+        row, col = divmod(int(np.argmax(codes.ravel() > _MAX_CODE)), cols)
+        raise ValueError(f"{path}: linha {row + 1}, coluna {col + 1}: "
+                         f"código de célula inválido {int(codes[row, col])} (use 0 a {_MAX_CODE})")
+    return WarehouseGrid(codes)
+
+
+# ==================== ENTRADA ÚNICA ====================
+
+def load_map_file(path, memory_map=True):
+    """Carrega um mapa pelo formato da extensão: .srmap (binário), .csv ou texto."""
+    if path.lower().endswith(BINARY_EXTENSIONS):
+        return load_binary_map(path, memory_map=memory_map)
+    return load_text_map(path)
+
+
+def save_map_file(path, grid):
+    """Grava o grid no formato da extensão: .srmap (binário), .csv ou texto."""
+    lower = path.lower()
+    if lower.endswith(BINARY_EXTENSIONS):
+        save_binary_map(path, grid)
+    else:
+        save_text_map(path, grid, csv=lower.endswith(CSV_EXTENSIONS))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Converte mapas do SimRobot entre texto, CSV e binário")
+    parser.add_argument('source', help="mapa de entrada (.txt, .map, .csv ou .srmap)")
+    parser.add_argument('target', help="mapa de saída (o formato vem da extensão)")
+    args = parser.parse_args(argv)
+
+    grid = load_map_file(args.source)
+    save_map_file(args.target, grid)
+    print(f"{args.source} -> {args.target}: {grid.rows}x{grid.cols}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
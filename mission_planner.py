@@ -0,0 +1,639 @@
+"""
+Planejador de missão do modo automático total: roteamento de veículos com
+capacidade (CVRP) e paradas de recarga.
+
+A missão é vista como um conjunto de viagens. Cada viagem sai de onde a
+anterior terminou, coleta até ROBOT_CAPACITY itens e termina num
+almoxarifado. Antes de cada trecho (até um item ou até o almoxarifado) o
+robô precisa ter bateria para o trecho e para chegar depois a uma estação;
+se não tem, o plano insere uma parada de recarga na estação com menor
+desvio, e a recarga planejada só vai até o que o plano gasta até a próxima
+parada. Custo de
+uma solução = movimentos totais (cada um gasta 2% de bateria e tempo de
+recarga) + uma penalidade fixa por parada de recarga (a espera de
+STATION_WAIT_TIME antes de começar a recarregar).
+
+Construção: economias de Clarke-Wright e varredura angular em torno dos
+almoxarifados; fica a melhor das duas. Melhoria: busca local até um ótimo
+local ou até o limite de avaliações de custo:
+- 2-opt dentro de cada viagem (inverte um trecho);
+- Or-opt: move um trecho de 1 a 3 paradas para outra posição, na mesma
+  viagem ou em outra com capacidade livre;
+- Or-opt na sequência de viagens (move uma viagem inteira).
+
+As distâncias vêm do DistanceOracle (BFS), então o custo estimado é o
+número exato de movimentos do A*. Como a tabela custa uma BFS por célula,
+cada plano cobre só as MAX_PLAN_CELLS células com itens mais perto do robô
+(as outras ficam em plan.deferred para o plano seguinte). O trabalho é
+limitado por contagem (células e avaliações), não pelo relógio: a mesma
+semente dá a mesma missão em qualquer máquina. Na interface, um prazo em
+milissegundos corta também por tempo. Uso:
+
+    from mission_planner import MissionPlanner
+
+    planner = MissionPlanner(oracle, start, battery, items_on_grid, capacity=3)
+    plan = planner.plan()                # ou plan(time_budget_ms=200) na interface
+    for kind, target in plan.actions:   # ('collect' | 'deliver' | 'recharge', (x, y))
+        ...
+"""
+import math
+import time
+
+# Avaliações de custo (uma simulação da sequência de viagens cada) por plano
+# na construção + busca local: limite de trabalho, igual em qualquer máquina
+DEFAULT_MAX_EVALUATIONS = 3000
+
+# Fração do prazo (time_budget_ms, só na interface) que a tabela de distâncias pode usar
+DISTANCE_BUDGET_SHARE = 0.5
+
+# Células com itens por plano (as mais perto do robô); as demais ficam para o
+# próximo plano, feito quando este acaba
+MAX_PLAN_CELLS = 32
+
+# Penalidade (em movimentos) por parada de recarga: a espera de 3 s na
+# estação equivale a uns 4,5 movimentos de 667 ms
+RECHARGE_STOP_MOVES = 5
+
+# Quantos pontos de partida a varredura angular experimenta
+SWEEP_STARTS = 8
+
+# Maior trecho movido de uma vez pelo Or-opt
+MAX_SEGMENT = 3
+
+INFEASIBLE = float('inf')
+
+
+class MissionPlan:
+    """Plano executável: lista de ações e metas de recarga por ação."""
+
+    def __init__(self, actions, charge_targets, moves, recharge_stops, trips, unserved, deferred,
+                 construction, planning_ms, improvements, evaluations):
+        self.actions = actions                # [('collect' | 'deliver' | 'recharge', (x, y)), ...]
+        self.charge_targets = charge_targets  # índice da ação de recarga -> bateria alvo (%)
+        self.moves = moves                    # Movimentos estimados
+        self.recharge_stops = recharge_stops
+        self.trips = trips                    # [[(x, y), ...], ...] células de coleta por viagem
+        self.unserved = unserved              # Células com itens que o plano não consegue atender
+        self.deferred = deferred              # Células com itens deixadas para o próximo plano
+        self.construction = construction      # 'savings', 'sweep' ou None (sem tempo para planejar)
+        self.planning_ms = planning_ms        # Tabela de distâncias + construção + busca local
+        self.improvements = improvements      # Movimentos aceitos pela busca local
+        self.evaluations = evaluations        # Avaliações de custo (limite de trabalho)
+
+    def __len__(self):
+        return len(self.actions)
+
+    def __repr__(self):
+        return (f"MissionPlan({len(self.actions)} ações, {len(self.trips)} viagens, "
+                f"{self.moves} movimentos, {self.recharge_stops} recargas, {self.construction})")
+
+
+class MissionPlanner:
+    """
+    Monta o plano de uma missão a partir do estado atual do robô.
+
+    'items_on_grid' é {(x, y): [itens]}; 'inventory' é quantos itens o robô
+    já carrega (vão na primeira viagem). Bateria em %, 'battery_per_move'
+    por movimento e 'safety_margin' % nunca usados.
+    """
+
+    def __init__(self, oracle, start, battery, items_on_grid, capacity, inventory=0,
+                 battery_per_move=2, safety_margin=8, recharge_stop_moves=RECHARGE_STOP_MOVES,
+                 max_cells=MAX_PLAN_CELLS):
+        self.oracle = oracle
+        self.capacity = capacity
+        self.inventory = min(inventory, capacity)
+        self.per_move = battery_per_move
+        self.margin = safety_margin
+        self.recharge_stop_moves = recharge_stop_moves
+        self.max_cells = max_cells
+
+        self.start_cell = tuple(start)
+        self.items_on_grid = items_on_grid
+        self.item_cells = [tuple(cell) for cell, items in items_on_grid.items() if items]
+
+        # Orçamentos em movimentos: bateria cheia e bateria atual, já sem a margem
+        self.full = (100 - self.margin) / self.per_move
+        self.initial = (battery - self.margin) / self.per_move
+
+    # ------------------------------------------------------------------
+    # Distâncias e viabilidade
+    # ------------------------------------------------------------------
+
+    def _prepare(self):
+        """
+        Indexa as células e monta a tabela de distâncias.
+
+        Com as BFS das células fixas (início, almoxarifados e estações; as
+        dos marcos ficam no cache do oráculo entre planos) já se sabe quais
+        itens uma viagem consegue atender. Entram no plano só as max_cells
+        células atendíveis mais perto do robô, com uma BFS cada; as outras
+        ficam em 'deferred' para o próximo plano, assim como as que o prazo
+        (se houver) não deixou calcular. Retorna False se não houve tempo
+        nem para as células fixas.
+        """
+        oracle = self.oracle
+        fixed = []
+        for cell in [self.start_cell] + list(oracle.warehouses) + list(oracle.recharge_stations):
+            if cell not in fixed:
+                fixed.append(cell)
+        fixed_set = set(fixed)
+        self.deferred = []
+
+        # Itens fora das células fixas, do mais perto ao mais longe do início
+        from_start = oracle.distances_from(self.start_cell, self.item_cells)
+        candidates = sorted((d, k) for k, d in enumerate(from_start)
+                            if d >= 0 and self.item_cells[k] not in fixed_set)
+        self.unserved = [cell for cell, d in zip(self.item_cells, from_start)
+                         if d < 0 and cell not in fixed_set]
+        cells = fixed + [self.item_cells[k] for _, k in candidates]
+
+        fixed_rows = []
+        for cell in fixed:
+            if self._distances_spent():
+                self.deferred = list(self.item_cells)
+                self.unserved = []
+                return False
+            fixed_rows.append(oracle.distances_from(cell, cells))
+
+        # Classificação: só distâncias às células fixas (grafo não direcionado)
+        n_fixed = len(fixed)
+        self._index(cells, fixed_rows + [[row[c] for row in fixed_rows]
+                                         for c in range(n_fixed, len(cells))], n_fixed)
+        horizon = []
+        for c in range(n_fixed, len(cells)):
+            if len(horizon) >= self.max_cells:
+                self.deferred.append(cells[c])
+            elif self._cell_feasible(c):
+                horizon.append(cells[c])
+            else:
+                self.unserved.append(cells[c])
+
+        # Tabela completa só para as células do plano
+        planned = fixed + horizon
+        position = {cell: c for c, cell in enumerate(cells)}
+        rows = [[row[position[cell]] for cell in planned] for row in fixed_rows]
+        for cell in planned[n_fixed:]:
+            if self._distances_spent():
+                break
+            rows.append(oracle.distances_from(cell, planned))
+        self.deferred = planned[len(rows):] + self.deferred
+        self._index(planned[:len(rows)], rows, len(rows))
+
+        self.stop_cell = []
+        self.stop_load = []
+        for cell in self.item_cells:
+            c = self.position.get(cell)
+            if c is None:
+                continue
+            if not self._reachable(c):
+                if cell not in self.unserved:
+                    self.unserved.append(cell)
+                continue
+            self._split(c, len(self.items_on_grid[cell]))
+        # Paradas que nem uma viagem só com elas cabe na bateria cheia
+        feasible = [k for k in range(len(self.stop_cell)) if self._trip_feasible([k])]
+        for k in range(len(self.stop_cell)):
+            if k not in feasible and self.cells[self.stop_cell[k]] not in self.unserved:
+                self.unserved.append(self.cells[self.stop_cell[k]])
+        self.stops = feasible
+        return True
+
+    def _index(self, cells, rows, n_rows):
+        """Indexa 'cells' (0 = início) com as linhas de distância (-1 sem caminho) das primeiras n_rows."""
+        self.cells = cells
+        self.position = {cell: c for c, cell in enumerate(cells)}
+        self.start = 0
+        self.warehouses = [self.position[c] for c in self.oracle.warehouses]
+        self.stations = [self.position[c] for c in self.oracle.recharge_stations]
+        self.D = D = [[d if d >= 0 else INFEASIBLE for d in row] for row in rows]
+        n = len(cells)
+        # Almoxarifado mais próximo de cada célula (o "depósito" das economias)
+        self.nearest_wh = [min(self.warehouses, key=lambda w: D[c][w], default=None) for c in range(n)]
+        self.depot = [D[c][self.nearest_wh[c]] if self.nearest_wh[c] is not None else INFEASIBLE
+                      for c in range(n)]
+        # Reserva: movimentos de cada célula até a estação mais próxima
+        self.reserve = [min((D[c][s] for s in self.stations), default=0) for c in range(n)]
+
+    def _split(self, c, count):
+        """Divide os itens da célula c em paradas de até 'capacity' itens."""
+        while count > 0:
+            load = min(count, self.capacity)
+            self.stop_cell.append(c)
+            self.stop_load.append(load)
+            count -= load
+
+    def _cell_feasible(self, c):
+        """A célula c é alcançável e cada uma das suas paradas cabe numa viagem sozinha."""
+        if not self._reachable(c):
+            return False
+        self.stop_cell = []
+        self.stop_load = []
+        self._split(c, len(self.items_on_grid[self.cells[c]]))
+        return all(self._trip_feasible([k]) for k in range(len(self.stop_cell)))
+
+    def _distances_spent(self):
+        """O prazo da tabela de distâncias acabou (só com limite de tempo)."""
+        return self._distance_deadline is not None and time.perf_counter() >= self._distance_deadline
+
+    def _budget_spent(self):
+        """Acabaram as avaliações de custo ou o prazo."""
+        return (self._evaluations >= self._max_evaluations
+                or (self._deadline is not None and time.perf_counter() >= self._deadline))
+
+    def _reachable(self, c):
+        return self.D[self.start][c] < INFEASIBLE and self.depot[c] < INFEASIBLE
+
+    def _trip_feasible(self, seq):
+        """A viagem cabe na bateria saindo cheio da estação mais próxima da primeira parada."""
+        if not self.stations:
+            return True  # Sem estações, só a bateria atual conta (verificado em _simulate)
+        first = self.stop_cell[seq[0]]
+        last = self.stop_cell[seq[-1]]
+        station = min(self.stations, key=lambda s: self.D[s][first])
+        waypoints = [self.stop_cell[k] for k in seq] + [self.nearest_wh[last]]
+        return self._walk(station, self.full, waypoints, False) is not None
+
+    def _load(self, seq):
+        return sum(self.stop_load[k] for k in seq)
+
+    def _capacity(self, trip_index):
+        """Capacidade livre da viagem: a primeira já leva o inventário atual."""
+        return self.capacity - self.inventory if trip_index == 0 else self.capacity
+
+    # ------------------------------------------------------------------
+    # Avaliação
+    # ------------------------------------------------------------------
+
+    def _best_warehouse(self, last, nxt):
+        """Almoxarifado que minimiza chegar de 'last' e seguir para 'nxt'."""
+        D = self.D
+        if nxt is None:
+            return self.nearest_wh[last]
+        return min(self.warehouses, key=lambda w: D[last][w] + D[w][nxt])
+
+    def _walk(self, pos, avail, waypoints, final, record=None):
+        """
+        Percorre 'waypoints' a partir de pos com 'avail' movimentos de bateria.
+        Antes de cada trecho o robô precisa ter bateria para o trecho e para
+        chegar depois a uma estação (menos no último trecho da missão); se não
+        tem, passa antes pela estação alcançável com menor desvio e recarrega.
+        Retorna (custo, avail) ou None se algum trecho não cabe nem com a
+        bateria cheia.
+        """
+        D = self.D
+        cost = 0.0
+        last = len(waypoints) - 1
+        for h, target in enumerate(waypoints):
+            reserve = 0 if final and h == last else self.reserve[target]
+            d = D[pos][target]
+            if d + reserve > avail:
+                best = None
+                for s in self.stations:
+                    to_station = D[pos][s]
+                    if to_station <= avail:
+                        detour = to_station + D[s][target]
+                        if best is None or detour < best[0]:
+                            best = (detour, s)
+                if best is None:
+                    return None
+                s = best[1]
+                d = D[s][target]
+                if d + reserve > self.full:
+                    return None
+                cost += D[pos][s] + self.recharge_stop_moves
+                if record is not None:
+                    record.moved(D[pos][s])
+                    record.recharge(self.cells[s])
+                avail = self.full
+            cost += d
+            avail -= d
+            pos = target
+            if record is not None:
+                record.moved(d)
+                record.arrived(h)
+        return cost, avail
+
+    def _simulate(self, trips, record=None):
+        """
+        Custo da sequência de viagens (movimentos + penalidade de recargas).
+        Retorna (custo, viagens viáveis): o custo é INFEASIBLE se alguma viagem
+        não cabe na bateria. Com 'record' (_ActionRecord), anota as ações do plano.
+        """
+        self._evaluations += 1
+        cells = self.stop_cell
+        pos = self.start
+        avail = self.initial
+        cost = 0.0
+        n_trips = len(trips)
+
+        for k, seq in enumerate(trips):
+            nxt = None
+            if k + 1 < n_trips and trips[k + 1]:
+                nxt = cells[trips[k + 1][0]]
+            waypoints = [cells[stop] for stop in seq]
+            w = self._best_warehouse(waypoints[-1] if waypoints else pos, nxt)
+            if w is None:
+                return INFEASIBLE, k
+            waypoints.append(w)
+            if record is not None:
+                record.begin_trip([(self.cells[cells[stop]], self.stop_load[stop]) for stop in seq],
+                                  self.cells[w])
+            walked = self._walk(pos, avail, waypoints, k + 1 == n_trips, record)
+            if walked is None:
+                return INFEASIBLE, k
+            leg, avail = walked
+            cost += leg
+            pos = w
+        if record is not None:
+            # A última recarga também cobre a volta a uma estação depois da missão
+            record.moved(self.reserve[pos])
+        return cost, n_trips
+
+    def _cost(self, trips):
+        return self._simulate(trips)[0]
+
+    # ------------------------------------------------------------------
+    # Construção
+    # ------------------------------------------------------------------
+
+    def _savings_routes(self):
+        """Economias de Clarke-Wright com o almoxarifado mais próximo como depósito."""
+        D = self.D
+        cells = self.stop_cell
+        routes = {k: [k] for k in self.stops}
+        route_of = {k: k for k in self.stops}
+        savings = []
+        stops = self.stops
+        for a_pos, i in enumerate(stops):
+            for j in stops[a_pos + 1:]:
+                ci, cj = cells[i], cells[j]
+                saving = self.depot[ci] + self.depot[cj] - D[ci][cj]
+                if saving > 0:
+                    savings.append((-saving, i, j))
+        savings.sort()
+
+        for _, i, j in savings:
+            ri, rj = route_of[i], route_of[j]
+            if ri == rj:
+                continue
+            a, b = routes[ri], routes[rj]
+            if self._load(a) + self._load(b) > self.capacity:
+                continue
+            # i precisa ser ponta de a e j ponta de b; orienta para ligar i -> j
+            if a[-1] != i:
+                if a[0] != i:
+                    continue
+                a = a[::-1]
+            if b[0] != j:
+                if b[-1] != j:
+                    continue
+                b = b[::-1]
+            merged = a + b
+            if not self._trip_feasible(merged):
+                continue
+            routes[ri] = merged
+            del routes[rj]
+            for k in b:
+                route_of[k] = ri
+        return list(routes.values())
+
+    def _sweep_routes(self, offset):
+        """Varredura angular em torno do centro dos almoxarifados, a partir de 'offset'."""
+        if self.warehouses:
+            cx = sum(self.cells[w][0] for w in self.warehouses) / len(self.warehouses)
+            cy = sum(self.cells[w][1] for w in self.warehouses) / len(self.warehouses)
+        else:
+            cx, cy = self.cells[self.start]
+        order = sorted(self.stops, key=lambda k: math.atan2(self.cells[self.stop_cell[k]][1] - cy,
+                                                            self.cells[self.stop_cell[k]][0] - cx))
+        order = order[offset:] + order[:offset]
+        routes = []
+        current = []
+        for k in order:
+            candidate = current + [k]
+            if current and (self._load(candidate) > self.capacity or not self._trip_feasible(candidate)):
+                routes.append(current)
+                candidate = [k]
+            current = candidate
+        if current:
+            routes.append(current)
+        return routes
+
+    def _sequence(self, routes):
+        """Ordena as viagens pelo vizinho mais próximo a partir do início, escolhendo o sentido de cada uma."""
+        D = self.D
+        cells = self.stop_cell
+        remaining = [list(r) for r in routes]
+        trips = [[]] if self.inventory else []
+        pos = self.start
+        while remaining:
+            best = None
+            for r_index, route in enumerate(remaining):
+                for seq in (route, route[::-1]):
+                    first, last = cells[seq[0]], cells[seq[-1]]
+                    value = D[pos][first] + self.depot[last]
+                    if best is None or value < best[0]:
+                        best = (value, r_index, seq)
+            _, r_index, seq = best
+            remaining.pop(r_index)
+            trips.append(seq)
+            pos = self.nearest_wh[cells[seq[-1]]]
+        return trips
+
+    # ------------------------------------------------------------------
+    # Busca local
+    # ------------------------------------------------------------------
+
+    def _improve(self, trips, cost):
+        """Busca local de primeira melhora até um ótimo local ou até acabar o orçamento."""
+        improvements = 0
+        improved = True
+        while improved and not self._budget_spent():
+            improved = False
+            for move in (self._two_opt, self._or_opt, self._trip_or_opt):
+                result = move(trips, cost)
+                if result is not None:
+                    trips, cost = result
+                    improvements += 1
+                    improved = True
+                    break
+        return trips, cost, improvements
+
+    def _two_opt(self, trips, cost):
+        """Inverte um trecho de uma viagem."""
+        for t, seq in enumerate(trips):
+            for i in range(len(seq) - 1):
+                for j in range(i + 1, len(seq)):
+                    candidate = list(trips)
+                    candidate[t] = seq[:i] + seq[i:j + 1][::-1] + seq[j + 1:]
+                    new_cost = self._cost(candidate)
+                    if new_cost < cost:
+                        return candidate, new_cost
+            if self._budget_spent():
+                return None
+        return None
+
+    def _or_opt(self, trips, cost):
+        """Move um trecho de 1 a MAX_SEGMENT paradas para outra posição (mesma viagem ou outra)."""
+        for a, source in enumerate(trips):
+            for length in range(1, min(MAX_SEGMENT, len(source)) + 1):
+                for i in range(len(source) - length + 1):
+                    segment = source[i:i + length]
+                    rest = source[:i] + source[i + length:]
+                    load = self._load(segment)
+                    for b, target in enumerate(trips):
+                        base = rest if b == a else target
+                        if b != a and self._load(target) + load > self._capacity(b):
+                            continue
+                        for p in range(len(base) + 1):
+                            if b == a and p == i:
+                                continue
+                            for piece in (segment, segment[::-1]) if length > 1 else (segment,):
+                                candidate = list(trips)
+                                candidate[b] = base[:p] + piece + base[p:]
+                                if b != a:
+                                    candidate[a] = rest
+                                candidate = self._drop_empty(candidate)
+                                new_cost = self._cost(candidate)
+                                if new_cost < cost:
+                                    return candidate, new_cost
+                if self._budget_spent():
+                    return None
+        return None
+
+    def _trip_or_opt(self, trips, cost):
+        """Move uma viagem inteira para outra posição da sequência."""
+        first = 1 if self.inventory else 0  # A viagem com o inventário atual fica em primeiro
+        for i in range(first, len(trips)):
+            for j in range(first, len(trips)):
+                if i == j:
+                    continue
+                candidate = list(trips)
+                trip = candidate.pop(i)
+                candidate.insert(j, trip)
+                new_cost = self._cost(candidate)
+                if new_cost < cost:
+                    return candidate, new_cost
+            if self._budget_spent():
+                return None
+        return None
+
+    def _drop_empty(self, trips):
+        """Remove viagens vazias (menos a primeira quando o robô já leva itens)."""
+        return [seq for t, seq in enumerate(trips) if seq or (t == 0 and self.inventory)]
+
+    # ------------------------------------------------------------------
+    # Plano
+    # ------------------------------------------------------------------
+
+    def plan(self, time_budget_ms=None, max_evaluations=DEFAULT_MAX_EVALUATIONS):
+        """
+        Monta a tabela de distâncias, constrói e melhora o plano.
+
+        O limite de trabalho é determinístico: a tabela tem uma BFS por
+        célula do horizonte e a construção e a busca local param depois de
+        'max_evaluations' avaliações de custo, então a mesma entrada dá o
+        mesmo plano em qualquer máquina. 'time_budget_ms' (só para a
+        interface interativa) corta também por tempo: a tabela usa até
+        DISTANCE_BUDGET_SHARE do prazo, e sem tempo para ela o plano sai
+        vazio (decisão gulosa).
+        """
+        t0 = time.perf_counter()
+        self._evaluations = 0
+        self._max_evaluations = max_evaluations
+        self._deadline = None
+        self._distance_deadline = None
+        if time_budget_ms is not None:
+            self._deadline = t0 + time_budget_ms / 1000
+            self._distance_deadline = t0 + DISTANCE_BUDGET_SHARE * time_budget_ms / 1000
+        if not self._prepare():
+            return MissionPlan(actions=[], charge_targets={}, moves=0, recharge_stops=0, trips=[],
+                               unserved=[], deferred=self.deferred, construction=None,
+                               planning_ms=(time.perf_counter() - t0) * 1000, improvements=0,
+                               evaluations=0)
+
+        # As economias sempre entram; as varreduras só enquanto houver orçamento
+        candidates = [('savings', self._sequence(self._savings_routes()))]
+        for k in range(min(SWEEP_STARTS, len(self.stops))):
+            if self._budget_spent():
+                break
+            offset = k * len(self.stops) // min(SWEEP_STARTS, len(self.stops))
+            candidates.append(('sweep', self._sequence(self._sweep_routes(offset))))
+
+        best = None
+        for construction, trips in candidates:
+            cost, feasible = self._simulate(trips)
+            if cost == INFEASIBLE:
+                # Só a parte viável da sequência entra no plano
+                trips = trips[:feasible]
+                cost, _ = self._simulate(trips)
+            served = sum(self._load(seq) for seq in trips)
+            key = (-served, cost)
+            if best is None or key < best[0]:
+                best = (key, construction, trips, cost)
+        _, construction, trips, cost = best
+
+        trips, cost, improvements = self._improve(trips, cost)
+
+        record = _ActionRecord()
+        self._simulate(trips, record)
+        served = {k for seq in trips for k in seq}
+        unserved = list(self.unserved)
+        for k in self.stops:
+            cell = self.cells[self.stop_cell[k]]
+            if k not in served and cell not in unserved:
+                unserved.append(cell)
+
+        charge_targets = {
+            index: min(100.0, self.margin + moves * self.per_move)
+            for index, moves in record.charges.items()
+        }
+        recharge_stops = sum(1 for kind, _ in record if kind == 'recharge')
+        moves = int(round(cost - recharge_stops * self.recharge_stop_moves)) if trips else 0
+        return MissionPlan(
+            actions=list(record),
+            charge_targets=charge_targets,
+            moves=moves,
+            recharge_stops=recharge_stops,
+            trips=[[self.cells[self.stop_cell[k]] for k in seq] for seq in trips],
+            unserved=unserved,
+            deferred=self.deferred,
+            construction=construction,
+            planning_ms=(time.perf_counter() - t0) * 1000,
+            improvements=improvements,
+            evaluations=self._evaluations,
+        )
+
+
+class _ActionRecord(list):
+    """
+    Lista de ações montada por _simulate, com as metas de recarga: para cada
+    recarga, os movimentos até a próxima recarga (ou até o fim da missão).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.charges = {}
+        self._charge = None  # Índice da recarga em andamento
+        self._trip = None    # ([(célula, itens), ...], almoxarifado) da viagem atual
+
+    def begin_trip(self, stops, warehouse):
+        self._trip = (stops, warehouse)
+
+    def moved(self, moves):
+        if self._charge is not None:
+            self.charges[self._charge] += moves
+
+    def recharge(self, station):
+        self.append(('recharge', station))
+        self._charge = len(self) - 1
+        self.charges[self._charge] = 0
+
+    def arrived(self, hop):
+        stops, warehouse = self._trip
+        if hop < len(stops):
+            cell, load = stops[hop]
+            self.extend(('collect', cell) for _ in range(load))
+        else:
+            self.append(('deliver', warehouse))
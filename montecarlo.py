@@ -0,0 +1,210 @@
+"""
+Execução em lote (Monte Carlo) de missões headless em vários processos.
+
+Cada missão usa uma semente diferente para initialize_items_randomly, e cada
+ponto de parâmetros (ex.: SAFETY_MARGIN=6, ROBOT_CAPACITY=4) roda N missões.
+As missões são distribuídas num multiprocessing.Pool: cada processo tem o
+seu próprio estado do Simrobot, e só o resumo de cada missão volta pelo
+canal, então o ganho cresce linearmente com o número de núcleos.
+
+Agrega por ponto: taxas de vitória/game over, movimentos, tempo de recarga
+e itens entregues por minuto simulado.
+
+Uso:
+
+    python montecarlo.py --missions 1000 --param SAFETY_MARGIN=6,8,10 --param ROBOT_CAPACITY=3,4
+
+ou em código:
+
+    from montecarlo import run_batch
+    report = run_batch([{'ROBOT_CAPACITY': 3}, {'ROBOT_CAPACITY': 4}], missions=500)
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # Um aviso por processo polui a saída
+
+import Simrobot as sim
+from headless import HeadlessEngine, DEFAULT_STALL_TIMEOUT_MS
+
+# Tempo simulado máximo por missão (30 minutos)
+DEFAULT_MAX_SIM_TIME_MS = 30 * 60 * 1000
+
+DEFAULT_MISSIONS = 100
+
+# Resultados possíveis de uma missão (HeadlessEngine.run_mission)
+OUTCOMES = ("victory", "game_over", "stalled", "timeout", "stopped")
+
+# Valores originais das constantes alteradas neste processo (restaurados entre pontos)
+_original_params = {}
+
+
+# ==================== PROCESSO DE TRABALHO ====================
+
+def apply_params(params):
+    """Restaura as constantes do Simrobot e aplica as do ponto atual."""
+    for name, value in _original_params.items():
+        setattr(sim, name, value)
+    for name, value in params.items():
+        if not hasattr(sim, name):
+            raise ValueError(f"Simrobot não tem o parâmetro {name}")
+        _original_params.setdefault(name, getattr(sim, name))
+        setattr(sim, name, value)
+
+
+def run_mission_task(task):
+    """Executa uma missão (point_index, params, seed, max_sim_time_ms, stall_timeout_ms) e devolve o resumo."""
+    point_index, params, seed, max_sim_time_ms, stall_timeout_ms = task
+    apply_params(params)
+    engine = HeadlessEngine(seed=seed)
+    result = engine.run_mission(max_sim_time_ms=max_sim_time_ms, stall_timeout_ms=stall_timeout_ms)
+    result['point'] = point_index
+    return result
+
+
+# ==================== AGREGAÇÃO ====================
+
+def _describe(values):
+    """Média, desvio padrão e percentis de uma lista de números."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return {
+        'mean': round(statistics.fmean(ordered), 4),
+        'stdev': round(statistics.stdev(ordered), 4) if len(ordered) > 1 else 0.0,
+        'min': round(ordered[0], 4),
+        'p50': round(ordered[len(ordered) // 2], 4),
+        'p95': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+        'max': round(ordered[-1], 4),
+    }
+
+
+def aggregate(params, results):
+    """Resumo estatístico das missões de um ponto de parâmetros."""
+    n = len(results)
+    counts = {outcome: 0 for outcome in OUTCOMES}
+    for result in results:
+        counts[result['outcome']] = counts.get(result['outcome'], 0) + 1
+
+    items_per_minute = [
+        r['items_delivered'] / (r['sim_time_ms'] / 60000) for r in results if r['sim_time_ms'] > 0
+    ]
+    return {
+        'params': params,
+        'missions': n,
+        'outcomes': counts,
+        'victory_rate': counts['victory'] / n if n else 0.0,
+        'game_over_rate': counts['game_over'] / n if n else 0.0,
+        'stalled_rate': counts['stalled'] / n if n else 0.0,
+        'moves': _describe([r['moves'] for r in results]),
+        'recharge_time_s': _describe([r['recharge_time_ms'] / 1000 for r in results]),
+        'items_delivered': _describe([r['items_delivered'] for r in results]),
+        'items_per_sim_minute': _describe(items_per_minute),
+        'sim_time_s': _describe([r['sim_time_ms'] / 1000 for r in results]),
+    }
+
+
+# ==================== EXECUÇÃO ====================
+
+def run_batch(points, missions=DEFAULT_MISSIONS, seed_start=0, processes=None,
+              max_sim_time_ms=DEFAULT_MAX_SIM_TIME_MS, stall_timeout_ms=DEFAULT_STALL_TIMEOUT_MS,
+              keep_missions=False):
+    """
+    Roda 'missions' missões para cada ponto de parâmetros (lista de dicionários
+    {constante do Simrobot: valor}). Todos os pontos usam as mesmas sementes,
+    então as diferenças entre pontos não vêm da distribuição de itens.
+    """
+    points = [dict(p) for p in points] or [{}]
+    tasks = [
+        (index, params, seed_start + k, max_sim_time_ms, stall_timeout_ms)
+        for index, params in enumerate(points)
+        for k in range(missions)
+    ]
+    processes = processes or os.cpu_count() or 1
+    # Lotes grandes reduzem o custo de comunicação; vários lotes por processo mantêm o balanceamento
+    chunksize = max(1, len(tasks) // (processes * 8))
+
+    t0 = time.perf_counter()
+    if processes == 1:
+        results = [run_mission_task(task) for task in tasks]
+    else:
+        with multiprocessing.Pool(processes) as pool:
+            results = list(pool.imap_unordered(run_mission_task, tasks, chunksize=chunksize))
+    wall_time = time.perf_counter() - t0
+
+    by_point = [[] for _ in points]
+    for result in results:
+        by_point[result['point']].append(result)
+    for point_results in by_point:
+        point_results.sort(key=lambda r: r['seed'])
+
+    report = {
+        'missions_per_point': missions,
+        'seed_start': seed_start,
+        'processes': processes,
+        'max_sim_time_ms': max_sim_time_ms,
+        'stall_timeout_ms': stall_timeout_ms,
+        'wall_time_s': round(wall_time, 3),
+        'missions_per_second': round(len(tasks) / wall_time, 2) if wall_time > 0 else None,
+        'points': [aggregate(params, point_results) for params, point_results in zip(points, by_point)],
+    }
+    if keep_missions:
+        report['missions'] = by_point
+    return report
+
+
+def parse_param(text):
+    """'NOME=v1,v2,...' -> (NOME, [valores numéricos])."""
+    name, _, values = text.partition('=')
+    if not name or not values:
+        raise argparse.ArgumentTypeError(f"parâmetro inválido: {text!r} (use NOME=v1,v2)")
+    parsed = []
+    for value in values.split(','):
+        number = float(value)
+        parsed.append(int(number) if number.is_integer() else number)
+    return name.strip(), parsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Missões Monte Carlo do SimRobot em vários processos")
+    parser.add_argument('--missions', type=int, default=DEFAULT_MISSIONS, help="missões por ponto")
+    parser.add_argument('--seed-start', type=int, default=0)
+    parser.add_argument('--param', type=parse_param, action='append', default=[],
+                        help="constante do Simrobot e valores a varrer, ex.: SAFETY_MARGIN=6,8,10")
+    parser.add_argument('--processes', type=int, default=None, help="padrão: número de núcleos")
+    parser.add_argument('--max-sim-time-ms', type=float, default=DEFAULT_MAX_SIM_TIME_MS)
+    parser.add_argument('--stall-timeout-ms', type=float, default=DEFAULT_STALL_TIMEOUT_MS)
+    parser.add_argument('--keep-missions', action='store_true', help="inclui o resumo de cada missão")
+    parser.add_argument('--output', help="arquivo JSON de saída (padrão: saída padrão)")
+    args = parser.parse_args(argv)
+
+    names = [name for name, _ in args.param]
+    points = [dict(zip(names, values)) for values in itertools.product(*(v for _, v in args.param))]
+
+    report = run_batch(points, missions=args.missions, seed_start=args.seed_start,
+                       processes=args.processes, max_sim_time_ms=args.max_sim_time_ms,
+                       stall_timeout_ms=args.stall_timeout_ms, keep_missions=args.keep_missions)
+
+    for point in report['points']:
+        print(f"{point['params'] or 'padrão'}: vitória {point['victory_rate']:.1%}, "
+              f"game over {point['game_over_rate']:.1%}, "
+              f"itens/min {point['items_per_sim_minute']['mean']:.2f}", file=sys.stderr)
+    print(f"{report['missions_per_second']} missões/s com {report['processes']} processos", file=sys.stderr)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Cache LRU de caminhos e custos de rota.
+
+O modo automático pede as mesmas rotas o tempo todo: a cada decisão,
+decide_next_action_intelligent custa almoxarifado -> estação e item ->
+almoxarifado, e update_auto_mode em seguida calcula o caminho da ação que
+acabou de custar. Com o cache, a segunda consulta entre os mesmos pontos
+não chega à busca.
+
+As chaves incluem a versão do mapa ((início, alvo, versão)), então um
+caminho calculado antes de uma célula mudar nunca é devolvido depois; o
+Simrobot também esvazia o cache a cada mudança de mapa (invalidate), para
+não guardar entradas que não servem mais. Caminhos e custos têm entradas
+separadas, cada um limitado a 'capacity' entradas com descarte do menos
+usado recentemente.
+
+Uso:
+
+    cache = PathCache(capacity=256)
+    path = cache.get_path(start, goal, version)
+    if path is None:
+        path = cache.put_path(start, goal, version, a_star(graph, start, goal))
+    print(cache.stats())   # acertos, faltas, descartes e taxa de acerto
+"""
+from collections import OrderedDict
+
+DEFAULT_CAPACITY = 256
+
+
+class _LruTable:
+    """Dicionário limitado com descarte do menos usado recentemente e contadores."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+class PathCache:
+    """Caminhos e custos de rota por (início, alvo, versão do mapa)."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.paths = _LruTable(capacity)
+        self.costs = _LruTable(capacity)
+        self.invalidations = 0
+
+    def get_path(self, start, goal, version):
+        """Caminho guardado (tupla de células) ou None."""
+        return self.paths.get((tuple(start), tuple(goal), version))
+
+    def put_path(self, start, goal, version, path):
+        """Guarda o caminho (como tupla, para não ser alterado por quem o recebe) e o devolve."""
+        path = tuple(path)
+        self.paths.put((tuple(start), tuple(goal), version), path)
+        return path
+
+    @staticmethod
+    def _cost_key(a, b, version):
+        # O grid não é direcionado: custo(a, b) = custo(b, a) ocupa uma entrada só
+        a = tuple(a)
+        b = tuple(b)
+        return (a, b, version) if a <= b else (b, a, version)
+
+    def get_cost(self, a, b, version):
+        """Custo guardado ou None."""
+        return self.costs.get(self._cost_key(a, b, version))
+
+    def put_cost(self, a, b, version, cost):
+        self.costs.put(self._cost_key(a, b, version), cost)
+        return cost
+
+    def invalidate(self):
+        """Descarta todas as entradas (mapa ou células andáveis mudaram); mantém os contadores."""
+        self.paths.entries.clear()
+        self.costs.entries.clear()
+        self.invalidations += 1
+
+    def reset_stats(self):
+        for table in (self.paths, self.costs):
+            table.hits = table.misses = table.evictions = 0
+        self.invalidations = 0
+
+    def stats(self):
+        """Contadores de caminhos e de custos, com a taxa de acerto de cada um."""
+        return {
+            'paths': self.paths.stats(),
+            'costs': self.costs.stats(),
+            'invalidations': self.invalidations,
+        }
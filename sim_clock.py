@@ -0,0 +1,48 @@
+"""
+Relógio simulado para execuções mais rápidas que o tempo real.
+
+O Simrobot lê o tempo por now_ms(); com set_time_source(clock) a lógica passa
+a usar este relógio no lugar de pygame.time.get_ticks(). O relógio só anda
+quando alguém o avança, seja em passos fixos (advance) ou saltando direto
+para o próximo evento agendado (advance_to).
+
+O tempo é sempre um inteiro de milissegundos, como no pygame e no log de
+eventos: passos fracionários (SIM_STEP_MS = 1000/30) acumulam a fração
+restante e o relógio anda 33, 33, 34, ... ms, sem derivar.
+"""
+import math
+
+
+class SimClock:
+    """Relógio em milissegundos controlado explicitamente pela simulação."""
+
+    def __init__(self, start_ms=1):
+        # O simulador usa 0 como "tempo não definido", por isso começa em 1
+        self.time_ms = start_ms
+        self._fraction = 0.0  # Parte fracionária dos passos ainda não aplicada
+
+    def __call__(self):
+        return self.time_ms
+
+    def now(self):
+        """Tempo atual em milissegundos."""
+        return self.time_ms
+
+    def advance(self, dt_ms):
+        """Avança o relógio em dt_ms milissegundos (a fração fica para os próximos passos)."""
+        self._fraction += dt_ms
+        whole = math.floor(self._fraction)
+        self.time_ms += whole
+        self._fraction -= whole
+
+    def advance_to(self, t_ms):
+        """Salta o relógio até t_ms, arredondado para cima (nunca volta no tempo)."""
+        t_ms = math.ceil(t_ms)
+        if t_ms > self.time_ms:
+            self.time_ms = t_ms
+            self._fraction = 0.0
+
+    def reset(self, start_ms=1):
+        """Volta o relógio ao instante inicial."""
+        self.time_ms = start_ms
+        self._fraction = 0.0
@@ -0,0 +1,44 @@
+"""Configuração comum dos testes: módulos na raiz do repositório e pygame sem janela."""
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def restore_map():
+    """Devolve ao Simrobot o mapa padrão depois de um teste que carrega outro mapa."""
+    import Simrobot as sim
+
+    saved = [row[:] for row in sim.matriz2]
+    yield
+    sim.load_map(saved)
+    sim.bump_map_version()
+    sim.invalidate_distance_oracle()
+
+
+@pytest.fixture
+def bfs_distance():
+    """Distância de referência por BFS direta entre duas células (None se inalcançável)."""
+    from distance_oracle import bfs_distances
+
+    def distance(grid, a, b):
+        field = bfs_distances(grid.walkable_flat, grid.rows, grid.cols, a[1] * grid.cols + a[0])
+        d = field[b[1] * grid.cols + b[0]]
+        return int(d) if d >= 0 else None
+    return distance
+
+
+@pytest.fixture
+def assert_valid_path():
+    """Verifica que o caminho liga start a goal em passos 4-conexos sobre células andáveis."""
+    def check(grid, path, start, goal):
+        assert path[0] == start and path[-1] == goal
+        for (x0, y0), (x1, y1) in zip(path, path[1:]):
+            assert abs(x1 - x0) + abs(y1 - y0) == 1
+        assert all(grid.is_walkable(x, y) for x, y in path)
+    return check
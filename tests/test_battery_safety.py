@@ -0,0 +1,54 @@
+"""Bateria no modo automático: trechos planejados guardam a margem e bateria zerada é game over."""
+import pytest
+
+import Simrobot as sim
+from headless import HeadlessEngine
+from warehouse_grid import CELL_FREE
+
+
+@pytest.fixture
+def engine():
+    engine = HeadlessEngine(seed=1)
+    yield engine
+    engine.close()
+
+
+def _place_robot(pos):
+    sim.robot_grid_pos[0], sim.robot_grid_pos[1] = pos
+
+
+def test_empty_battery_off_a_station_is_game_over(engine):
+    _place_robot(sim.world_grid.positions(CELL_FREE)[0])
+    sim.battery = 0
+    sim.check_game_state()
+    assert sim.game_state == "game_over"
+
+
+def test_planned_step_reserves_the_safety_margin(engine):
+    start = tuple(sim.robot_grid_pos)
+    target = next(item for item in sim.items_on_grid if item != start)
+    station = sim.find_nearest_recharge_station(target)
+    cost = sim.calculate_route_cost(start, target) + sim.calculate_route_cost(target, station)
+
+    sim.battery = cost
+    assert not sim.planned_step_is_safe(target)
+    sim.battery = cost + sim.SAFETY_MARGIN
+    assert sim.planned_step_is_safe(target)
+
+
+def test_final_leg_skips_the_station_reserve(engine):
+    start = tuple(sim.robot_grid_pos)
+    target = next(item for item in sim.items_on_grid if item != start)
+    sim.battery = sim.calculate_route_cost(start, target) + sim.SAFETY_MARGIN
+    assert sim.planned_step_is_safe(target, final=True)
+    assert not sim.planned_step_is_safe(target)
+
+
+def test_greedy_recharge_charges_up_to_the_threshold(engine, monkeypatch):
+    monkeypatch.setattr(sim, "auto_mode", sim.AUTO_MODE_FULL)
+    monkeypatch.setattr(sim, "planned_recharge_target", None)
+    needed = sim.calculate_needed_battery()
+    monkeypatch.setattr(sim, "RECHARGE_THRESHOLD", min(100, needed + 10))
+    assert sim.recharge_target_battery() == min(100, needed + 10)
+    monkeypatch.setattr(sim, "RECHARGE_THRESHOLD", 0)
+    assert sim.recharge_target_battery() == needed
@@ -0,0 +1,60 @@
+"""Oráculo de distâncias: campos sob demanda, LRU e mesmas respostas da BFS direta."""
+import random
+
+from benchmark import generate_layout
+from distance_oracle import UNREACHABLE, DistanceOracle
+from warehouse_grid import CELL_RECHARGE, CELL_WAREHOUSE
+
+
+def _world(seed=0, size=30):
+    grid, items = generate_layout(size, size, seed=seed)
+    landmarks = grid.positions(CELL_WAREHOUSE) + grid.positions(CELL_RECHARGE) + list(items)
+    return grid, DistanceOracle(grid, landmarks)
+
+
+def test_construction_runs_no_bfs():
+    _, oracle = _world()
+    assert oracle.landmarks
+    assert oracle.bfs_runs == 0
+
+
+def test_distances_match_direct_bfs(bfs_distance):
+    grid, oracle = _world(seed=3)
+    rng = random.Random(3)
+    cells = [(x, y) for y in range(grid.rows) for x in range(grid.cols)]
+    for _ in range(200):
+        a, b = rng.choice(cells), rng.choice(cells)
+        expected = 0 if a == b else (bfs_distance(grid, a, b) if grid.walkable[a[1], a[0]] and grid.walkable[b[1], b[0]] else None)
+        assert oracle.distance(a, b) == expected, (a, b)
+
+
+def test_nearest_matches_brute_force_with_first_tie():
+    grid, oracle = _world(seed=5)
+    landmarks = oracle.landmarks
+    for source in landmarks[:20]:
+        candidates = landmarks[::3]
+        dists = [oracle.distance(source, c) for c in candidates]
+        reachable = [d for d in dists if d is not None]
+        expected = candidates[dists.index(min(reachable))] if reachable else None
+        assert oracle.nearest(source, candidates) == expected
+
+
+def test_distance_matrix_matches_distance():
+    _, oracle = _world(seed=2)
+    cells = oracle.landmarks[:15] + [(-1, -1)]
+    matrix = oracle.distance_matrix(cells)
+    for i, a in enumerate(cells):
+        for j, b in enumerate(cells):
+            d = oracle.distance(a, b)
+            assert matrix[i, j] == (UNREACHABLE if d is None else d)
+
+
+def test_field_cache_is_bounded():
+    _, oracle = _world(seed=1)
+    oracle.field_capacity = 4
+    for pos in oracle.landmarks[:10]:
+        oracle.distance(pos, oracle.landmarks[-1])
+    assert len(oracle._fields) <= 4
+    runs = oracle.bfs_runs
+    oracle.distance(oracle.landmarks[9], oracle.landmarks[0])  # Campo recente: sem BFS nova
+    assert oracle.bfs_runs == runs
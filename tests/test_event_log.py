@@ -0,0 +1,22 @@
+"""Log de eventos: o replay de uma missão headless dá os mesmos tempos da execução."""
+import pytest
+
+from event_log import replay
+from headless import HeadlessEngine
+
+
+@pytest.mark.parametrize("seed", [0, 4])
+def test_replay_times_match_the_mission(tmp_path, seed):
+    path = str(tmp_path / "missao.srlog")
+    engine = HeadlessEngine(seed=seed, record_path=path)
+    try:
+        result = engine.run_mission()
+    finally:
+        engine.close()
+    summary = replay(path).summary()
+
+    assert isinstance(result['sim_time_ms'], int)
+    assert summary['game_state'] == result['outcome']
+    assert summary['elapsed_ms'] == result['sim_time_ms']
+    assert summary['recharge_time_ms'] == result['recharge_time_ms']
+    assert summary['moves'] == result['moves']
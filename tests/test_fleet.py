@@ -0,0 +1,57 @@
+"""Modo frota com o planejador cooperativo no mapa padrão."""
+import pytest
+
+from cooperative_planner import CooperativePlanner
+from benchmark import generate_layout
+from fleet import STATE_QUEUED, FleetWorld
+
+
+@pytest.mark.parametrize("n_robots", [2, 3, 5, 10])
+def test_cooperative_fleet_completes_default_map(n_robots):
+    # Regressão: robôs parados no corredor do almoxarifado (7, 2) e na fila
+    # das estações travavam a frota até o limite de tempo
+    for seed in range(10):
+        result = FleetWorld(n_robots=n_robots, seed=seed, planner=CooperativePlanner()).run()
+        assert result['outcome'] == 'victory', (n_robots, seed, result['outcome'])
+        assert result['items_remaining'] == 0
+
+
+def test_cooperative_fleet_has_no_collisions():
+    world = FleetWorld(n_robots=5, seed=1, planner=CooperativePlanner())
+    while world.is_finished() is None and world.ticks < 2000:
+        world.tick()
+        cells = [tuple(p) for p, state in zip(world.pos.tolist(), world.state) if state != STATE_QUEUED]
+        assert len(set(cells)) == len(cells), world.ticks
+    assert world.is_finished() == 'victory'
+
+
+def test_fleet_collects_items_beyond_a_single_safe_trip():
+    # Itens longe de almoxarifados e estações não cabem em item -> almoxarifado -> estação
+    # com uma carga; a frota os leva até uma estação e recarrega antes de entregar
+    grid, items = generate_layout(40, 40, seed=0, item_density=0.2, max_items=250, warehouses=6, stations=8)
+    world = FleetWorld(grid=grid, items_on_grid={pos: list(v) for pos, v in items.items()}, n_robots=20)
+    result = world.run()
+    assert result['outcome'] == 'victory'
+    assert result['items_remaining'] == 0
+    assert world.items_remaining() == sum(len(v) for v in world.items_on_grid.values())
+
+
+@pytest.mark.parametrize("n_robots", [20, 50])
+def test_dense_cooperative_fleet_on_default_map(n_robots):
+    # Regressão: com mais robôs que células livres, todos empilhados no 'S', a
+    # frota travava e robôs morriam nos desvios que o oráculo não enxerga
+    for seed in (1, 42):
+        world = FleetWorld(n_robots=n_robots, seed=seed, planner=CooperativePlanner())
+        result = world.run()
+        assert result['outcome'] == 'victory', (n_robots, seed, result['outcome'])
+        assert result['robots_dead'] == 0
+
+
+def test_dense_cooperative_fleet_on_generated_layout():
+    grid, items = generate_layout(40, 40, seed=0, item_density=0.2, max_items=250, warehouses=6, stations=8)
+    world = FleetWorld(grid=grid, items_on_grid={pos: list(v) for pos, v in items.items()}, n_robots=20,
+                       seed=5, planner=CooperativePlanner())
+    result = world.run()
+    assert result['outcome'] == 'victory'
+    assert result['robots_dead'] == 0
+    assert result['items_delivered'] == result['items_initial']
@@ -0,0 +1,77 @@
+"""HPA*: caminhos andáveis e contínuos, custo igual ao caminho e atualização por célula."""
+import random
+
+import numpy as np
+
+import Simrobot as sim
+from benchmark import generate_layout, prepare_world
+from hpa_planner import HierarchicalPlanner
+from warehouse_grid import CELL_FREE, CELL_OBSTACLE, CODE_FLAGS, FLAG_WALKABLE, WarehouseGrid
+
+
+def _walkable_cells(grid):
+    ys, xs = np.nonzero(grid.walkable)
+    return list(zip(xs.tolist(), ys.tolist()))
+
+
+def test_paths_are_walkable_connected_and_costed_by_length(bfs_distance, assert_valid_path):
+    grid, _ = generate_layout(64, 64, seed=4)
+    planner = HierarchicalPlanner(grid, cluster_size=16)
+    rng = random.Random(4)
+    cells = _walkable_cells(grid)
+    for _ in range(100):
+        start, goal = rng.choice(cells), rng.choice(cells)
+        path = planner.find_path(start, goal)
+        optimal = bfs_distance(grid, start, goal)
+        if optimal is None:
+            assert path == []
+            continue
+        assert_valid_path(grid, path, start, goal)
+        assert len(path) - 1 >= optimal
+        assert planner.distance(start, goal) == len(path) - 1
+
+
+def test_update_cell_matches_a_fresh_planner(bfs_distance, assert_valid_path):
+    grid, _ = generate_layout(48, 48, seed=7, obstacle_density=0.1)
+    planner = HierarchicalPlanner(grid, cluster_size=16)
+    rng = random.Random(7)
+    cells = _walkable_cells(grid)
+    pairs = [(rng.choice(cells), rng.choice(cells)) for _ in range(30)]
+    for start, goal in pairs:
+        planner.find_path(start, goal)  # Preenche os blocos antes das mudanças
+
+    for _ in range(20):
+        x, y = rng.choice(cells)
+        grid.set_code(x, y, CELL_OBSTACLE if grid.is_walkable(x, y) else CELL_FREE)
+        planner.update_cell(x, y)
+
+    fresh = HierarchicalPlanner(grid, cluster_size=16)
+    for start, goal in pairs:
+        path = planner.find_path(start, goal)
+        assert path == fresh.find_path(start, goal)
+        if path:
+            assert_valid_path(grid, path, start, goal)
+        else:
+            assert not grid.is_walkable(*start) or not grid.is_walkable(*goal) or bfs_distance(grid, start, goal) is None
+
+
+def test_set_code_updates_only_the_cell_layers():
+    grid, _ = generate_layout(20, 20, seed=1)
+    walkable_flat = grid.walkable_flat
+    for x, y, code in [(3, 4, CELL_OBSTACLE), (3, 4, CELL_FREE), (10, 0, CELL_OBSTACLE)]:
+        grid.set_code(x, y, code)
+        assert grid.walkable_flat is walkable_flat  # Atualizado no lugar, sem cópia
+        np.testing.assert_array_equal(grid.flags, CODE_FLAGS[grid.codes])
+        assert bytes(grid.walkable_flat) == (CODE_FLAGS[grid.codes] & FLAG_WALKABLE).tobytes()
+        assert WarehouseGrid(grid.codes.copy()).walkable_flat == grid.walkable_flat
+
+
+def test_route_cost_uses_hpa_path_length(monkeypatch, restore_map):
+    grid, items = generate_layout(60, 60, seed=2)
+    prepare_world(grid, items)
+    monkeypatch.setattr(sim, 'HPA_MIN_CELLS', 0)
+    sim.path_cache.invalidate()
+    start = tuple(sim.robot_grid_pos)
+    for goal in list(sim.items_on_grid)[:20]:
+        path = sim.find_path(start, goal)
+        assert sim.calculate_route_cost(start, goal) == (len(path) - 1) * 2
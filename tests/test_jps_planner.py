@@ -0,0 +1,32 @@
+"""A* e JPS: caminhos andáveis, contínuos e com o comprimento da distância BFS."""
+import random
+
+import pytest
+
+import Simrobot as sim
+from benchmark import generate_layout
+from jps_planner import jump_point_search
+from warehouse_grid import WarehouseGrid
+
+
+@pytest.mark.parametrize("search", [sim.a_star, jump_point_search], ids=["a_star", "jps"])
+@pytest.mark.parametrize("obstacle_density", [0.0, 0.15, 0.3])
+def test_path_length_matches_bfs_distance(search, obstacle_density, bfs_distance, assert_valid_path):
+    grid, _ = generate_layout(40, 40, seed=11, obstacle_density=obstacle_density)
+    graph = grid.build_graph()
+    cells = list(graph)
+    rng = random.Random(11)
+    for _ in range(150):
+        start, goal = rng.choice(cells), rng.choice(cells)
+        path = search(graph, start, goal)
+        assert_valid_path(grid, path, start, goal)
+        assert len(path) - 1 == bfs_distance(grid, start, goal)
+
+
+@pytest.mark.parametrize("search", [sim.a_star, jump_point_search], ids=["a_star", "jps"])
+def test_unreachable_goal_gives_empty_path(search):
+    grid = WarehouseGrid.from_matrix([
+        ['S', '1', '0', '1'],
+        ['1', '1', '0', 'A'],
+    ])
+    assert search(grid.build_graph(), (0, 0), (3, 1)) == []
@@ -0,0 +1,52 @@
+"""Mapas de arquivo: ida e volta, validação de códigos e camadas calculadas sob demanda."""
+import numpy as np
+import pytest
+
+from map_loader import load_map_file, parse_text_map, save_map_file
+from warehouse_grid import CELL_OBSTACLE, CODE_FLAGS, WarehouseGrid
+
+
+@pytest.fixture
+def grid():
+    return parse_text_map("A11R\n1S10\n0011\n")
+
+
+@pytest.mark.parametrize("name", ["mapa.txt", "mapa.csv", "mapa.srmap"])
+def test_round_trip(tmp_path, grid, name):
+    path = str(tmp_path / name)
+    save_map_file(path, grid)
+    loaded = load_map_file(path)
+    np.testing.assert_array_equal(loaded.codes, grid.codes)
+    assert loaded.walkable_flat == grid.walkable_flat
+
+
+def test_binary_map_layers_are_lazy_and_set_cell_keeps_the_file(tmp_path, grid):
+    path = str(tmp_path / "mapa.srmap")
+    save_map_file(path, grid)
+    loaded = load_map_file(path)
+    assert loaded._flags is None and loaded._walkable_flat is None
+    loaded.set_code(1, 0, CELL_OBSTACLE)  # Sem camadas calculadas: só os códigos mudam
+    assert not loaded.is_walkable(1, 0)
+    np.testing.assert_array_equal(loaded.flags, CODE_FLAGS[loaded.codes])
+    np.testing.assert_array_equal(load_map_file(path).codes, grid.codes)  # Cópia-na-escrita
+
+
+@pytest.mark.parametrize("memory_map", [True, False])
+def test_binary_map_rejects_unknown_codes(tmp_path, grid, memory_map):
+    path = tmp_path / "mapa.srmap"
+    save_map_file(str(path), grid)
+    data = bytearray(path.read_bytes())
+    data[-3] = 9  # Linha 3, coluna 2
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="linha 3, coluna 2: código de célula inválido 9"):
+        load_map_file(str(path), memory_map=memory_map)
+
+
+def test_text_map_rejects_unknown_characters():
+    with pytest.raises(ValueError, match="linha 2, coluna 3"):
+        parse_text_map("A11R\n1SX0\n")
+
+
+def test_literal_matrix_rejects_unknown_characters():
+    with pytest.raises(ValueError, match="linha 2, coluna 3"):
+        WarehouseGrid.from_matrix([['A', '1', '1', 'R'], ['1', 'S', 'X', '0']])
@@ -0,0 +1,80 @@
+"""Planejador de missão: prazo cobre a tabela de distâncias, horizonte de células e replanejamento."""
+import functools
+
+import Simrobot as sim
+from benchmark import generate_layout
+from distance_oracle import DistanceOracle
+from headless import HeadlessEngine
+from mission_planner import MissionPlanner
+from warehouse_grid import CELL_START
+
+
+def _planner(size, seed=0, **options):
+    grid, items = generate_layout(size, size, seed=seed)
+    oracle = DistanceOracle(grid, [])
+    start = grid.positions(CELL_START)[0]
+    return MissionPlanner(oracle, start, 100, items, capacity=3, **options), oracle, items
+
+
+def test_large_map_plan_runs_few_bfs_and_reports_the_whole_time():
+    planner, oracle, items = _planner(75)
+    assert oracle.bfs_runs == 0  # Nada é calculado antes de plan()
+    plan = planner.plan(time_budget_ms=200)
+    fixed = 1 + len(oracle.warehouses) + len(oracle.recharge_stations)
+    assert oracle.bfs_runs <= fixed + planner.max_cells
+    assert plan.planning_ms < 2000
+    assert len(plan.unserved) + len(plan.deferred) + sum(map(len, plan.trips)) <= len(items)
+
+
+def test_plan_covers_only_the_horizon_and_defers_the_rest():
+    planner, _, items = _planner(20, max_cells=5)
+    plan = planner.plan(time_budget_ms=1000)
+    planned = {cell for trip in plan.trips for cell in trip}
+    assert 0 < len(planned) <= 5
+    assert plan.deferred
+    assert planned | set(plan.unserved) | set(plan.deferred) == {cell for cell, v in items.items() if v}
+
+
+def test_no_time_for_distances_gives_an_empty_plan():
+    planner, _, items = _planner(20)
+    plan = planner.plan(time_budget_ms=0)
+    assert plan.construction is None and plan.actions == []
+    assert set(plan.deferred) == set(items)
+
+
+def test_mission_replans_the_deferred_cells(monkeypatch):
+    plans = []
+    small = functools.partial(MissionPlanner, max_cells=2)
+
+    def planner(*args, **kwargs):
+        plans.append(small(*args, **kwargs))
+        return plans[-1]
+
+    monkeypatch.setattr(sim, "MissionPlanner", planner)
+    engine = HeadlessEngine(seed=3)
+    try:
+        result = engine.run_mission()
+    finally:
+        engine.close()
+    assert result['outcome'] == 'victory'
+    assert len(plans) >= 3
+
+
+def test_work_cap_makes_plans_independent_of_machine_speed(monkeypatch):
+    planner, _, _ = _planner(20, seed=1)
+    plan = planner.plan()
+    assert plan.evaluations <= planner.plan(max_evaluations=10 ** 9).evaluations
+
+    # Um relógio que anda 1 s por consulta (máquina lentíssima) não muda a missão
+    results = []
+    for slow in (False, True):
+        if slow:
+            ticks = iter(range(10 ** 9))
+            monkeypatch.setattr("mission_planner.time.perf_counter", lambda: float(next(ticks)))
+        engine = HeadlessEngine(seed=4)
+        try:
+            results.append(engine.run_mission())
+        finally:
+            engine.close()
+    assert results[0]['moves'] == results[1]['moves']
+    assert results[0]['sim_time_ms'] == results[1]['sim_time_ms']
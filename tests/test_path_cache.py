@@ -0,0 +1,45 @@
+"""Cache de caminhos: LRU por tabela, custo simétrico e esvaziamento a cada mudança de mapa."""
+import Simrobot as sim
+from headless import HeadlessEngine
+from path_cache import PathCache
+
+
+def test_paths_are_evicted_least_recently_used_first():
+    cache = PathCache(capacity=2)
+    cache.put_path((0, 0), (1, 0), 0, [(0, 0), (1, 0)])
+    cache.put_path((0, 0), (2, 0), 0, [(0, 0), (1, 0), (2, 0)])
+    assert cache.get_path((0, 0), (1, 0), 0) is not None  # (0,0)->(2,0) vira o menos usado
+    cache.put_path((0, 0), (3, 0), 0, [(0, 0), (1, 0), (2, 0), (3, 0)])
+
+    assert cache.get_path((0, 0), (2, 0), 0) is None
+    assert cache.get_path((0, 0), (1, 0), 0) == ((0, 0), (1, 0))
+    stats = cache.stats()['paths']
+    assert stats['size'] == 2 and stats['evictions'] == 1
+
+
+def test_costs_are_symmetric_and_keyed_by_map_version():
+    cache = PathCache()
+    cache.put_cost((3, 1), (0, 2), 5, 8)
+    assert cache.get_cost((0, 2), (3, 1), 5) == 8
+    assert cache.get_cost((0, 2), (3, 1), 6) is None
+    assert cache.stats()['costs']['size'] == 1
+
+
+def test_set_cell_bumps_map_version_and_clears_the_cache(restore_map):
+    HeadlessEngine(seed=1)
+    start = tuple(sim.robot_grid_pos)
+    goal = max(sim.get_navigation_graph(), key=lambda cell: abs(cell[0] - start[0]) + abs(cell[1] - start[1]))
+    path = sim.find_path(start, goal)
+    sim.calculate_route_cost(start, goal)
+    assert sim.path_cache.get_path(start, goal, sim.map_version) == tuple(path)
+    invalidations = sim.path_cache.invalidations
+
+    # Bloquear uma célula do caminho guardado: a próxima busca não pode reaproveitá-lo
+    blocked = path[len(path) // 2]
+    sim.set_cell(blocked[0], blocked[1], '0')
+
+    stats = sim.path_cache.stats()
+    assert stats['paths']['size'] == 0 and stats['costs']['size'] == 0
+    assert stats['invalidations'] == invalidations + 1
+    new_path = sim.find_path(start, goal)
+    assert new_path and blocked not in new_path
@@ -0,0 +1,179 @@
+"""
+Representação compacta do ambiente em arrays NumPy.
+
+Cada célula vira um código uint8 (em vez de uma string de um caractere numa
+lista de listas) e uma camada de flags em bits indica o que a célula é:
+andável, almoxarifado, estação de recarga, início. Movimento, validação de
+caminho e construção do grafo consultam estas camadas.
+
+A matriz literal do Simrobot ('S', 'R', 'A', '1', '0') é convertida por
+WarehouseGrid.from_matrix().
+"""
+import numpy as np
+
+# Códigos das células
+CELL_OBSTACLE = 0   # '0'
+CELL_FREE = 1       # '1'
+CELL_START = 2      # 'S'
+CELL_RECHARGE = 3   # 'R'
+CELL_WAREHOUSE = 4  # 'A'
+
+CHAR_TO_CODE = {
+    '0': CELL_OBSTACLE,
+    '1': CELL_FREE,
+    'S': CELL_START,
+    'R': CELL_RECHARGE,
+    'A': CELL_WAREHOUSE,
+}
+CODE_TO_CHAR = {code: char for char, code in CHAR_TO_CODE.items()}
+
+# Camadas em bits
+FLAG_WALKABLE = 1
+FLAG_WAREHOUSE = 2
+FLAG_STATION = 4
+FLAG_START = 8
+
+# Tabela código -> flags (indexada diretamente pelo array de códigos)
+CODE_FLAGS = np.zeros(256, dtype=np.uint8)
+CODE_FLAGS[CELL_FREE] = FLAG_WALKABLE
+CODE_FLAGS[CELL_START] = FLAG_WALKABLE | FLAG_START
+CODE_FLAGS[CELL_RECHARGE] = FLAG_WALKABLE | FLAG_STATION
+CODE_FLAGS[CELL_WAREHOUSE] = FLAG_WALKABLE | FLAG_WAREHOUSE
+
+# Ordem dos vizinhos usada pelo grafo (mesma de build_graph_from_matrix original)
+NEIGHBOR_OFFSETS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+
+
+class WarehouseGrid:
+    """Grid do almoxarifado: códigos uint8 + camadas de flags em bits."""
+
+    def __init__(self, codes):
+        self.codes = np.ascontiguousarray(codes, dtype=np.uint8)
+        self.rows, self.cols = self.codes.shape
+        self._flags = None
+        self._walkable_flat = None
+
+    @classmethod
+    def from_matrix(cls, matriz):
+        """Converte a matriz literal (lista de listas de caracteres) para o grid compacto.
+
+        Caracteres fora de 'S', 'R', 'A', '1', '0' geram ValueError (como em
+        map_loader.parse_text_map) em vez de virarem obstáculo em silêncio.
+        """
+        rows = []
+        for y, row in enumerate(matriz):
+            try:
+                rows.append([CHAR_TO_CODE[cell] for cell in row])
+            except KeyError as e:
+                x = list(row).index(e.args[0])
+                raise ValueError(f"linha {y + 1}, coluna {x + 1}: "
+                                 f"caractere inválido {e.args[0]!r} (use S, R, A, 1 ou 0)") from None
+        return cls(np.array(rows, dtype=np.uint8))
+
+    def to_matrix(self):
+        """Converte de volta para o formato literal (lista de listas de caracteres)."""
+        return [[CODE_TO_CHAR[code] for code in row] for row in self.codes.tolist()]
+
+    # As camadas derivadas são calculadas no primeiro uso: um mapa aberto com
+    # memmap (map_loader) não paga flags nem a cópia linear se não consultá-las
+
+    @property
+    def flags(self):
+        """Camada de flags em bits (uint8 por célula)."""
+        if self._flags is None:
+            self._flags = CODE_FLAGS[self.codes]
+        return self._flags
+
+    @property
+    def walkable_flat(self):
+        """Andável por célula, linear (y * cols + x), como bytes 0/1."""
+        if self._walkable_flat is None:
+            # Cópia linear em bytes: indexação em Python bem mais rápida que em array NumPy
+            # (bytearray para set_code atualizar uma célula sem copiar o grid)
+            self._walkable_flat = bytearray((self.flags & FLAG_WALKABLE).tobytes())
+        return self._walkable_flat
+
+    @property
+    def walkable(self):
+        """Máscara booleana das células andáveis."""
+        return (self.flags & FLAG_WALKABLE) != 0
+
+    # ------------------------------------------------------------------
+    # Consultas por célula
+    # ------------------------------------------------------------------
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.cols and 0 <= y < self.rows
+
+    def is_walkable(self, x, y):
+        """True se (x, y) está dentro do grid e não é obstáculo."""
+        return 0 <= x < self.cols and 0 <= y < self.rows and self.walkable_flat[y * self.cols + x] != 0
+
+    def has_flag(self, x, y, flag):
+        return self.in_bounds(x, y) and bool(self.flags[y, x] & flag)
+
+    def is_warehouse(self, x, y):
+        return self.has_flag(x, y, FLAG_WAREHOUSE)
+
+    def is_station(self, x, y):
+        return self.has_flag(x, y, FLAG_STATION)
+
+    def code_at(self, x, y):
+        return int(self.codes[y, x])
+
+    def cell_char(self, x, y):
+        """Caractere da célula no formato literal ('S', 'R', 'A', '1', '0')."""
+        return CODE_TO_CHAR[int(self.codes[y, x])]
+
+    def set_code(self, x, y, code):
+        """Altera o código de uma célula e atualiza as camadas só nessa célula."""
+        self.codes[y, x] = code
+        flags = CODE_FLAGS[self.codes[y, x]]
+        if self._flags is not None:
+            self._flags[y, x] = flags
+        if self._walkable_flat is not None:
+            self._walkable_flat[y * self.cols + x] = int(flags & FLAG_WALKABLE)
+
+    # ------------------------------------------------------------------
+    # Consultas vetorizadas
+    # ------------------------------------------------------------------
+
+    def positions(self, code):
+        """Lista de posições (x, y) com o código dado, em ordem de varredura (linha a linha)."""
+        ys, xs = np.nonzero(self.codes == code)
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    def count(self, code):
+        return int(np.count_nonzero(self.codes == code))
+
+    def neighbor_masks(self):
+        """
+        Para cada direção de NEIGHBOR_OFFSETS, máscara booleana das células
+        andáveis cujo vizinho naquela direção também é andável.
+        """
+        w = self.walkable
+        right = np.zeros_like(w)
+        left = np.zeros_like(w)
+        down = np.zeros_like(w)
+        up = np.zeros_like(w)
+        right[:, :-1] = w[:, :-1] & w[:, 1:]
+        left[:, 1:] = w[:, 1:] & w[:, :-1]
+        down[:-1, :] = w[:-1, :] & w[1:, :]
+        up[1:, :] = w[1:, :] & w[:-1, :]
+        return [right, left, down, up]
+
+    def build_graph(self):
+        """Grafo de adjacência {(x, y): [((nx, ny), custo), ...]} a partir das máscaras."""
+        masks = [mask.tolist() for mask in self.neighbor_masks()]
+        walkable = self.walkable.tolist()
+        graph = {}
+        for y in range(self.rows):
+            row = walkable[y]
+            for x in range(self.cols):
+                if row[x]:
+                    neighbors = []
+                    for (dx, dy), mask in zip(NEIGHBOR_OFFSETS, masks):
+                        if mask[y][x]:
+                            neighbors.append(((x + dx, y + dy), 1.0))  # Custo 1 por movimento
+                    graph[(x, y)] = neighbors
+        return graph